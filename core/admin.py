@@ -28,6 +28,27 @@ from django.shortcuts import get_object_or_404
 import requests
 import json
 
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.apps import apps
+from django.contrib.auth import get_permission_codename
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.shortcuts import redirect
+
+from django.http import FileResponse
+from django.urls import reverse
+
+from django.contrib import messages
+
+from .comptages import CACHE_LISTES, SEUIL_COMPTE_EXACT, compte_connu, compter_borne
+from .export import FORMATS, noms_matieres, reponse_export
+from .geocodage import SEUIL_GEOCODAGE, geocoder_fiches
+from .matieres import REGISTRE
+from .models import Tache
+from .recherche import critere_recherche
+from .taches import SEUIL_TACHE, bilan_geocodage, planifier
+
 
 # ============================================================================
 # MIXIN GÉOLOCALISATION - VERSION OPENROUTESERVICE (PRODUCTION)
@@ -200,6 +221,315 @@ class GeolocalisationMixin:
                 'error': f'Erreur : {str(e)}'
             })
 
+    @admin.action(description='📍 Géolocaliser la sélection')
+    def geolocaliser_selection(self, request, queryset):
+        """
+        Géolocalise en une fois les fiches sélectionnées sans coordonnées
+        (core.geocodage : BAN en parallèle, adresses déjà connues reprises).
+        Au-delà de SEUIL_GEOCODAGE fiches, passe en tâche de fond.
+        """
+        nombre = queryset.count()
+        if nombre > SEUIL_GEOCODAGE:
+            self.planifier_tache(
+                request, 'geocodage',
+                f'📍 Géolocalisation de {nombre} {self.model._meta.verbose_name_plural.lower()}',
+                modele=self.model._meta.label_lower,
+                ids=self.ids_selection(queryset),
+            )
+            return
+        bilan = geocoder_fiches(queryset)
+        niveau = messages.WARNING if bilan['echecs'] else messages.SUCCESS
+        self.message_user(request, f'📍 {bilan_geocodage(bilan)}.', niveau)
+
+
+# ============================================================================
+# 🗣️ MIXIN RECHERCHE PHONÉTIQUE
+# ============================================================================
+
+class RechercheIndexeeMixin:
+    """
+    Recherche de l'admin sur l'index sans accents (core.recherche) au lieu
+    d'un icontains par champ de search_fields : "helene" trouve "Hélène",
+    chaque mot doit apparaître, et aucune jointure ne duplique les lignes
+    (pas de DISTINCT). search_fields reste déclaré pour afficher la barre
+    de recherche et documenter les champs indexés.
+    """
+
+    champs_recherche = ['recherche']
+    recherche_matieres = None       # nom de la relation des matières, ex. 'matieres'
+    recherche_co_responsable = False
+
+    def get_search_results(self, request, queryset, search_term):
+        matieres = None
+        if self.recherche_matieres:
+            matieres = getattr(self.model, self.recherche_matieres)
+        critere = critere_recherche(search_term, self.champs_recherche, matieres,
+                                    self.recherche_co_responsable)
+        if critere is None:
+            return queryset, False
+        return queryset.filter(critere), False
+
+
+class RecherchePhonetiqueMixin:
+    """
+    Complète la recherche de l'admin par les noms qui se prononcent pareil :
+    "Tchorbadjan" trouve "Tchorbadjian", "marie helene" trouve "Marie-Hélène".
+
+    Une fiche correspond si chaque mot se prononce comme son nom ou son
+    prénom, ou si les mots, coupés en deux, se prononcent comme son nom
+    et son prénom composés. Les requêtes utilisent les index phonétiques.
+    """
+
+    def critere_phonetique(self, search_term):
+        """Q des fiches correspondant phonétiquement à la recherche, ou None."""
+        mots = search_term.split()
+        if not mots:
+            return None
+        criteres = []
+
+        # Chaque mot = le nom ou le prénom
+        par_mot = [self.model.filtre_phonetique(mot) for mot in mots]
+        if all(critere is not None for critere in par_mot):
+            tous = par_mot[0]
+            for critere in par_mot[1:]:
+                tous &= critere
+            criteres.append(tous)
+
+        # "marie helene tchorbadjan" : prénom / nom composés
+        for coupure in range(1, len(mots)):
+            critere = self.model.filtre_nom_prenom_phonetique(
+                ' '.join(mots[:coupure]), ' '.join(mots[coupure:]))
+            if critere is not None:
+                criteres.append(critere)
+
+        if not criteres:
+            return None
+        resultat = criteres[0]
+        for critere in criteres[1:]:
+            resultat |= critere
+        return resultat
+
+    def get_search_results(self, request, queryset, search_term):
+        resultats, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+
+        critere = self.critere_phonetique(search_term)
+        if critere is not None:
+            resultats = resultats | queryset.filter(critere)
+
+        return resultats, may_have_duplicates
+
+
+# ============================================================================
+# 📚 FILTRE PAR MATIÈRE
+# ============================================================================
+
+class FiltreMatieres(admin.RelatedFieldListFilter):
+    """Filtre « par matière » dont les choix viennent du registre, sans requête."""
+
+    def field_choices(self, field, request, model_admin):
+        return [(matiere.pk, matiere.nom) for matiere in REGISTRE.toutes()]
+
+
+# ============================================================================
+# 🧮 FILTRES ET TOTAUX EN CACHE
+# ============================================================================
+
+class FiltreValeursEnCache(admin.AllValuesFieldListFilter):
+    """
+    Filtre sur les valeurs d'une colonne (code postal, ville...) dont la
+    liste est gardée en cache (core.comptages) au lieu d'un SELECT DISTINCT
+    à chaque affichage.
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        valeurs = self.lookup_choices  # queryset pas encore évalué
+        self.lookup_choices = CACHE_LISTES.valeur(
+            field.model, ('filtre', field_path), lambda: list(valeurs))
+
+
+class FiltreRelationEnCache(admin.RelatedFieldListFilter):
+    """Filtre sur une clé étrangère (co-responsable...) dont les choix sont gardés en cache."""
+
+    def field_choices(self, field, request, model_admin):
+        return CACHE_LISTES.valeur(
+            field.related_model,
+            ('filtre', field.model._meta.label, field.name),
+            lambda: super(FiltreRelationEnCache, self).field_choices(field, request, model_admin),
+        )
+
+
+class ChangeListComptee(ChangeList):
+    """
+    Liste sans COUNT(*) de toute la table à chaque affichage : le total
+    vient du cache (ou de l'estimation PostgreSQL), et une liste filtrée
+    n'est comptée exactement que si la table est petite, sinon jusqu'à
+    SEUIL_COMPTE_EXACT. approximation vaut alors 'estimation' ou 'borne'
+    (affichés « ≈ » et « plus de » par admin/core/pagination.html).
+    """
+
+    approximation = None
+
+    def compter(self):
+        """(nombre de résultats, total, approximation)."""
+        total, estime = CACHE_LISTES.total(self.model, self.root_queryset)
+        if not self.get_filters_params() and not self.query:
+            return total, total, 'estimation' if estime else None
+        if not estime and total <= SEUIL_COMPTE_EXACT:
+            return self.queryset.count(), total, None
+        nombre, borne = compter_borne(self.queryset)
+        return nombre, total, 'borne' if borne else None
+
+    def get_results(self, request):
+        # ChangeList.get_results inchangé : seuls ses deux count() (paginator
+        # et root_queryset) rendent les nombres ci-dessus, sans requête
+        result_count, full_result_count, self.approximation = self.compter()
+        queryset, root_queryset = self.queryset, self.root_queryset
+        self.queryset = compte_connu(queryset, result_count)
+        self.root_queryset = compte_connu(root_queryset, full_result_count)
+        try:
+            super().get_results(request)
+        finally:
+            self.queryset, self.root_queryset = queryset, root_queryset
+
+
+class ComptesEnCacheMixin:
+    """
+    Listes de l'admin dont le temps d'affichage ne dépend plus de la taille
+    de la table : totaux en cache (ChangeListComptee). À combiner avec
+    FiltreValeursEnCache / FiltreRelationEnCache dans list_filter.
+    """
+
+    def get_changelist(self, request, **kwargs):
+        return ChangeListComptee
+
+
+# ============================================================================
+# ⏳ MIXIN TÂCHES DE FOND
+# ============================================================================
+
+class TachesDeFondMixin:
+    """
+    Actions de masse : exécutées tout de suite sur une petite sélection,
+    mises en file (core.taches, commande run_jobs) au-delà de SEUIL_TACHE
+    fiches, pour ne pas dépasser le délai du proxy.
+    """
+
+    def planifier_tache(self, request, nom, description, **parametres):
+        tache = planifier(nom, description, request.user, **parametres)
+        self.message_user(request, format_html(
+            '⏳ {} : tâche de fond lancée — <a href="{}">suivre la progression</a>',
+            description, reverse('admin:core_tache_change', args=[tache.pk])))
+        return tache
+
+    def ids_selection(self, queryset):
+        return list(queryset.order_by().values_list('pk', flat=True))
+
+    def mettre_a_jour_selection(self, request, queryset, valeurs, message):
+        """
+        queryset.update(**valeurs) ; message contient {} pour le nombre de fiches :
+        '{} élève(s) marqué(s) comme accompagné(s).'
+        """
+        nombre = queryset.count()
+        if nombre <= SEUIL_TACHE:
+            modifiees = queryset.update(**valeurs)
+            # update() n'envoie pas de signal : totaux et filtres à recalculer
+            CACHE_LISTES.invalider(self.model)
+            self.message_user(request, message.format(modifiees))
+            return
+        self.planifier_tache(
+            request, 'mise_a_jour', f"✏️ {message.format(nombre).rstrip('.')}",
+            modele=self.model._meta.label_lower,
+            ids=self.ids_selection(queryset),
+            valeurs=valeurs,
+        )
+
+
+# ============================================================================
+# 📤 MIXIN EXPORT (CSV, XLSX, JSONL)
+# ============================================================================
+
+class ExportMixin(TachesDeFondMixin):
+    """
+    Exports en flux (core.export) d'une liste de l'admin :
+        - actions « Exporter en CSV / XLSX / JSONL » sur la sélection
+        - boutons en haut de la liste pour exporter toutes les fiches
+          correspondant aux filtres et à la recherche en cours, sans cocher
+
+    Au-delà de SEUIL_TACHE fiches, l'export devient une tâche de fond et le
+    fichier se télécharge depuis la page de la tâche.
+
+    La classe d'admin déclare colonnes_export [(titre, valeur)], nom_export
+    et les relations à précharger (select_related_export, prefetch_export).
+    """
+
+    colonnes_export = []
+    nom_export = 'export'
+    select_related_export = ()
+    prefetch_export = ()
+    change_list_template = 'admin/core/change_list_export.html'
+
+    def queryset_export(self, queryset):
+        return queryset.select_related(*self.select_related_export) \
+                       .prefetch_related(*self.prefetch_export)
+
+    def exporter(self, request, queryset, format_export):
+        nombre = queryset.count()
+        if nombre > SEUIL_TACHE:
+            tache = self.planifier_tache(
+                request, 'export',
+                f'📥 Export {format_export.upper()} de {nombre} {self.model._meta.verbose_name_plural.lower()}',
+                modele=self.model._meta.label_lower,
+                ids=self.ids_selection(queryset),
+                format_export=format_export,
+            )
+            return redirect('admin:core_tache_change', tache.pk)
+        return reponse_export(self.queryset_export(queryset), self.colonnes_export,
+                              self.nom_export, format_export)
+
+    @admin.action(description='📥 Exporter en CSV')
+    def exporter_csv(self, request, queryset):
+        return self.exporter(request, queryset, 'csv')
+
+    @admin.action(description='📥 Exporter en XLSX')
+    def exporter_xlsx(self, request, queryset):
+        return self.exporter(request, queryset, 'xlsx')
+
+    @admin.action(description='📥 Exporter en JSONL')
+    def exporter_jsonl(self, request, queryset):
+        return self.exporter(request, queryset, 'jsonl')
+
+    def exporter_filtres_view(self, request, format_export):
+        """Exporte toute la liste filtrée (mêmes paramètres que la page de liste)."""
+        if format_export not in FORMATS:
+            raise Http404(f'Format d\'export inconnu : {format_export}')
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+        request.export_en_cours = True  # voir get_changelist
+        try:
+            changelist = self.get_changelist_instance(request)
+        except IncorrectLookupParameters:
+            opts = self.model._meta
+            return redirect(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        return self.exporter(request, changelist.get_queryset(request), format_export)
+
+    def get_changelist(self, request, **kwargs):
+        changelist = super().get_changelist(request, **kwargs)
+        if getattr(request, 'export_en_cours', False):
+            # Seul le queryset filtré sert : pas de pagination ni de comptages
+            return type('ChangeListExport', (changelist,), {'get_results': lambda cl, request: None})
+        return changelist
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                'exporter/<str:format_export>/',
+                self.admin_site.admin_view(self.exporter_filtres_view),
+                name=f'{opts.app_label}_{opts.model_name}_exporter',
+            ),
+        ] + super().get_urls()
+
 
 # ============================================================================
 # Admin pour le profil utilisateur
@@ -207,7 +537,7 @@ class GeolocalisationMixin:
 @admin.register(ProfilUtilisateur)
 class ProfilUtilisateurAdmin(admin.ModelAdmin):
     list_display = ['user', 'benevole']
-    list_filter = ['benevole']
+    list_filter = [('benevole', FiltreRelationEnCache)]
     search_fields = ['user__username', 'benevole__nom', 'benevole__prenom']
     
 # ============================================================================
@@ -230,7 +560,8 @@ class MatiereAdmin(admin.ModelAdmin):
 # ============================================================================
 
 @admin.register(Eleve)
-class EleveAdmin(GeolocalisationMixin, admin.ModelAdmin):
+class EleveAdmin(ExportMixin, RecherchePhonetiqueMixin, RechercheIndexeeMixin, GeolocalisationMixin,
+                 ComptesEnCacheMixin, admin.ModelAdmin):
     form = EleveAdminForm
     """Configuration de l'affichage des élèves dans l'admin"""
     
@@ -255,10 +586,10 @@ class EleveAdmin(GeolocalisationMixin, admin.ModelAdmin):
     list_filter = [
         'statut',
         'classe',
-        'code_postal',
-        'matieres_souhaitees',  # Filtre par matière
+        ('code_postal', FiltreValeursEnCache),
+        ('matieres_souhaitees', FiltreMatieres),  # Filtre par matière
         'date_creation',
-        'co_responsable',
+        ('co_responsable', FiltreRelationEnCache),
     ]
     
     search_fields = [
@@ -275,6 +606,13 @@ class EleveAdmin(GeolocalisationMixin, admin.ModelAdmin):
     filter_horizontal = ('matieres_souhaitees',)
     
     list_per_page = 50
+
+    def get_queryset(self, request):
+        # Vignette co-responsable chargée avec la page : un nombre de
+        # requêtes constant, quel que soit le nombre de lignes
+        return super().get_queryset(request).select_related(
+            'co_responsable__profil__benevole',
+        )
     
     # ========================================================================
     # 📝 FORMULAIRE D'ÉDITION
@@ -415,7 +753,7 @@ class EleveAdmin(GeolocalisationMixin, admin.ModelAdmin):
     
     def afficher_matieres(self, obj):
         """Affiche les matières dans la liste"""
-        matieres = obj.matieres_souhaitees.all()
+        matieres = list(obj.matieres_souhaitees.all())
         if matieres:
             return ", ".join([m.nom for m in matieres[:3]])  # Max 3 pour ne pas surcharger
         return "-"
@@ -425,61 +763,47 @@ class EleveAdmin(GeolocalisationMixin, admin.ModelAdmin):
     # ⚡ ACTIONS RAPIDES
     # ========================================================================
     
-    actions = ['marquer_accompagne', 'marquer_a_accompagner', 'marquer_complet','exporter_csv']
+    actions = ['marquer_accompagne', 'marquer_a_accompagner', 'marquer_complet',
+               'geolocaliser_selection', 'exporter_csv', 'exporter_xlsx', 'exporter_jsonl']
     
     def marquer_accompagne(self, request, queryset):
         """Marque les élèves sélectionnés comme accompagnés"""
-        updated = queryset.update(statut='accompagne')
-        self.message_user(request, f'{updated} élève(s) marqué(s) comme accompagné(s).')
+        self.mettre_a_jour_selection(request, queryset, {'statut': 'accompagne'},
+                                     '{} élève(s) marqué(s) comme accompagné(s).')
     marquer_accompagne.short_description = "✅ Marquer comme accompagné"
     
     def marquer_a_accompagner(self, request, queryset):
         """Marque les élèves sélectionnés comme à accompagner"""
-        updated = queryset.update(statut='a_accompagner')
-        self.message_user(request, f'{updated} élève(s) marqué(s) comme à accompagner.')
+        self.mettre_a_jour_selection(request, queryset, {'statut': 'a_accompagner'},
+                                     '{} élève(s) marqué(s) comme à accompagner.')
     marquer_a_accompagner.short_description = "⏳ Marquer comme à accompagner"
     
     def marquer_complet(self, request, queryset):
-        updated = queryset.update(statut_saisie='complet')
-        self.message_user(request, f'{updated} fiche(s) marquée(s) comme complète(s).')
+        self.mettre_a_jour_selection(request, queryset, {'statut_saisie': 'complet'},
+                                     '{} fiche(s) marquée(s) comme complète(s).')
     marquer_complet.short_description = "✅ Marquer comme fiche complète"
     
-    def exporter_csv(self, request, queryset):
-        """Exporte les élèves sélectionnés en CSV"""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="eleves_export.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Nom', 'Prénom', 'Téléphone élève',
-            'Nom parent', 'Prénom parent', 'Téléphone parent',
-            'Classe', 'Établissement', 'Matières souhaitées',
-            'Adresse', 'Arrondissement', 'Statut',
-            'Informations complémentaires'
-        ])
-        
-        for eleve in queryset:
-            writer.writerow([
-                eleve.nom,
-                eleve.prenom,
-                eleve.telephone,
-                eleve.nom_parent,
-                eleve.prenom_parent,
-                eleve.telephone_parent,
-                eleve.classe,
-                eleve.etablissement,
-                eleve.get_matieres_str(),  # Convertit les matières en chaîne
-                eleve.adresse,
-                eleve.arrondissement,
-                eleve.get_statut_display(),
-                eleve.informations_complementaires,
-            ])
-        
-        return response
-    exporter_csv.short_description = "📥 Exporter en CSV"
+    # ========================================================================
+    # 📤 EXPORT (voir ExportMixin)
+    # ========================================================================
+
+    nom_export = 'eleves_export'
+    prefetch_export = ('matieres_souhaitees',)
+    colonnes_export = [
+        ('Nom', 'nom'),
+        ('Prénom', 'prenom'),
+        ('Téléphone élève', 'telephone'),
+        ('Nom parent', 'nom_parent'),
+        ('Prénom parent', 'prenom_parent'),
+        ('Téléphone parent', 'telephone_parent'),
+        ('Classe', 'classe'),
+        ('Établissement', 'etablissement'),
+        ('Matières souhaitées', 'get_matieres_str'),  # matières préchargées
+        ('Adresse', 'adresse'),
+        ('Arrondissement', 'arrondissement'),
+        ('Statut', 'get_statut_display'),
+        ('Informations complémentaires', 'informations_complementaires'),
+    ]
     
      # Méthode pour afficher le bénévole associé
     def co_responsable_nom(self, obj):
@@ -500,7 +824,8 @@ des filtres, recherches et actions personnalisées.
 """
 
 @admin.register(Benevole)
-class BenevoleAdmin(GeolocalisationMixin, admin.ModelAdmin):
+class BenevoleAdmin(ExportMixin, RecherchePhonetiqueMixin, RechercheIndexeeMixin, GeolocalisationMixin,
+                    ComptesEnCacheMixin, admin.ModelAdmin):
     """
     Configuration avancée de l'interface d'administration pour les bénévoles.
     """
@@ -541,10 +866,14 @@ class BenevoleAdmin(GeolocalisationMixin, admin.ModelAdmin):
         'matieres__nom',  # Recherche dans les matières
     ]
     
+    # Index de recherche + matières et co-responsable (core.recherche)
+    recherche_matieres = 'matieres'
+    recherche_co_responsable = True
+    
     list_filter = [
         'statut',
         'est_responsable',
-        'ville',
+        ('ville', FiltreValeursEnCache),
         'primaire',
         'college',
         'lycee',
@@ -651,6 +980,12 @@ class BenevoleAdmin(GeolocalisationMixin, admin.ModelAdmin):
     
     # Sélection par page
     list_max_show_all = 200
+
+    def get_queryset(self, request):
+        # Vignette co-responsable chargée avec la page (une seule requête)
+        return super().get_queryset(request).select_related(
+            'co_responsable__profil__benevole',
+        )
     
     # Préserver les filtres lors de la navigation
     preserve_filters = True
@@ -681,18 +1016,18 @@ class BenevoleAdmin(GeolocalisationMixin, admin.ModelAdmin):
     
     @admin.action(description="Convertir en Mentor")
     def convertir_en_mentor(self, request, queryset):
-        updated = queryset.update(statut='Mentor')
-        self.message_user(request, f"{updated} bénévole(s) converti(s) en Mentor.")
+        self.mettre_a_jour_selection(request, queryset, {'statut': 'Mentor'},
+                                     '{} bénévole(s) converti(s) en Mentor.')
     
     @admin.action(description="Marquer comme Disponible")
     def marquer_comme_disponible(self, request, queryset):
-        updated = queryset.update(statut='Disponible')
-        self.message_user(request, f"{updated} bénévole(s) marqué(s) comme Disponible.")
+        self.mettre_a_jour_selection(request, queryset, {'statut': 'Disponible'},
+                                     '{} bénévole(s) marqué(s) comme Disponible.')
     
     @admin.action(description="Marquer comme Indisponible")
     def marquer_comme_indisponible(self, request, queryset):
-        updated = queryset.update(statut='Indisponible')
-        self.message_user(request, f"{updated} bénévole(s) marqué(s) comme Indisponible.")
+        self.mettre_a_jour_selection(request, queryset, {'statut': 'Indisponible'},
+                                     '{} bénévole(s) marqué(s) comme Indisponible.')
 
     # ================================================================
     # 🎨 MÉTHODES PERSONNALISÉES POUR L'AFFICHAGE
@@ -779,7 +1114,10 @@ class BenevoleAdmin(GeolocalisationMixin, admin.ModelAdmin):
         'marquer_comme_mentor',
         'marquer_comme_disponible',
         'marquer_comme_indisponible',
-        'exporter_csv_complet',
+        'geolocaliser_selection',
+        'exporter_csv',
+        'exporter_xlsx',
+        'exporter_jsonl',
         'assigner_co_responsable'
     ]
     
@@ -828,6 +1166,7 @@ class BenevoleAdmin(GeolocalisationMixin, admin.ModelAdmin):
                 
                 # Mettre à jour les bénévoles sélectionnés
                 count = Benevole.objects.filter(pk__in=selected).update(co_responsable=co_responsable)
+                CACHE_LISTES.invalider(Benevole)
                 print(f"✅ {count} bénévole(s) mis à jour")
                 
                 self.message_user(
@@ -855,103 +1194,64 @@ class BenevoleAdmin(GeolocalisationMixin, admin.ModelAdmin):
     @admin.action(description='✅ Marquer comme Mentor')
     def marquer_comme_mentor(self, request, queryset):
         """Action pour marquer des bénévoles comme Mentor."""
-        updated = queryset.update(statut='Mentor')
-        self.message_user(
-            request,
-            f'{updated} bénévole(s) marqué(s) comme Mentor.'
-        )
+        self.mettre_a_jour_selection(request, queryset, {'statut': 'Mentor'},
+                                     '{} bénévole(s) marqué(s) comme Mentor.')
     
     @admin.action(description='🟢 Marquer comme Disponible')
     def marquer_comme_disponible(self, request, queryset):
         """Action pour marquer des bénévoles comme Disponible."""
-        updated = queryset.update(statut='Disponible')
-        self.message_user(
-            request,
-            f'{updated} bénévole(s) marqué(s) comme Disponible.'
-        )
+        self.mettre_a_jour_selection(request, queryset, {'statut': 'Disponible'},
+                                     '{} bénévole(s) marqué(s) comme Disponible.')
     
     @admin.action(description='🔴 Marquer comme Indisponible')
     def marquer_comme_indisponible(self, request, queryset):
         """Action pour marquer des bénévoles comme Indisponible."""
-        updated = queryset.update(statut='Indisponible')
-        self.message_user(
-            request,
-            f'{updated} bénévole(s) marqué(s) comme Indisponible.'
-        )
+        self.mettre_a_jour_selection(request, queryset, {'statut': 'Indisponible'},
+                                     '{} bénévole(s) marqué(s) comme Indisponible.')
     
-    @admin.action(description='📥 Exporter en CSV complet')
-    def exporter_csv_complet(self, request, queryset):
-        """Exporte les bénévoles sélectionnés en CSV complet."""
-        import csv
-        from django.http import HttpResponse
-        from datetime import datetime
-        
-        # Créer la réponse HTTP
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        filename = f'benevoles_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        # Créer le writer CSV
-        writer = csv.writer(response)
-        
-        # En-têtes
-        writer.writerow([
-            'Nom', 'Prénom', 'Statut', 'Adresse', 'Code postal', 'Ville',
-            'Email', 'Téléphone', 'Est responsable',
-            'Profession', 'Matières', 'Zone géographique', 'Moyen de déplacement',
-            'Primaire', 'Collège', 'Lycée',
-            'A donné photo', 'Groupe WhatsApp',
-            'Fichier', 'Outlook', 'Extranet',
-            'Réunion accueil', 'Volet 3',
-            'Commentaires', 'Divers',
-            'Latitude', 'Longitude'
-        ])
-        
-        # Données
-        for benevole in queryset:
-            writer.writerow([
-                benevole.nom,
-                benevole.prenom,
-                benevole.statut,
-                benevole.adresse,
-                benevole.code_postal,
-                benevole.ville,
-                benevole.email,
-                benevole.telephone,
-                benevole.est_responsable,
-                benevole.profession,
-                benevole.matieres,
-                benevole.zone_geographique,
-                benevole.moyen_deplacement,
-                benevole.primaire,
-                benevole.college,
-                benevole.lycee,
-                benevole.a_donne_photo,
-                benevole.est_ajoute_au_groupe_whatsapp,
-                benevole.fichier,
-                benevole.outlook,
-                benevole.extranet,
-                benevole.reunion_accueil_faite,
-                benevole.volet_3_casier_judiciaire,
-                benevole.commentaires,
-                benevole.divers,
-                benevole.latitude,
-                benevole.longitude,
-            ])
-        
-        self.message_user(
-            request,
-            f'{queryset.count()} bénévole(s) exporté(s) en CSV.'
-        )
-        
-        return response
+    # ================================================================
+    # 📤 EXPORT COMPLET (voir ExportMixin)
+    # ================================================================
+
+    nom_export = 'benevoles_export'
+    prefetch_export = ('matieres',)
+    colonnes_export = [
+        ('Nom', 'nom'),
+        ('Prénom', 'prenom'),
+        ('Statut', 'statut'),
+        ('Adresse', 'adresse'),
+        ('Code postal', 'code_postal'),
+        ('Ville', 'ville'),
+        ('Email', 'email'),
+        ('Téléphone', 'telephone'),
+        ('Est responsable', 'est_responsable'),
+        ('Profession', 'profession'),
+        ('Matières', noms_matieres('matieres')),
+        ('Zone géographique', 'zone_geographique'),
+        ('Moyen de déplacement', 'moyen_deplacement'),
+        ('Primaire', 'primaire'),
+        ('Collège', 'college'),
+        ('Lycée', 'lycee'),
+        ('A donné photo', 'a_donne_photo'),
+        ('Groupe WhatsApp', 'est_ajoute_au_groupe_whatsapp'),
+        ('Fichier', 'fichier'),
+        ('Outlook', 'outlook'),
+        ('Extranet', 'extranet'),
+        ('Réunion accueil', 'reunion_accueil_faite'),
+        ('Volet 3', 'volet_3_casier_judiciaire'),
+        ('Commentaires', 'commentaires'),
+        ('Divers', 'divers'),
+        ('Latitude', 'latitude'),
+        ('Longitude', 'longitude'),
+    ]
+
 
 # ============================================================================
 # 🔗 ADMINISTRATION DES BINÔMES
 # ============================================================================
 
 @admin.register(Binome)
-class BinomeAdmin(admin.ModelAdmin):
+class BinomeAdmin(TachesDeFondMixin, RechercheIndexeeMixin, ComptesEnCacheMixin, admin.ModelAdmin):
     """Configuration de l'affichage des binômes dans l'admin."""
     
     list_display = [
@@ -978,6 +1278,9 @@ class BinomeAdmin(admin.ModelAdmin):
         'benevole__prenom',
     ]
     
+    # Index de recherche de l'élève et du bénévole (core.recherche)
+    champs_recherche = ['eleve__recherche', 'benevole__recherche']
+    
     # Filtres automatiques sur les clés étrangères
     autocomplete_fields = ['eleve', 'benevole']
     
@@ -1010,6 +1313,10 @@ class BinomeAdmin(admin.ModelAdmin):
     )
     
     list_per_page = 50
+
+    def get_queryset(self, request):
+        # eleve / benevole affichés via __str__ : chargés par jointure
+        return super().get_queryset(request).select_related('eleve', 'benevole')
     
     # Méthode personnalisée pour calculer la durée
     def duree(self, obj):
@@ -1027,17 +1334,157 @@ class BinomeAdmin(admin.ModelAdmin):
     actions = ['activer_binomes', 'desactiver_binomes']
     
     def activer_binomes(self, request, queryset):
-        count = queryset.update(actif=True)
-        self.message_user(request, f'{count} binôme(s) activé(s).')
+        self.mettre_a_jour_selection(request, queryset, {'actif': True},
+                                     '{} binôme(s) activé(s).')
     activer_binomes.short_description = "✅ Activer les binômes"
     
     def desactiver_binomes(self, request, queryset):
         from datetime import date
-        count = queryset.update(actif=False, date_fin=date.today())
-        self.message_user(request, f'{count} binôme(s) désactivé(s).')
+        self.mettre_a_jour_selection(request, queryset,
+                                     {'actif': False, 'date_fin': date.today().isoformat()},
+                                     '{} binôme(s) désactivé(s).')
     desactiver_binomes.short_description = "❌ Désactiver les binômes"
 
 
+# ============================================================================
+# ⏳ ADMINISTRATION DES TÂCHES DE FOND
+# ============================================================================
+
+@admin.register(Tache)
+class TacheAdmin(admin.ModelAdmin):
+    """
+    Suivi des tâches lancées par les actions de masse (voir core.taches).
+    Lecture seule : les tâches sont créées par les actions et exécutées
+    par la commande run_jobs.
+    """
+
+    list_display = [
+        'description',
+        'statut_colore',
+        'avancement',
+        'utilisateur',
+        'date_creation',
+        'date_fin',
+        'lien_fichier',
+    ]
+
+    list_filter = ['statut', 'traitement']
+
+    list_select_related = ['utilisateur']
+
+    fields = [
+        'description',
+        'statut',
+        ('progression', 'total'),
+        'message',
+        'lien_fichier',
+        'utilisateur',
+        ('date_creation', 'date_debut', 'date_activite', 'date_fin'),
+    ]
+
+    readonly_fields = [
+        'description', 'statut', 'progression', 'total', 'message',
+        'lien_fichier', 'utilisateur', 'date_creation', 'date_debut', 'date_activite', 'date_fin',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Statut', ordering='statut')
+    def statut_colore(self, obj):
+        couleurs = {
+            'en_attente': '#ffc107',
+            'en_cours': '#007bff',
+            'terminee': '#28a745',
+            'echec': '#dc3545',
+        }
+        return format_html(
+            '<span style="color: {}; font-weight: bold;">●</span> {}',
+            couleurs.get(obj.statut, '#6c757d'),
+            obj.get_statut_display()
+        )
+
+    @admin.display(description='Avancement')
+    def avancement(self, obj):
+        return f'{obj.pourcentage()} % ({obj.progression}/{obj.total})'
+
+    @admin.display(description='Fichier')
+    def lien_fichier(self, obj):
+        if not obj.fichier:
+            return '-'
+        return format_html(
+            '<a href="{}">📥 Télécharger</a>',
+            reverse('admin:core_tache_telecharger', args=[obj.pk])
+        )
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                '<int:object_id>/progression/',
+                self.admin_site.admin_view(self.progression_view),
+                name='core_tache_progression',
+            ),
+            path(
+                '<int:object_id>/telecharger/',
+                self.admin_site.admin_view(self.telecharger_view),
+                name='core_tache_telecharger',
+            ),
+        ]
+        return custom_urls + urls
+
+    def _tache(self, request, object_id):
+        tache = get_object_or_404(Tache, pk=object_id)
+        if not self.has_view_permission(request, tache):
+            raise PermissionDenied
+        return tache
+
+    def peut_telecharger(self, request, tache):
+        """
+        Le fichier reprend les fiches exportées : réservé à l'auteur de la
+        tâche, ou à qui peut consulter le modèle exporté.
+        """
+        if tache.utilisateur_id == request.user.pk:
+            return True
+        try:
+            modele = apps.get_model(tache.parametres.get('modele', ''))
+        except (LookupError, ValueError):
+            return False
+        opts = modele._meta
+        return any(
+            request.user.has_perm(f'{opts.app_label}.{get_permission_codename(action, opts)}')
+            for action in ('view', 'change')
+        )
+
+    def progression_view(self, request, object_id):
+        """Avancement en JSON, interrogé par la page de la tâche."""
+        tache = self._tache(request, object_id)
+        return JsonResponse({
+            'statut': tache.statut,
+            'statut_libelle': tache.get_statut_display(),
+            'progression': tache.progression,
+            'total': tache.total,
+            'pourcentage': tache.pourcentage(),
+            'finie': tache.est_finie(),
+            'message': tache.message,
+            'fichier': (reverse('admin:core_tache_telecharger', args=[tache.pk])
+                        if tache.fichier and self.peut_telecharger(request, tache) else None),
+        })
+
+    def telecharger_view(self, request, object_id):
+        """Fichier produit par la tâche (hors de MEDIA_ROOT, donc servi ici)."""
+        tache = self._tache(request, object_id)
+        if not self.peut_telecharger(request, tache):
+            raise PermissionDenied
+        if not tache.fichier:
+            raise Http404('Cette tâche n\'a pas produit de fichier')
+        return FileResponse(tache.fichier.open('rb'), as_attachment=True,
+                            filename=tache.fichier.name.rsplit('/', 1)[-1])
+
+
 # ============================================================================
 # 🎨 PERSONNALISATION DU SITE ADMIN
 # ============================================================================
@@ -37,7 +37,12 @@ class CoreConfig(AppConfig):
         Exemple :
             import core.signals  # Charger les signaux
         """
-        pass
+        import core.signals  # Charger les signaux (registre des matières)
+
+        from django.conf import settings
+        if settings.DBSTATS_ACTIVE:
+            from core.dbstats import installer
+            installer()  # Statistiques des requêtes SQL (top_queries)
 
 
 # ============================================================================
@@ -0,0 +1,233 @@
+"""
+🗂️ COLONNES.PY - Correspondance déclarative colonnes → champs pour les imports
+
+Chaque commande d'import décrit ses colonnes une fois, avec leurs
+variantes d'en-tête et leur conversion :
+
+    class ColonnesBinomes(SchemaColonnes):
+        nom_enfant = Colonne('nom enfant', 'nom famille enfant', conversion=nom_famille)
+        prenom_enfant = Colonne('prénom enfant', 'prenom enfant', 'prénom en fant')
+        date_contrat = Colonne('date contrat', conversion=parse_date)
+
+    with ColonnesBinomes.ouvrir(chemin, minuscules=True) as lignes:
+        for ligne in lignes:
+            ligne.nom_enfant, ligne.date_contrat   # déjà nettoyés et convertis
+
+Les en-têtes sont résolus UNE FOIS par fichier en positions de colonnes,
+et une fonction de lecture par colonne est préparée à ce moment-là : une
+ligne est ensuite lue comme une simple liste (csv.reader), sans dict ni
+recherche d'en-tête.
+
+Règles (identiques aux anciens row.get(...) or row.get(...)) :
+    - plusieurs variantes présentes : la première valeur non vide l'emporte
+    - en-tête en double : la dernière colonne est prise (comme csv.DictReader)
+    - aucune variante présente : valeur par défaut (conversion de '')
+    - Colonne(index=0) : colonne désignée par sa position, quel que soit son titre
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from operator import itemgetter
+
+from .lecture import nettoyer_entete, ouvrir_lignes
+
+
+# ============================================================================
+# 🔄 CONVERSIONS
+# ============================================================================
+
+FORMATS_DATE = ('%d/%m/%Y', '%d/%m/%y', '%Y-%m-%d')
+
+
+def texte(valeur):
+    return valeur.strip()
+
+
+def brut(valeur):
+    return valeur
+
+
+def minuscules(valeur):
+    return valeur.strip().lower()
+
+
+def nom_famille(valeur):
+    """Nom de famille : sans espaces ni astérisque final (marque du fichier source)."""
+    return valeur.strip().rstrip('*')
+
+
+def present(valeur):
+    """Case cochée / cellule remplie → True."""
+    return bool(valeur.strip())
+
+
+def fait(valeur):
+    """Cellule remplie et différente de « 0 » → True."""
+    return valeur.strip() not in ('', '0')
+
+
+def booleen(valeur):
+    """« oui » → True ; vide, « non » ou autre → False."""
+    return valeur.strip().lower() == 'oui'
+
+
+def parse_date(valeur):
+    """Date JJ/MM/AAAA, JJ/MM/AA ou AAAA-MM-JJ → date ; vide, « 0 » ou illisible → None."""
+    valeur = (valeur or '').strip()
+    if not valeur or valeur == '0':
+        return None
+    for fmt in FORMATS_DATE:
+        try:
+            return datetime.strptime(valeur, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def decimal(valeur):
+    valeur = valeur.strip()
+    if not valeur:
+        return None
+    try:
+        return Decimal(valeur)
+    except InvalidOperation:
+        return None
+
+
+def flottant(valeur):
+    valeur = valeur.strip()
+    if not valeur:
+        return None
+    try:
+        return float(valeur)
+    except ValueError:
+        return None
+
+
+# ============================================================================
+# 🗂️ SCHÉMA DÉCLARATIF
+# ============================================================================
+
+class Colonne:
+    """Une colonne attendue : ses variantes d'en-tête (ou sa position) et sa conversion."""
+
+    def __init__(self, *alias, conversion=texte, index=None, defaut=None):
+        self.alias = alias
+        self.conversion = conversion
+        self.index = index
+        # Valeur si la colonne est absente du fichier ; par défaut conversion('')
+        self.defaut = conversion('') if defaut is None else defaut
+
+
+class SchemaColonnes:
+    """
+    Base des schémas d'import : les attributs Colonne d'une sous-classe
+    deviennent les champs (dans l'ordre de déclaration) d'un namedtuple.
+    """
+
+    colonnes = {}
+    Ligne = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.colonnes = {
+            **cls.colonnes,
+            **{nom: attr for nom, attr in vars(cls).items() if isinstance(attr, Colonne)},
+        }
+        cls.Ligne = namedtuple(cls.__name__.replace('Colonnes', 'Ligne') or 'Ligne', cls.colonnes)
+
+    @classmethod
+    def extracteur(cls, entetes, minuscules=False):
+        """
+        Résout les en-têtes en positions et retourne une fonction
+        liste de textes → Ligne (namedtuple des valeurs converties).
+        """
+        positions = {}
+        for i, entete in enumerate(entetes):
+            positions[entete] = i  # en double : la dernière l'emporte
+
+        lecteurs = []
+        for colonne in cls.colonnes.values():
+            if colonne.index is not None:
+                indexes = [colonne.index] if colonne.index < len(entetes) else []
+            else:
+                indexes = [positions[a] for a in
+                           (nettoyer_entete(alias, minuscules) for alias in colonne.alias)
+                           if a in positions]
+            lecteurs.append(_lecteur(indexes, colonne))
+
+        largeur = len(entetes)
+        fabriquer = cls.Ligne._make
+
+        def extraire(ligne):
+            if len(ligne) < largeur:
+                ligne = list(ligne) + [''] * (largeur - len(ligne))
+            return fabriquer([lire(ligne) for lire in lecteurs])
+        return extraire
+
+    @classmethod
+    @contextmanager
+    def ouvrir(cls, chemin, minuscules=False):
+        """
+        Ouvre un fichier d'import et retourne un lecteur de Lignes, avec
+        l'attribut fieldnames (en-têtes du fichier) comme csv.DictReader.
+        """
+        with ouvrir_lignes(chemin, minuscules) as (entetes, lignes):
+            yield LecteurColonnes(entetes, lignes, cls.extracteur(entetes, minuscules))
+
+
+class LecteurColonnes:
+    """
+    Itérable de Lignes, avec les en-têtes du fichier dans fieldnames.
+    numero et brute décrivent la ligne en cours (numéro dans le fichier,
+    cellules telles que lues), pour les messages et les rejets.
+    """
+
+    def __init__(self, entetes, lignes, extraire):
+        self.fieldnames = entetes
+        self.lignes = lignes
+        self.extraire = extraire
+        self.numero = None
+        self.brute = None
+        # Quarantaine des lignes rejetées (core.quarantaine), si la commande en a une
+        self.rejets = None
+
+    def __iter__(self):
+        extraire = self.extraire
+        for numero, ligne in self.lignes:
+            self.numero = numero
+            self.brute = ligne
+            yield extraire(ligne)
+
+    def rejeter(self, motif):
+        """Met la ligne en cours en quarantaine avec son motif."""
+        if self.rejets is not None:
+            self.rejets.rejeter(self.numero, self.brute, motif)
+
+
+def _lecteur(indexes, colonne):
+    """Fonction ligne → valeur convertie de la colonne (indexes : positions présentes)."""
+    if not indexes:
+        defaut = colonne.defaut
+        return lambda ligne: defaut
+
+    conversion = colonne.conversion
+    if len(indexes) == 1:
+        cellule = itemgetter(indexes[0])
+    else:
+        # Plusieurs variantes présentes : la première cellule non vide
+        cellules = itemgetter(*indexes)
+
+        def cellule(ligne):
+            for valeur in cellules(ligne):
+                if valeur:
+                    return valeur
+            return ''
+
+    if conversion is brut:
+        return cellule
+    if conversion is texte:
+        return lambda ligne: cellule(ligne).strip()
+    return lambda ligne: conversion(cellule(ligne))
@@ -0,0 +1,121 @@
+"""
+🧮 COMPTAGES.PY - Totaux et choix de filtres des listes de l'admin, en cache
+
+Chaque affichage d'une liste de l'admin comptait toute la table deux fois
+(COUNT filtré et non filtré) et relisait les valeurs distinctes des
+filtres (code postal, ville, co-responsable...) : le temps d'affichage
+grandissait avec la table, même pour la première page.
+
+Ce module garde, par processus :
+
+    CACHE_LISTES.total(Eleve)          # (nombre, approximatif)
+    CACHE_LISTES.valeur(Eleve, ('filtre', 'code_postal'), calcul)
+
+Les entrées d'un modèle sont invalidées par ses signaux post_save /
+post_delete (core.signals), et explicitement après les QuerySet.update()
+des actions de l'admin et des tâches de fond. Les autres modifications
+sans signal (bulk_create() des imports, autre processus) sont prises en
+compte au plus tard après DUREE_MAX secondes.
+
+Au-delà de SEUIL_COMPTE_EXACT fiches, sur PostgreSQL, le total vient de
+l'estimation du planificateur (pg_class.reltuples) au lieu d'un COUNT(*),
+et le nombre de résultats d'une liste filtrée n'est compté que jusqu'au
+seuil (compter_borne) : « plus de 10 000 résultats ».
+"""
+
+import threading
+import time
+from types import MethodType
+
+from django.db import connections
+
+from .metriques import CACHE
+
+
+# Au-delà, les comptages deviennent approximatifs ou bornés
+SEUIL_COMPTE_EXACT = 10000
+
+
+def estimation_postgresql(modele, alias):
+    """Nombre de lignes estimé par PostgreSQL (dernier ANALYZE), ou None."""
+    connexion = connections[alias]
+    if connexion.vendor != 'postgresql':
+        return None
+    with connexion.cursor() as curseur:
+        curseur.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                        [modele._meta.db_table])
+        ligne = curseur.fetchone()
+    # -1 : table jamais analysée
+    if not ligne or ligne[0] < 0:
+        return None
+    return int(ligne[0])
+
+
+def compter_borne(queryset, limite=SEUIL_COMPTE_EXACT):
+    """
+    Compte au plus limite + 1 lignes : SELECT COUNT(*) FROM (... LIMIT n).
+    Retourne (nombre, approximatif) ; approximatif si la limite est dépassée.
+    """
+    nombre = queryset.order_by()[:limite + 1].count()
+    if nombre > limite:
+        return limite, True
+    return nombre, False
+
+
+def compte_connu(queryset, nombre):
+    """
+    Copie du queryset dont count() rend `nombre` sans requête. Méthode liée,
+    comme QuerySet.count : Paginator.count ne l'appellerait pas sinon.
+    """
+    copie = queryset._clone()
+    copie.count = MethodType(lambda qs: nombre, copie)
+    return copie
+
+
+class CacheListes:
+    """
+    Valeurs calculées pour les listes de l'admin, rangées par modèle :
+    invalider(Eleve) efface tout ce qui a été calculé depuis la table
+    des élèves.
+    """
+
+    DUREE_MAX = 300
+
+    def __init__(self):
+        self.verrou = threading.Lock()
+        self.entrees = {}  # {label du modèle: {clé: (calculée le, valeur)}}
+
+    def invalider(self, modele):
+        with self.verrou:
+            self.entrees.pop(modele._meta.label, None)
+
+    def valeur(self, modele, cle, calcul):
+        """Valeur en cache pour (modèle, clé), calculée par calcul() si absente ou trop vieille."""
+        entree = self.entrees.get(modele._meta.label, {}).get(cle)
+        if entree is not None and time.monotonic() - entree[0] < self.DUREE_MAX:
+            CACHE.incrementer(cache='listes_admin', resultat='hit')
+            return entree[1]
+        CACHE.incrementer(cache='listes_admin', resultat='miss')
+        valeur = calcul()
+        with self.verrou:
+            self.entrees.setdefault(modele._meta.label, {})[cle] = (time.monotonic(), valeur)
+        return valeur
+
+    def total(self, modele, queryset=None):
+        """
+        (nombre de fiches, approximatif) : estimation PostgreSQL au-delà de
+        SEUIL_COMPTE_EXACT, COUNT(*) sinon ; gardé en cache dans les deux cas.
+        """
+        if queryset is None:
+            queryset = modele._default_manager.all()
+
+        def calculer():
+            estimation = estimation_postgresql(modele, queryset.db)
+            if estimation is not None and estimation > SEUIL_COMPTE_EXACT:
+                return estimation, True
+            return queryset.count(), False
+
+        return self.valeur(modele, ('total', queryset.db), calculer)
+
+
+CACHE_LISTES = CacheListes()
@@ -0,0 +1,53 @@
+"""
+👥 CORESPONSABLES.PY - Propagation du co-responsable bénévole → élève
+
+Chaque élève en binôme actif hérite du co-responsable de son bénévole.
+La propagation est ensembliste : une requête pour lister les écarts (si
+on veut les afficher), puis UN SEUL UPDATE limité aux élèves dont la
+valeur diffère. Les autres lignes ne sont pas réécrites et gardent leur
+date de modification.
+
+Utilisé par la commande affecter_coresponsables et, en fin d'import, par
+import_binomes --affecter-coresponsables.
+"""
+
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Binome, Eleve
+
+
+def eleves_a_mettre_a_jour():
+    """Élèves en binôme actif dont le co-responsable diffère de celui du bénévole."""
+    return (Eleve.objects
+            .filter(binome__actif=True, binome__benevole__co_responsable__isnull=False)
+            .exclude(co_responsable=F('binome__benevole__co_responsable')))
+
+
+def ecarts():
+    """[(prénom, nom, ancien username ou None, nouveau username)] pour affichage."""
+    return list(eleves_a_mettre_a_jour().values_list(
+        'prenom', 'nom', 'co_responsable__username',
+        'binome__benevole__co_responsable__username',
+    ).order_by('nom', 'prenom'))
+
+
+def propager_coresponsables():
+    """
+    Copie le co-responsable du bénévole sur l'élève, en une requête :
+
+        UPDATE core_eleve
+           SET co_responsable_id = (co-responsable du bénévole du binôme),
+               date_modification = now
+         WHERE id IN (élèves dont la valeur diffère)
+
+    Retourne le nombre d'élèves modifiés.
+    """
+    coresponsable_benevole = Binome.objects.filter(
+        eleve=OuterRef('pk'),
+    ).order_by().values('benevole__co_responsable')[:1]
+
+    return eleves_a_mettre_a_jour().update(
+        co_responsable=Subquery(coresponsable_benevole),
+        date_modification=timezone.now(),
+    )
@@ -0,0 +1,245 @@
+"""
+🗄️ DBSTATS.PY - Statistiques des requêtes SQL par empreinte (SQLite et PostgreSQL)
+
+L'équivalent maison de pg_stat_statements, qui fonctionne aussi sur SQLite :
+avec DBSTATS_ACTIVE=True, chaque requête SQL de chaque processus (web,
+imports, run_jobs...) passe par un execute_wrapper posé sur toutes les
+connexions à leur ouverture. Les requêtes sont regroupées par empreinte
+(core.performance.empreinte_sql : valeurs, listes IN et LIMIT retirés) :
+
+    SELECT ... FROM core_eleve WHERE core_eleve.id IN (…) LIMIT ?
+        nombre, temps total, maximum, répartition des durées (p95)
+        exemple : la plus lente, avec le type et la longueur de ses paramètres
+
+Les valeurs restent en mémoire et sont ajoutées au fichier DBSTATS_FICHIER
+(défaut : metriques/sql/requetes.json) au plus toutes les
+DBSTATS_INTERVALLE secondes et à la fin du processus, sous verrou de
+fichier : plusieurs processus cumulent dans le même fichier.
+
+Lecture : python manage.py top_queries (plans d'exécution compris).
+
+Les valeurs des paramètres ne sont jamais écrites : elles peuvent contenir
+des données personnelles (élèves mineurs) ou des clés de session. L'exemple
+garde leur type et leur longueur ; top_queries rejoue le plan avec des
+valeurs fictives de même type (parametres_fictifs).
+
+Coût : un chronomètre par requête et une empreinte par texte SQL distinct
+(gardée en mémoire). Désactivé par défaut : aucun wrapper n'est posé.
+"""
+
+import atexit
+import bisect
+import math
+import os
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from .metriques import ecrire_json, lire_json, verrou_fichier
+from .performance import empreinte_sql
+
+
+# Limites de la répartition des durées (secondes) : 0,05 ms à ~52 s, ×2
+SEAUX = tuple(0.00005 * 2 ** i for i in range(21))
+
+# Au-delà, les nouvelles empreintes sont cumulées sous AUTRES
+MAX_EMPREINTES = 2000
+AUTRES = '(autres requêtes)'
+
+# Textes SQL distincts dont l'empreinte est gardée (vidé une fois plein)
+MAX_TEXTES = 10000
+
+
+def _masquer(valeur):
+    """[type, longueur] d'un paramètre, sans sa valeur (longueur : textes et listes)."""
+    longueur = len(valeur) if isinstance(valeur, (str, bytes, list, tuple)) else None
+    return [type(valeur).__name__, longueur]
+
+
+def _parametres(params, many):
+    """Types et longueurs des paramètres de l'exemple (executemany : non conservés)."""
+    if many or params is None:
+        return None
+    if isinstance(params, dict):
+        return {nom: _masquer(valeur) for nom, valeur in params.items()}
+    return [_masquer(valeur) for valeur in params]
+
+
+# Valeur fictive par type, pour rejouer un plan d'exécution
+FICTIFS = {
+    'str': lambda n: 'x' * n,
+    'bytes': lambda n: b'x' * n,
+    'int': lambda n: 0,
+    'float': lambda n: 0.0,
+    'bool': lambda n: False,
+    'Decimal': lambda n: Decimal(0),
+    'datetime': lambda n: datetime.now(),
+    'date': lambda n: date.today(),
+    'list': lambda n: [],
+    'tuple': lambda n: (),
+}
+
+
+def _fictif(masque):
+    nom, longueur = masque
+    fabrique = FICTIFS.get(nom)
+    return fabrique(longueur or 0) if fabrique else None
+
+
+def parametres_fictifs(masques):
+    """Paramètres de même type et longueur que l'exemple, pour EXPLAIN."""
+    if isinstance(masques, dict):
+        return {nom: _fictif(masque) for nom, masque in masques.items()}
+    return [_fictif(masque) for masque in masques]
+
+
+def centile(stat, rang=0.95):
+    """Durée sous laquelle se trouvent `rang` des exécutions (borne du seau, au plus le maximum)."""
+    objectif = math.ceil(stat['nombre'] * rang)
+    cumul = 0
+    for limite, nombre in zip(SEAUX, stat['seaux']):
+        cumul += nombre
+        if cumul >= objectif:
+            return min(limite, stat['max'])
+    return stat['max']
+
+
+class StatistiquesSQL:
+    """
+    execute_wrapper commun à toutes les connexions : cumule, par empreinte,
+    {'nombre', 'total', 'max', 'seaux', 'exemple'} (durées en secondes).
+    """
+
+    def __init__(self):
+        self.verrou = threading.Lock()
+        self.stats = {}
+        self.empreintes = {}  # texte SQL → empreinte
+        self.derniere_ecriture = time.monotonic()
+        self.suspendu = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.suspendu:
+            return execute(sql, params, many, context)
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.enregistrer(sql, params, many, time.perf_counter() - debut,
+                             context['connection'].alias)
+            if time.monotonic() - self.derniere_ecriture >= settings.DBSTATS_INTERVALLE:
+                self.ecrire()
+
+    def empreinte(self, sql):
+        empreinte = self.empreintes.get(sql)
+        if empreinte is None:
+            if len(self.empreintes) >= MAX_TEXTES:
+                self.empreintes.clear()
+            empreinte = self.empreintes[sql] = empreinte_sql(sql)
+        return empreinte
+
+    def enregistrer(self, sql, params, many, duree, alias):
+        empreinte = self.empreinte(sql)
+        with self.verrou:
+            stat = self.stats.get(empreinte)
+            if stat is None:
+                if len(self.stats) >= MAX_EMPREINTES:
+                    empreinte = AUTRES
+                stat = self.stats.setdefault(empreinte, {
+                    'nombre': 0, 'total': 0.0, 'max': 0.0,
+                    'seaux': [0] * (len(SEAUX) + 1), 'exemple': None,
+                })
+            stat['nombre'] += 1
+            stat['total'] += duree
+            stat['seaux'][bisect.bisect_left(SEAUX, duree)] += 1
+            if duree >= stat['max']:
+                stat['max'] = duree
+                stat['exemple'] = {
+                    'sql': sql,
+                    'types': _parametres(params, many),
+                    'alias': alias,
+                    'duree': duree,
+                }
+
+    # ------------------------------------------------------------------
+    # Cumul entre processus
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def fusionner(total, stats):
+        """Ajoute stats ({empreinte: stat}) à total ; l'exemple le plus lent est gardé."""
+        for empreinte, stat in stats.items():
+            cumul = total.get(empreinte)
+            if cumul is None or len(cumul['seaux']) != len(stat['seaux']):
+                total[empreinte] = stat
+                continue
+            cumul['nombre'] += stat['nombre']
+            cumul['total'] += stat['total']
+            cumul['seaux'] = [a + b for a, b in zip(cumul['seaux'], stat['seaux'])]
+            if stat['max'] >= cumul['max']:
+                cumul['max'] = stat['max']
+                cumul['exemple'] = stat['exemple']
+        return total
+
+    @staticmethod
+    def fichier():
+        return str(settings.DBSTATS_FICHIER)
+
+    def charger(self):
+        """Valeurs du fichier ; les exemples écrits avec leurs valeurs (anciennes versions) sont effacés."""
+        stats = lire_json(self.fichier())
+        for stat in stats.values():
+            if stat.get('exemple') and 'types' not in stat['exemple']:
+                stat['exemple'] = None
+        return stats
+
+    def ecrire(self):
+        """Ajoute les valeurs du processus au fichier, puis les remet à zéro."""
+        with self.verrou:
+            stats, self.stats = self.stats, {}
+            self.derniere_ecriture = time.monotonic()
+        if not stats:
+            return
+        chemin = self.fichier()
+        try:
+            dossier = os.path.dirname(chemin)
+            os.makedirs(dossier, exist_ok=True)
+            with verrou_fichier(dossier):
+                ecrire_json(chemin, self.fusionner(self.charger(), stats))
+        except OSError:
+            pass  # les statistiques ne doivent jamais faire échouer une requête
+
+    def lire(self):
+        """Valeurs du fichier et du processus courant."""
+        with self.verrou:
+            propres = {e: dict(s, seaux=list(s['seaux'])) for e, s in self.stats.items()}
+        return self.fusionner(self.charger(), propres)
+
+    def reinitialiser(self):
+        with self.verrou:
+            self.stats = {}
+        try:
+            os.remove(self.fichier())
+        except FileNotFoundError:
+            pass
+
+
+STATS_SQL = StatistiquesSQL()
+
+
+# ============================================================================
+# 🔌 INSTALLATION (CoreConfig.ready, si DBSTATS_ACTIVE)
+# ============================================================================
+
+def brancher(sender, connection, **kwargs):
+    """connection_created : pose le wrapper sur la connexion (une seule fois)."""
+    if STATS_SQL not in connection.execute_wrappers:
+        connection.execute_wrappers.append(STATS_SQL)
+
+
+def installer():
+    connection_created.connect(brancher, dispatch_uid='core.dbstats')
+    atexit.register(STATS_SQL.ecrire)
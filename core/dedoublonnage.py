@@ -0,0 +1,411 @@
+"""
+🧹 DEDOUBLONNAGE.PY - Détection et fusion des doublons (élèves, bénévoles)
+
+Les saisies des différents onglets produisent des doublons approximatifs :
+"Benali" / "Ben Ali", "Dupont" / "Dupond", prénom et nom inversés, même
+personne avec ou sans téléphone...
+
+Détection en trois temps, en UNE lecture de la table :
+    1. Blocage   : on ne compare que les fiches qui partagent une clé
+                   (nom normalisé, clé phonétique, téléphone, email...) ou voisines
+                   une fois triées par nom (fenêtre glissante). Coût :
+                   O(n · taille des blocs), blocs bornés à TAILLE_BLOC_MAX,
+                   plus le tri en O(n log n).
+    2. Score     : Jaro-Winkler sur nom + prénom, complété par la
+                   concordance du téléphone et de l'email.
+    3. Groupes   : les paires au-dessus du seuil sont regroupées par
+                   union-find (A≈B et B≈C → {A, B, C}).
+
+Élèves (fratries=True) : le téléphone et l'email des parents désignent
+une famille, pas une personne. Ils servent au blocage mais ne comptent
+pas dans le score, et le prénom doit être identique (ou égal au nom, si
+nom et prénom ont été inversés) : Lina / Lila Dupont sont deux sœurs.
+
+Un groupe dont les fiches n'ont pas toutes les mêmes nom et prénom
+normalisés est approximatif (groupe_exact) : clean_duplicates demande
+une confirmation avant de le fusionner.
+
+Utilisation :
+    from core.dedoublonnage import detecter_doublons, charger_eleves
+    for groupe in detecter_doublons(charger_eleves()):
+        ...
+"""
+
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+
+from .models import Benevole, Binome, Eleve, ProfilUtilisateur
+from .text import normaliser_compact
+
+
+# ============================================================================
+# ⚙️ PARAMÈTRES
+# ============================================================================
+
+SEUIL = 0.9            # Score minimal pour considérer deux fiches comme doublons
+SEUIL_NOM = 0.85       # Similarité minimale des noms, quels que soient tél / email
+FENETRE = 5            # Voisins comparés après tri par nom
+TAILLE_BLOC_MAX = 100  # Au-delà, une clé est trop commune pour bloquer
+
+# Poids des critères (renormalisés selon les critères renseignés)
+POIDS_NOM = 0.6
+POIDS_TELEPHONE = 0.2
+POIDS_EMAIL = 0.2
+
+
+# Fiche réduite aux champs utiles à la comparaison
+Personne = namedtuple('Personne', 'id nom prenom nom_cle prenom_cle phonetique telephone email')
+
+
+# ============================================================================
+# 📏 SIMILARITÉ
+# ============================================================================
+
+def jaro(s1, s2):
+    """Similarité de Jaro entre deux chaînes (0 → 1)."""
+    if s1 == s2:
+        return 1.0
+    l1, l2 = len(s1), len(s2)
+    if not l1 or not l2:
+        return 0.0
+
+    portee = max(max(l1, l2) // 2 - 1, 0)
+    vus2 = [False] * l2
+    communs1 = []
+    for i, c in enumerate(s1):
+        # Recherche du caractère dans la fenêtre autorisée (str.find est en C)
+        debut = i - portee if i > portee else 0
+        fin = i + portee + 1
+        if fin > l2:
+            fin = l2
+        j = s2.find(c, debut, fin)
+        while j != -1 and vus2[j]:
+            j = s2.find(c, j + 1, fin)
+        if j != -1:
+            vus2[j] = True
+            communs1.append(c)
+    communs = len(communs1)
+    if not communs:
+        return 0.0
+
+    # Caractères communs mais dans un ordre différent
+    communs2 = [c for c, vu in zip(s2, vus2) if vu]
+    decales = sum(a != b for a, b in zip(communs1, communs2))
+
+    return (communs / l1 + communs / l2 + (communs - decales / 2) / communs) / 3
+
+
+def jaro_winkler(s1, s2, bonus=0.1):
+    """Jaro, favorisé quand les chaînes commencent pareil (jusqu'à 4 caractères)."""
+    score = jaro(s1, s2)
+    prefixe = 0
+    for a, b in zip(s1[:4], s2[:4]):
+        if a != b:
+            break
+        prefixe += 1
+    return score + prefixe * bonus * (1 - score)
+
+
+def _moyenne(nom1, nom2, prenom1, prenom2):
+    """
+    Moyenne des similarités nom / prénom. Si le nom seul ne permet pas
+    d'atteindre SEUIL_NOM, le prénom n'est pas comparé et la borne haute
+    est retournée (cas de loin le plus fréquent : calcul divisé par deux).
+    """
+    nom = jaro_winkler(nom1, nom2)
+    if (nom + 1) / 2 < SEUIL_NOM:
+        return (nom + 1) / 2
+    return (nom + jaro_winkler(prenom1, prenom2)) / 2
+
+
+def similarite_noms(p, q):
+    """Moyenne nom / prénom, en acceptant qu'ils aient été inversés à la saisie."""
+    directe = _moyenne(p.nom_cle, q.nom_cle, p.prenom_cle, q.prenom_cle)
+    if directe >= SEUIL_NOM:
+        return directe
+    # Inversion envisagée seulement si les initiales se croisent
+    if p.nom_cle[:1] != q.prenom_cle[:1] and p.prenom_cle[:1] != q.nom_cle[:1]:
+        return directe
+    return max(directe, _moyenne(p.nom_cle, q.prenom_cle, p.prenom_cle, q.nom_cle))
+
+
+def similarite_emails(e1, e2):
+    """1 si identiques, 0.8 si même identifiant avant @ (autre fournisseur), sinon 0."""
+    if e1 == e2:
+        return 1.0
+    if e1.split('@')[0] == e2.split('@')[0]:
+        return 0.8
+    return 0.0
+
+
+def prenoms_identiques(p, q):
+    """Même prénom normalisé, ou nom et prénom inversés (prénom de l'un = nom de l'autre)."""
+    return p.prenom_cle == q.prenom_cle or p.prenom_cle == q.nom_cle
+
+
+def score(p, q, fratries=False):
+    """
+    Score de ressemblance de deux fiches (0 → 1).
+
+    Le nom compte toujours ; téléphone et email ne comptent que s'ils
+    sont renseignés des deux côtés (sinon ils ne pénalisent pas).
+    Avec fratries (élèves) : prénom identique exigé, téléphone et email
+    ignorés.
+    """
+    if fratries and not prenoms_identiques(p, q):
+        return 0.0
+    nom = similarite_noms(p, q)
+    if nom < SEUIL_NOM or fratries:
+        return nom
+
+    total, poids = POIDS_NOM * nom, POIDS_NOM
+    if p.telephone and q.telephone:
+        total += POIDS_TELEPHONE * (p.telephone == q.telephone)
+        poids += POIDS_TELEPHONE
+    if p.email and q.email:
+        total += POIDS_EMAIL * similarite_emails(p.email, q.email)
+        poids += POIDS_EMAIL
+    return total / poids
+
+
+# ============================================================================
+# 🔗 REGROUPEMENT
+# ============================================================================
+
+class UnionFind:
+    """Partition d'indices en groupes, avec compression de chemin."""
+
+    def __init__(self, taille):
+        self.parent = list(range(taille))
+
+    def trouver(self, i):
+        racine = i
+        while self.parent[racine] != racine:
+            racine = self.parent[racine]
+        while self.parent[i] != racine:
+            self.parent[i], i = racine, self.parent[i]
+        return racine
+
+    def unir(self, i, j):
+        ri, rj = self.trouver(i), self.trouver(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def cles_de_blocage(p):
+    """Clés partagées par les fiches susceptibles d'être des doublons."""
+    cles = [('nom', p.nom_cle), ('prenom', p.prenom_cle, p.nom_cle[:1]),
+            ('paire',) + tuple(sorted((p.nom_cle, p.prenom_cle)))]
+    if p.phonetique:
+        # Même prononciation (Tchorbadjian / Tchorbadjan), nom et prénom dans un ordre ou l'autre
+        cles.append(('phonetique', p.phonetique))
+    if p.telephone:
+        cles.append(('tel', p.telephone))
+    if p.email:
+        cles.append(('email', p.email))
+    return cles
+
+
+def paires_candidates(personnes, fenetre=FENETRE):
+    """Paires d'indices (i, j), i < j, à comparer : mêmes blocs ou voisines par nom."""
+    blocs = defaultdict(list)
+    for i, p in enumerate(personnes):
+        for cle in cles_de_blocage(p):
+            blocs[cle].append(i)
+
+    paires = set()
+    for indices in blocs.values():
+        if 1 < len(indices) <= TAILLE_BLOC_MAX:
+            for a in range(len(indices)):
+                for b in range(a + 1, len(indices)):
+                    paires.add((indices[a], indices[b]))
+
+    # Fenêtre glissante sur le tri par nom + prénom (fautes de frappe dans le nom)
+    ordre = sorted(range(len(personnes)),
+                   key=lambda i: personnes[i].nom_cle + personnes[i].prenom_cle)
+    for position, i in enumerate(ordre):
+        for j in ordre[position + 1:position + fenetre]:
+            paires.add((min(i, j), max(i, j)))
+
+    return paires
+
+
+def detecter_doublons(personnes, seuil=SEUIL, fenetre=FENETRE, fratries=False):
+    """
+    Retourne les groupes de doublons : liste de (fiches, score minimal),
+    chaque groupe trié par id, groupes triés par id de leur première fiche.
+    fratries : voir score() (élèves).
+    """
+    unions = UnionFind(len(personnes))
+    scores = {}
+    for i, j in paires_candidates(personnes, fenetre):
+        s = score(personnes[i], personnes[j], fratries)
+        if s >= seuil:
+            unions.unir(i, j)
+            scores[(i, j)] = s
+
+    groupes = defaultdict(list)
+    for i in range(len(personnes)):
+        groupes[unions.trouver(i)].append(i)
+
+    score_groupe = defaultdict(lambda: 1.0)
+    for (i, j), s in scores.items():
+        racine = unions.trouver(i)
+        score_groupe[racine] = min(score_groupe[racine], s)
+
+    resultat = [
+        (sorted((personnes[i] for i in indices), key=lambda p: p.id), score_groupe[racine])
+        for racine, indices in groupes.items() if len(indices) > 1
+    ]
+    return sorted(resultat, key=lambda groupe: groupe[0][0].id)
+
+
+def groupe_exact(groupe):
+    """Toutes les fiches ont les mêmes nom et prénom normalisés (dans un ordre ou l'autre)."""
+    return len({tuple(sorted((p.nom_cle, p.prenom_cle))) for p in groupe}) == 1
+
+
+# ============================================================================
+# 📥 CHARGEMENT (1 requête par table)
+# ============================================================================
+
+def _charger(queryset, champ_telephone, champ_email):
+    personnes = []
+    champs = ('id', 'nom', 'prenom', 'nom_phonetique', 'prenom_phonetique',
+              'telephone_cle', champ_telephone, champ_email)
+    for (id, nom, prenom, nom_phonetique, prenom_phonetique,
+         telephone_cle, telephone, email) in queryset.values_list(*champs):
+        personnes.append(Personne(
+            id=id, nom=nom, prenom=prenom,
+            nom_cle=normaliser_compact(nom), prenom_cle=normaliser_compact(prenom),
+            phonetique='|'.join(sorted((nom_phonetique, prenom_phonetique)))
+            if nom_phonetique and prenom_phonetique else '',
+            # Numéro non normalisable : comparé tel quel
+            telephone=telephone_cle or (telephone or '').strip(),
+            email=(email or '').strip().lower() if email and '@' in email else '',
+        ))
+    return personnes
+
+
+def charger_eleves():
+    return _charger(Eleve.objects.all(), 'telephone_parent', 'email_parent')
+
+
+def charger_benevoles():
+    return _charger(Benevole.objects.all(), 'telephone', 'email')
+
+
+# ============================================================================
+# 🔀 FUSION
+# ============================================================================
+
+def choisir_survivant(groupe, prioritaires):
+    """
+    Fiche conservée : celle liée à un binôme / un compte (ids prioritaires),
+    sinon la plus ancienne. Retourne (survivant, perdants).
+    """
+    survivant = min(groupe, key=lambda p: (p.id not in prioritaires, p.id))
+    return survivant, [p for p in groupe if p.id != survivant.id]
+
+
+def plan_fusion(groupes, modele):
+    """
+    Pour chaque groupe : (survivant, perdants, conflit).
+
+    conflit est un message (fusion impossible sans perte) ou None :
+        - élèves    : plusieurs fiches ont un binôme (un seul binôme par élève)
+        - bénévoles : plusieurs fiches sont liées à un compte utilisateur
+    """
+    if modele is Eleve:
+        lies = set(Binome.objects.values_list('eleve_id', flat=True))
+        message = 'plusieurs fiches ont un binôme'
+    else:
+        lies = set(ProfilUtilisateur.objects.values_list('benevole_id', flat=True))
+        message = 'plusieurs fiches sont liées à un compte utilisateur'
+
+    plan = []
+    for groupe, _ in groupes:
+        survivant, perdants = choisir_survivant(groupe, lies)
+        conflit = message if sum(p.id in lies for p in groupe) > 1 else None
+        plan.append((survivant, perdants, conflit))
+    return plan
+
+
+# Correspondances perdant → survivant par requête UPDATE (limite de paramètres SQLite)
+TAILLE_LOT = 500
+
+
+def repointer(modele, champ, correspondance):
+    """
+    Remplace, dans la colonne champ de modele, chaque id perdant par son
+    survivant, en une requête :
+        UPDATE ... SET champ = CASE WHEN champ = perdant THEN survivant ... END
+        WHERE champ IN (perdants)
+    (une requête par lot de TAILLE_LOT perdants). Retourne le nombre de lignes.
+    """
+    perdants = list(correspondance)
+    total = 0
+    for debut in range(0, len(perdants), TAILLE_LOT):
+        lot = perdants[debut:debut + TAILLE_LOT]
+        nouvelle_valeur = Case(*[When(**{champ: perdant}, then=Value(correspondance[perdant]))
+                                 for perdant in lot])
+        total += modele.objects.filter(**{f'{champ}__in': lot}).update(**{champ: nouvelle_valeur})
+    return total
+
+
+def fusionner_m2m(through, champ, correspondance):
+    """
+    Rattache aux survivants les lignes d'une table ManyToMany (matières).
+    Les liens que le survivant possède déjà sont supprimés (1 requête),
+    les autres repointés (1 requête UPDATE).
+    """
+    proprietaires = set(correspondance) | set(correspondance.values())
+    lignes = through.objects.filter(**{f'{champ}__in': proprietaires}).values_list(
+        'id', champ, 'matiere_id')
+
+    # Liens des survivants d'abord : ce sont eux qui sont conservés
+    deja_lies = set()
+    en_double = []
+    for id, proprietaire, matiere_id in sorted(lignes, key=lambda l: l[1] in correspondance):
+        cible = (correspondance.get(proprietaire, proprietaire), matiere_id)
+        if cible in deja_lies:
+            en_double.append(id)
+        else:
+            deja_lies.add(cible)
+
+    if en_double:
+        through.objects.filter(id__in=en_double).delete()
+    repointer(through, champ, correspondance)
+
+
+@transaction.atomic
+def fusionner(modele, plan):
+    """
+    Fusionne tous les groupes sans conflit dans leur survivant, en
+    opérations ensemblistes (une requête par table, quel que soit le
+    nombre de groupes) :
+        - binômes et compte utilisateur repointés vers le survivant
+        - matières réunies
+        - perdants supprimés en une fois
+    Tout ou rien. Retourne le nombre de fiches supprimées.
+    """
+    correspondance = {
+        perdant.id: survivant.id
+        for survivant, perdants, conflit in plan if not conflit
+        for perdant in perdants
+    }
+    if not correspondance:
+        return 0
+
+    if modele is Eleve:
+        repointer(Binome, 'eleve_id', correspondance)
+        fusionner_m2m(Eleve.matieres_souhaitees.through, 'eleve_id', correspondance)
+    else:
+        repointer(Binome, 'benevole_id', correspondance)
+        repointer(ProfilUtilisateur, 'benevole_id', correspondance)
+        fusionner_m2m(Benevole.matieres.through, 'benevole_id', correspondance)
+
+    _, par_modele = modele.objects.filter(id__in=list(correspondance)).delete()
+    return par_modele.get(modele._meta.label, 0)
@@ -0,0 +1,246 @@
+"""
+📤 EXPORT.PY - Exports en flux (CSV, XLSX, JSONL) pour l'admin
+
+Les exports ne construisent plus le fichier en mémoire avant de l'envoyer :
+les fiches sont lues par lots (queryset.iterator(chunk_size), matières
+préchargées par lot) et le fichier part au navigateur au fur et à mesure
+(StreamingHttpResponse). Mémoire constante, quel que soit le nombre de
+fiches, et le téléchargement démarre tout de suite.
+
+Chaque export décrit ses colonnes une fois :
+
+    COLONNES = [
+        ('Nom', 'nom'),                           # attribut
+        ('Statut', 'get_statut_display'),         # méthode sans argument
+        ('Matières', noms_matieres('matieres')),  # fonction fiche → valeur
+    ]
+    reponse_export(queryset, COLONNES, 'eleves_export', 'xlsx')
+
+Formats :
+    - csv   : comme les anciens exports
+    - xlsx  : classeur écrit directement dans le flux (zipfile, bibliothèque
+              standard), une ligne à la fois — pas besoin d'openpyxl
+    - jsonl : une fiche JSON par ligne {titre de colonne: valeur}
+"""
+
+import csv
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from operator import attrgetter
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+# Fiches lues (et matières préchargées) par lot
+TAILLE_LOT = 500
+
+
+# ============================================================================
+# 🧮 VALEURS DES COLONNES
+# ============================================================================
+
+def noms_matieres(champ):
+    """Colonne « Matières » : noms séparés par des virgules (relation préchargée)."""
+    def valeur(fiche):
+        return ', '.join(m.nom for m in getattr(fiche, champ).all())
+    return valeur
+
+
+def lecteur_colonnes(colonnes):
+    """[(titre, attribut | méthode | fonction)] → fonction fiche → liste de valeurs."""
+    lecteurs = [source if callable(source) else attrgetter(source) for _, source in colonnes]
+
+    def lire(fiche):
+        valeurs = []
+        for lecteur in lecteurs:
+            valeur = lecteur(fiche)
+            valeurs.append(valeur() if callable(valeur) else valeur)
+        return valeurs
+    return lire
+
+
+def lignes_export(queryset, colonnes):
+    """Valeurs de chaque fiche, lue par lots de TAILLE_LOT."""
+    lire = lecteur_colonnes(colonnes)
+    for fiche in queryset.iterator(chunk_size=TAILLE_LOT):
+        yield lire(fiche)
+
+
+# ============================================================================
+# 📄 CSV ET JSONL
+# ============================================================================
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer : write() rend la ligne au lieu de l'écrire."""
+
+    def write(self, valeur):
+        return valeur
+
+
+def flux_csv(titres, lignes):
+    writer = csv.writer(_Echo())
+    lot = [writer.writerow(titres)]
+    for ligne in lignes:
+        lot.append(writer.writerow(ligne))
+        if len(lot) >= TAILLE_LOT:
+            yield ''.join(lot)
+            lot = []
+    yield ''.join(lot)
+
+
+def _json_defaut(valeur):
+    if isinstance(valeur, (date, datetime)):
+        return valeur.isoformat()
+    return str(valeur)  # Decimal, fichiers...
+
+
+def flux_jsonl(titres, lignes):
+    lot = []
+    for ligne in lignes:
+        lot.append(json.dumps(dict(zip(titres, ligne)), ensure_ascii=False,
+                              default=_json_defaut) + '\n')
+        if len(lot) >= TAILLE_LOT:
+            yield ''.join(lot)
+            lot = []
+    yield ''.join(lot)
+
+
+# ============================================================================
+# 📊 XLSX EN FLUX
+# ============================================================================
+
+_PARTIES_XLSX = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+_DEBUT_FEUILLE = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+).encode()
+
+_FIN_FEUILLE = b'</sheetData></worksheet>'
+
+# Caractères de contrôle interdits en XML (sauf tabulation et retours à la ligne)
+_INTERDITS_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _cellule_xlsx(valeur):
+    if valeur is None or valeur == '':
+        return '<c/>'
+    if isinstance(valeur, bool):
+        return f'<c t="b"><v>{int(valeur)}</v></c>'
+    if isinstance(valeur, (int, float, Decimal)):
+        return f'<c><v>{valeur}</v></c>'
+    if isinstance(valeur, (date, datetime)):
+        valeur = valeur.strftime('%d/%m/%Y')
+    texte = escape(_INTERDITS_XML.sub('', str(valeur)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texte}</t></is></c>'
+
+
+def _ligne_xlsx(valeurs):
+    return ('<row>' + ''.join(_cellule_xlsx(v) for v in valeurs) + '</row>').encode()
+
+
+class _Tampon:
+    """
+    Fichier en écriture seule (ni seek ni tell) : zipfile écrit alors l'archive
+    séquentiellement, et ce qui a été écrit est récupéré avec vider().
+    """
+
+    def __init__(self):
+        self.morceaux = []
+
+    def write(self, donnees):
+        self.morceaux.append(bytes(donnees))
+        return len(donnees)
+
+    def flush(self):
+        pass
+
+    def vider(self):
+        donnees = b''.join(self.morceaux)
+        self.morceaux = []
+        return donnees
+
+
+def flux_xlsx(titres, lignes):
+    tampon = _Tampon()
+    with zipfile.ZipFile(tampon, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for nom, contenu in _PARTIES_XLSX.items():
+            archive.writestr(nom, contenu)
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as feuille:
+            feuille.write(_DEBUT_FEUILLE)
+            feuille.write(_ligne_xlsx(titres))
+            for numero, ligne in enumerate(lignes, 1):
+                feuille.write(_ligne_xlsx(ligne))
+                if numero % TAILLE_LOT == 0:
+                    yield tampon.vider()
+            feuille.write(_FIN_FEUILLE)
+    yield tampon.vider()
+
+
+# ============================================================================
+# 📥 RÉPONSE HTTP
+# ============================================================================
+
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', flux_csv),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', flux_xlsx),
+    'jsonl': ('application/x-ndjson; charset=utf-8', flux_jsonl),
+}
+
+
+def reponse_export(queryset, colonnes, nom_fichier, format_export='csv'):
+    """
+    Téléchargement en flux du queryset dans le format demandé.
+
+    Les relations affichées doivent être préchargées par l'appelant
+    (select_related / prefetch_related), elles le sont alors par lot.
+    """
+    type_contenu, flux = FORMATS[format_export]
+    titres = [titre for titre, _ in colonnes]
+    reponse = StreamingHttpResponse(flux(titres, lignes_export(queryset, colonnes)),
+                                    content_type=type_contenu)
+    horodatage = timezone.localtime().strftime('%Y%m%d_%H%M%S')
+    reponse['Content-Disposition'] = (
+        f'attachment; filename="{nom_fichier}_{horodatage}.{format_export}"')
+    return reponse
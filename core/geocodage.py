@@ -0,0 +1,230 @@
+"""
+🌍 GEOCODAGE.PY - Géocodage groupé avec l'API BAN (Base Adresse Nationale)
+
+Plutôt qu'un appel HTTP bloquant par ligne, les adresses à géocoder sont
+rassemblées, dédoublonnées (une adresse identique n'est demandée qu'une
+fois) puis résolues en parallèle par quelques threads, sous un débit
+maximal qui respecte la limite de l'API (50 requêtes/s par IP).
+
+Un fichier de 200 corrections se géocode ainsi en quelques secondes au
+lieu de la somme des latences réseau.
+
+Utilisation :
+    from core.geocodage import appeler_ban, geocoder_en_parallele
+    resultats = geocoder_en_parallele(adresses, lambda a: appeler_ban(f'{a} Marseille'))
+    resultats['12 rue de Rome']  # (lat, lng, score, ville) ou None
+
+Pour des fiches (action « Géolocaliser la sélection » de l'admin) :
+    bilan = geocoder_fiches(Eleve.objects.filter(...))
+    bilan['succes'], bilan['echecs']
+
+Les coordonnées déjà connues pour la même adresse (autre élève ou bénévole
+du même immeuble) sont reprises sans appeler la BAN.
+"""
+
+import json
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .metriques import CACHE, GEOCODAGE_APPELS
+
+
+URL_BAN = 'https://api-adresse.data.gouv.fr/search/'
+
+# Score minimal pour accepter un résultat (0 à 1)
+SCORE_MIN = 0.4
+
+# Requêtes simultanées et débit maximal (la BAN accepte 50 requêtes/s par IP)
+WORKERS = 8
+DEBIT_MAX = 40
+
+# Au-delà de ce nombre de fiches, « Géolocaliser la sélection » passe en tâche de fond
+SEUIL_GEOCODAGE = 100
+
+# Fiches enregistrées par requête (bulk_update)
+TAILLE_LOT = 500
+
+
+def appeler_ban(requete, timeout=10):
+    """
+    Appelle l'API BAN pour une adresse en texte libre.
+
+    Returns:
+        tuple: (latitude, longitude, score, ville) ou None si échec / score trop faible
+    """
+    url = f"{URL_BAN}?{urllib.parse.urlencode({'q': requete, 'limit': 1})}"
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            data = json.loads(response.read().decode())
+    except Exception:
+        GEOCODAGE_APPELS.incrementer(resultat='erreur')
+        return None
+
+    if not data.get('features'):
+        GEOCODAGE_APPELS.incrementer(resultat='sans_resultat')
+        return None
+    feature = data['features'][0]
+    lng, lat = feature['geometry']['coordinates'][:2]
+    props = feature['properties']
+    score = props.get('score', 0)
+    if score <= SCORE_MIN:
+        GEOCODAGE_APPELS.incrementer(resultat='sans_resultat')
+        return None
+    GEOCODAGE_APPELS.incrementer(resultat='succes')
+    return (lat, lng, score, props.get('city', ''))
+
+
+class Limiteur:
+    """Espace les appels d'au moins 1/debit secondes, tous threads confondus."""
+
+    def __init__(self, debit):
+        self.intervalle = 1 / debit if debit else 0
+        self.prochain = 0.0
+        self.verrou = threading.Lock()
+
+    def attendre(self):
+        if not self.intervalle:
+            return
+        with self.verrou:
+            maintenant = time.monotonic()
+            depart = max(self.prochain, maintenant)
+            self.prochain = depart + self.intervalle
+        if depart > maintenant:
+            time.sleep(depart - maintenant)
+
+
+def geocoder_en_parallele(adresses, geocoder, workers=WORKERS, debit_max=DEBIT_MAX, avancement=None):
+    """
+    Géocode chaque adresse distincte une seule fois, en parallèle.
+
+    geocoder(adresse) est appelé depuis plusieurs threads : il ne doit pas
+    toucher à la base de données. avancement(adresse), s'il est donné, est
+    appelé dans le thread appelant après chaque adresse résolue.
+
+    Returns:
+        dict: {adresse: résultat de geocoder (None si échec)}
+    """
+    uniques = list(dict.fromkeys(adresses))
+    if not uniques:
+        return {}
+
+    limiteur = Limiteur(debit_max)
+
+    def geocoder_limite(adresse):
+        limiteur.attendre()
+        try:
+            return geocoder(adresse)
+        except Exception:
+            return None
+
+    resultats = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(uniques)))) as executeur:
+        for adresse, resultat in zip(uniques, executeur.map(geocoder_limite, uniques)):
+            resultats[adresse] = resultat
+            if avancement is not None:
+                avancement(adresse)
+    return resultats
+
+
+# ============================================================================
+# 📍 GÉOCODAGE DE FICHES (élèves, bénévoles)
+# ============================================================================
+
+def adresse_fiche(fiche):
+    """Adresse postale d'une fiche, telle qu'envoyée à la BAN ('' si pas d'adresse)."""
+    if not (fiche.adresse or '').strip():
+        return ''
+    morceaux = [fiche.numero_rue, fiche.adresse, fiche.code_postal, fiche.ville or 'Marseille']
+    return ' '.join(' '.join(m.split()) for m in morceaux if m and m.strip())
+
+
+def coordonnees_connues(fiches):
+    """
+    {adresse: (lat, lng)} pour les adresses de ces fiches déjà géolocalisées
+    sur une autre fiche, élève ou bénévole (une requête par modèle).
+    """
+    from .models import Benevole, Eleve
+
+    cherchees = {adresse_fiche(fiche) for fiche in fiches}
+    # Filtre par le champ adresse en base, puis comparaison de l'adresse complète
+    champs_adresse = {fiche.adresse for fiche in fiches}
+    connues = {}
+    for modele in (Eleve, Benevole):
+        candidates = modele.objects.filter(
+            adresse__in=champs_adresse, latitude__isnull=False, longitude__isnull=False,
+        ).only('numero_rue', 'adresse', 'code_postal', 'ville', 'latitude', 'longitude')
+        for fiche in candidates:
+            adresse = adresse_fiche(fiche)
+            if adresse in cherchees:
+                connues.setdefault(adresse, (fiche.latitude, fiche.longitude))
+    return connues
+
+
+def _position_ban(adresse):
+    resultat = appeler_ban(adresse)
+    return resultat[:2] if resultat else None
+
+
+def geocoder_fiches(queryset, avancement=None):
+    """
+    Géolocalise les fiches du queryset qui n'ont pas encore de coordonnées :
+    adresses déjà connues reprises, les autres demandées en parallèle à la
+    BAN (une fois par adresse distincte), puis un bulk_update.
+
+    avancement(nombre) est appelé au fil du traitement (progression d'une
+    tâche de fond), pour un total égal au nombre de fiches du queryset.
+
+    Returns:
+        dict: {'succes', 'echecs', 'deja', 'sans_adresse', 'reprises'} (nombres de fiches)
+    """
+    modele = queryset.model
+    bilan = {'succes': 0, 'echecs': 0, 'deja': 0, 'sans_adresse': 0, 'reprises': 0}
+    signaler = avancement or (lambda nombre: None)
+
+    a_geocoder = []
+    for fiche in queryset.only('id', 'numero_rue', 'adresse', 'code_postal', 'ville',
+                               'latitude', 'longitude'):
+        if fiche.latitude is not None and fiche.longitude is not None:
+            bilan['deja'] += 1
+        elif not adresse_fiche(fiche):
+            bilan['sans_adresse'] += 1
+        else:
+            a_geocoder.append(fiche)
+            continue
+        signaler(1)
+
+    connues = coordonnees_connues(a_geocoder) if a_geocoder else {}
+    bilan['reprises'] = sum(1 for fiche in a_geocoder if adresse_fiche(fiche) in connues)
+
+    par_adresse = {}
+    for fiche in a_geocoder:
+        par_adresse.setdefault(adresse_fiche(fiche), []).append(fiche)
+    # Adresses déjà connues (hit) ou à demander à la BAN (miss)
+    CACHE.incrementer(len(connues), cache='geocodage', resultat='hit')
+    CACHE.incrementer(len(par_adresse) - len(connues), cache='geocodage', resultat='miss')
+    for adresse in connues:
+        signaler(len(par_adresse[adresse]))
+
+    resultats = dict(connues)
+    resultats.update(geocoder_en_parallele(
+        [adresse for adresse in par_adresse if adresse not in connues],
+        _position_ban,
+        avancement=lambda adresse: signaler(len(par_adresse[adresse])),
+    ))
+
+    a_enregistrer = []
+    for adresse, fiches in par_adresse.items():
+        position = resultats.get(adresse)
+        for fiche in fiches:
+            if position:
+                fiche.latitude, fiche.longitude = position
+                a_enregistrer.append(fiche)
+                bilan['succes'] += 1
+            else:
+                bilan['echecs'] += 1
+
+    modele.objects.bulk_update(a_enregistrer, ['latitude', 'longitude'], batch_size=TAILLE_LOT)
+    return bilan
@@ -0,0 +1,259 @@
+"""
+📂 LECTURE.PY - Lecture des fichiers d'import (CSV, XLSX, ODS)
+
+Les commandes d'import acceptent directement les classeurs exportés de
+Google Sheets, sans conversion manuelle en CSV :
+
+    python manage.py import_eleves enfants.xlsx              # 1er onglet
+    python manage.py import_binomes suivi.ods:"Binômes David" # onglet nommé
+
+Les lignes sont lues en flux (une à la fois, mémoire constante) :
+    - CSV  : csv.reader
+    - XLSX : openpyxl en mode read_only (dépendance optionnelle)
+    - ODS  : content.xml parcouru avec iterparse (bibliothèque standard)
+
+Quel que soit le format, ouvrir_lignes() donne les en-têtes nettoyés
+(espaces, BOM, minuscules en option) et chaque ligne comme une liste de
+textes, les cellules typées (dates, nombres, booléens) converties en texte.
+core.colonnes associe ensuite les colonnes aux champs une seule fois par
+fichier :
+
+    with ColonnesEleves.ouvrir(chemin) as lignes:
+        for ligne in lignes:
+            ...
+"""
+
+import csv
+import os
+import zipfile
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from xml.etree import ElementTree
+
+
+EXTENSIONS_CLASSEUR = ('.xlsx', '.xlsm', '.ods')
+
+
+class OngletAbsent(FileNotFoundError):
+    """
+    L'onglet demandé n'existe pas dans le classeur. Sous-classe de
+    FileNotFoundError : les commandes d'import signalent et sautent le
+    fichier comme un fichier absent.
+    """
+
+
+# ============================================================================
+# 🧹 EN-TÊTES ET CELLULES
+# ============================================================================
+
+def nettoyer_entete(name, minuscules=False):
+    """Nettoie un nom de colonne (espaces, BOM) ; en minuscules si demandé."""
+    name = '' if name is None else str(name)
+    name = name.strip().lstrip('\ufeff').lstrip('\ufbff')
+    return name.lower() if minuscules else name
+
+
+def texte_cellule(valeur):
+    """
+    Convertit une cellule typée en texte, comme dans un export CSV :
+    dates en JJ/MM/AAAA, entiers sans ".0", booléens en oui / non.
+    """
+    if valeur is None:
+        return ''
+    if isinstance(valeur, bool):
+        return 'oui' if valeur else 'non'
+    if isinstance(valeur, datetime):
+        return valeur.strftime('%d/%m/%Y')
+    if isinstance(valeur, date):
+        return valeur.strftime('%d/%m/%Y')
+    if isinstance(valeur, time):
+        return valeur.strftime('%H:%M')
+    if isinstance(valeur, float) and valeur.is_integer():
+        return str(int(valeur))
+    return str(valeur)
+
+
+def separer_feuille(chemin):
+    """
+    'classeur.xlsx:Onglet' → ('classeur.xlsx', 'Onglet')
+    'fichier.csv'          → ('fichier.csv', None)
+    """
+    base, sep, feuille = chemin.rpartition(':')
+    if sep and base.lower().endswith(EXTENSIONS_CLASSEUR):
+        return base, feuille
+    return chemin, None
+
+
+# ============================================================================
+# 📖 LECTEURS
+# ============================================================================
+
+def lignes_xlsx(chemin, feuille=None):
+    """Lignes d'un onglet XLSX, en flux (openpyxl read_only)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError(
+            "La lecture des fichiers .xlsx nécessite openpyxl : pip install openpyxl")
+
+    classeur = load_workbook(chemin, read_only=True, data_only=True)
+    try:
+        if feuille is None:
+            onglet = classeur.worksheets[0]
+        elif feuille in classeur.sheetnames:
+            onglet = classeur[feuille]
+        else:
+            raise OngletAbsent(f'Onglet "{feuille}" absent de {chemin} '
+                               f'(onglets : {", ".join(classeur.sheetnames)})')
+
+        for valeurs in onglet.iter_rows(values_only=True):
+            yield [texte_cellule(v) for v in valeurs]
+    finally:
+        classeur.close()
+
+
+# Espaces de noms OpenDocument
+TABLE = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+OFFICE = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+TEXT = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+
+# Au-delà, une répétition de lignes/cellules vides est du remplissage de fin d'onglet
+REPETITION_MAX = 1000
+
+
+def _texte_ods(element):
+    """Texte d'un paragraphe ODS, en tenant compte des espaces encodés (text:s)."""
+    morceaux = [element.text or '']
+    for enfant in element:
+        if enfant.tag == f'{TEXT}s':
+            morceaux.append(' ' * int(enfant.get(f'{TEXT}c', 1)))
+        elif enfant.tag == f'{TEXT}tab':
+            morceaux.append('\t')
+        elif enfant.tag == f'{TEXT}line-break':
+            morceaux.append('\n')
+        else:
+            morceaux.append(_texte_ods(enfant))
+        morceaux.append(enfant.tail or '')
+    return ''.join(morceaux)
+
+
+def _valeur_ods(cellule):
+    """Texte d'une cellule ODS, converti comme texte_cellule() selon son type."""
+    type_valeur = cellule.get(f'{OFFICE}value-type')
+    if type_valeur in ('float', 'percentage', 'currency'):
+        return texte_cellule(float(cellule.get(f'{OFFICE}value')))
+    if type_valeur == 'date':
+        return texte_cellule(datetime.fromisoformat(cellule.get(f'{OFFICE}date-value')))
+    if type_valeur == 'boolean':
+        return texte_cellule(cellule.get(f'{OFFICE}boolean-value') == 'true')
+    return '\n'.join(_texte_ods(p) for p in cellule.iter(f'{TEXT}p'))
+
+
+def lignes_ods(chemin, feuille=None):
+    """Lignes d'un onglet ODS, en flux : content.xml est parcouru sans être chargé."""
+    with zipfile.ZipFile(chemin) as archive, archive.open('content.xml') as contenu:
+        pile = []
+        onglet_trouve = False
+        dans_onglet = False
+
+        for evenement, element in ElementTree.iterparse(contenu, events=('start', 'end')):
+            if evenement == 'start':
+                pile.append(element)
+                if element.tag == f'{TABLE}table':
+                    dans_onglet = not onglet_trouve and (
+                        feuille is None or element.get(f'{TABLE}name') == feuille)
+                    onglet_trouve = onglet_trouve or dans_onglet
+                continue
+
+            pile.pop()
+            if element.tag == f'{TABLE}table':
+                if dans_onglet:
+                    return
+                element.clear()
+            elif element.tag == f'{TABLE}table-row':
+                if dans_onglet:
+                    ligne = []
+                    for cellule in element:
+                        if cellule.tag not in (f'{TABLE}table-cell', f'{TABLE}covered-table-cell'):
+                            continue
+                        valeur = _valeur_ods(cellule)
+                        repetitions = int(cellule.get(f'{TABLE}number-columns-repeated', 1))
+                        if not valeur:
+                            repetitions = min(repetitions, REPETITION_MAX)
+                        ligne.extend([valeur] * repetitions)
+                    while ligne and not ligne[-1]:
+                        ligne.pop()
+
+                    if ligne:
+                        repetitions = int(element.get(f'{TABLE}number-rows-repeated', 1))
+                        for _ in range(repetitions):
+                            yield ligne
+                # Libérer la ligne lue : la mémoire reste constante
+                element.clear()
+                if pile:
+                    pile[-1].remove(element)
+
+        if feuille is not None and not onglet_trouve:
+            raise OngletAbsent(f'Onglet "{feuille}" absent de {chemin}')
+
+
+def _numerotees_csv(lecteur):
+    """
+    Lignes du CSV avec le numéro de leur première ligne dans le fichier :
+    une cellule entre guillemets peut contenir des retours à la ligne, le
+    rang de la ligne ne suffit donc pas. Lignes vides ignorées.
+    """
+    debut = lecteur.line_num + 1
+    for ligne in lecteur:
+        if ligne:
+            yield debut, ligne
+        debut = lecteur.line_num + 1
+
+
+def _numerotees(lignes, premiere):
+    """
+    (numéro de ligne dans le classeur, ligne) pour chaque ligne non vide :
+    les lignes vides sont ignorées, mais comptées.
+    """
+    for numero, ligne in enumerate(lignes, premiere):
+        if any(ligne):
+            yield numero, ligne
+
+
+@contextmanager
+def ouvrir_lignes(chemin, minuscules=False):
+    """
+    Ouvre un fichier d'import (CSV, XLSX ou ODS) et retourne
+    (en-têtes nettoyés, itérateur de (numéro de ligne, liste de textes)).
+
+    Pour un classeur, 'fichier.xlsx:Onglet' choisit l'onglet (1er par défaut) ;
+    la première ligne non vide sert d'en-tête. Lève FileNotFoundError si le
+    fichier n'existe pas, comme open(), OngletAbsent si l'onglet n'existe pas.
+
+    Les lignes peuvent être plus courtes que l'en-tête.
+    Le numéro est celui de la ligne dans le tableur (en-tête = ligne 1) ;
+    en ODS, les lignes vides ne sont pas comptées.
+    """
+    chemin, feuille = separer_feuille(chemin)
+    extension = os.path.splitext(chemin)[1].lower()
+
+    if extension in EXTENSIONS_CLASSEUR:
+        lire = lignes_ods if extension == '.ods' else lignes_xlsx
+        lignes = lire(chemin, feuille)
+        try:
+            entetes = []
+            numero = 0
+            for numero, ligne in enumerate(lignes, 1):
+                if any(ligne):
+                    entetes = [nettoyer_entete(name, minuscules) for name in ligne]
+                    break
+            yield entetes, _numerotees(lignes, numero + 1)
+        finally:
+            lignes.close()
+
+    else:
+        with open(chemin, 'r', encoding='utf-8', newline='') as f:
+            lecteur = csv.reader(f)
+            entetes = [nettoyer_entete(name, minuscules) for name in next(lecteur, [])]
+            yield entetes, _numerotees_csv(lecteur)
+
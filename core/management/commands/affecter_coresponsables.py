@@ -1,28 +1,43 @@
+"""
+Commande Django pour affecter le co-responsable du bénévole à son élève
+
+Seuls les élèves dont le co-responsable diffère sont modifiés, en une
+seule requête UPDATE (voir core.coresponsables).
+
+Usage:
+    python manage.py affecter_coresponsables
+    python manage.py affecter_coresponsables --dry-run
+"""
+
 from django.core.management.base import BaseCommand
-from core.models import Binome
+
+from core.coresponsables import ecarts, propager_coresponsables
+
 
 class Command(BaseCommand):
     help = 'Affecte le co-responsable du bénévole à son élève'
-    
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mode test : affiche les élèves concernés sans modifier la base'
+        )
+
     def handle(self, *args, **options):
-        # Compter les affectations
-        count = 0
-        
-        # Parcourir tous les binômes actifs
-        binomes = Binome.objects.filter(actif=True).select_related('eleve', 'benevole')
-        
-        for binome in binomes:
-            # Si le bénévole a un co-responsable
-            if binome.benevole and binome.benevole.co_responsable:
-                # L'affecter à l'élève
-                binome.eleve.co_responsable = binome.benevole.co_responsable
-                binome.eleve.save()
-                count += 1
-                
-                self.stdout.write(
-                    f"✓ {binome.eleve.get_nom_complet()} → {binome.benevole.co_responsable.username}"
-                )
-        
+        dry_run = options.get('dry_run', False)
+
+        lignes = ecarts()
+        for prenom, nom, ancien, nouveau in lignes:
+            self.stdout.write(f"✓ {prenom} {nom} : {ancien or '—'} → {nouveau}")
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(f'\n⚠️  MODE TEST : {len(lignes)} élève(s) seraient mis à jour')
+            )
+            return
+
+        count = propager_coresponsables() if lignes else 0
         self.stdout.write(
             self.style.SUCCESS(f'\n✅ {count} élève(s) mis à jour')
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,123 @@
+"""
+Commande Django pour mesurer la reconnaissance des matières (extraire_matieres)
+
+Génère un corpus synthétique de champs "besoins", compare le résultat et
+le débit de l'ancienne boucle mot-clé par mot-clé avec le matcher compilé
+de core.matieres.
+
+Usage:
+    python manage.py bench_matieres
+    python manage.py bench_matieres --lignes 100000 --seed 42
+"""
+
+import random
+import re
+import time
+import unicodedata
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.matieres import MATIERES_CANONIQUES, extraire_matieres
+
+
+# Morceaux non reconnus, pour simuler les saisies réelles
+BRUIT = [
+    'piano', 'devoirs', 'confiance en soi', 'aide', 'soutien scolaire',
+    'motivation', 'concentration', 'rattrapage', 'brevet', 'bac',
+]
+
+SEPARATEURS = [', ', ' / ', '; ', '\n', ',']
+
+
+def normaliser_reference(texte):
+    """Ancienne normalisation (sans cache), pour comparaison."""
+    texte = texte.lower().strip()
+    texte = unicodedata.normalize('NFD', texte)
+    return ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
+
+
+def extraire_matieres_reference(besoins_str):
+    """Ancienne implémentation (boucle sur chaque mot-clé), pour comparaison."""
+    if not besoins_str:
+        return [], ''
+
+    tokens = re.split(r'[,;/\n]+', besoins_str)
+    tokens = [t.strip() for t in tokens if t.strip()]
+
+    matieres_trouvees = set()
+    tokens_non_reconnus = []
+
+    for token in tokens:
+        token_norm = normaliser_reference(token)
+        reconnu = False
+
+        for matiere_canon, mots_cles in MATIERES_CANONIQUES.items():
+            for mot in mots_cles:
+                if normaliser_reference(mot) in token_norm:
+                    matieres_trouvees.add(matiere_canon)
+                    reconnu = True
+                    break
+            if reconnu:
+                break
+
+        if not reconnu:
+            tokens_non_reconnus.append(token)
+
+    return list(matieres_trouvees), ', '.join(tokens_non_reconnus)
+
+
+class Command(BaseCommand):
+    help = 'Mesure le débit de extraire_matieres sur un corpus synthétique'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lignes', type=int, default=20000, help='Taille du corpus')
+        parser.add_argument('--seed', type=int, default=0, help='Graine aléatoire')
+
+    def handle(self, *args, **options):
+        nb_lignes = options['lignes']
+        rng = random.Random(options['seed'])
+
+        mots_cles = [mot for mots in MATIERES_CANONIQUES.values() for mot in mots]
+        vocabulaire = mots_cles + BRUIT
+
+        corpus = []
+        for _ in range(nb_lignes):
+            morceaux = []
+            for _ in range(rng.randint(1, 5)):
+                mot = rng.choice(vocabulaire)
+                if rng.random() < 0.3:
+                    mot = mot.upper()
+                elif rng.random() < 0.3:
+                    mot = mot.capitalize()
+                if rng.random() < 0.2:
+                    mot = f"{mot} {rng.choice(BRUIT)}"
+                morceaux.append(mot)
+            texte = ''
+            for morceau in morceaux:
+                texte += morceau + rng.choice(SEPARATEURS)
+            corpus.append(texte)
+
+        self.stdout.write(self.style.SUCCESS(f'\n📊 Corpus : {nb_lignes} champs "besoins"\n'))
+
+        resultats = {}
+        for nom, fonction in [('reference', extraire_matieres_reference),
+                              ('compilé', extraire_matieres)]:
+            debut = time.perf_counter()
+            sorties = [fonction(texte) for texte in corpus]
+            duree = time.perf_counter() - debut
+            resultats[nom] = (sorties, duree)
+            self.stdout.write(
+                f'  {nom:<10} : {duree:.3f} s  ({nb_lignes / duree:,.0f} lignes/s)')
+
+        reference, duree_ref = resultats['reference']
+        compile_, duree_compile = resultats['compilé']
+
+        differences = sum(
+            1 for a, b in zip(reference, compile_)
+            if (sorted(a[0]), a[1]) != (sorted(b[0]), b[1])
+        )
+        if differences:
+            raise CommandError(f'{differences} résultat(s) différent(s) de la référence')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Résultats identiques — accélération x{duree_ref / duree_compile:.1f}'))
@@ -0,0 +1,133 @@
+"""
+Commande Django pour vérifier et mesurer la normalisation des textes (core.text)
+
+Compare les fonctions de core.text aux anciennes implémentations
+(normaliser / normaliser_nom / normaliser_classe des imports et
+normalize_name de clean_duplicates) : les résultats doivent être
+identiques, puis affiche le gain de temps sur un corpus synthétique
+où, comme pendant un import, les mêmes valeurs reviennent souvent.
+
+Usage:
+    python manage.py bench_normalisation
+    python manage.py bench_normalisation --valeurs 200000 --distinctes 5000
+"""
+
+import random
+import re
+import time
+import unicodedata
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import text
+from core.models import Eleve
+
+
+# Valeurs piégeuses : formes décomposées, ligatures, majuscules spéciales...
+CAS_PARTICULIERS = [
+    '', ' ', '  Hélène  ', 'MARIE-HÉLÈNE', 'Marie-Hélène', 'Œdipe', 'Straße',
+    'İstanbul', 'Ångström', 'Ñandú', 'Łódź', 'Dvořák', 'Ἀθῆναι', 'Le Gall*', 'N\'Diaye',
+    'Tchorbadjian', 'ǅemal', 'ﬁlou', '6ème', '6°', '1ÈRE', 'Terminale', 'cap 1', ' 2de ',
+    '12, Rue  d\'Italie', 'Bd Baille', '😀 émoji',
+]
+
+LETTRES = 'abcdefghijklmnopqrstuvwxyzéèêëàâäîïôöùûüçÉÈÀÇ -\''
+
+
+def normaliser_reference(texte):
+    """Ancienne implémentation de normaliser / normaliser_nom."""
+    texte = texte.lower().strip()
+    texte = unicodedata.normalize('NFD', texte)
+    return ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
+
+
+def normalize_name_reference(name):
+    """Ancienne implémentation de clean_duplicates.normalize_name."""
+    if not name:
+        return ""
+    normalized = unicodedata.normalize('NFD', name)
+    normalized = ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
+    normalized = normalized.lower()
+    return re.sub(r'[*\s]+', '', normalized)
+
+
+CLASSES_VALIDES = {c for c, _ in Eleve.CLASSE_CHOICES}
+
+
+def normaliser_classe_reference(classe_str):
+    """Ancienne implémentation de normaliser_classe."""
+    if not classe_str:
+        return ''
+    classe_str = classe_str.strip()
+    if classe_str in CLASSES_VALIDES:
+        return classe_str
+    return text.CLASSE_MAPPING.get(classe_str.upper(), '')
+
+
+COMPARAISONS = [
+    ('normaliser', normaliser_reference, text.normaliser),
+    ('normaliser_nom', normaliser_reference, text.normaliser_nom),
+    ('normaliser_compact', normalize_name_reference, text.normaliser_compact),
+    ('normaliser_classe', normaliser_classe_reference, text.normaliser_classe),
+]
+
+
+class Command(BaseCommand):
+    help = 'Vérifie et mesure les fonctions de normalisation de core.text'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--valeurs', type=int, default=100000,
+                            help='Nombre de normalisations par fonction')
+        parser.add_argument('--distinctes', type=int, default=2000,
+                            help='Nombre de valeurs distinctes dans le corpus')
+        parser.add_argument('--seed', type=int, default=0, help='Graine aléatoire')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        distinctes = list(CAS_PARTICULIERS)
+        distinctes += list(text.CLASSE_MAPPING) + list(CLASSES_VALIDES)
+        while len(distinctes) < options['distinctes']:
+            distinctes.append(''.join(rng.choice(LETTRES) for _ in range(rng.randint(3, 20))))
+        corpus = [rng.choice(distinctes) for _ in range(options['valeurs'])]
+
+        # ============================================================
+        # 1. RÉSULTATS IDENTIQUES
+        # ============================================================
+
+        self.stdout.write(self.style.SUCCESS('\n🔍 Comparaison avec les anciennes implémentations'))
+        erreurs = 0
+        for nom, reference, nouvelle in COMPARAISONS:
+            for valeur in distinctes:
+                attendu, obtenu = reference(valeur), nouvelle(valeur)
+                if attendu != obtenu:
+                    erreurs += 1
+                    self.stdout.write(self.style.ERROR(
+                        f'  ❌ {nom}({valeur!r}) : {obtenu!r} au lieu de {attendu!r}'))
+        if erreurs:
+            raise CommandError(f'{erreurs} différence(s) avec les anciennes implémentations')
+        self.stdout.write(f'  ✅ {len(distinctes)} valeurs × {len(COMPARAISONS)} fonctions identiques')
+
+        # ============================================================
+        # 2. DÉBIT
+        # ============================================================
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n📊 {len(corpus)} normalisations ({len(distinctes)} valeurs distinctes)\n'))
+        for nom, reference, nouvelle in COMPARAISONS:
+            nouvelle_sans_cache = getattr(nouvelle, '__wrapped__', nouvelle)
+            for cache in (text.normaliser, text.normaliser_compact, text.normaliser_classe):
+                cache.cache_clear()
+
+            durees = []
+            for fonction in (reference, nouvelle_sans_cache, nouvelle):
+                debut = time.perf_counter()
+                for valeur in corpus:
+                    fonction(valeur)
+                durees.append(time.perf_counter() - debut)
+
+            self.stdout.write(
+                f'  {nom:<20} référence {durees[0]:.3f} s | '
+                f'sans cache {durees[1]:.3f} s | avec cache {durees[2]:.3f} s '
+                f'(x{durees[0] / durees[2]:.1f})'
+            )
@@ -0,0 +1,95 @@
+"""
+Commande Django pour mesurer le coût de LoginRequiredMiddleware
+
+Le middleware passe sur chaque requête (pages, API, fichiers statiques
+servis par Django) : il ne doit faire aucune requête SQL une fois l'état
+2FA de l'utilisateur gardé en session. La commande appelle le middleware
+seul (vue factice), N fois par cas, et affiche le temps moyen et le nombre
+de requêtes SQL.
+
+Lecture seule : la session est en mémoire et n'est jamais enregistrée.
+
+Usage:
+    python manage.py check_middleware
+    python manage.py check_middleware --repetitions 10000
+"""
+
+import time
+
+from allauth.mfa.models import Authenticator
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from core.middleware import LoginRequiredMiddleware
+
+
+class Command(BaseCommand):
+    help = 'Mesure le temps et les requêtes SQL de LoginRequiredMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repetitions',
+            type=int,
+            default=2000,
+            help='Appels du middleware par cas (défaut : 2000)'
+        )
+
+    def handle(self, *args, **options):
+        repetitions = options['repetitions']
+        middleware = LoginRequiredMiddleware(lambda request: HttpResponse())
+        factory = RequestFactory()
+
+        # De préférence un utilisateur qui a configuré son TOTP
+        totp = Authenticator.objects.filter(type=Authenticator.Type.TOTP).select_related('user').first()
+        utilisateur = totp.user if totp else User.objects.order_by('pk').first()
+
+        cas = [
+            ('Fichier statique', '/static/css/style.css', AnonymousUser()),
+            ('Anonyme', '/eleves/', AnonymousUser()),
+        ]
+        if utilisateur:
+            etat = '2FA configuré' if totp else 'sans 2FA'
+            cas.append((f'Connecté ({etat})', '/eleves/', utilisateur))
+        else:
+            self.stdout.write(self.style.WARNING('⚠️  Aucun utilisateur en base : cas connecté ignoré'))
+
+        self.stdout.write(self.style.SUCCESS('\n🔐 Coût de LoginRequiredMiddleware\n'))
+
+        echecs = []
+        for nom, chemin, user in cas:
+            session = SessionBase()  # en mémoire, partagée par les requêtes du cas
+
+            def requete():
+                r = factory.get(chemin)
+                r.user = user
+                r.session = session
+                return r
+
+            # Premier appel à part : lecture de l'état 2FA, une fois par MFA_ETAT_DUREE
+            with CaptureQueriesContext(connection) as premiere:
+                middleware(requete())
+
+            requetes = [requete() for _ in range(repetitions)]
+            with CaptureQueriesContext(connection) as suivantes:
+                debut = time.perf_counter()
+                for r in requetes:
+                    middleware(r)
+                duree = time.perf_counter() - debut
+
+            ligne = (f'{nom:<24} : {duree / repetitions * 1e6:6.1f} µs/requête, '
+                     f'{len(premiere.captured_queries)} requête(s) SQL au premier appel, '
+                     f'{len(suivantes.captured_queries)} ensuite')
+            if suivantes.captured_queries:
+                self.stdout.write(self.style.ERROR(f'  ❌ {ligne}'))
+                echecs.append(nom)
+            else:
+                self.stdout.write(f'  ✅ {ligne}')
+
+        if echecs:
+            raise CommandError(f"Requêtes SQL à chaque appel : {', '.join(echecs)}")
+        self.stdout.write(self.style.SUCCESS('\n✅ Aucune requête SQL par requête HTTP'))
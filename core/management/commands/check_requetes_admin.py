@@ -0,0 +1,95 @@
+"""
+Commande Django pour vérifier le nombre de requêtes des listes de l'admin
+
+Chaque liste (élèves, bénévoles, binômes) est affichée deux fois, avec une
+page de quelques lignes puis une page pleine : le nombre de requêtes SQL
+doit être identique. S'il grandit avec la page, une colonne refait une
+requête par ligne (select_related / prefetch_related manquant dans
+get_queryset).
+
+Lecture seule : les vues sont appelées directement, avec un superutilisateur
+non enregistré, sur les données de la base.
+
+Usage:
+    python manage.py check_requetes_admin
+    python manage.py check_requetes_admin --lignes 100 -v 2
+"""
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Benevole, Binome, Eleve
+
+
+MODELES = [Eleve, Benevole, Binome]
+
+# Taille de la petite page ; la grande est --lignes
+PETITE_PAGE = 2
+
+
+class Command(BaseCommand):
+    help = "Vérifie que les listes de l'admin font un nombre de requêtes constant"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lignes',
+            type=int,
+            default=50,
+            help='Taille de la grande page (défaut : 50, comme list_per_page)'
+        )
+
+    def handle(self, *args, **options):
+        grande_page = options['lignes']
+        verbosite = options['verbosity']
+        utilisateur = User(username='check_requetes_admin', is_active=True,
+                           is_staff=True, is_superuser=True)
+        factory = RequestFactory()
+
+        self.stdout.write(self.style.SUCCESS("\n🔍 Requêtes SQL des listes de l'admin\n"))
+
+        echecs = []
+        for modele in MODELES:
+            model_admin = admin.site._registry[modele]
+            nom = modele._meta.verbose_name_plural
+            total = model_admin.get_queryset(factory.get('/')).count()
+            if total <= PETITE_PAGE:
+                self.stdout.write(f'  ⏭️  {nom:<12} : {total} fiche(s), pas assez pour comparer')
+                continue
+
+            # Premier affichage non compté : caches chargés une fois par
+            # processus (registre des matières...)
+            mesures = []
+            for taille in (PETITE_PAGE, PETITE_PAGE, grande_page):
+                requete = factory.get('/')
+                requete.user = utilisateur
+                par_page = model_admin.list_per_page
+                model_admin.list_per_page = taille
+                try:
+                    with CaptureQueriesContext(connection) as requetes:
+                        model_admin.changelist_view(requete).render()
+                finally:
+                    model_admin.list_per_page = par_page
+                mesures.append((min(taille, total), requetes))
+
+            (petite, avant), (grande, apres) = mesures[1:]
+            ligne = (f'{nom:<12} : {len(avant.captured_queries)} requête(s) pour {petite} ligne(s), '
+                     f'{len(apres.captured_queries)} pour {grande}')
+            if len(apres.captured_queries) == len(avant.captured_queries):
+                self.stdout.write(f'  ✅ {ligne}')
+            else:
+                self.stdout.write(self.style.ERROR(f'  ❌ {ligne}'))
+                echecs.append(nom)
+
+            if verbosite > 1:
+                for q in apres.captured_queries:
+                    self.stdout.write(f"      {q['sql'][:150]}")
+
+        if echecs:
+            raise CommandError(
+                f"Requêtes par ligne dans : {', '.join(echecs)} "
+                f"(relancer avec -v 2 pour voir les requêtes)")
+        self.stdout.write(self.style.SUCCESS('\n✅ Nombre de requêtes constant'))
@@ -1,16 +1,33 @@
 """
-Commande Django pour nettoyer les doublons de bénévoles
+Commande Django pour nettoyer les doublons de bénévoles et d'élèves
 
-Supprime les doublons basés sur l'email, garde le plus récent
+Détecte les doublons approximatifs (fautes de frappe, accents, nom et
+prénom inversés...) avec core.dedoublonnage, puis fusionne chaque groupe
+dans sa fiche la plus ancienne (ou celle liée à un binôme / un compte) :
+binômes, compte utilisateur et matières sont rattachés au survivant.
+
+Les groupes qu'on ne peut pas fusionner sans perte (deux binômes, deux
+comptes utilisateurs) sont signalés et laissés tels quels.
+
+Seuls les groupes exacts (mêmes nom et prénom normalisés : accents,
+espaces, inversion) sont fusionnés d'office. Un groupe approximatif
+(Dupont / Dupond, Benali / Ben Ali...) demande une confirmation ; avec
+--noinput, il est laissé tel quel.
 
 Usage:
     python manage.py clean_duplicates
     python manage.py clean_duplicates --dry-run
+    python manage.py clean_duplicates --dry-run --seuil 0.85
+    python manage.py clean_duplicates --noinput     # groupes exacts seulement
 """
 
 from django.core.management.base import BaseCommand
+
+from core.dedoublonnage import (
+    FENETRE, SEUIL, charger_benevoles, charger_eleves, detecter_doublons,
+    fusionner, groupe_exact, plan_fusion,
+)
 from core.models import Benevole, Eleve
-from collections import Counter
 
 
 class Command(BaseCommand):
@@ -22,129 +39,42 @@ class Command(BaseCommand):
             action='store_true',
             help='Mode test : affiche ce qui serait fait sans supprimer'
         )
+        parser.add_argument(
+            '--seuil',
+            type=float,
+            default=SEUIL,
+            help=f'Score minimal (0 à 1) pour considérer deux fiches comme doublons (défaut : {SEUIL})'
+        )
+        parser.add_argument(
+            '--fenetre',
+            type=int,
+            default=FENETRE,
+            help=f'Nombre de voisins comparés après tri par nom (défaut : {FENETRE})'
+        )
+        parser.add_argument(
+            '--noinput', '--no-input',
+            action='store_false',
+            dest='interactive',
+            help='Aucune question : les groupes approximatifs ne sont pas fusionnés'
+        )
 
     def handle(self, *args, **options):
         dry_run = options.get('dry_run', False)
-        
+        self.interactive = options['interactive']
+
         if dry_run:
             self.stdout.write(self.style.WARNING('\n' + '='*60))
             self.stdout.write(self.style.WARNING('🔍 MODE TEST - Aucune suppression'))
             self.stdout.write(self.style.WARNING('='*60 + '\n'))
-        
-        # ============================================================
-        # NETTOYER LES DOUBLONS BÉNÉVOLES (par email)
-        # ============================================================
-        
-        self.stdout.write(self.style.SUCCESS('\n🧹 Nettoyage des doublons bénévoles\n'))
-        
-        # Récupérer tous les emails valides
-        emails = Benevole.objects.values_list('email', flat=True)
-        
-        # Filtrer les emails invalides
-        valid_emails = [
-            email for email in emails 
-            if email and '@' in email and len(email) > 5
-        ]
-        
-        email_counts = Counter(valid_emails)
-        duplicates = [email for email, count in email_counts.items() if count > 1]
-        
-        if not duplicates:
-            self.stdout.write('✅ Aucun doublon trouvé\n')
-        else:
-            self.stdout.write(f'⚠️  {len(duplicates)} email(s) en double trouvé(s)\n')
-            
-            total_deleted = 0
-            
-            for email in duplicates:
-                benevoles = Benevole.objects.filter(email=email).order_by('id')
-                count = benevoles.count()
-                
-                self.stdout.write(f'\n📧 {email} ({count} occurrences)')
-                
-                # Vérifier si c'est vraiment la même personne
-                # (même nom + prénom en normalisant)
-                first = benevoles.first()
-                
-                for b in benevoles:
-                    nom_normalized = self.normalize_name(b.nom)
-                    prenom_normalized = self.normalize_name(b.prenom)
-                    first_nom = self.normalize_name(first.nom)
-                    first_prenom = self.normalize_name(first.prenom)
-                    
-                    if b.id == first.id:
-                        self.stdout.write(f'   ✅ Garder : {b.prenom} {b.nom} (id={b.id})')
-                    elif nom_normalized == first_nom and prenom_normalized == first_prenom:
-                        # Même personne → doublon
-                        if dry_run:
-                            self.stdout.write(f'   ❌ Supprimerait : {b.prenom} {b.nom} (id={b.id})')
-                        else:
-                            self.stdout.write(f'   ❌ Supprimé : {b.prenom} {b.nom} (id={b.id})')
-                            b.delete()
-                        total_deleted += 1
-                    else:
-                        # Personnes différentes avec même email
-                        self.stdout.write(f'   ⚠️  Personne différente : {b.prenom} {b.nom} (id={b.id}) - Email partagé ?')
-            
-            self.stdout.write(f'\n📊 Total doublons supprimés : {total_deleted}')
-        
-        # ============================================================
-        # NETTOYER LES DOUBLONS ÉLÈVES (par nom+prenom+telephone)
-        # ============================================================
-        
-        self.stdout.write(self.style.SUCCESS('\n🧹 Nettoyage des doublons élèves\n'))
-        
-        # Grouper par nom + prenom + telephone_parent
-        from django.db.models import Count
-        
-        duplicates_eleves = Eleve.objects.values(
-            'nom', 'prenom', 'telephone_parent'
-        ).annotate(
-            count=Count('id')
-        ).filter(count__gt=1)
-        
-        if not duplicates_eleves:
-            self.stdout.write('✅ Aucun doublon trouvé\n')
-        else:
-            self.stdout.write(f'⚠️  {len(duplicates_eleves)} élève(s) en double trouvé(s)\n')
-            
-            total_deleted = 0
-            
-            for dup in duplicates_eleves:
-                nom = dup['nom']
-                prenom = dup['prenom']
-                tel = dup['telephone_parent']
-                
-                eleves = Eleve.objects.filter(
-                    nom=nom,
-                    prenom=prenom,
-                    telephone_parent=tel
-                ).order_by('id')
-                
-                count = eleves.count()
-                
-                self.stdout.write(f'\n👤 {prenom} {nom} - {tel} ({count} occurrences)')
-                
-                # Garder le premier, supprimer les autres
-                to_keep = eleves.first()
-                to_delete = eleves[1:]
-                
-                self.stdout.write(f'   ✅ Garder : id={to_keep.id}')
-                
-                for e in to_delete:
-                    if dry_run:
-                        self.stdout.write(f'   ❌ Supprimerait : id={e.id}')
-                    else:
-                        self.stdout.write(f'   ❌ Supprimé : id={e.id}')
-                        e.delete()
-                    total_deleted += 1
-            
-            self.stdout.write(f'\n📊 Total doublons supprimés : {total_deleted}')
-        
+
+        for modele, charger, icone in [(Benevole, charger_benevoles, '📧'),
+                                       (Eleve, charger_eleves, '👤')]:
+            self.nettoyer(modele, charger, icone, dry_run, options['seuil'], options['fenetre'])
+
         # ============================================================
         # RÉSUMÉ
         # ============================================================
-        
+
         self.stdout.write('\n' + '='*60)
         if dry_run:
             self.stdout.write(self.style.WARNING('⚠️  MODE TEST : Aucune donnée supprimée'))
@@ -152,22 +82,57 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS('✅ Nettoyage terminé !'))
         self.stdout.write('='*60 + '\n')
 
-    def normalize_name(self, name):
-        """Normalise un nom pour comparaison (enlève accents, casse, et caractères spéciaux)"""
-        if not name:
-            return ""
-        
-        import unicodedata
-        import re
-        
-        # Enlever les accents
-        normalized = unicodedata.normalize('NFD', name)
-        normalized = ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
-        
-        # Mettre en minuscules
-        normalized = normalized.lower()
-        
-        # Retirer les caractères spéciaux (*, espaces multiples, etc.)
-        normalized = re.sub(r'[*\s]+', '', normalized)
-        
-        return normalized
+    def nettoyer(self, modele, charger, icone, dry_run, seuil, fenetre):
+        """Détecte, affiche et (hors mode test) fusionne les doublons d'une table."""
+        nom_table = modele._meta.verbose_name_plural
+        self.stdout.write(self.style.SUCCESS(f'\n🧹 Nettoyage des doublons {nom_table}\n'))
+
+        personnes = charger()
+        groupes = detecter_doublons(personnes, seuil=seuil, fenetre=fenetre,
+                                    fratries=modele is Eleve)
+
+        if not groupes:
+            self.stdout.write(f'✅ Aucun doublon trouvé ({len(personnes)} fiches)\n')
+            return
+
+        self.stdout.write(f'⚠️  {len(groupes)} groupe(s) de doublons sur {len(personnes)} fiches\n')
+
+        plan = plan_fusion(groupes, modele)
+        a_supprimer = 0
+        for position, ((groupe, score_min), (survivant, perdants, conflit)) in enumerate(zip(groupes, plan)):
+            exact = groupe_exact(groupe)
+            self.stdout.write(f'\n{icone} {survivant.prenom} {survivant.nom} '
+                              f'({len(groupe)} fiches, score {score_min:.2f}'
+                              f'{"" if exact else ", approximatif"})')
+            if conflit:
+                self.stdout.write(self.style.WARNING(f'   ⚠️  Non fusionné : {conflit}'))
+                for p in groupe:
+                    self.stdout.write(f'      • {p.prenom} {p.nom} (id={p.id})')
+                continue
+            if not exact and not dry_run and not self.confirmer(groupe):
+                plan[position] = (survivant, perdants, 'groupe approximatif non confirmé')
+                self.stdout.write(self.style.WARNING('   ⚠️  Non fusionné : non confirmé'))
+                continue
+
+            self.stdout.write(f'   ✅ Garder : {survivant.prenom} {survivant.nom} (id={survivant.id})')
+            if dry_run:
+                verbe = 'Fusionnerait' if exact else 'Fusionnerait après confirmation'
+            else:
+                verbe = 'Fusionné'
+            for p in perdants:
+                self.stdout.write(f'   ❌ {verbe} : {p.prenom} {p.nom} (id={p.id})')
+            a_supprimer += len(perdants)
+
+        if not dry_run:
+            a_supprimer = fusionner(modele, plan)
+
+        self.stdout.write(f'\n📊 Total doublons supprimés : {a_supprimer}')
+
+    def confirmer(self, groupe):
+        """Groupe approximatif : fusion seulement sur réponse « o » (jamais avec --noinput)."""
+        if not self.interactive:
+            return False
+        for p in groupe:
+            self.stdout.write(f'      • {p.prenom} {p.nom} (id={p.id})')
+        reponse = input('   ❓ Même personne ? Fusionner ce groupe [o/N] : ')
+        return reponse.strip().lower() in ('o', 'oui', 'y', 'yes')
@@ -13,9 +13,8 @@ Usage:
 
 from django.core.management.base import BaseCommand
 from core.models import Eleve, Benevole
-import urllib.request
-import urllib.parse
-import json
+from core.geocodage import appeler_ban
+from core.metriques import METRIQUES
 import time
 import csv
 
@@ -134,6 +133,12 @@ class Command(BaseCommand):
         if dry_run:
             self.stdout.write(self.style.WARNING('\n⚠️  MODE TEST : Aucune donnée modifiée'))
         
+        # Appels à la BAN comptés pour /metrics
+        try:
+            METRIQUES.pousser()
+        except OSError as e:
+            self.stderr.write(f'⚠️  Métriques non enregistrées : {e}')
+        
         # ============================================================
         # RAPPORT DES ÉCHECS
         # ============================================================
@@ -290,42 +295,12 @@ class Command(BaseCommand):
 
     def _call_ban_api(self, query):
         """
-        Appelle l'API BAN
+        Appelle l'API BAN (core.geocodage, appels comptés dans /metrics)
         
         Returns:
             tuple: (lat, lng, score, city) ou None
         """
-        try:
-            # URL de l'API BAN
-            base_url = "https://api-adresse.data.gouv.fr/search/"
-            params = urllib.parse.urlencode({
-                'q': query,
-                'limit': 1
-            })
-            
-            url = f"{base_url}?{params}"
-            
-            with urllib.request.urlopen(url, timeout=10) as response:
-                data = json.loads(response.read().decode())
-                
-                if data.get('features') and len(data['features']) > 0:
-                    feature = data['features'][0]
-                    coords = feature['geometry']['coordinates']
-                    props = feature['properties']
-                    
-                    lng = coords[0]
-                    lat = coords[1]
-                    score = props.get('score', 0)
-                    city = props.get('city', '')
-                    
-                    # Accepter seulement si score > 0.4 (40%)
-                    if score > 0.4:
-                        return (lat, lng, score, city)
-            
-            return None
-            
-        except Exception as e:
-            return None
+        return appeler_ban(query)
 
     def normalize_address(self, address):
         """Normalise une adresse (corrections automatiques)"""
@@ -6,19 +6,51 @@ Usage:
 """
 
 from django.core.management.base import BaseCommand
-from core.models import Benevole, Matiere
-import csv
-from datetime import datetime
+from core.models import Benevole
 
-import unicodedata
+from core.colonnes import Colonne, SchemaColonnes, fait, minuscules, nom_famille, parse_date, present
+from core.profilage import ProfilageMixin
+from core.lecture import OngletAbsent
+from core.quarantaine import QuarantaineMixin
+from core.text import normaliser_nom
 
-def normaliser_nom(texte):
-    """Minuscules + suppression accents pour comparaison souple."""
-    texte = texte.lower().strip()
-    texte = unicodedata.normalize('NFD', texte)
-    return ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
 
-class Command(BaseCommand):
+class ColonnesBenevoles(SchemaColonnes):
+    # La première colonne contient le nom, quel que soit son titre
+    nom = Colonne(index=0, conversion=nom_famille)
+    prenom = Colonne('Prénom')
+    email = Colonne('Mail', conversion=minuscules)
+    telephone = Colonne('Mobile')
+    arrondissement = Colonne('Arr.')
+    adresse = Colonne('Adresse')
+    profession = Colonne('Profession')
+    primaire = Colonne('Primaire', conversion=present)
+    college = Colonne('Collège', conversion=present)
+    lycee = Colonne('Lycée', conversion=present)
+    # Si "0" ou vide, considérer comme pas fait
+    reunion_accueil = Colonne('Réunion d\'accueil faite', conversion=fait)
+    volet_3 = Colonne('Volet 3 casier judiciaire', conversion=parse_date)
+    a_donne_photo = Colonne('photo', conversion=present)
+    commentaires = Colonne('Commentaires')
+    divers = Colonne('Divers')
+
+
+class ColonnesCandidats(SchemaColonnes):
+    nom = Colonne(index=0, conversion=nom_famille)
+    prenom = Colonne('Prénom')
+    email = Colonne('Mail', conversion=minuscules)
+    telephone = Colonne('Mobile')
+    arrondissement = Colonne('Arr.')
+    adresse = Colonne('Adresse')
+    primaire = Colonne('Prim', 'C', conversion=present)
+    college = Colonne('Coll', conversion=present)
+    lycee = Colonne('Lycée', conversion=present)
+    commentaires = Colonne('Commentaires')
+    infos_complementaires = Colonne('Informations complémentaires')
+    disponibilites = Colonne('Disponibilités et compétences')
+
+
+class Command(QuarantaineMixin, ProfilageMixin, BaseCommand):
     help = 'Importe les bénévoles depuis les fichiers CSV'
 
     def add_arguments(self, parser):
@@ -43,8 +75,6 @@ class Command(BaseCommand):
         created_count = 0
         updated_count = 0
         error_count = 0
-        # Pré-charger pour lookup nom+prénom
-        tous_benevoles = list(Benevole.objects.all())
         
         # ============================================================
         # IMPORT BÉNÉVOLES 2025-2026 (statut à déterminer plus tard)
@@ -53,58 +83,20 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'\n📥 Import des bénévoles depuis {benevoles_file}'))
         
         try:
-            with open(benevoles_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
+            # Colonnes résolues une fois (en-têtes nettoyés : BOM, espaces, etc.)
+            with self.ouvrir_import(ColonnesBenevoles, benevoles_file) as lecteur:
                 
-                # Nettoyer les noms de colonnes (BOM, espaces, etc.)
-                reader.fieldnames = [name.strip().lstrip('\ufeff').lstrip('\ufbff') for name in reader.fieldnames]
-                
-                for row in reader:
+                for ligne in self.profileur.lignes(lecteur):
+                    nom, prenom, email = ligne.nom, ligne.prenom, ligne.email
                     try:
-                        # Extraire les données
-                        # La première colonne contient le nom
-                        first_col_name = reader.fieldnames[0]
-                        nom = row.get(first_col_name, '').strip().rstrip('*')
-                        
                         # Arrêter à la section Responsables
                         if nom.lower() == 'responsables':
                             break
                         
-                        # Ignorer les lignes vides
-                        if not row.get('Prénom') or not row.get('Mail') or '@' not in row.get('Mail') or len(row.get('Mail')) < 5:
-                            continue
-                        
-                        prenom = row.get('Prénom', '').strip()
-                        email = row.get('Mail', '').strip().lower()
-                        
-                        # Ignorer si pas de prénom ou email
-                        if not prenom or not email:
+                        # Ignorer les lignes vides (pas de prénom ou email invalide)
+                        if not prenom or '@' not in email or len(email) < 5:
                             continue
                         
-                        telephone = row.get('Mobile', '').strip()
-                        arrondissement = row.get('Arr.', '').strip()
-                        adresse = row.get('Adresse', '').strip()
-                        profession = row.get('Profession', '').strip()
-                        zone_geo = row.get('Zone géographique', '').strip()
-                        
-                        # Niveaux
-                        primaire = bool(row.get('Primaire', '').strip())
-                        college = bool(row.get('Collège', '').strip())
-                        lycee = bool(row.get('Lycée', '').strip())
-                        
-                        # Documents administratifs
-                        reunion_accueil_str = row.get('Réunion d\'accueil faite', '').strip()
-                        volet_3_str = row.get('Volet 3 casier judiciaire', '').strip()
-                        
-                        # Si "0" ou vide, considérer comme False (pas fait)
-                        reunion_accueil = reunion_accueil_str not in ['', '0']
-                        volet_3 = self.parse_date(volet_3_str) if volet_3_str and volet_3_str != '0' else None
-                        a_donne_photo = bool(row.get('photo', '').strip())
-                        
-                        # Commentaires
-                        commentaires = row.get('Commentaires', '').strip()
-                        divers = row.get('Divers', '').strip()
-                        
                         # Créer ou mettre à jour le bénévole
                         # Statut provisoire : Disponible (sera mis à jour après import binômes)
                         
@@ -161,28 +153,32 @@ class Command(BaseCommand):
                                     email=email,
                                     nom=nom,
                                     prenom=prenom,
-                                    telephone=telephone,
-                                    arrondissement=arrondissement,
-                                    adresse=adresse,
-                                    profession=profession,
-                                    primaire=primaire,
-                                    college=college,
-                                    lycee=lycee,
+                                    telephone=ligne.telephone,
+                                    arrondissement=ligne.arrondissement,
+                                    adresse=ligne.adresse,
+                                    profession=ligne.profession,
+                                    primaire=ligne.primaire,
+                                    college=ligne.college,
+                                    lycee=ligne.lycee,
                                     statut='Disponible',  # Provisoire
-                                    reunion_accueil_faite=reunion_accueil,
-                                    volet_3_casier_judiciaire=volet_3,
-                                    a_donne_photo=a_donne_photo,
-                                    commentaires=commentaires,
-                                    divers=divers,
+                                    reunion_accueil_faite=ligne.reunion_accueil,
+                                    volet_3_casier_judiciaire=ligne.volet_3,
+                                    a_donne_photo=ligne.a_donne_photo,
+                                    commentaires=ligne.commentaires,
+                                    divers=ligne.divers,
                                 )
                                 
                                 created_count += 1
                                 self.stdout.write(f'  ✅ Créé : {prenom} {nom}')
                     
                     except Exception as e:
+                        lecteur.rejeter(str(e))
                         error_count += 1
                         self.stdout.write(self.style.ERROR(f'  ❌ Erreur ligne {prenom} {nom}: {str(e)}'))
         
+        except OngletAbsent as e:
+            self.stdout.write(self.style.ERROR(f'❌ {e}'))
+            return
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'❌ Fichier non trouvé : {benevoles_file}'))
             return
@@ -191,24 +187,15 @@ class Command(BaseCommand):
         # IMPORT CANDIDATS À RECONTACTER (statut = Candidat)
         # ============================================================
         
-        tous_benevoles = list(Benevole.objects.all())
-        
         self.stdout.write(self.style.SUCCESS(f'\n📥 Import des candidats depuis {candidats_file}'))
         
         try:
-            with open(candidats_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                reader.fieldnames = [name.strip().lstrip('\ufeff').lstrip('\ufbff') for name in reader.fieldnames]
+            with self.ouvrir_import(ColonnesCandidats, candidats_file) as lecteur:
                 
-                for row in reader:
+                for ligne in self.profileur.lignes(lecteur):
+                    nom, prenom, email = ligne.nom, ligne.prenom, ligne.email
                     try:
                         # Ignorer les lignes vides ou les séparateurs d'année
-                        first_col_name = reader.fieldnames[0]
-                        nom = row.get(first_col_name, '').strip().rstrip('*')
-                        
-                        prenom = row.get('Prénom', '').strip()
-                        email = row.get('Mail', '').strip().lower()
-                        
                         # Arrêter si on atteint la section "Demandes retirées"
                         if 'demande' in nom.lower() and 'retir' in nom.lower():
                             break
@@ -224,41 +211,17 @@ class Command(BaseCommand):
                         if email and '@' not in email and len(email) < 5:
                             email = ''
                         
-                        # Extraire les données
-                        telephone = row.get('Mobile', '').strip()
-                        arrondissement = row.get('Arr.', '').strip()
-                        adresse = row.get('Adresse', '').strip()
-                        zone_geo = row.get('Zone géographique', '').strip()
-                        
-                        # Niveaux
-                        primaire = bool(row.get('Prim', '').strip() or row.get('C', '').strip())
-                        college = bool(row.get('Coll', '').strip())
-                        lycee = bool(row.get('Lycée', '').strip())
-                        
-                        # Commentaires
-                        commentaires = row.get('Commentaires', '').strip()
-                        infos_complementaires = row.get('Informations complémentaires', '').strip()
-                        disponibilites = row.get('Disponibilités et compétences', '').strip()
-                        
-                        # Créer ou mettre à jour le candidat
-                        
                         # Créer ou mettre à jour le candidat
 
                         # Chercher par email si disponible, sinon par nom+prénom
+                        # (colonnes clés indexées, sans charger toute la table)
                         if email:
-                            benevole = next(
-                                (b for b in tous_benevoles if b.email and b.email.lower() == email),
-                                None
-                            )
+                            benevole = Benevole.objects.filter(email__iexact=email).first()
                         else:
-                            nom_norm = normaliser_nom(nom)
-                            prenom_norm = normaliser_nom(prenom)
-                            benevole = next(
-                                (b for b in tous_benevoles
-                                 if normaliser_nom(b.nom) == nom_norm
-                                 and normaliser_nom(b.prenom) == prenom_norm),
-                                None
-                            )
+                            benevole = Benevole.objects.filter(
+                                nom_cle=normaliser_nom(nom),
+                                prenom_cle=normaliser_nom(prenom)
+                            ).first()
 
                         if dry_run:
                             if benevole:
@@ -289,24 +252,27 @@ class Command(BaseCommand):
                                     email=email,
                                     nom=nom,
                                     prenom=prenom,
-                                    telephone=telephone,
-                                    arrondissement=arrondissement,
-                                    adresse=adresse,
-                                    primaire=primaire,
-                                    college=college,
-                                    lycee=lycee,
+                                    telephone=ligne.telephone,
+                                    arrondissement=ligne.arrondissement,
+                                    adresse=ligne.adresse,
+                                    primaire=ligne.primaire,
+                                    college=ligne.college,
+                                    lycee=ligne.lycee,
                                     statut='Candidat',
-                                    commentaires=commentaires,
-                                    divers=f"{infos_complementaires}\n{disponibilites}".strip(),
+                                    commentaires=ligne.commentaires,
+                                    divers=f"{ligne.infos_complementaires}\n{ligne.disponibilites}".strip(),
                                 )
-                                tous_benevoles.append(benevole)
                                 created_count += 1
                                 self.stdout.write(f'  ✅ Créé candidat : {prenom} {nom}')
                     
                     except Exception as e:
+                        lecteur.rejeter(str(e))
                         error_count += 1
                         self.stdout.write(self.style.ERROR(f'  ❌ Erreur : {str(e)}'))
         
+        except OngletAbsent as e:
+            self.stdout.write(self.style.ERROR(f'❌ {e}'))
+            return
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'❌ Fichier non trouvé : {candidats_file}'))
             return
@@ -329,21 +295,3 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(
                 f'\n💡 Note : Les statuts "Mentor" seront attribués lors de l\'import des binômes'
             ))
-    
-    def parse_date(self, date_str):
-        """Parse une date au format DD/MM/YYYY ou DD/MM/YY"""
-        if not date_str or date_str.strip() == '0':
-            return None
-        
-        date_str = date_str.strip()
-        
-        # Essayer différents formats
-        formats = ['%d/%m/%Y', '%d/%m/%y', '%Y-%m-%d']
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
-        
-        return None
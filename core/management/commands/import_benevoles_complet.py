@@ -8,13 +8,48 @@ CORRECTION : Les ManyToManyField ne peuvent pas être dans create()
 """
 
 from django.core.management.base import BaseCommand, CommandError
-from core.models import Benevole, Matiere
-import csv
+from core.models import Benevole
+from core.colonnes import Colonne, SchemaColonnes, booleen, flottant
+from core.lecture import separer_feuille
+from core.matieres import parse_matieres
+from core.profilage import ProfilageMixin
+from core.quarantaine import QuarantaineMixin
+from core.text import normaliser_nom
 import os
-import re
 
 
-class Command(BaseCommand):
+class ColonnesBenevolesComplet(SchemaColonnes):
+    nom = Colonne('Nom')
+    prenom = Colonne('Prénom')
+    statut = Colonne('Statut', defaut='Disponible')
+    adresse = Colonne('Adresse')
+    code_postal = Colonne('Code postal')
+    ville = Colonne('Ville')
+    email = Colonne('Email')
+    telephone = Colonne('Téléphone')
+    # CONVERSION DES CHAMPS BOOLEAN ("oui" → True)
+    est_responsable = Colonne('est_responsable', conversion=booleen)
+    profession = Colonne('Profession')
+    zone_geographique = Colonne('Zone géographique')
+    moyen_deplacement = Colonne('Moyen de déplacement')
+    primaire = Colonne('Primaire', conversion=booleen)
+    college = Colonne('Collège', conversion=booleen)
+    lycee = Colonne('Lycée', conversion=booleen)
+    a_donne_photo = Colonne('a_donne_photo', conversion=booleen)
+    est_ajoute_au_groupe_whatsapp = Colonne('est_ajoute_au groupe_WhatsApp', conversion=booleen)
+    fichier = Colonne('fichier', conversion=booleen)
+    outlook = Colonne('Outlook', conversion=booleen)
+    extranet = Colonne('Extranet', conversion=booleen)
+    reunion_accueil_faite = Colonne('Réunion d\'accueil faite', conversion=booleen)
+    volet_3_casier_judiciaire = Colonne('Volet 3 casier judiciaire')
+    commentaires = Colonne('Commentaires')
+    divers = Colonne('Divers')
+    latitude = Colonne('latitude', conversion=flottant)
+    longitude = Colonne('longitude', conversion=flottant)
+    matieres = Colonne('Matières')
+
+
+class Command(QuarantaineMixin, ProfilageMixin, BaseCommand):
     help = 'Importe les bénévoles depuis benevoles_complet.csv avec conversion Boolean'
 
     def add_arguments(self, parser):
@@ -36,46 +71,12 @@ class Command(BaseCommand):
             help='Simuler l\'import sans modifier la base de données'
         )
 
-    def convert_to_boolean(self, value):
-        """
-        Convertit une valeur texte en Boolean.
-        "oui" → True
-        "" ou "non" ou autre → False
-        """
-        if not value:
-            return False
-        return value.strip().lower() == 'oui'
-
-    def parse_matieres(self, matieres_str):
-        """
-        Parse la chaîne de matières et retourne une liste d'objets Matiere.
-        """
-        if not matieres_str or matieres_str.strip() == '':
-            return []
-        
-        # Séparer par virgule
-        matieres_list = [m.strip() for m in matieres_str.split(',') if m.strip()]
-        matieres_objets = []
-        
-        for matiere_nom in matieres_list:
-            try:
-                matiere = Matiere.objects.get(nom__iexact=matiere_nom)
-                matieres_objets.append(matiere)
-            except Matiere.DoesNotExist:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"      ⚠️  Matière non trouvée : '{matiere_nom}'"
-                    )
-                )
-        
-        return matieres_objets
-
     def handle(self, *args, **options):
         csv_file = options['csv_file']
         update_mode = options['update']
         dry_run = options['dry_run']
         
-        if not os.path.exists(csv_file):
+        if not os.path.exists(separer_feuille(csv_file)[0]):
             raise CommandError(f'Le fichier {csv_file} n\'existe pas')
         
         if dry_run:
@@ -92,13 +93,12 @@ class Command(BaseCommand):
         }
         
         try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                lecteur = csv.DictReader(f)
+            with self.ouvrir_import(ColonnesBenevolesComplet, csv_file) as lecteur:
                 
-                for row in lecteur:
+                for ligne in self.profileur.lignes(lecteur):
                     stats['total'] += 1
-                    nom = row.get('Nom', '').strip()
-                    prenom = row.get('Prénom', '').strip()
+                    nom = ligne.nom
+                    prenom = ligne.prenom
                     
                     try:
                         if not nom or not prenom:
@@ -108,69 +108,54 @@ class Command(BaseCommand):
                                 )
                             )
                             stats['ignorés'] += 1
+                            lecteur.rejeter('Nom ou prénom manquant')
                             continue
                         
-                        # Convertir latitude/longitude
-                        try:
-                            latitude = float(row.get('latitude', '')) if row.get('latitude') else None
-                        except ValueError:
-                            latitude = None
-                        
-                        try:
-                            longitude = float(row.get('longitude', '')) if row.get('longitude') else None
-                        except ValueError:
-                            longitude = None
-                        
-                        # CONVERSION DES CHAMPS BOOLEAN
-                        est_responsable = self.convert_to_boolean(row.get('est_responsable', ''))
-                        primaire = self.convert_to_boolean(row.get('Primaire', ''))
-                        college = self.convert_to_boolean(row.get('Collège', ''))
-                        lycee = self.convert_to_boolean(row.get('Lycée', ''))
-                        a_donne_photo = self.convert_to_boolean(row.get('a_donne_photo', ''))
-                        est_ajoute_au_groupe_whatsapp = self.convert_to_boolean(row.get('est_ajoute_au groupe_WhatsApp', ''))
-                        fichier = self.convert_to_boolean(row.get('fichier', ''))
-                        outlook = self.convert_to_boolean(row.get('Outlook', ''))
-                        extranet = self.convert_to_boolean(row.get('Extranet', ''))
-                        reunion_accueil_faite = self.convert_to_boolean(row.get('Réunion d\'accueil faite', ''))
-                        
-                        # Parser les matières
-                        matieres_str = row.get('Matières', '')
-                        matieres_objets = self.parse_matieres(matieres_str) if not dry_run else []
+                        # Résoudre les matières
+                        matieres_objets = []
+                        if not dry_run:
+                            matieres_objets, inconnues = parse_matieres(ligne.matieres)
+                            for matiere_nom in inconnues:
+                                self.stdout.write(
+                                    self.style.WARNING(
+                                        f"      ⚠️  Matière non trouvée : '{matiere_nom}'"
+                                    )
+                                )
                         
                         # Préparer les données du bénévole (SANS matieres)
                         benevole_data = {
-                            'nom': nom,
-                            'prenom': prenom,
-                            'statut': row.get('Statut', 'Disponible'),
-                            'adresse': row.get('Adresse', ''),
-                            'code_postal': row.get('Code postal', ''),
-                            'ville': row.get('Ville', ''),
-                            'email': row.get('Email', ''),
-                            'telephone': row.get('Téléphone', ''),
-                            'est_responsable': est_responsable,
-                            'profession': row.get('Profession', ''),
-                            'zone_geographique': row.get('Zone géographique', ''),
-                            'moyen_deplacement': row.get('Moyen de déplacement', ''),
-                            'primaire': primaire,
-                            'college': college,
-                            'lycee': lycee,
-                            'a_donne_photo': a_donne_photo,
-                            'est_ajoute_au_groupe_whatsapp': est_ajoute_au_groupe_whatsapp,
-                            'fichier': fichier,
-                            'outlook': outlook,
-                            'extranet': extranet,
-                            'reunion_accueil_faite': reunion_accueil_faite,
-                            'volet_3_casier_judiciaire': row.get('Volet 3 casier judiciaire', ''),
-                            'commentaires': row.get('Commentaires', ''),
-                            'divers': row.get('Divers', ''),
-                            'latitude': latitude,
-                            'longitude': longitude,
+                            'nom': ligne.nom,
+                            'prenom': ligne.prenom,
+                            'statut': ligne.statut,
+                            'adresse': ligne.adresse,
+                            'code_postal': ligne.code_postal,
+                            'ville': ligne.ville,
+                            'email': ligne.email,
+                            'telephone': ligne.telephone,
+                            'est_responsable': ligne.est_responsable,
+                            'profession': ligne.profession,
+                            'zone_geographique': ligne.zone_geographique,
+                            'moyen_deplacement': ligne.moyen_deplacement,
+                            'primaire': ligne.primaire,
+                            'college': ligne.college,
+                            'lycee': ligne.lycee,
+                            'a_donne_photo': ligne.a_donne_photo,
+                            'est_ajoute_au_groupe_whatsapp': ligne.est_ajoute_au_groupe_whatsapp,
+                            'fichier': ligne.fichier,
+                            'outlook': ligne.outlook,
+                            'extranet': ligne.extranet,
+                            'reunion_accueil_faite': ligne.reunion_accueil_faite,
+                            'volet_3_casier_judiciaire': ligne.volet_3_casier_judiciaire,
+                            'commentaires': ligne.commentaires,
+                            'divers': ligne.divers,
+                            'latitude': ligne.latitude,
+                            'longitude': ligne.longitude,
                         }
                         
                         if not dry_run:
                             benevole_existant = Benevole.objects.filter(
-                                nom=nom,
-                                prenom=prenom
+                                nom_cle=normaliser_nom(nom),
+                                prenom_cle=normaliser_nom(prenom)
                             ).first()
                             
                             if benevole_existant:
@@ -215,8 +200,8 @@ class Command(BaseCommand):
                         else:
                             # Mode dry-run
                             benevole_existant = Benevole.objects.filter(
-                                nom=nom,
-                                prenom=prenom
+                                nom_cle=normaliser_nom(nom),
+                                prenom_cle=normaliser_nom(prenom)
                             ).first()
                             
                             if benevole_existant:
@@ -231,6 +216,7 @@ class Command(BaseCommand):
                                 stats['créés'] += 1
                     
                     except Exception as e:
+                        lecteur.rejeter(str(e))
                         stats['erreurs'] += 1
                         self.stdout.write(
                             self.style.ERROR(
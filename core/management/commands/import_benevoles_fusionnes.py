@@ -6,13 +6,35 @@ avec gestion des candidats et des nouveaux champs.
 """
 
 from django.core.management.base import BaseCommand, CommandError
-from core.models import Benevole, Matiere
-import csv
+from core.models import Benevole
+from core.colonnes import Colonne, booleen, decimal
+from core.lecture import separer_feuille
+from core.management.commands.import_benevoles_complet import ColonnesBenevolesComplet
+from core.matieres import parse_matieres
+from core.profilage import ProfilageMixin
+from core.quarantaine import QuarantaineMixin
+from core.text import normaliser_nom
 import os
-from decimal import Decimal, InvalidOperation
 
 
-class Command(BaseCommand):
+def statut_ou_candidat(valeur):
+    return valeur.strip() or 'Candidat'
+
+
+class ColonnesBenevolesFusionnes(ColonnesBenevolesComplet):
+    """Mêmes colonnes que benevoles_complet.csv, plus celles des candidats."""
+    statut = Colonne('Statut', conversion=statut_ou_candidat)
+    volet_3_casier_judiciaire = Colonne('Volet 3 casier judiciaire', conversion=booleen)
+    latitude = Colonne('latitude', conversion=decimal)
+    longitude = Colonne('longitude', conversion=decimal)
+    # NOUVEAUX CHAMPS (candidats)
+    origine_contact = Colonne('Origine_contact')
+    date_contact = Colonne('Date_contact')
+    informations_complementaires = Colonne('Informations_complementaires')
+    disponibilites_competences = Colonne('Disponibilites_competences')
+
+
+class Command(QuarantaineMixin, ProfilageMixin, BaseCommand):
     help = 'Importe les bénévoles depuis benevoles_fusionnes.csv avec gestion des candidats'
 
     def add_arguments(self, parser):
@@ -34,57 +56,12 @@ class Command(BaseCommand):
             help='Simuler l\'import sans modifier la base de données'
         )
 
-    def convert_to_boolean(self, value):
-        """
-        Convertit une valeur texte en Boolean.
-        "oui" → True
-        "" ou "non" ou autre → False
-        """
-        if not value:
-            return False
-        return value.strip().lower() == 'oui'
-
-    def convert_to_decimal(self, value):
-        """
-        Convertit une valeur en Decimal pour latitude/longitude
-        """
-        if not value or str(value).strip() == '':
-            return None
-        try:
-            return Decimal(str(value).strip())
-        except (InvalidOperation, ValueError):
-            return None
-
-    def parse_matieres(self, matieres_str):
-        """
-        Parse la chaîne de matières et retourne une liste d'objets Matiere.
-        """
-        if not matieres_str or matieres_str.strip() == '':
-            return []
-        
-        # Séparer par virgule
-        matieres_list = [m.strip() for m in matieres_str.split(',') if m.strip()]
-        matieres_objets = []
-        
-        for matiere_nom in matieres_list:
-            try:
-                matiere = Matiere.objects.get(nom__iexact=matiere_nom)
-                matieres_objets.append(matiere)
-            except Matiere.DoesNotExist:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"      ⚠️  Matière non trouvée : '{matiere_nom}'"
-                    )
-                )
-        
-        return matieres_objets
-
     def handle(self, *args, **options):
         csv_file = options['csv_file']
         update_mode = options['update']
         dry_run = options['dry_run']
         
-        if not os.path.exists(csv_file):
+        if not os.path.exists(separer_feuille(csv_file)[0]):
             raise CommandError(f'Le fichier {csv_file} n\'existe pas')
         
         if dry_run:
@@ -101,13 +78,12 @@ class Command(BaseCommand):
         }
         
         try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                lecteur = csv.DictReader(f)
+            with self.ouvrir_import(ColonnesBenevolesFusionnes, csv_file) as lecteur:
                 
-                for row in lecteur:
+                for ligne in self.profileur.lignes(lecteur):
                     stats['total'] += 1
-                    nom = row.get('Nom', '').strip()
-                    prenom = row.get('Prénom', '').strip()
+                    nom = ligne.nom
+                    prenom = ligne.prenom
                     
                     try:
                         if not nom or not prenom:
@@ -117,68 +93,59 @@ class Command(BaseCommand):
                                 )
                             )
                             stats['ignorés'] += 1
+                            lecteur.rejeter('Nom ou prénom manquant')
                             continue
                         
-                        # Convertir latitude/longitude
-                        latitude = self.convert_to_decimal(row.get('latitude', ''))
-                        longitude = self.convert_to_decimal(row.get('longitude', ''))
-                        
-                        # CONVERSION DES CHAMPS BOOLEAN
-                        est_responsable = self.convert_to_boolean(row.get('est_responsable', ''))
-                        primaire = self.convert_to_boolean(row.get('Primaire', ''))
-                        college = self.convert_to_boolean(row.get('Collège', ''))
-                        lycee = self.convert_to_boolean(row.get('Lycée', ''))
-                        a_donne_photo = self.convert_to_boolean(row.get('a_donne_photo', ''))
-                        est_ajoute_au_groupe_whatsapp = self.convert_to_boolean(row.get('est_ajoute_au groupe_WhatsApp', ''))
-                        fichier = self.convert_to_boolean(row.get('fichier', ''))
-                        outlook = self.convert_to_boolean(row.get('Outlook', ''))
-                        extranet = self.convert_to_boolean(row.get('Extranet', ''))
-                        reunion_accueil_faite = self.convert_to_boolean(row.get('Réunion d\'accueil faite', ''))
-                        volet_3_casier_judiciaire = self.convert_to_boolean(row.get('Volet 3 casier judiciaire', ''))
-                        
-                        # Parser les matières
-                        matieres_str = row.get('Matières', '')
-                        matieres_objets = self.parse_matieres(matieres_str) if not dry_run else []
+                        # Résoudre les matières
+                        matieres_objets = []
+                        if not dry_run:
+                            matieres_objets, inconnues = parse_matieres(ligne.matieres)
+                            for matiere_nom in inconnues:
+                                self.stdout.write(
+                                    self.style.WARNING(
+                                        f"      ⚠️  Matière non trouvée : '{matiere_nom}'"
+                                    )
+                                )
                         
                         # Préparer les données du bénévole (SANS matieres - c'est un ManyToMany)
                         benevole_data = {
-                            'nom': nom,
-                            'prenom': prenom,
-                            'statut': row.get('Statut', '').strip() or 'Candidat',
-                            'adresse': row.get('Adresse', '').strip(),
-                            'code_postal': row.get('Code postal', '').strip(),
-                            'ville': row.get('Ville', '').strip(),
-                            'email': row.get('Email', '').strip(),
-                            'telephone': row.get('Téléphone', '').strip(),
-                            'est_responsable': est_responsable,
-                            'profession': row.get('Profession', '').strip(),
-                            'zone_geographique': row.get('Zone géographique', '').strip(),
-                            'moyen_deplacement': row.get('Moyen de déplacement', '').strip(),
-                            'primaire': primaire,
-                            'college': college,
-                            'lycee': lycee,
-                            'a_donne_photo': a_donne_photo,
-                            'est_ajoute_au_groupe_whatsapp': est_ajoute_au_groupe_whatsapp,
-                            'fichier': fichier,
-                            'outlook': outlook,
-                            'extranet': extranet,
-                            'reunion_accueil_faite': reunion_accueil_faite,
-                            'volet_3_casier_judiciaire': volet_3_casier_judiciaire,
-                            'commentaires': row.get('Commentaires', '').strip(),
-                            'divers': row.get('Divers', '').strip(),
-                            'latitude': latitude,
-                            'longitude': longitude,
+                            'nom': ligne.nom,
+                            'prenom': ligne.prenom,
+                            'statut': ligne.statut,
+                            'adresse': ligne.adresse,
+                            'code_postal': ligne.code_postal,
+                            'ville': ligne.ville,
+                            'email': ligne.email,
+                            'telephone': ligne.telephone,
+                            'est_responsable': ligne.est_responsable,
+                            'profession': ligne.profession,
+                            'zone_geographique': ligne.zone_geographique,
+                            'moyen_deplacement': ligne.moyen_deplacement,
+                            'primaire': ligne.primaire,
+                            'college': ligne.college,
+                            'lycee': ligne.lycee,
+                            'a_donne_photo': ligne.a_donne_photo,
+                            'est_ajoute_au_groupe_whatsapp': ligne.est_ajoute_au_groupe_whatsapp,
+                            'fichier': ligne.fichier,
+                            'outlook': ligne.outlook,
+                            'extranet': ligne.extranet,
+                            'reunion_accueil_faite': ligne.reunion_accueil_faite,
+                            'volet_3_casier_judiciaire': ligne.volet_3_casier_judiciaire,
+                            'commentaires': ligne.commentaires,
+                            'divers': ligne.divers,
+                            'latitude': ligne.latitude,
+                            'longitude': ligne.longitude,
                             # NOUVEAUX CHAMPS (candidats)
-                            'origine_contact': row.get('Origine_contact', '').strip(),
-                            'date_contact': row.get('Date_contact', '').strip(),
-                            'informations_complementaires': row.get('Informations_complementaires', '').strip(),
-                            'disponibilites_competences': row.get('Disponibilites_competences', '').strip(),
+                            'origine_contact': ligne.origine_contact,
+                            'date_contact': ligne.date_contact,
+                            'informations_complementaires': ligne.informations_complementaires,
+                            'disponibilites_competences': ligne.disponibilites_competences,
                         }
                         
                         if not dry_run:
                             benevole_existant = Benevole.objects.filter(
-                                nom=nom,
-                                prenom=prenom
+                                nom_cle=normaliser_nom(nom),
+                                prenom_cle=normaliser_nom(prenom)
                             ).first()
                             
                             if benevole_existant:
@@ -223,8 +190,8 @@ class Command(BaseCommand):
                         else:
                             # Mode dry-run
                             benevole_existant = Benevole.objects.filter(
-                                nom=nom,
-                                prenom=prenom
+                                nom_cle=normaliser_nom(nom),
+                                prenom_cle=normaliser_nom(prenom)
                             ).first()
                             
                             if benevole_existant:
@@ -239,6 +206,7 @@ class Command(BaseCommand):
                                 stats['créés'] += 1
                     
                     except Exception as e:
+                        lecteur.rejeter(str(e))
                         stats['erreurs'] += 1
                         self.stdout.write(
                             self.style.ERROR(
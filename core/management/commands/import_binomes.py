@@ -3,25 +3,43 @@ Commande Django pour importer les binômes depuis les fichiers CSV
 
 Usage:
     python manage.py import_binomes binomes_david.csv binomes_clara.csv ...
+    python manage.py import_binomes binomes_*.csv --dry-run --diff changements.json
+    python manage.py import_binomes binomes_*.csv --affecter-coresponsables
+    python manage.py import_binomes binomes_*.csv --only-rejects   # lignes rejetées seulement
 """
 
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from core.models import Eleve, Benevole, Binome
-import csv
-import unicodedata
+from core.coresponsables import propager_coresponsables
+from core.colonnes import Colonne, SchemaColonnes, minuscules, nom_famille, parse_date
+from core.profilage import ProfilageMixin
+from core.lecture import OngletAbsent
+from core.quarantaine import QuarantaineMixin
 from datetime import datetime
 import os
 
+from core.simulation import (
+    NB_SUGGESTIONS, InstantaneBenevoles, InstantaneBinomes, InstantaneEleves, JournalSimulation,
+)
+from core.text import normaliser_nom
 
-def normaliser_nom(texte):
-    """Minuscules + suppression accents pour comparaison souple."""
-    texte = texte.lower().strip()
-    texte = unicodedata.normalize('NFD', texte)
-    return ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
 
+class ColonnesBinomes(SchemaColonnes):
+    """En-têtes lus en minuscules ; plusieurs variantes selon les onglets du suivi."""
+    nom_enfant = Colonne('nom enfant', 'nom famille enfant', conversion=nom_famille)
+    prenom_enfant = Colonne('prénom enfant', 'prenom enfant', 'prénom en fant')
+    nom_benevole = Colonne('nom bénévole', 'nom benevole')
+    prenom_benevole = Colonne('prénom bénévole', 'prenom benevole')
+    email_benevole = Colonne('mail bénévole', 'mail benevole', 'mail', conversion=minuscules)
+    tel_famille = Colonne('tél famille', 'tel famille', 'mobile')
+    date_contrat = Colonne('date contrat', conversion=parse_date)
+    commentaires = Colonne('commentaires-observations', 'nouvelles bénévole')
+    aide_demandee = Colonne('aide demandée', 'aide demandee', 'besoins')
+    infos_diverses = Colonne('informations diverses')
 
-class Command(BaseCommand):
+
+class Command(QuarantaineMixin, ProfilageMixin, BaseCommand):
     help = 'Importe les binômes depuis les fichiers CSV'
 
     def add_arguments(self, parser):
@@ -31,6 +49,16 @@ class Command(BaseCommand):
             action='store_true',
             help='Mode test : affiche ce qui serait fait sans modifier la base de données'
         )
+        parser.add_argument(
+            '--diff',
+            type=str,
+            help='Avec --dry-run : écrit les changements simulés dans ce fichier (.json ou .csv)'
+        )
+        parser.add_argument(
+            '--affecter-coresponsables',
+            action='store_true',
+            help="Après l'import : chaque élève en binôme actif reçoit le co-responsable de son bénévole"
+        )
 
     def handle(self, *args, **options):
         csv_files = options['csv_files']
@@ -41,21 +69,28 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('🔍 MODE TEST - Aucune modification en base de données'))
             self.stdout.write(self.style.WARNING('='*60 + '\n'))
 
+            # Instantanés chargés une fois : aucune requête par ligne
+            with self.profileur.phase('instantane'):
+                instantane_eleves = InstantaneEleves()
+                instantane_benevoles = InstantaneBenevoles()
+                instantane_binomes = InstantaneBinomes()
+            journal = JournalSimulation()
+
         created_count = 0
         updated_count = 0
         error_count = 0
 
-        coresponsables = {
-            'david':      self.get_or_create_user('David'),
-            'clara':      self.get_or_create_user('Clara'),
-            'georges':    self.get_or_create_user('Georges'),
-            'bernadette': self.get_or_create_user('Bernadette'),
-            'sylvie':     self.get_or_create_user('Sylvie'),
-        }
+        noms_coresponsables = ['David', 'Clara', 'Georges', 'Bernadette', 'Sylvie']
+        if dry_run:
+            coresponsables = self.trouver_users(noms_coresponsables)
+        else:
+            coresponsables = {
+                name.lower(): self.get_or_create_user(name) for name in noms_coresponsables
+            }
 
-        # Pré-charger tous les bénévoles et élèves pour les lookups normalisés
-        tous_benevoles = list(Benevole.objects.all())
-        tous_eleves = list(Eleve.objects.all())
+        # Élèves (nom, prénom normalisés) présents dans les fichiers, pour
+        # détecter ensuite les binômes arrêtés sans relire les CSV
+        eleves_vus = set()
 
         for csv_file in csv_files:
             filename = os.path.basename(csv_file).lower()
@@ -71,24 +106,23 @@ class Command(BaseCommand):
                 self.stdout.write(f'   👤 Co-responsable : {coresponsable_user.username}')
 
             try:
-                with open(csv_file, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    reader.fieldnames = [
-                        name.strip().lstrip('\ufeff').lstrip('\ufbff').lower()
-                        for name in reader.fieldnames
-                    ]
+                with self.ouvrir_import(ColonnesBinomes, csv_file, minuscules=True) as lecteur:
 
                     if dry_run:
-                        self.stdout.write(self.style.WARNING(f'   📋 Colonnes : {reader.fieldnames}'))
+                        self.stdout.write(self.style.WARNING(f'   📋 Colonnes : {lecteur.fieldnames}'))
 
-                    for row in reader:
+                    for ligne in self.profileur.lignes(lecteur):
                         try:
+                            nom_enfant = ligne.nom_enfant
+                            prenom_enfant = ligne.prenom_enfant
+                            eleves_vus.add((normaliser_nom(nom_enfant), normaliser_nom(prenom_enfant)))
+
                             # ================================================
                             # BÉNÉVOLE
                             # ================================================
-                            nom_benevole = (row.get('nom bénévole', '') or row.get('nom benevole', '')).strip()
-                            prenom_benevole = (row.get('prénom bénévole', '') or row.get('prenom benevole', '')).strip()
-                            email_benevole = (row.get('mail bénévole', '') or row.get('mail benevole', '') or row.get('mail', '')).strip().lower()
+                            nom_benevole = ligne.nom_benevole
+                            prenom_benevole = ligne.prenom_benevole
+                            email_benevole = ligne.email_benevole
 
                             if not nom_benevole or not prenom_benevole:
                                 continue
@@ -97,52 +131,57 @@ class Command(BaseCommand):
                             if nom_benevole and nom_benevole[0].isdigit():
                                 continue
                             
-                            benevole = self.trouver_benevole(
-                                tous_benevoles, nom_benevole, prenom_benevole, email_benevole
-                            )
+                            if dry_run:
+                                benevole = instantane_benevoles.trouver(
+                                    nom_benevole, prenom_benevole, email_benevole)
+                            else:
+                                benevole = self.trouver_benevole(
+                                    nom_benevole, prenom_benevole, email_benevole
+                                )
 
                             if not benevole:
-                                self.stdout.write(self.style.WARNING(
-                                    f'  ⚠️  Bénévole non trouvé : {prenom_benevole} {nom_benevole}'
-                                ))
+                                suggestions = (instantane_benevoles.suggestions(nom_benevole, prenom_benevole)
+                                               if dry_run else
+                                               self.suggestions(Benevole, nom_benevole, prenom_benevole))
+                                self.non_trouve(lecteur, 'Bénévole', nom_benevole, prenom_benevole, suggestions)
                                 continue
 
-                            # =======================================.rstrip('*')=========
+                            # ================================================
                             # ÉLÈVE
                             # ================================================
-                            nom_enfant = (row.get('nom enfant', '') or row.get('nom famille enfant', '')).strip().rstrip('*')
-                            prenom_enfant = (row.get('prénom enfant', '') or row.get('prenom enfant', '') or row.get('prénom en fant', '')).strip()
-                            tel_famille = (row.get('tél famille', '') or row.get('tel famille', '') or row.get('mobile', '')).strip()
+                            tel_famille = ligne.tel_famille
 
                             if not nom_enfant or not prenom_enfant:
                                 continue
 
-                            eleve = self.trouver_eleve(tous_eleves, nom_enfant, prenom_enfant, tel_famille)
+                            if dry_run:
+                                eleve = instantane_eleves.trouver(nom_enfant, prenom_enfant, tel_famille)
+                            else:
+                                eleve = self.trouver_eleve(nom_enfant, prenom_enfant, tel_famille)
 
                             if not eleve:
-                                self.stdout.write(self.style.WARNING(
-                                    f'  ⚠️  Élève non trouvé : {prenom_enfant} {nom_enfant}'
-                                ))
+                                suggestions = (instantane_eleves.suggestions(nom_enfant, prenom_enfant)
+                                               if dry_run else
+                                               self.suggestions(Eleve, nom_enfant, prenom_enfant))
+                                self.non_trouve(lecteur, 'Élève', nom_enfant, prenom_enfant, suggestions)
                                 continue
 
                             # ================================================
                             # BINÔME
                             # ================================================
-                            date_contrat = (row.get('date contrat', '') or '').strip()
-                            date_debut = self.parse_date(date_contrat) or datetime.now().date()
-
-                            commentaires = (row.get('commentaires-observations', '') or row.get('nouvelles bénévole', '') or '').strip()
-                            aide_demandee = (row.get('aide demandée', '') or row.get('aide demandee', '') or row.get('besoins', '') or '').strip()
-                            infos_diverses = (row.get('informations diverses', '') or '').strip()
-                            notes = '\n'.join(filter(None, [commentaires, aide_demandee, infos_diverses]))
+                            date_debut = ligne.date_contrat or datetime.now().date()
+                            notes = '\n'.join(filter(None, [
+                                ligne.commentaires, ligne.aide_demandee, ligne.infos_diverses]))
 
                             if dry_run:
-                                try:
-                                    Binome.objects.get(eleve=eleve)
+                                created = self.simuler_binome(
+                                    journal, instantane_binomes, eleve, benevole,
+                                    coresponsable_user, date_debut)
+                                if not created:
                                     updated_count += 1
                                     self.stdout.write(
                                         f'  🔄 Mettrait à jour : {prenom_enfant} {nom_enfant} ↔ {prenom_benevole} {nom_benevole}')
-                                except Binome.DoesNotExist:
+                                else:
                                     created_count += 1
                                     self.stdout.write(
                                         f'  ✅ Créerait : {prenom_enfant} {nom_enfant} ↔ {prenom_benevole} {nom_benevole}')
@@ -185,9 +224,13 @@ class Command(BaseCommand):
                                         f'  🔄 Mis à jour : {prenom_enfant} {nom_enfant} ↔ {prenom_benevole} {nom_benevole}')
 
                         except Exception as e:
+                            lecteur.rejeter(str(e))
                             error_count += 1
                             self.stdout.write(self.style.ERROR(f'  ❌ Erreur : {str(e)}'))
 
+            except OngletAbsent as e:
+                self.stdout.write(self.style.ERROR(f'❌ {e}'))
+                continue
             except FileNotFoundError:
                 self.stdout.write(self.style.ERROR(f'❌ Fichier non trouvé : {csv_file}'))
                 continue
@@ -196,61 +239,76 @@ class Command(BaseCommand):
         # DÉTECTER LES BINÔMES ARRÊTÉS
         # ====================================================================
 
-        if not dry_run:
-            self.stdout.write(self.style.SUCCESS('\n🔍 Détection des binômes arrêtés'))
-            self.stdout.write('='*60 + '\n')
+        with self.profileur.phase('detection_arrets'):
+            if self.seulement_rejets:
+                # Reprise des rejets : les fichiers sont partiels, un binôme absent n'est pas arrêté
+                self.stdout.write(self.style.WARNING(
+                    '\n⏭️  Détection des binômes arrêtés ignorée (reprise des rejets)'))
 
-            binomes_actifs = Binome.objects.filter(actif=True)
-            stopped_count = 0
+            elif dry_run:
+                self.stdout.write(self.style.SUCCESS('\n🔍 Détection des binômes arrêtés (simulation)'))
+                self.stdout.write('='*60 + '\n')
 
-            for binome in binomes_actifs:
-                eleve_found = False
+                stopped_count = 0
+                for binome in instantane_binomes.actifs():
+                    eleve = instantane_eleves.par_id[binome['eleve_id']]
+                    if (eleve['nom_cle'], eleve['prenom_cle']) in eleves_vus:
+                        continue
 
-                for csv_file in csv_files:
-                    try:
-                        with open(csv_file, 'r', encoding='utf-8') as f:
-                            reader = csv.DictReader(f)
-                            reader.fieldnames = [
-                                name.strip().lstrip('\ufeff').lstrip('\ufbff').lower()
-                                for name in reader.fieldnames
-                            ]
+                    stopped_count += 1
+                    self.stdout.write(f'  ⏹️  Arrêterait le binôme de : {eleve.libelle}')
+                    journal.noter('archivage', 'Binome', binome['id'], eleve.libelle,
+                                  {'actif': (True, False), 'date_fin': (None, datetime.now().date())})
+                    if eleve['statut'] == 'accompagne':
+                        journal.noter('archivage', 'Eleve', eleve['id'], eleve.libelle,
+                                      {'statut': ('accompagne', 'archive')})
+                        eleve['statut'] = 'archive'
 
-                            for row in reader:
-                                nom_enfant = (row.get('nom enfant', '') or row.get('nom famille enfant', '')).strip().rstrip('*')
-                                prenom_enfant = (row.get('prénom enfant', '') or row.get('prenom enfant', '') or row.get('prénom en fant', '')).strip()
-                                tel_famille = (row.get('tél famille', '') or row.get('tel famille', '') or row.get('mobile', '')).strip()
+                self.stdout.write(f'\n📊 Binômes qui seraient arrêtés : {stopped_count}')
 
-                                if (normaliser_nom(binome.eleve.nom) == normaliser_nom(nom_enfant) and
-                                        normaliser_nom(binome.eleve.prenom) == normaliser_nom(prenom_enfant)):
-                                    eleve_found = True
-                                    break
+            else:
+                self.stdout.write(self.style.SUCCESS('\n🔍 Détection des binômes arrêtés'))
+                self.stdout.write('='*60 + '\n')
 
-                        if eleve_found:
-                            break
+                binomes_actifs = Binome.objects.filter(actif=True).select_related('eleve', 'benevole')
+                stopped_count = 0
 
-                    except FileNotFoundError:
-                        continue
+                for binome in binomes_actifs:
+                    eleve_found = (binome.eleve.nom_cle, binome.eleve.prenom_cle) in eleves_vus
 
-                if not eleve_found:
-                    binome.actif = False
-                    binome.date_fin = datetime.now().date()
-                    binome.save(update_fields=['actif', 'date_fin'])
+                    if not eleve_found:
+                        binome.actif = False
+                        binome.date_fin = datetime.now().date()
+                        binome.save(update_fields=['actif', 'date_fin'])
 
-                    stopped_count += 1
-                    self.stdout.write(
-                        f'  ⏹️  Binôme arrêté : {binome.eleve.prenom} {binome.eleve.nom} '
-                        f'↔ {binome.benevole.prenom if binome.benevole else "?"} '
-                        f'{binome.benevole.nom if binome.benevole else ""}'
-                    )
-
-                    if binome.eleve.statut == 'accompagne':
-                        binome.eleve.statut = 'archive'
-                        binome.eleve.save(update_fields=['statut'])
-
-            if stopped_count > 0:
-                self.stdout.write(f'\n📊 Binômes arrêtés détectés : {stopped_count}')
+                        stopped_count += 1
+                        self.stdout.write(
+                            f'  ⏹️  Binôme arrêté : {binome.eleve.prenom} {binome.eleve.nom} '
+                            f'↔ {binome.benevole.prenom if binome.benevole else "?"} '
+                            f'{binome.benevole.nom if binome.benevole else ""}'
+                        )
+
+                        if binome.eleve.statut == 'accompagne':
+                            binome.eleve.statut = 'archive'
+                            binome.eleve.save(update_fields=['statut'])
+
+                if stopped_count > 0:
+                    self.stdout.write(f'\n📊 Binômes arrêtés détectés : {stopped_count}')
+                else:
+                    self.stdout.write('✅ Aucun binôme arrêté détecté')
+
+        # ====================================================================
+        # CO-RESPONSABLES DES BÉNÉVOLES → ÉLÈVES
+        # ====================================================================
+
+        if options.get('affecter_coresponsables'):
+            if dry_run:
+                self.stdout.write(self.style.WARNING(
+                    '\n👥 Affectation des co-responsables ignorée en mode test'))
             else:
-                self.stdout.write('✅ Aucun binôme arrêté détecté')
+                with self.profileur.phase('coresponsables'):
+                    nb = propager_coresponsables()
+                self.stdout.write(f'\n👥 Co-responsables affectés aux élèves : {nb}')
 
         # ====================================================================
         # RÉSUMÉ
@@ -263,6 +321,10 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f'  ⚠️  Erreurs : {error_count}'))
 
         if dry_run:
+            if options.get('diff'):
+                journal.ecrire(options['diff'])
+                self.stdout.write(
+                    f'  📝 {len(journal.entrees)} changement(s) écrits dans {options["diff"]}')
             self.stdout.write(self.style.WARNING('\n' + '='*60))
             self.stdout.write(self.style.WARNING("⚠️  MODE TEST : Aucune donnée n'a été modifiée"))
             self.stdout.write(self.style.WARNING('='*60 + '\n'))
@@ -271,47 +333,114 @@ class Command(BaseCommand):
     # MÉTHODES UTILITAIRES
     # ========================================================================
 
-    def trouver_benevole(self, tous_benevoles, nom, prenom, email):
+    def trouver_benevole(self, nom, prenom, email):
         """Recherche un bénévole par email, puis nom+prénom normalisés."""
         # 1. Par email (exact)
         if email and '@' in email:
-            for b in tous_benevoles:
-                if b.email and b.email.lower() == email:
-                    return b
+            benevole = Benevole.objects.filter(email__iexact=email).first()
+            if benevole:
+                return benevole
 
         # 2. Par nom + prénom normalisés (insensible casse + accents)
-        nom_norm = normaliser_nom(nom)
-        prenom_norm = normaliser_nom(prenom)
-        for b in tous_benevoles:
-            if (normaliser_nom(b.nom) == nom_norm and
-                    normaliser_nom(b.prenom) == prenom_norm):
-                return b
+        benevole = Benevole.objects.filter(
+            nom_cle=normaliser_nom(nom),
+            prenom_cle=normaliser_nom(prenom)
+        ).first()
+        return benevole
 
-        return None
-
-    def trouver_eleve(self, tous_eleves, nom, prenom, tel):
+    def trouver_eleve(self, nom, prenom, tel):
         """Recherche un élève par nom+prénom+tel normalisés, puis sans tel."""
-        nom_norm = normaliser_nom(nom)
-        prenom_norm = normaliser_nom(prenom)
-
         # 1. Avec téléphone
         if tel:
-            for e in tous_eleves:
-                if (normaliser_nom(e.nom) == nom_norm and
-                        normaliser_nom(e.prenom) == prenom_norm and
-                        e.telephone_parent == tel):
-                    return e
-
-        # 2. Sans téléphone (fallback)
-        matches = [
-            e for e in tous_eleves
-            if normaliser_nom(e.nom) == nom_norm and normaliser_nom(e.prenom) == prenom_norm
-        ]
+            eleve = Eleve.objects.filter(**Eleve.filtre_identite(nom, prenom, tel)).first()
+            if eleve:
+                return eleve
+
+        # 2. Sans téléphone (fallback) : seulement si un seul élève correspond
+        matches = list(Eleve.objects.filter(
+            nom_cle=normaliser_nom(nom),
+            prenom_cle=normaliser_nom(prenom)
+        )[:2])
         if len(matches) == 1:
             return matches[0]
 
         return None
 
+    @staticmethod
+    def suggestions(modele, nom, prenom):
+        """
+        Fiches dont nom et prénom se prononcent pareil (orthographe approchante).
+        Seulement proposées dans le message de rejet : la clé phonétique est
+        trop grossière (Mohamed / Mahmoud, Amine / Amina) pour rattacher un
+        binôme sans vérification.
+        """
+        return [f'{f.prenom} {f.nom}' for f in modele.candidats_phonetiques(nom, prenom)[:NB_SUGGESTIONS]]
+
+    def non_trouve(self, lecteur, libelle, nom, prenom, suggestions):
+        """Avertit et rejette la ligne (quarantaine), avec les noms approchants éventuels."""
+        message = f'{libelle} non trouvé : {prenom} {nom}'
+        if suggestions:
+            message += f" (vérifier l'orthographe : {' / '.join(suggestions)} ?)"
+        self.stdout.write(self.style.WARNING(f'  ⚠️  {message}'))
+        lecteur.rejeter(message)
+
+    def simuler_binome(self, journal, instantane_binomes, eleve, benevole,
+                       coresponsable_user, date_debut):
+        """
+        Simule update_or_create du binôme et les statuts Mentor / accompagne
+        sur les fiches des instantanés. Retourne True si le binôme serait créé.
+        """
+        libelle = f'{eleve.libelle} ↔ {benevole.libelle}'
+        binome = instantane_binomes.par_eleve.get(eleve['id'])
+
+        if binome is None:
+            instantane_binomes.creer(eleve['id'], benevole['id'])
+            journal.noter('creation', 'Binome', None, libelle, {
+                'benevole': (None, benevole.libelle),
+                'date_debut': (None, date_debut),
+                'actif': (None, True),
+            })
+        else:
+            changements = {}
+            if binome['benevole_id'] != benevole['id']:
+                changements['benevole_id'] = (binome['benevole_id'], benevole['id'])
+            if not binome['actif']:
+                changements['actif'] = (False, True)
+            binome.update(benevole_id=benevole['id'], actif=True)
+            if changements:
+                journal.noter('mise_a_jour', 'Binome', binome['id'], libelle, changements)
+
+        changements = {}
+        if coresponsable_user and eleve['co_responsable_id'] != coresponsable_user.id:
+            changements['co_responsable'] = (eleve['co_responsable_id'], coresponsable_user.username)
+            eleve['co_responsable_id'] = coresponsable_user.id
+        if eleve['statut'] != 'accompagne':
+            changements['statut'] = (eleve['statut'], 'accompagne')
+            eleve['statut'] = 'accompagne'
+        if changements:
+            journal.noter('mise_a_jour', 'Eleve', eleve['id'], eleve.libelle, changements)
+
+        if benevole['statut'] != 'Mentor':
+            journal.noter('mise_a_jour', 'Benevole', benevole['id'], benevole.libelle,
+                          {'statut': (benevole['statut'], 'Mentor')})
+            benevole['statut'] = 'Mentor'
+
+        return binome is None
+
+    def trouver_users(self, names):
+        """Mode test : co-responsables existants, ou utilisateurs non enregistrés (1 requête)."""
+        existants = {
+            user.username: user
+            for user in User.objects.filter(username__in=[name.lower() for name in names])
+        }
+        users = {}
+        for name in names:
+            username = name.lower()
+            users[username] = existants.get(username) or User(username=username, first_name=name)
+            if username not in existants:
+                self.stdout.write(self.style.WARNING(f'  👤 Créerait l\'utilisateur : {name}'))
+        return users
+
     def get_or_create_user(self, name):
         username = name.lower()
         user, created = User.objects.get_or_create(
@@ -323,14 +452,3 @@ class Command(BaseCommand):
             user.save()
             self.stdout.write(self.style.SUCCESS(f'  👤 Utilisateur créé : {name}'))
         return user
-
-    def parse_date(self, date_str):
-        if not date_str or date_str.strip() == '0':
-            return None
-        date_str = date_str.strip()
-        for fmt in ['%d/%m/%Y', '%d/%m/%y', '%Y-%m-%d']:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
-        return None
@@ -4,20 +4,40 @@ Commande Django pour importer les corrections manuelles d'adresses
 Après avoir corrigé le fichier CSV généré par --report,
 cette commande réimporte les adresses corrigées et les géolocalise
 
+L'import se fait en trois phases :
+    1. lecture du fichier et recherche des fiches (une requête par type)
+    2. géocodage en parallèle, une seule fois par adresse distincte
+    3. enregistrement groupé (bulk_update) dans une transaction
+
 Usage:
     python manage.py import_corrections corrections.csv
     python manage.py import_corrections corrections.csv --dry-run
+    python manage.py import_corrections corrections.csv --workers 4
+    python manage.py import_corrections corrections.csv --only-rejects
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from core.models import Eleve, Benevole
-import csv
-import urllib.request
-import urllib.parse
-import json
+from core.geocodage import WORKERS, appeler_ban, geocoder_en_parallele
+from core.colonnes import Colonne, SchemaColonnes
+from core.profilage import ProfilageMixin
+from core.lecture import OngletAbsent
+from core.quarantaine import QuarantaineMixin
+
+
+# Type indiqué dans le rapport de geolocalize_all → modèle
+MODELES = {'Bénévole': Benevole, 'Élève': Eleve}
+
+
+class ColonnesCorrections(SchemaColonnes):
+    type_obj = Colonne('type')
+    nom = Colonne('nom')
+    prenom = Colonne('prenom')
+    adresse_corrigee = Colonne('adresse_corrigee')
 
 
-class Command(BaseCommand):
+class Command(QuarantaineMixin, ProfilageMixin, BaseCommand):
     help = 'Importe les corrections d\'adresses et les géolocalise'
 
     def add_arguments(self, parser):
@@ -27,6 +47,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Mode test : affiche ce qui serait fait sans modifier'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=WORKERS,
+            help=f'Nombre de requêtes de géocodage simultanées (défaut : {WORKERS})'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
@@ -43,74 +69,107 @@ class Command(BaseCommand):
         failed_count = 0
         skipped_count = 0
         
-        try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
+        # ============================================================
+        # 1. LECTURE ET RECHERCHE DES FICHES
+        # ============================================================
+        
+        corrections = []  # (modèle, nom, prénom, adresse corrigée, numéro de ligne, ligne brute)
+        with self.quarantaine(csv_file) as rejets:
+            try:
+                with rejets.lire(ColonnesCorrections) as lecteur:
                 
-                for row in reader:
-                    type_obj = row.get('type', '')
-                    nom = row.get('nom', '')
-                    prenom = row.get('prenom', '')
-                    adresse_corrigee = row.get('adresse_corrigee', '').strip()
-                    
-                    # Ignorer si pas de correction fournie
-                    if not adresse_corrigee:
-                        skipped_count += 1
-                        self.stdout.write(f'⏭️  {prenom} {nom} - Pas de correction fournie')
-                        continue
+                    for ligne in self.profileur.lignes(lecteur):
+                        type_obj, nom, prenom, adresse_corrigee = ligne
                     
-                    # Chercher l'objet dans la base
-                    obj = None
-                    
-                    if type_obj == 'Bénévole':
-                        try:
-                            obj = Benevole.objects.get(nom=nom, prenom=prenom)
-                        except Benevole.DoesNotExist:
-                            self.stdout.write(self.style.ERROR(
-                                f'❌ Bénévole non trouvé : {prenom} {nom}'
-                            ))
-                            failed_count += 1
+                        # Ignorer si pas de correction fournie
+                        if not adresse_corrigee:
+                            skipped_count += 1
+                            self.stdout.write(f'⏭️  {prenom} {nom} - Pas de correction fournie')
                             continue
                     
-                    elif type_obj == 'Élève':
-                        try:
-                            obj = Eleve.objects.get(nom=nom, prenom=prenom)
-                        except Eleve.DoesNotExist:
+                        if type_obj not in MODELES:
                             self.stdout.write(self.style.ERROR(
-                                f'❌ Élève non trouvé : {prenom} {nom}'
+                                f'❌ Type inconnu « {type_obj} » : {prenom} {nom}'
                             ))
                             failed_count += 1
+                            lecteur.rejeter(f'Type inconnu « {type_obj} »')
                             continue
                     
-                    # Géolocaliser l'adresse corrigée
-                    self.stdout.write(f'🔍 {prenom} {nom}')
-                    self.stdout.write(f'   Nouvelle adresse : {adresse_corrigee}')
-                    
-                    result = self.geocode_address(adresse_corrigee)
-                    
-                    if result:
-                        lat, lng, score = result
-                        
-                        if dry_run:
-                            self.stdout.write(f'   ✅ Trouverait : {lat}, {lng} (score: {score:.0%})')
-                        else:
-                            # Mettre à jour l'adresse ET les coordonnées
-                            obj.adresse = adresse_corrigee
-                            obj.latitude = lat
-                            obj.longitude = lng
-                            obj.save(update_fields=['adresse', 'latitude', 'longitude'])
-                            self.stdout.write(f'   ✅ Géolocalisé : {lat}, {lng} (score: {score:.0%})')
-                        
-                        success_count += 1
+                        corrections.append((MODELES[type_obj], nom, prenom, adresse_corrigee,
+                                            lecteur.numero, lecteur.brute))
+        
+            except OngletAbsent as e:
+                self.stdout.write(self.style.ERROR(f'\n❌ {e}'))
+                return
+            except FileNotFoundError:
+                self.stdout.write(self.style.ERROR(f'\n❌ Fichier non trouvé : {csv_file}'))
+                return
+        
+            with self.profileur.phase('recherche_fiches'):
+                fiches = {modele: self.charger_fiches(modele, corrections) for modele in MODELES.values()}
+        
+            a_geocoder = []  # (fiche, adresse corrigée, numéro de ligne, ligne brute)
+            for modele, nom, prenom, adresse_corrigee, numero, brute in corrections:
+                trouvees = fiches[modele].get((nom, prenom), [])
+                if len(trouvees) != 1:
+                    raison = 'non trouvé' if not trouvees else f'{len(trouvees)} fiches homonymes'
+                    self.stdout.write(self.style.ERROR(
+                        f'❌ {modele._meta.verbose_name.capitalize()} {raison} : {prenom} {nom}'
+                    ))
+                    failed_count += 1
+                    rejets.rejeter(numero, brute, f'{modele._meta.verbose_name.capitalize()} {raison}')
+                    continue
+                a_geocoder.append((trouvees[0], adresse_corrigee, numero, brute))
+        
+            # ============================================================
+            # 2. GÉOCODAGE EN PARALLÈLE (une fois par adresse distincte)
+            # ============================================================
+        
+            adresses = [adresse for _, adresse, _, _ in a_geocoder]
+            nb_distinctes = len(set(adresses))
+            self.stdout.write(f'\n🌍 Géocodage de {nb_distinctes} adresse(s) distincte(s) '
+                              f'pour {len(adresses)} fiche(s)...\n')
+            with self.profileur.phase('geocodage'):
+                resultats = geocoder_en_parallele(adresses, self.geocode_address,
+                                                  workers=options['workers'])
+        
+            # ============================================================
+            # 3. ENREGISTREMENT GROUPÉ
+            # ============================================================
+        
+            a_enregistrer = {modele: [] for modele in MODELES.values()}
+            for obj, adresse_corrigee, numero, brute in a_geocoder:
+                self.stdout.write(f'🔍 {obj.prenom} {obj.nom}')
+                self.stdout.write(f'   Nouvelle adresse : {adresse_corrigee}')
+            
+                result = resultats.get(adresse_corrigee)
+                if result:
+                    lat, lng, score = result
+                
+                    if dry_run:
+                        self.stdout.write(f'   ✅ Trouverait : {lat}, {lng} (score: {score:.0%})')
                     else:
-                        self.stdout.write(f'   ❌ Échec de géolocalisation')
-                        failed_count += 1
-                    
-                    self.stdout.write('')
+                        # Mettre à jour l'adresse ET les coordonnées
+                        obj.adresse = adresse_corrigee
+                        obj.mettre_a_jour_cles()  # bulk_update ne passe pas par save()
+                        obj.latitude = lat
+                        obj.longitude = lng
+                        a_enregistrer[type(obj)].append(obj)
+                        self.stdout.write(f'   ✅ Géolocalisé : {lat}, {lng} (score: {score:.0%})')
+                
+                    success_count += 1
+                else:
+                    self.stdout.write(f'   ❌ Échec de géolocalisation')
+                    failed_count += 1
+                    rejets.rejeter(numero, brute, 'Échec de géolocalisation')
+            
+                self.stdout.write('')
         
-        except FileNotFoundError:
-            self.stdout.write(self.style.ERROR(f'\n❌ Fichier non trouvé : {csv_file}'))
-            return
+            if not dry_run:
+                with self.profileur.phase('enregistrement'), transaction.atomic():
+                    for modele, objets in a_enregistrer.items():
+                        modele.objects.bulk_update(
+                            objets, ['adresse', 'recherche', 'latitude', 'longitude'], batch_size=500)
         
         # Résumé
         self.stdout.write('\n' + '='*60)
@@ -125,38 +184,26 @@ class Command(BaseCommand):
         
         self.stdout.write('')
 
+    def charger_fiches(self, modele, corrections):
+        """Fiches du modèle citées dans les corrections, par (nom, prénom) : une requête."""
+        noms = {nom for m, nom, *_ in corrections if m is modele}
+        fiches = {}
+        if noms:
+            for obj in modele.objects.filter(nom__in=noms).only(
+                    'id', 'latitude', 'longitude', *modele.champs_sources_cles(),
+                    *modele.CLES_NORMALISEES):
+                fiches.setdefault((obj.nom, obj.prenom), []).append(obj)
+        return fiches
+
     def geocode_address(self, address):
         """
-        Géocode une adresse avec l'API BAN
+        Géocode une adresse avec l'API BAN (appelée en parallèle, sans accès à la base)
         
         Returns:
             tuple: (latitude, longitude, score) ou None
         """
-        try:
-            base_url = "https://api-adresse.data.gouv.fr/search/"
-            params = urllib.parse.urlencode({
-                'q': f"{address} Marseille",
-                'limit': 1
-            })
-            
-            url = f"{base_url}?{params}"
-            
-            with urllib.request.urlopen(url, timeout=10) as response:
-                data = json.loads(response.read().decode())
-                
-                if data.get('features') and len(data['features']) > 0:
-                    feature = data['features'][0]
-                    coords = feature['geometry']['coordinates']
-                    props = feature['properties']
-                    
-                    lng = coords[0]
-                    lat = coords[1]
-                    score = props.get('score', 0)
-                    
-                    if score > 0.4:
-                        return (lat, lng, score)
-            
-            return None
-            
-        except Exception:
-            return None
+        result = appeler_ban(f"{address} Marseille")
+        if result:
+            lat, lng, score, _ = result
+            return (lat, lng, score)
+        return None
@@ -3,118 +3,38 @@ Commande Django pour importer les élèves depuis le fichier "Enfants aidés"
 
 Usage:
     python manage.py import_eleves enfants_aides.csv
+    python manage.py import_eleves enfants_aides.csv --dry-run --diff changements.json
+    python manage.py import_eleves enfants_aides.csv --only-rejects   # lignes rejetées seulement
 """
 
 from django.core.management.base import BaseCommand
-from core.models import Eleve, Matiere
-import csv
-from datetime import datetime
-
-
-# Matières canoniques et leurs mots-clés associés
-MATIERES_CANONIQUES = {
-    'Mathématiques': ['math', 'maths', 'mathématiques', 'calcul', 'géométrie', 'nombres'],
-    'Français':      ['français', 'francais', 'lecture', 'écriture', 'ecriture', 'orthographe',
-                      'grammaire', 'conjugaison', 'rédaction', 'redaction', 'compréhension',
-                      'comprehension', 'consignes','conjugaison', 'conjuguaison', 'fraçais', 'matières scientifiques', 'sciences'],
-    'Anglais':       ['anglais'],
-    'Espagnol':      ['espagnol'],
-    'Histoire-Géographie': ['histoire', 'géographie', 'geographie', 'hg', 'hist', 'his-geo'],
-    'SVT':           ['svt', 'sciences', 'matières scientifiques'],
-    'Physique-Chimie': ['physique', 'chimie', 'phys', 'matières scientifiques', 'sciences'],
-    'Toutes matières': ['toutes', 'toutes matières', 'toutes matieres', 'primaire',
-                        'matières primaires', 'bases du primaire'],
-    'Méthodologie':  ['méthodo', 'methodologie', 'méthodologie', 'organisation', 'méthode',
-                      'apprendre à apprendre'],
-}
-
-
-def normaliser(texte):
-    """Minuscules + suppression accents pour comparaison."""
-    import unicodedata
-    texte = texte.lower().strip()
-    texte = unicodedata.normalize('NFD', texte)
-    texte = ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
-    return texte
-
-
-# Mapping pour normaliser les classes du CSV vers les choix du modèle.
-# Toutes les clés sont en MAJUSCULES — la fonction fait un .upper() avant lookup.
-CLASSE_MAPPING = {
-    # Collège — variantes orthographiques
-    '6°': '6e',  '6ÈME': '6e', '6EME': '6e',
-    '5°': '5e',  '5ÈME': '5e', '5EME': '5e',
-    '4°': '4e',  '4ÈME': '4e', '4EME': '4e',
-    '3°': '3e',  '3ÈME': '3e', '3EME': '3e',
-    # Collège — sections (6A … 6E, etc.)
-    '6A': '6e', '6B': '6e', '6C': '6e', '6D': '6e', '6E': '6e',
-    '5A': '5e', '5B': '5e', '5C': '5e', '5D': '5e', '5E': '5e',
-    '4A': '4e', '4B': '4e', '4C': '4e', '4D': '4e', '4E': '4e',
-    '3A': '3e', '3B': '3e', '3C': '3e', '3D': '3e', '3E': '3e',
-    # Lycée général
-    '2NDE': '2de', '2DE': '2de', '2°': '2de', 'SECONDE': '2de',
-    '1ÈRE': '1re', '1ERE': '1re', '1RE': '1re', '1°': '1re', 'PREMIERE': '1re',
-    # Terminale
-    'T': 'Terminale', 'TLE': 'Terminale', 'TERM': 'Terminale', 'TERMINALE': 'Terminale',
-    'TS': 'Terminale', 'TES': 'Terminale', 'TL': 'Terminale',
-    # CAP
-    'CAP 1': 'CAP 1e', 'CAP1': 'CAP 1e',
-    'CAP 2': 'CAP 2e', 'CAP2': 'CAP 2e',
-    # Bac Pro
-    '2DE BAC PRO': 'Bac Pro 2e', '2NDE BAC PRO': 'Bac Pro 2e',
-    'SECONDE BAC PRO': 'Bac Pro 2e', '2DE BACPRO': 'Bac Pro 2e',
-    'BAC PRO 2E': 'Bac Pro 2e', 'BAC PRO 2': 'Bac Pro 2e',
-}
-
-CLASSES_VALIDES = {c for c, _ in Eleve.CLASSE_CHOICES}
-
-
-def normaliser_classe(classe_str):
-    """Normalise la valeur de classe CSV vers un choix du modèle, ou '' si inconnu."""
-    if not classe_str:
-        return ''
-    classe_str = classe_str.strip()
-    if classe_str in CLASSES_VALIDES:
-        return classe_str
-    return CLASSE_MAPPING.get(classe_str.upper(), '')
-
-
-def extraire_matieres(besoins_str):
-    """
-    Retourne (matieres_reconnues: list[str], texte_non_reconnu: str)
-    """
-    if not besoins_str:
-        return [], ''
-
-    # Découper par séparateurs courants
-    import re
-    tokens = re.split(r'[,;/\n]+', besoins_str)
-    tokens = [t.strip() for t in tokens if t.strip()]
-
-    matieres_trouvees = set()
-    tokens_non_reconnus = []
-
-    for token in tokens:
-        token_norm = normaliser(token)
-        reconnu = False
-
-        for matiere_canon, mots_cles in MATIERES_CANONIQUES.items():
-            for mot in mots_cles:
-                if normaliser(mot) in token_norm:
-                    matieres_trouvees.add(matiere_canon)
-                    reconnu = True
-                    break
-            if reconnu:
-                break
-
-        if not reconnu:
-            tokens_non_reconnus.append(token)
-
-    texte_non_reconnu = ', '.join(tokens_non_reconnus)
-    return list(matieres_trouvees), texte_non_reconnu
-
-
-class Command(BaseCommand):
+from core.models import Eleve
+from core.colonnes import Colonne, SchemaColonnes, minuscules, nom_famille, parse_date
+from core.matieres import REGISTRE, extraire_matieres
+from core.profilage import ProfilageMixin
+from core.lecture import OngletAbsent
+from core.quarantaine import QuarantaineMixin
+from core.simulation import InstantaneEleves, JournalSimulation
+from core.text import normaliser_classe
+
+
+class ColonnesEleves(SchemaColonnes):
+    nom_famille = Colonne('Nom famille enfant', conversion=nom_famille)
+    prenom_enfant = Colonne('Prénom enfant')
+    telephone_famille = Colonne('Mobile')
+    arrondissement = Colonne('Arr.')
+    adresse = Colonne('Adresse enfant')
+    complement_adresse = Colonne("complement d'adresse")
+    classe = Colonne('yion', conversion=normaliser_classe)
+    etablissement = Colonne('Etablissement scolaire')
+    email_parent = Colonne('mail', conversion=minuscules)
+    besoins = Colonne('besoins')
+    commentaires = Colonne('Commentaires-observations')
+    complement_infos = Colonne("Complément d'informatons- Autres n°")
+    date_visite = Colonne('Date dernière visite chez la famille', conversion=parse_date)
+
+
+class Command(QuarantaineMixin, ProfilageMixin, BaseCommand):
     help = 'Importe les élèves depuis le fichier CSV Enfants aidés'
 
     def add_arguments(self, parser):
@@ -124,6 +44,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Mode test : affiche ce qui serait fait sans modifier la base de données'
         )
+        parser.add_argument(
+            '--diff',
+            type=str,
+            help='Avec --dry-run : écrit les changements simulés dans ce fichier (.json ou .csv)'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
@@ -134,6 +59,11 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('🔍 MODE TEST - Aucune modification en base de données'))
             self.stdout.write(self.style.WARNING('='*60 + '\n'))
 
+            # Instantané chargé une fois : aucune requête par ligne
+            with self.profileur.phase('instantane'):
+                instantane = InstantaneEleves(matieres=True)
+            journal = JournalSimulation()
+
         created_count = 0
         updated_count = 0
         error_count = 0
@@ -141,49 +71,33 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'\n📥 Import des élèves depuis {csv_file}'))
 
         try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                reader.fieldnames = [name.strip().lstrip('\ufeff').lstrip('\ufbff')
-                                     for name in reader.fieldnames]
+            with self.ouvrir_import(ColonnesEleves, csv_file) as lecteur:
 
-                for row in reader:
+                for ligne in self.profileur.lignes(lecteur):
+                    nom_famille = ligne.nom_famille
+                    prenom_enfant = ligne.prenom_enfant
+                    telephone_famille = ligne.telephone_famille
                     try:
-                        nom_famille = row.get('Nom famille enfant', '').strip().rstrip('*')
-                        prenom_enfant = row.get('Prénom enfant', '').strip()
-                        telephone_famille = row.get('Mobile', '').strip()
-
                         if not nom_famille or not prenom_enfant:
                             continue
 
-                        arrondissement = row.get('Arr.', '').strip()
-                        adresse = row.get('Adresse enfant', '').strip()
-                        complement_adresse = row.get("complement d'adresse", '').strip()
-                        classe = normaliser_classe(row.get('yion', '').strip())
-                        etablissement = row.get('Etablissement scolaire', '').strip()
-                        email_parent = row.get('mail', '').strip().lower()
-                        besoins = row.get('besoins', '').strip()
-                        commentaires = row.get('Commentaires-observations', '').strip()
-                        complement_infos = row.get("Complément d'informatons- Autres n°", '').strip()
-                        date_visite = self.parse_date(
-                            row.get('Date dernière visite chez la famille', ''))
+                        classe = ligne.classe
 
                         # Normalisation des matières
-                        matieres_reconnues, texte_non_reconnu = extraire_matieres(besoins)
+                        matieres_reconnues, texte_non_reconnu = extraire_matieres(ligne.besoins)
 
                         if dry_run:
-                            try:
-                                eleve = Eleve.objects.get(
-                                    nom=nom_famille,
-                                    prenom=prenom_enfant,
-                                    telephone_parent=telephone_famille
-                                )
-                                updated_count += 1
-                                self.stdout.write(
-                                    f'  🔄 Mettrait à jour statut : {prenom_enfant} {nom_famille}')
-                            except Eleve.DoesNotExist:
+                            _, cree = instantane.simuler_import(
+                                journal, nom_famille, prenom_enfant, telephone_famille,
+                                'accompagne', matieres_reconnues, classe=classe)
+                            if cree:
                                 created_count += 1
                                 self.stdout.write(
                                     f'  ✅ Créerait : {prenom_enfant} {nom_famille}')
+                            else:
+                                updated_count += 1
+                                self.stdout.write(
+                                    f'  🔄 Mettrait à jour statut : {prenom_enfant} {nom_famille}')
 
                             if matieres_reconnues:
                                 self.stdout.write(
@@ -196,20 +110,17 @@ class Command(BaseCommand):
                         else:
                             # Construire le texte des commentaires enrichi
                             commentaire_final_parts = []
-                            if commentaires:
-                                commentaire_final_parts.append(commentaires)
-                            if complement_infos:
-                                commentaire_final_parts.append(complement_infos)
+                            if ligne.commentaires:
+                                commentaire_final_parts.append(ligne.commentaires)
+                            if ligne.complement_infos:
+                                commentaire_final_parts.append(ligne.complement_infos)
                             if texte_non_reconnu:
                                 commentaire_final_parts.append(f'Besoins (non classifié) : {texte_non_reconnu}')
                             commentaire_final = '\n'.join(commentaire_final_parts).strip()
 
                             try:
-                                eleve = Eleve.objects.get(
-                                    nom=nom_famille,
-                                    prenom=prenom_enfant,
-                                    telephone_parent=telephone_famille
-                                )
+                                eleve = Eleve.objects.get(**Eleve.filtre_identite(
+                                    nom_famille, prenom_enfant, telephone_famille))
                                 # EXISTE : mettre à jour uniquement le statut
                                 old_statut = eleve.statut
                                 eleve.statut = 'accompagne'
@@ -229,16 +140,16 @@ class Command(BaseCommand):
                                     nom=nom_famille,
                                     prenom=prenom_enfant,
                                     telephone_parent=telephone_famille,
-                                    arrondissement=arrondissement,
-                                    adresse=adresse,
-                                    complement_adresse=complement_adresse,
+                                    arrondissement=ligne.arrondissement,
+                                    adresse=ligne.adresse,
+                                    complement_adresse=ligne.complement_adresse,
                                     classe=classe,
-                                    etablissement=etablissement,
-                                    email_parent=email_parent,
+                                    etablissement=ligne.etablissement,
+                                    email_parent=ligne.email_parent,
                                     statut='accompagne',
                                     statut_saisie='complet',
                                     informations_complementaires=commentaire_final,
-                                    date_derniere_visite=date_visite,
+                                    date_derniere_visite=ligne.date_visite,
                                 )
 
                                 created_count += 1
@@ -249,11 +160,14 @@ class Command(BaseCommand):
                                 self.add_matieres(eleve, matieres_reconnues)
 
                     except Exception as e:
+                        lecteur.rejeter(str(e))
                         error_count += 1
-                        prenom = row.get('Prénom enfant', 'inconnu')
-                        nom = row.get('Nom famille enfant', 'inconnu')
-                        self.stdout.write(self.style.ERROR(f'  ❌ Erreur {prenom} {nom}: {str(e)}'))
+                        self.stdout.write(self.style.ERROR(
+                            f'  ❌ Erreur {prenom_enfant or "inconnu"} {nom_famille or "inconnu"}: {str(e)}'))
 
+        except OngletAbsent as e:
+            self.stdout.write(self.style.ERROR(f'❌ {e}'))
+            return
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'❌ Fichier non trouvé : {csv_file}'))
             return
@@ -265,26 +179,16 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f'  ⚠️  Erreurs : {error_count}'))
 
         if dry_run:
+            if options.get('diff'):
+                journal.ecrire(options['diff'])
+                self.stdout.write(
+                    f'  📝 {len(journal.entrees)} changement(s) écrits dans {options["diff"]}')
             self.stdout.write(self.style.WARNING('\n' + '='*60))
             self.stdout.write(self.style.WARNING("⚠️  MODE TEST : Aucune donnée n'a été modifiée"))
             self.stdout.write(self.style.WARNING('='*60 + '\n'))
 
-    def parse_date(self, date_str):
-        if not date_str or date_str.strip() == '0':
-            return None
-        date_str = date_str.strip()
-        for fmt in ['%d/%m/%Y', '%d/%m/%y', '%Y-%m-%d']:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
-        return None
-
     def add_matieres(self, eleve, matieres_list):
         """Ajoute les matières canoniques reconnues à l'élève (ManyToMany)."""
-        for nom_matiere in matieres_list:
-            matiere, _ = Matiere.objects.get_or_create(
-                nom__iexact=nom_matiere,
-                defaults={'nom': nom_matiere, 'actif': True}
-            )
-            eleve.matieres_souhaitees.add(matiere)
+        # Ids depuis le registre ; les matières absentes sont créées en une requête
+        ids = REGISTRE.assurer(matieres_list)
+        eleve.matieres_souhaitees.add(*ids.values())
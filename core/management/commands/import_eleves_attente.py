@@ -4,118 +4,41 @@ Commande Django pour importer les élèves en attente depuis le fichier CSV.
 Usage:
     python manage.py import_eleves_attente eleves_en_attente.csv
     python manage.py import_eleves_attente eleves_en_attente.csv --dry-run
+    python manage.py import_eleves_attente eleves_en_attente.csv --dry-run --diff changements.csv
 """
 
-import csv
-import re
-import unicodedata
-from datetime import datetime
-
 from django.core.management.base import BaseCommand
 
-from core.models import Eleve, Matiere
-
-
-# Matières canoniques et leurs mots-clés associés (identique à import_eleves.py)
-MATIERES_CANONIQUES = {
-    'Mathématiques': ['math', 'maths', 'mathématiques', 'calcul', 'géométrie', 'nombres'],
-    'Français':      ['français', 'francais', 'lecture', 'écriture', 'ecriture', 'orthographe',
-                      'grammaire', 'conjugaison', 'rédaction', 'redaction', 'compréhension',
-                      'comprehension', 'consignes', 'conjuguaison', 'fraçais'],
-    'Anglais':       ['anglais'],
-    'Espagnol':      ['espagnol'],
-    'Histoire-Géographie': ['histoire', 'géographie', 'geographie', 'hg', 'hist', 'his-geo'],
-    'SVT':           ['svt'],
-    'Physique-Chimie': ['physique', 'chimie', 'phys'],
-    'Toutes matières': ['toutes', 'toutes matières', 'toutes matieres', 'primaire',
-                        'matières primaires', 'bases du primaire', 'tout-'],
-    'Méthodologie':  ['méthodo', 'methodologie', 'méthodologie', 'organisation', 'méthode',
-                      'apprendre à apprendre'],
-    'Sciences':      ['sciences', 'matières scientifiques'],
-}
-
-# Mapping pour normaliser les classes du CSV vers les choix du modèle.
-# Toutes les clés sont en MAJUSCULES — la fonction fait un .upper() avant lookup.
-CLASSE_MAPPING = {
-    # Collège — variantes orthographiques
-    '6°': '6e',  '6ÈME': '6e', '6EME': '6e',
-    '5°': '5e',  '5ÈME': '5e', '5EME': '5e',
-    '4°': '4e',  '4ÈME': '4e', '4EME': '4e',
-    '3°': '3e',  '3ÈME': '3e', '3EME': '3e',
-    # Collège — sections (6A … 6E, etc.)
-    '6A': '6e', '6B': '6e', '6C': '6e', '6D': '6e', '6E': '6e',
-    '5A': '5e', '5B': '5e', '5C': '5e', '5D': '5e', '5E': '5e',
-    '4A': '4e', '4B': '4e', '4C': '4e', '4D': '4e', '4E': '4e',
-    '3A': '3e', '3B': '3e', '3C': '3e', '3D': '3e', '3E': '3e',
-    # Lycée général
-    '2NDE': '2de', '2DE': '2de', '2°': '2de', 'SECONDE': '2de',
-    '1ÈRE': '1re', '1ERE': '1re', '1RE': '1re', '1°': '1re', 'PREMIERE': '1re',
-    # Terminale
-    'T': 'Terminale', 'TLE': 'Terminale', 'TERM': 'Terminale', 'TERMINALE': 'Terminale',
-    'TS': 'Terminale', 'TES': 'Terminale', 'TL': 'Terminale',
-    # CAP
-    'CAP 1': 'CAP 1e', 'CAP1': 'CAP 1e',
-    'CAP 2': 'CAP 2e', 'CAP2': 'CAP 2e',
-    # Bac Pro
-    '2DE BAC PRO': 'Bac Pro 2e', '2NDE BAC PRO': 'Bac Pro 2e',
-    'SECONDE BAC PRO': 'Bac Pro 2e', '2DE BACPRO': 'Bac Pro 2e',
-    'BAC PRO 2E': 'Bac Pro 2e', 'BAC PRO 2': 'Bac Pro 2e',
-}
-
-CLASSES_VALIDES = {c for c, _ in Eleve.CLASSE_CHOICES}
-
-
-def normaliser(texte):
-    """Minuscules + suppression accents pour comparaison."""
-    texte = texte.lower().strip()
-    texte = unicodedata.normalize('NFD', texte)
-    return ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
-
-
-def normaliser_classe(classe_str):
-    """Normalise la valeur de classe CSV vers un choix du modèle, ou '' si inconnu."""
-    if not classe_str:
-        return ''
-    classe_str = classe_str.strip()
-    if classe_str in CLASSES_VALIDES:
-        return classe_str
-    return CLASSE_MAPPING.get(classe_str.upper(), '')
-
-
-def extraire_matieres(besoins_str):
-    """
-    Retourne (matieres_reconnues: list[str], texte_non_reconnu: str)
-    """
-    if not besoins_str:
-        return [], ''
-
-    tokens = re.split(r'[,;/\n]+', besoins_str)
-    tokens = [t.strip() for t in tokens if t.strip()]
-
-    matieres_trouvees = set()
-    tokens_non_reconnus = []
-
-    for token in tokens:
-        token_norm = normaliser(token)
-        reconnu = False
-
-        for matiere_canon, mots_cles in MATIERES_CANONIQUES.items():
-            for mot in mots_cles:
-                if normaliser(mot) in token_norm:
-                    matieres_trouvees.add(matiere_canon)
-                    reconnu = True
-                    break
-            if reconnu:
-                break
-
-        if not reconnu:
-            tokens_non_reconnus.append(token)
-
-    texte_non_reconnu = ', '.join(tokens_non_reconnus)
-    return list(matieres_trouvees), texte_non_reconnu
-
-
-class Command(BaseCommand):
+from core.colonnes import Colonne, SchemaColonnes, minuscules, nom_famille, parse_date
+from core.lecture import OngletAbsent
+from core.matieres import REGISTRE, extraire_matieres
+from core.models import Eleve
+from core.profilage import ProfilageMixin
+from core.quarantaine import QuarantaineMixin
+from core.simulation import InstantaneEleves, JournalSimulation
+from core.text import normaliser_classe
+
+
+class ColonnesElevesAttente(SchemaColonnes):
+    nom = Colonne('Nom enfant', conversion=nom_famille)
+    prenom = Colonne('Prénom enfant')
+    telephone_parent = Colonne('Mobile parents')
+    # La 4e colonne (header vide après strip) contient l'arrondissement
+    arrondissement = Colonne('')
+    adresse = Colonne('Adresse')
+    complement_adresse = Colonne("complement d'adresse")
+    classe_raw = Colonne('Classe')
+    etablissement = Colonne('Etab.  scolaire')
+    email_parent = Colonne('Mail parents', conversion=minuscules)
+    besoins = Colonne('Besoins')
+    commentaires = Colonne('Commentaires')
+    complement_infos = Colonne('complements infos autre n°de tel contact)')
+    benevole_pressenti = Colonne('Bénévole pressenti')
+    date_demande = Colonne('date de demande')
+    date_visite = Colonne('Famille visitée le :', conversion=parse_date)
+
+
+class Command(QuarantaineMixin, ProfilageMixin, BaseCommand):
     help = 'Importe les élèves en attente depuis le fichier CSV'
 
     def add_arguments(self, parser):
@@ -125,6 +48,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Mode test : affiche ce qui serait fait sans modifier la base de données'
         )
+        parser.add_argument(
+            '--diff',
+            type=str,
+            help='Avec --dry-run : écrit les changements simulés dans ce fichier (.json ou .csv)'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['csv_file']
@@ -135,6 +63,11 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('MODE TEST - Aucune modification en base de données'))
             self.stdout.write(self.style.WARNING('=' * 60 + '\n'))
 
+            # Instantané chargé une fois : aucune requête par ligne
+            with self.profileur.phase('instantane'):
+                instantane = InstantaneEleves(matieres=True)
+            journal = JournalSimulation()
+
         created_count = 0
         updated_count = 0
         skipped_count = 0
@@ -143,28 +76,16 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f'\nImport des élèves en attente depuis {csv_file}'))
 
         try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                reader.fieldnames = [
-                    name.strip().lstrip('\ufeff').lstrip('\ufbff')
-                    for name in reader.fieldnames
-                ]
+            with self.ouvrir_import(ColonnesElevesAttente, csv_file) as lecteur:
 
-                for row in reader:
+                for ligne in self.profileur.lignes(lecteur):
+                    nom, prenom, telephone_parent = ligne.nom, ligne.prenom, ligne.telephone_parent
                     try:
-                        nom = row.get('Nom enfant', '').strip().rstrip('*')
-                        prenom = row.get('Prénom enfant', '').strip()
-                        telephone_parent = row.get('Mobile parents', '').strip()
-
                         if not nom or not prenom:
                             skipped_count += 1
                             continue
 
-                        # La 4e colonne (header vide après strip) contient l'arrondissement
-                        arrondissement = row.get('', '').strip()
-                        adresse = row.get('Adresse', '').strip()
-                        complement_adresse = row.get("complement d'adresse", '').strip()
-                        classe_raw = row.get('Classe', '').strip()
+                        classe_raw = ligne.classe_raw
                         classe = normaliser_classe(classe_raw)
                         classe_note = None  # valeur brute à conserver en commentaire si fallback
                         if not classe and classe_raw:
@@ -175,29 +96,19 @@ class Command(BaseCommand):
                             elif 'BAC PRO' in raw_up or 'BACPRO' in raw_up:
                                 classe = '2de'
                                 classe_note = f'Classe brute : {classe_raw}'
-                        etablissement = row.get('Etab.  scolaire', '').strip()
-                        email_parent = row.get('Mail parents', '').strip().lower()
-                        besoins = row.get('Besoins', '').strip()
-                        commentaires = row.get('Commentaires', '').strip()
-                        complement_infos = row.get('complements infos autre n°de tel contact)', '').strip()
-                        benevole_pressenti = row.get('Bénévole pressenti', '').strip()
-                        date_demande = row.get('date de demande', '').strip()
-                        date_visite = self.parse_date(row.get('Famille visitée le :', ''))
 
-                        matieres_reconnues, texte_non_reconnu = extraire_matieres(besoins)
+                        matieres_reconnues, texte_non_reconnu = extraire_matieres(ligne.besoins)
 
                         if dry_run:
-                            try:
-                                Eleve.objects.get(
-                                    nom=nom,
-                                    prenom=prenom,
-                                    telephone_parent=telephone_parent,
-                                )
-                                updated_count += 1
-                                self.stdout.write(f'  Mettrait à jour statut : {prenom} {nom}')
-                            except Eleve.DoesNotExist:
+                            _, cree = instantane.simuler_import(
+                                journal, nom, prenom, telephone_parent,
+                                'en_attente', matieres_reconnues, classe=classe)
+                            if cree:
                                 created_count += 1
                                 self.stdout.write(f'  Creerait : {prenom} {nom}')
+                            else:
+                                updated_count += 1
+                                self.stdout.write(f'  Mettrait à jour statut : {prenom} {nom}')
 
                             if classe_note:
                                 self.stdout.write(
@@ -218,14 +129,14 @@ class Command(BaseCommand):
                         else:
                             # Construire les informations complémentaires
                             commentaire_parts = []
-                            if commentaires:
-                                commentaire_parts.append(commentaires)
-                            if complement_infos:
-                                commentaire_parts.append(complement_infos)
-                            if benevole_pressenti:
-                                commentaire_parts.append(f'Bénévole pressenti : {benevole_pressenti}')
-                            if date_demande:
-                                commentaire_parts.append(f'Date de demande : {date_demande}')
+                            if ligne.commentaires:
+                                commentaire_parts.append(ligne.commentaires)
+                            if ligne.complement_infos:
+                                commentaire_parts.append(ligne.complement_infos)
+                            if ligne.benevole_pressenti:
+                                commentaire_parts.append(f'Bénévole pressenti : {ligne.benevole_pressenti}')
+                            if ligne.date_demande:
+                                commentaire_parts.append(f'Date de demande : {ligne.date_demande}')
                             if texte_non_reconnu:
                                 commentaire_parts.append(f'Besoins (non classifié) : {texte_non_reconnu}')
                             if classe_note:
@@ -233,11 +144,8 @@ class Command(BaseCommand):
                             commentaire_final = '\n'.join(commentaire_parts).strip()
 
                             try:
-                                eleve = Eleve.objects.get(
-                                    nom=nom,
-                                    prenom=prenom,
-                                    telephone_parent=telephone_parent,
-                                )
+                                eleve = Eleve.objects.get(**Eleve.filtre_identite(
+                                    nom, prenom, telephone_parent))
                                 old_statut = eleve.statut
                                 eleve.statut = 'en_attente'
                                 eleve.save(update_fields=['statut'])
@@ -255,16 +163,16 @@ class Command(BaseCommand):
                                     nom=nom,
                                     prenom=prenom,
                                     telephone_parent=telephone_parent,
-                                    arrondissement=arrondissement,
-                                    adresse=adresse,
-                                    complement_adresse=complement_adresse,
+                                    arrondissement=ligne.arrondissement,
+                                    adresse=ligne.adresse,
+                                    complement_adresse=ligne.complement_adresse,
                                     classe=classe,
-                                    etablissement=etablissement,
-                                    email_parent=email_parent,
+                                    etablissement=ligne.etablissement,
+                                    email_parent=ligne.email_parent,
                                     statut='en_attente',
                                     statut_saisie='complet',
                                     informations_complementaires=commentaire_final,
-                                    date_derniere_visite=date_visite,
+                                    date_derniere_visite=ligne.date_visite,
                                 )
                                 created_count += 1
                                 self.stdout.write(f'  Cree : {prenom} {nom}')
@@ -273,11 +181,14 @@ class Command(BaseCommand):
                                 self.add_matieres(eleve, matieres_reconnues)
 
                     except Exception as e:
+                        lecteur.rejeter(str(e))
                         error_count += 1
-                        prenom = row.get('Prénom enfant', 'inconnu')
-                        nom = row.get('Nom enfant', 'inconnu')
-                        self.stdout.write(self.style.ERROR(f'  Erreur {prenom} {nom}: {str(e)}'))
+                        self.stdout.write(self.style.ERROR(
+                            f'  Erreur {prenom or "inconnu"} {nom or "inconnu"}: {str(e)}'))
 
+        except OngletAbsent as e:
+            self.stdout.write(self.style.ERROR(str(e)))
+            return
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'Fichier non trouve : {csv_file}'))
             return
@@ -291,26 +202,16 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f'  Erreurs  : {error_count}'))
 
         if dry_run:
+            if options.get('diff'):
+                journal.ecrire(options['diff'])
+                self.stdout.write(
+                    f'  {len(journal.entrees)} changement(s) ecrits dans {options["diff"]}')
             self.stdout.write(self.style.WARNING('\n' + '=' * 60))
             self.stdout.write(self.style.WARNING("MODE TEST : Aucune donnee n'a ete modifiee"))
             self.stdout.write(self.style.WARNING('=' * 60 + '\n'))
 
-    def parse_date(self, date_str):
-        if not date_str or date_str.strip() == '0':
-            return None
-        date_str = date_str.strip()
-        for fmt in ['%d/%m/%Y', '%d/%m/%y', '%Y-%m-%d']:
-            try:
-                return datetime.strptime(date_str, fmt).date()
-            except ValueError:
-                continue
-        return None
-
     def add_matieres(self, eleve, matieres_list):
         """Ajoute les matières canoniques reconnues à l'élève (ManyToMany)."""
-        for nom_matiere in matieres_list:
-            matiere, _ = Matiere.objects.get_or_create(
-                nom__iexact=nom_matiere,
-                defaults={'nom': nom_matiere, 'actif': True}
-            )
-            eleve.matieres_souhaitees.add(matiere)
+        # Ids depuis le registre ; les matières absentes sont créées en une requête
+        ids = REGISTRE.assurer(matieres_list)
+        eleve.matieres_souhaitees.add(*ids.values())
@@ -11,6 +11,7 @@ Fichier à placer dans :
 """
 
 from django.core.management.base import BaseCommand
+from core.matieres import REGISTRE
 from core.models import Matiere
 
 
@@ -59,26 +60,30 @@ class Command(BaseCommand):
         self.stdout.write("=" * 70)
         self.stdout.write()
         
-        created_count = 0
-        existing_count = 0
+        # Une requête pour lire l'existant, une pour créer les manquantes
+        existantes = {matiere.nom for matiere in REGISTRE.toutes()}
+        a_creer = [data for data in matieres_data if data['nom'] not in existantes]
+        
+        Matiere.objects.bulk_create(
+            [Matiere(nom=data['nom'], ordre=data['ordre']) for data in a_creer],
+            ignore_conflicts=True,
+        )
+        # bulk_create n'envoie pas post_save
+        REGISTRE.invalider()
         
         for data in matieres_data:
-            matiere, created = Matiere.objects.get_or_create(
-                nom=data['nom'],
-                defaults={'ordre': data['ordre']}
-            )
-            
-            if created:
-                created_count += 1
+            if data['nom'] in existantes:
                 self.stdout.write(
-                    self.style.SUCCESS(f"✅ Créée : {matiere.nom}")
+                    f"⏭️  Existe déjà : {data['nom']}"
                 )
             else:
-                existing_count += 1
                 self.stdout.write(
-                    f"⏭️  Existe déjà : {matiere.nom}"
+                    self.style.SUCCESS(f"✅ Créée : {data['nom']}")
                 )
         
+        created_count = len(a_creer)
+        existing_count = len(matieres_data) - created_count
+        
         self.stdout.write()
         self.stdout.write("=" * 70)
         self.stdout.write(f"✅ Matières créées : {created_count}")
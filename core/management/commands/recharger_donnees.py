@@ -0,0 +1,163 @@
+"""
+Commande Django pour recharger toutes les données sans vider le site
+
+Remplace l'ancien « DELETE FROM ... » via dbshell suivi des imports :
+les imports sont joués dans une base de préparation (core.rechargement),
+validés, puis basculés en production en une transaction de quelques
+millisecondes. En cas d'échec, la production reste intacte.
+
+La base de préparation (toujours SQLite, même si la production est sur
+PostgreSQL) contient une copie des utilisateurs : elle est créée dans un
+dossier temporaire privé et supprimée à la fin, succès ou échec.
+
+Usage:
+    python manage.py recharger_donnees \\
+        --benevoles benevoles.csv candidats.csv \\
+        --eleves eleves.csv \\
+        --eleves-attente eleves_en_attente.csv \\
+        --binomes binomes_*.csv
+    python manage.py recharger_donnees ... --sans-bascule   # valider seulement
+    python manage.py recharger_donnees ... --sans-geo --report echecs.csv
+"""
+
+import os
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import rechargement
+from core.lecture import separer_feuille
+from core.models import Benevole, Eleve
+
+
+class Command(BaseCommand):
+    help = 'Recharge toutes les données via une base de préparation, puis bascule en une transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benevoles', nargs=2, required=True, metavar=('BENEVOLES', 'CANDIDATS'),
+            help='Fichiers des bénévoles et des candidats (import_benevoles)'
+        )
+        parser.add_argument('--eleves', required=True, help='Fichier des élèves accompagnés')
+        parser.add_argument('--eleves-attente', help='Fichier des élèves en attente')
+        parser.add_argument('--binomes', nargs='+', default=[], help='Fichiers des binômes')
+        parser.add_argument(
+            '--staging',
+            help='Fichier SQLite de préparation (défaut : dossier temporaire privé), '
+                 'supprimé en fin d\'exécution'
+        )
+        parser.add_argument(
+            '--baisse-max',
+            type=float,
+            default=rechargement.BAISSE_MAX,
+            help=f'Baisse maximale tolérée du nombre de fiches (défaut : {rechargement.BAISSE_MAX})'
+        )
+        parser.add_argument(
+            '--sans-geo',
+            action='store_true',
+            help='Ne géolocalise pas les nouvelles adresses avant la bascule'
+        )
+        parser.add_argument('--report', help='Rapport CSV des échecs de géolocalisation')
+        parser.add_argument(
+            '--sans-bascule',
+            action='store_true',
+            help='Prépare et valide seulement : la production n\'est pas modifiée'
+        )
+
+    def handle(self, *args, **options):
+        fichiers = list(options['benevoles']) + [options['eleves']] + options['binomes']
+        if options['eleves_attente']:
+            fichiers.append(options['eleves_attente'])
+        manquants = [f for f in fichiers if not os.path.exists(separer_feuille(f)[0])]
+        if manquants:
+            raise CommandError(f'Fichier(s) introuvable(s) : {", ".join(manquants)}')
+
+        with rechargement.base_preparation(options['staging']) as staging:
+            self.recharger(staging, options)
+
+    def recharger(self, staging, options):
+
+        # ============================================================
+        # 1. BASE DE PRÉPARATION
+        # ============================================================
+
+        self.stdout.write(self.style.SUCCESS(f'\n🏗️  Base de préparation : {staging}'))
+        copies = rechargement.preparer(staging)
+        self.stdout.write(f'  👥 Utilisateurs copiés : {copies["utilisateurs"]}')
+        self.stdout.write(f'  📚 Matières copiées : {copies["matieres"]}')
+
+        # ============================================================
+        # 2. IMPORTS
+        # ============================================================
+
+        etapes = [('import_benevoles', *options['benevoles']),
+                  ('import_eleves', options['eleves'])]
+        if options['eleves_attente']:
+            etapes.append(('import_eleves_attente', options['eleves_attente']))
+        if options['binomes']:
+            etapes.append(('import_binomes', *options['binomes']))
+
+        for commande, *arguments in etapes:
+            self.stdout.write(self.style.SUCCESS(f'\n📥 {commande} (préparation)'))
+            try:
+                rechargement.importer(staging, commande, *arguments)
+            except subprocess.CalledProcessError as e:
+                raise CommandError(f'{commande} a échoué (code {e.returncode}) : '
+                                   'production inchangée')
+
+        # ============================================================
+        # 3. PROFILS ET COORDONNÉES
+        # ============================================================
+
+        self.stdout.write(self.style.SUCCESS('\n🔗 Reprise des profils et coordonnées'))
+        perdus = rechargement.reporter_profils()
+        for profil in perdus:
+            self.stdout.write(self.style.WARNING(
+                f'  ⚠️  Profil non repris : {profil.user.username} ({profil.benevole.email})'))
+        for modele in (Benevole, Eleve):
+            nb = rechargement.reporter_coordonnees(modele)
+            self.stdout.write(f'  📍 Coordonnées reprises ({modele._meta.verbose_name_plural}) : {nb}')
+
+        if not options['sans_geo']:
+            self.stdout.write(self.style.SUCCESS('\n🌍 Géolocalisation des nouvelles adresses'))
+            arguments = ['--report', options['report']] if options['report'] else []
+            try:
+                rechargement.importer(staging, 'geolocalize_all', *arguments)
+            except subprocess.CalledProcessError as e:
+                raise CommandError(f'geolocalize_all a échoué (code {e.returncode}) : '
+                                   'production inchangée')
+
+        # ============================================================
+        # 4. VALIDATION
+        # ============================================================
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Validation'))
+        volumes, erreurs = rechargement.valider(options['baisse_max'])
+        for nom, (avant, apres) in volumes.items():
+            self.stdout.write(f'  📊 {nom} : {avant} → {apres}')
+
+        if erreurs:
+            for erreur in erreurs:
+                self.stdout.write(self.style.ERROR(f'  ❌ {erreur}'))
+            raise CommandError(f'{len(erreurs)} erreur(s) de validation : production inchangée')
+
+        if options['sans_bascule']:
+            self.stdout.write(self.style.WARNING('\n' + '='*60))
+            self.stdout.write(self.style.WARNING(
+                '⚠️  SANS BASCULE : production inchangée'))
+            self.stdout.write(self.style.WARNING('='*60 + '\n'))
+            return
+
+        # ============================================================
+        # 5. BASCULE
+        # ============================================================
+
+        self.stdout.write(self.style.SUCCESS('\n🔀 Bascule en production'))
+        inseres, duree = rechargement.basculer()
+        for nom, nb in inseres.items():
+            self.stdout.write(f'  ➕ {nom} : {nb}')
+
+        self.stdout.write('\n' + '='*60)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rechargement terminé ! Transaction de bascule : {duree * 1000:.0f} ms'))
+        self.stdout.write('='*60 + '\n')
@@ -0,0 +1,65 @@
+"""
+Commande Django pour (re)calculer les clés normalisées des élèves et bénévoles
+
+Remplit nom_cle, prenom_cle, telephone_cle, les clés phonétiques
+(nom_phonetique, prenom_phonetique) et l'index de recherche (recherche)
+pour les fiches existantes
+(après la migration qui les ajoute, ou après un QuerySet.update() qui ne
+passe pas par save()). Seules les fiches dont une clé a changé sont écrites.
+
+Usage:
+    python manage.py remplir_cles
+    python manage.py remplir_cles --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Benevole, Eleve
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les clés normalisées (nom, prénom, téléphone, phonétique, recherche) des élèves et bénévoles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mode test : compte les fiches à mettre à jour sans les modifier'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Nombre de fiches écrites par requête (défaut : 1000)'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options.get('dry_run', False)
+        batch_size = options['batch_size']
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('\n' + '='*60))
+            self.stdout.write(self.style.WARNING('🔍 MODE TEST - Aucune modification en base de données'))
+            self.stdout.write(self.style.WARNING('='*60 + '\n'))
+
+        for model in (Eleve, Benevole):
+            cles = list(model.CLES_NORMALISEES)
+            sources = model.champs_sources_cles()
+
+            a_modifier = []
+            total = 0
+            for obj in model.objects.only('pk', *sources, *cles).iterator(chunk_size=batch_size):
+                total += 1
+                if obj.mettre_a_jour_cles():
+                    a_modifier.append(obj)
+
+            if not dry_run and a_modifier:
+                with transaction.atomic():
+                    model.objects.bulk_update(a_modifier, cles, batch_size=batch_size)
+
+            verbe = 'à mettre à jour' if dry_run else 'mis à jour'
+            self.stdout.write(
+                f'  🔑 {model._meta.verbose_name_plural} : {len(a_modifier)} / {total} {verbe}')
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Clés normalisées à jour'))
@@ -0,0 +1,119 @@
+"""
+Commande Django pour exécuter les tâches de fond lancées depuis l'admin
+
+Les actions longues de l'admin (exports, mises à jour de milliers de
+fiches) sont mises en file dans la table des tâches (core.taches) ; cette
+commande les exécute une par une, dans l'ordre d'arrivée. Plusieurs
+workers peuvent tourner en même temps sans prendre la même tâche.
+
+Ctrl+C ou SIGTERM (systemctl stop) remettent la tâche en cours en file.
+Une tâche « en cours » dont la progression n'a pas bougé depuis
+TACHES_DELAI_MAX secondes (worker tué sans pouvoir la rendre) est reprise
+par le prochain worker ; l'ancien worker, s'il tourne encore, s'arrête à
+sa prochaine écriture de progression sans écraser le résultat.
+
+Usage:
+    python manage.py run_jobs                  # en continu (service systemd)
+    python manage.py run_jobs --once           # vide la file puis s'arrête (cron)
+    python manage.py run_jobs --intervalle 5 --conserver-jours 30
+"""
+
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import taches
+from core.metriques import COMMANDES_DUREE, COMMANDES_EXECUTIONS, METRIQUES
+
+
+def interrompre(signum, frame):
+    """SIGTERM : même arrêt que Ctrl+C, la tâche en cours est remise en file."""
+    raise KeyboardInterrupt
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches de fond mises en file par l'admin"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Traite les tâches en attente puis s'arrête"
+        )
+        parser.add_argument(
+            '--intervalle',
+            type=float,
+            default=2.0,
+            help='Secondes entre deux consultations de la file vide (défaut : 2)'
+        )
+        parser.add_argument(
+            '--conserver-jours',
+            type=int,
+            default=7,
+            help='Les tâches finies et leurs fichiers sont supprimés après ce délai (défaut : 7)'
+        )
+
+    def handle(self, *args, **options):
+        une_fois = options['once']
+        intervalle = options['intervalle']
+
+        purgees = taches.purger(options['conserver_jours'])
+        if purgees:
+            self.stdout.write(f'🧹 {purgees} ancienne(s) tâche(s) supprimée(s)')
+
+        if not une_fois:
+            self.stdout.write(self.style.SUCCESS('⏳ En attente de tâches (Ctrl+C pour arrêter)'))
+
+        executees = 0
+        tache = None
+        sigterm = signal.signal(signal.SIGTERM, interrompre)
+        try:
+            while True:
+                close_old_connections()
+                tache = taches.prendre_suivante()
+                if tache is None:
+                    if une_fois:
+                        break
+                    time.sleep(intervalle)
+                    continue
+
+                self.stdout.write(f'▶️  Tâche {tache.pk} : {tache.description}')
+                debut = time.perf_counter()
+                taches.executer(tache)
+                duree = time.perf_counter() - debut
+                executees += 1
+                if settings.METRIQUES_ACTIVE:
+                    self.publier_metriques(tache, duree)
+
+                if tache.statut == 'terminee':
+                    self.stdout.write(self.style.SUCCESS(f'   ✅ {tache.message} ({duree:.1f} s)'))
+                elif tache.statut == 'en_cours':
+                    self.stdout.write(self.style.WARNING('   ↪️  Reprise par un autre worker : résultat ignoré'))
+                else:
+                    derniere_ligne = tache.message.strip().splitlines()[-1:] or ['']
+                    self.stdout.write(self.style.ERROR(f'   ❌ Échec : {derniere_ligne[0]}'))
+                tache = None
+        except KeyboardInterrupt:
+            self.stdout.write('\n⏹️  Arrêt demandé')
+            if tache is not None:
+                # Interrompue en cours : remise en file pour le prochain worker
+                taches.remettre_en_attente(tache)
+                self.stdout.write(f'   ↩️  Tâche {tache.pk} remise en attente')
+        finally:
+            signal.signal(signal.SIGTERM, sigterm)
+
+        self.stdout.write(f'\n📊 {executees} tâche(s) exécutée(s)')
+
+    def publier_metriques(self, tache, duree):
+        """Résultat et durée de la tâche dans les métriques de /metrics (core.metriques)."""
+        commande = f'tache:{tache.traitement}'
+        resultat = {'terminee': 'succes', 'en_cours': 'reprise'}.get(tache.statut, 'echec')
+        try:
+            COMMANDES_EXECUTIONS.incrementer(commande=commande, resultat=resultat)
+            COMMANDES_DUREE.observer(duree, commande=commande)
+            METRIQUES.pousser()
+        except OSError as e:
+            self.stderr.write(f'⚠️  Métriques non enregistrées : {e}')
@@ -0,0 +1,174 @@
+"""
+Commande Django pour afficher les requêtes SQL les plus coûteuses
+
+Lit les statistiques cumulées par core.dbstats (DBSTATS_ACTIVE=True) dans
+tous les processus : pour chaque empreinte, le nombre d'exécutions, le
+temps total, moyen, p95 et maximum, l'exemple le plus lent avec le type
+et la longueur de ses paramètres, et son plan d'exécution (EXPLAIN QUERY
+PLAN sur SQLite, EXPLAIN sur PostgreSQL).
+
+Les valeurs des paramètres ne sont pas conservées : le plan est calculé
+avec des valeurs fictives de même type (core.dbstats.parametres_fictifs).
+Sur PostgreSQL, il peut donc différer de celui de la requête réelle quand
+le planificateur tient compte des valeurs (statistiques de colonne).
+
+Lecture seule : EXPLAIN n'exécute pas la requête.
+
+Usage:
+    python manage.py top_queries
+    python manage.py top_queries --tri p95 --limite 20
+    python manage.py top_queries --sans-plan
+    python manage.py top_queries -v 2                # SQL complet des exemples
+    python manage.py top_queries --reinitialiser     # repart de zéro
+"""
+
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connections
+
+from core.dbstats import STATS_SQL, centile, parametres_fictifs
+
+
+TRIS = {
+    'total': lambda stat: stat['total'],
+    'nombre': lambda stat: stat['nombre'],
+    'moyenne': lambda stat: stat['total'] / stat['nombre'],
+    'p95': centile,
+    'max': lambda stat: stat['max'],
+}
+
+# Seules ces requêtes ont un plan (pas SAVEPOINT, COMMIT, PRAGMA...)
+INSTRUCTIONS_EXPLICABLES = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+# Liste des colonnes d'un SELECT, abrégée à l'affichage au-delà de 80 caractères
+_COLONNES = re.compile(r'^(SELECT (?:DISTINCT )?)(.{80,}?)( FROM )')
+
+
+def ms(secondes):
+    return f'{secondes * 1000:.2f} ms'
+
+
+def abreger(sql):
+    return _COLONNES.sub(r'\1…\3', sql, count=1)
+
+
+def decrire(masque):
+    """['str', 12] → 'str(12)' ; ['int', None] → 'int'."""
+    nom, longueur = masque
+    return nom if longueur is None else f'{nom}({longueur})'
+
+
+def decrire_parametres(exemple):
+    types = exemple['types']
+    if types is None:
+        return 'non conservés (executemany)' if '%s' in exemple['sql'] else 'aucun'
+    if isinstance(types, dict):
+        return ', '.join(f'{nom}={decrire(masque)}' for nom, masque in types.items()) or 'aucun'
+    return ', '.join(decrire(masque) for masque in types) or 'aucun'
+
+
+class Command(BaseCommand):
+    help = 'Affiche les requêtes SQL les plus coûteuses (statistiques de core.dbstats)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limite',
+            type=int,
+            default=10,
+            help="Nombre d'empreintes affichées (défaut : 10)"
+        )
+        parser.add_argument(
+            '--tri',
+            choices=list(TRIS),
+            default='total',
+            help='Classement : total (défaut), nombre, moyenne, p95 ou max'
+        )
+        parser.add_argument(
+            '--sans-plan',
+            action='store_true',
+            help="N'affiche pas les plans d'exécution"
+        )
+        parser.add_argument(
+            '--reinitialiser',
+            action='store_true',
+            help='Efface les statistiques cumulées'
+        )
+
+    def handle(self, *args, **options):
+        # Les EXPLAIN de la commande ne comptent pas dans les statistiques
+        STATS_SQL.suspendu = True
+
+        if options['reinitialiser']:
+            STATS_SQL.reinitialiser()
+            self.stdout.write(self.style.SUCCESS(f'🧹 Statistiques effacées ({STATS_SQL.fichier()})'))
+            return
+
+        stats = STATS_SQL.lire()
+        if not stats:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  Aucune statistique dans {STATS_SQL.fichier()}'
+            ))
+            if not settings.DBSTATS_ACTIVE:
+                self.stdout.write('   Activer la collecte : DBSTATS_ACTIVE=True dans .env')
+            return
+
+        temps_total = sum(stat['total'] for stat in stats.values())
+        executions = sum(stat['nombre'] for stat in stats.values())
+        classement = sorted(stats.items(), key=lambda e: TRIS[options['tri']](e[1]), reverse=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n🗄️  Requêtes SQL les plus coûteuses (tri : {options["tri"]})\n'
+        ))
+        self.stdout.write(f'{len(stats)} empreinte(s), {executions} exécution(s), '
+                          f'{temps_total:.2f} s au total\n')
+
+        for rang, (empreinte, stat) in enumerate(classement[:options['limite']], 1):
+            part = 100 * stat['total'] / temps_total if temps_total else 0
+            self.stdout.write('=' * 70)
+            self.stdout.write(self.style.SUCCESS(
+                f'#{rang}  {stat["nombre"]} exécution(s), {ms(stat["total"])} ({part:.1f} %)'
+            ))
+            self.stdout.write(f'    moyenne {ms(stat["total"] / stat["nombre"])}, '
+                              f'p95 ≤ {ms(centile(stat))}, max {ms(stat["max"])}')
+            self.stdout.write(f'    {abreger(empreinte)}')
+
+            exemple = stat.get('exemple')
+            if not exemple:
+                continue
+            self.stdout.write(f'  Exemple ({ms(exemple["duree"])}, base « {exemple["alias"]} ») :')
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'    {exemple["sql"]}')
+            self.stdout.write(f'    paramètres : {decrire_parametres(exemple)}')
+            if not options['sans_plan']:
+                self.afficher_plan(exemple)
+
+        self.stdout.write('=' * 70)
+
+    def afficher_plan(self, exemple):
+        sql = exemple['sql']
+        if not sql.lstrip().upper().startswith(INSTRUCTIONS_EXPLICABLES):
+            return
+        if exemple['types'] is None and '%s' in sql:
+            self.stdout.write('  Plan : paramètres non conservés (executemany)')
+            return
+        if exemple['alias'] not in connections:
+            self.stdout.write(f'  Plan : base « {exemple["alias"]} » absente de DATABASES')
+            return
+
+        connexion = connections[exemple['alias']]
+        prefixe = 'EXPLAIN QUERY PLAN ' if connexion.vendor == 'sqlite' else 'EXPLAIN '
+        try:
+            with connexion.cursor() as curseur:
+                params = None if exemple['types'] is None else parametres_fictifs(exemple['types'])
+                curseur.execute(prefixe + sql, params)
+                lignes = curseur.fetchall()
+        except DatabaseError as e:
+            self.stdout.write(self.style.WARNING(f'  Plan indisponible : {e}'))
+            return
+
+        self.stdout.write('  Plan :')
+        for ligne in lignes:
+            # SQLite : (id, parent, inutilisé, détail) ; PostgreSQL : (texte,)
+            self.stdout.write(f'    {ligne[-1]}')
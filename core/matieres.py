@@ -0,0 +1,267 @@
+"""
+📚 MATIERES.PY - Reconnaissance des matières dans les besoins des élèves
+
+Le champ "besoins" des fichiers d'import est saisi librement
+("Maths / français, conjugaison", "toutes matières", ...).
+Ce module le découpe en morceaux et associe chaque morceau à une
+matière canonique.
+
+Le vocabulaire est compilé UNE SEULE FOIS, au chargement du module,
+en une expression régulière unique : chaque morceau du texte n'est
+donc parcouru qu'une fois, au lieu de tester chaque mot-clé un par un.
+
+Utilisation :
+    from core.matieres import extraire_matieres
+    matieres, non_reconnu = extraire_matieres("Maths, lecture, piano")
+    # (['Mathématiques', 'Français'], 'piano')
+
+Il tient aussi le registre des matières en base (REGISTRE) : imports,
+API et admin y résolvent noms et ids sans interroger la table Matiere.
+"""
+
+import re
+import threading
+import time
+
+from core.metriques import CACHE
+from core.models import Matiere
+from core.text import normaliser
+
+
+# ============================================================================
+# 📖 VOCABULAIRE
+# ============================================================================
+
+# Matières canoniques et leurs mots-clés associés.
+# ⚠️ L'ordre compte : si un morceau contient des mots-clés de plusieurs
+# matières, c'est la première matière de la liste qui l'emporte.
+MATIERES_CANONIQUES = {
+    'Mathématiques': ['math', 'maths', 'mathématiques', 'calcul', 'géométrie', 'nombres'],
+    'Français':      ['français', 'francais', 'lecture', 'écriture', 'ecriture', 'orthographe',
+                      'grammaire', 'conjugaison', 'rédaction', 'redaction', 'compréhension',
+                      'comprehension', 'consignes', 'conjuguaison', 'fraçais'],
+    'Anglais':       ['anglais'],
+    'Espagnol':      ['espagnol'],
+    'Histoire-Géographie': ['histoire', 'géographie', 'geographie', 'hg', 'hist', 'his-geo'],
+    'SVT':           ['svt'],
+    'Physique-Chimie': ['physique', 'chimie', 'phys'],
+    'Toutes matières': ['toutes', 'toutes matières', 'toutes matieres', 'primaire',
+                        'matières primaires', 'bases du primaire', 'tout-'],
+    'Méthodologie':  ['méthodo', 'methodologie', 'méthodologie', 'organisation', 'méthode',
+                      'apprendre à apprendre'],
+    'Sciences':      ['sciences', 'matières scientifiques'],
+}
+
+# Séparateurs entre les morceaux du champ "besoins"
+SEPARATEURS = re.compile(r'[,;/\n]+')
+
+
+# ============================================================================
+# ⚙️ RECONNAISSANCE
+# ============================================================================
+
+class MatiereMatcher:
+    """
+    Reconnaît les matières canoniques dans un texte libre.
+
+    Tous les mots-clés (normalisés sans accents) sont regroupés dans une
+    seule expression régulière, avec un groupe nommé par matière :
+
+        (?=(?P<m0>maths|math|...)|(?P<m1>francais|lecture|...)|...)
+
+    Le lookahead permet de retrouver les mots-clés qui se chevauchent,
+    et l'ordre des groupes reproduit la priorité de MATIERES_CANONIQUES.
+    """
+
+    def __init__(self, matieres):
+        self.noms = list(matieres)
+        groupes = []
+        for rang, mots_cles in enumerate(matieres.values()):
+            # Les plus longs d'abord, pour que l'alternative la plus précise gagne
+            mots = sorted({normaliser(mot) for mot in mots_cles}, key=len, reverse=True)
+            groupes.append(f"(?P<m{rang}>{'|'.join(re.escape(mot) for mot in mots)})")
+        self.motif = re.compile('(?=' + '|'.join(groupes) + ')')
+
+    def matiere(self, texte_normalise):
+        """Retourne la matière prioritaire présente dans le texte, ou None."""
+        meilleur = None
+        for match in self.motif.finditer(texte_normalise):
+            rang = int(match.lastgroup[1:])
+            if meilleur is None or rang < meilleur:
+                meilleur = rang
+                if rang == 0:
+                    break
+        return None if meilleur is None else self.noms[meilleur]
+
+    def extraire(self, besoins_str):
+        """
+        Retourne (matieres_reconnues: list[str], texte_non_reconnu: str)
+        """
+        if not besoins_str:
+            return [], ''
+
+        matieres_trouvees = set()
+        tokens_non_reconnus = []
+
+        for token in SEPARATEURS.split(besoins_str):
+            token = token.strip()
+            if not token:
+                continue
+            matiere = self.matiere(normaliser(token))
+            if matiere:
+                matieres_trouvees.add(matiere)
+            else:
+                tokens_non_reconnus.append(token)
+
+        return list(matieres_trouvees), ', '.join(tokens_non_reconnus)
+
+
+# Compilé une seule fois au chargement du module
+MATCHER = MatiereMatcher(MATIERES_CANONIQUES)
+
+
+def extraire_matieres(besoins_str):
+    """
+    Retourne (matieres_reconnues: list[str], texte_non_reconnu: str)
+    """
+    return MATCHER.extraire(besoins_str)
+
+
+# ============================================================================
+# 🗂️ REGISTRE DES MATIÈRES (en mémoire, par processus)
+# ============================================================================
+
+class RegistreMatieres:
+    """
+    La table Matiere (quelques dizaines de lignes) chargée une fois par
+    processus, avec les recherches par nom et par mot-clé :
+
+        REGISTRE.par_nom('mathématiques')  # Matiere, nom exact sans casse
+        REGISTRE.id('maths')               # id, nom ou mot-clé, sans accents
+        REGISTRE.noms([3, 1])              # ['Français', 'Mathématiques'] (ordre d'affichage)
+        REGISTRE.assurer(['SVT', 'Anglais'])  # {nom: id}, créées en masse si absentes
+
+    Le registre est invalidé par les signaux post_save / post_delete de
+    Matiere (core.signals) et après ses propres créations en masse. Les
+    modifications faites par un autre processus sont prises en compte au
+    plus tard après DUREE_MAX secondes.
+    """
+
+    DUREE_MAX = 300
+
+    def __init__(self):
+        self.verrou = threading.Lock()
+        self.donnees = None
+        self.charge_le = 0.0
+
+    def invalider(self):
+        self.donnees = None
+
+    def _charger(self):
+        donnees = self.donnees
+        if donnees is not None and time.monotonic() - self.charge_le < self.DUREE_MAX:
+            CACHE.incrementer(cache='matieres', resultat='hit')
+            return donnees
+        CACHE.incrementer(cache='matieres', resultat='miss')
+        with self.verrou:
+            if self.donnees is not None and time.monotonic() - self.charge_le < self.DUREE_MAX:
+                return self.donnees
+
+            matieres = list(Matiere.objects.all())
+            par_id = {m.id: m for m in matieres}
+            par_nom = {m.nom.lower(): m for m in matieres}
+            par_cle = {}
+            # Mots-clés du vocabulaire → matière canonique (si elle existe en base)...
+            for nom_canonique, mots_cles in MATIERES_CANONIQUES.items():
+                canonique = par_nom.get(nom_canonique.lower())
+                if canonique:
+                    par_cle[normaliser(nom_canonique)] = canonique.id
+                    for mot in mots_cles:
+                        par_cle.setdefault(normaliser(mot), canonique.id)
+            # ... mais un nom de matière existant l'emporte toujours sur un mot-clé
+            for m in matieres:
+                par_cle[normaliser(m.nom)] = m.id
+
+            self.donnees = donnees = {'par_id': par_id, 'par_nom': par_nom, 'par_cle': par_cle}
+            self.charge_le = time.monotonic()
+            return donnees
+
+    def toutes(self):
+        """Toutes les matières, dans l'ordre d'affichage."""
+        return sorted(self._charger()['par_id'].values(), key=lambda m: (m.ordre, m.nom))
+
+    def get(self, matiere_id):
+        return self._charger()['par_id'].get(matiere_id)
+
+    def par_nom(self, nom):
+        """Matière de ce nom exact (sans tenir compte de la casse), ou None."""
+        return self._charger()['par_nom'].get(nom.strip().lower())
+
+    def id(self, nom):
+        """Id de la matière désignée par son nom ou un mot-clé (sans accents), ou None."""
+        return self._charger()['par_cle'].get(normaliser(nom))
+
+    def noms(self, ids):
+        """Noms des matières, dans l'ordre d'affichage."""
+        par_id = self._charger()['par_id']
+        matieres = [par_id[i] for i in ids if i in par_id]
+        return [m.nom for m in sorted(matieres, key=lambda m: (m.ordre, m.nom))]
+
+    def assurer(self, noms, **defaults):
+        """
+        Ids des matières nommées (sans casse), en créant les absentes en
+        une requête. Retourne {nom demandé: id}.
+        """
+        absentes = [nom for nom in dict.fromkeys(noms) if self.par_nom(nom) is None]
+        if absentes:
+            Matiere.objects.bulk_create(
+                [Matiere(nom=nom, **{'actif': True, **defaults}) for nom in absentes],
+                ignore_conflicts=True,
+            )
+            # bulk_create n'envoie pas post_save
+            self.invalider()
+        return {nom: m.id for nom in noms if (m := self.par_nom(nom)) is not None}
+
+
+REGISTRE = RegistreMatieres()
+
+
+def noms_matieres_par_fiche(champ, ids):
+    """
+    Noms des matières de chaque fiche, en une requête sur la table de
+    liaison (sans jointure sur Matiere) :
+
+        noms_matieres_par_fiche(Eleve.matieres_souhaitees, [1, 2])
+        # {1: ['Français', 'Mathématiques'], 2: []}
+    """
+    source = champ.field.m2m_field_name()
+    cible = champ.field.m2m_reverse_field_name()
+    liens = {fiche_id: [] for fiche_id in ids}
+    for fiche_id, matiere_id in champ.through.objects.filter(
+            **{f'{source}_id__in': list(liens)}).values_list(f'{source}_id', f'{cible}_id'):
+        liens[fiche_id].append(matiere_id)
+    return {fiche_id: REGISTRE.noms(matiere_ids) for fiche_id, matiere_ids in liens.items()}
+
+
+# ============================================================================
+# 🔗 LISTES DE MATIÈRES DES FICHIERS BÉNÉVOLES
+# ============================================================================
+
+def parse_matieres(matieres_str):
+    """
+    Découpe une liste « Maths, Français » et la résout par nom exact
+    (sans casse) avec le registre, sans requête.
+
+    Retourne (matieres: list[Matiere], inconnues: list[str]).
+    """
+    matieres = []
+    inconnues = []
+    for nom in (m.strip() for m in (matieres_str or '').split(',')):
+        if not nom:
+            continue
+        matiere = REGISTRE.par_nom(nom)
+        if matiere:
+            matieres.append(matiere)
+        else:
+            inconnues.append(nom)
+    return matieres, inconnues
@@ -0,0 +1,402 @@
+"""
+📈 METRIQUES.PY - Métriques de l'application au format Prometheus (/metrics)
+
+Un registre en mémoire, par processus, sans service externe :
+
+    REQUETES_DUREE.observer(0.042, vue='core:api_eleves')
+    GEOCODAGE_APPELS.incrementer(resultat='succes')
+    IMPORT_DEBIT.fixer(1250.0, commande='import_eleves')
+
+Les processus écrivent leurs valeurs dans des fichiers JSON de
+METRIQUES_DIR, que la vue /metrics additionne avec celles du processus
+qui répond :
+
+    - web-<pid>.json   : chaque processus web réécrit le sien au plus toutes
+                         les METRIQUES_INTERVALLE secondes (ecrire_si_necessaire)
+    - commandes.json   : les commandes (imports, run_jobs, geolocalize_all)
+                         y ajoutent leurs valeurs en fin d'exécution (pousser),
+                         sous verrou de fichier ; les web-<pid>.json des
+                         processus arrêtés y sont reportés puis supprimés
+                         (recuperer_arretes)
+
+Rien n'est mesuré ni écrit sans METRIQUES_ACTIVE=True.
+
+Les compteurs et histogrammes s'additionnent d'un fichier à l'autre ; pour
+une jauge (débit du dernier import...), la valeur la plus récente l'emporte.
+Les taux se calculent côté Prometheus, par exemple le taux de succès d'un
+cache :
+    rate(esa_cache_total{resultat="hit"}[1h]) / rate(esa_cache_total[1h])
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+
+# ============================================================================
+# 💾 FICHIERS PARTAGÉS ENTRE PROCESSUS
+# ============================================================================
+
+def ecrire_json(chemin, donnees):
+    """Écriture atomique : un lecteur ne voit jamais un fichier à moitié écrit."""
+    temporaire = f'{chemin}.{os.getpid()}.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        json.dump(donnees, f, default=str)
+    os.replace(temporaire, chemin)
+
+
+def lire_json(chemin):
+    """Contenu du fichier, ou {} s'il est absent ou illisible."""
+    try:
+        with open(chemin, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def verrou_fichier(dossier):
+    """Verrou exclusif entre processus (lire, fusionner, réécrire un fichier)."""
+    with open(os.path.join(dossier, '.verrou'), 'w') as verrou:
+        if fcntl:
+            fcntl.flock(verrou, fcntl.LOCK_EX)
+        yield
+
+
+# ============================================================================
+# 📏 TYPES DE MÉTRIQUES
+# ============================================================================
+
+class Metrique:
+    """
+    Série de valeurs d'un nom de métrique, une par combinaison d'étiquettes.
+    Sans METRIQUES_ACTIVE, les mesures (incrementer, fixer, observer) sont
+    ignorées : rien ne s'accumule en mémoire.
+    """
+
+    type_prometheus = None
+
+    def __init__(self, registre, nom, aide, etiquettes=()):
+        self.registre = registre
+        self.nom = nom
+        self.aide = aide
+        self.etiquettes = tuple(etiquettes)
+        self.series = {}  # (valeurs des étiquettes) → valeur
+
+    def _cle(self, valeurs):
+        return tuple(str(valeurs.get(nom, '')) for nom in self.etiquettes)
+
+
+class Compteur(Metrique):
+    type_prometheus = 'counter'
+
+    def incrementer(self, nombre=1, **etiquettes):
+        if not settings.METRIQUES_ACTIVE:
+            return
+        cle = self._cle(etiquettes)
+        with self.registre.verrou:
+            self.series[cle] = self.series.get(cle, 0) + nombre
+
+    @staticmethod
+    def fusionner(avant, valeur):
+        return avant + valeur
+
+
+class Jauge(Metrique):
+    """Valeur fixée (la dernière l'emporte), gardée avec son horodatage."""
+
+    type_prometheus = 'gauge'
+
+    def fixer(self, valeur, **etiquettes):
+        if not settings.METRIQUES_ACTIVE:
+            return
+        cle = self._cle(etiquettes)
+        with self.registre.verrou:
+            self.series[cle] = [valeur, time.time()]
+
+    @staticmethod
+    def fusionner(avant, valeur):
+        return valeur if valeur[1] >= avant[1] else avant
+
+
+class Histogramme(Metrique):
+    """Répartition d'observations par seaux cumulatifs (le = inférieur ou égal)."""
+
+    type_prometheus = 'histogram'
+
+    def __init__(self, registre, nom, aide, etiquettes=(), seaux=()):
+        super().__init__(registre, nom, aide, etiquettes)
+        self.seaux = tuple(seaux)
+
+    def observer(self, valeur, **etiquettes):
+        if not settings.METRIQUES_ACTIVE:
+            return
+        cle = self._cle(etiquettes)
+        with self.registre.verrou:
+            serie = self.series.get(cle)
+            if serie is None:
+                serie = self.series[cle] = {'seaux': [0] * len(self.seaux), 'somme': 0.0, 'nombre': 0}
+            for i, limite in enumerate(self.seaux):
+                if valeur <= limite:
+                    serie['seaux'][i] += 1
+            serie['somme'] += valeur
+            serie['nombre'] += 1
+
+    @staticmethod
+    def fusionner(avant, valeur):
+        return {
+            'seaux': [a + b for a, b in zip(avant['seaux'], valeur['seaux'])],
+            'somme': avant['somme'] + valeur['somme'],
+            'nombre': avant['nombre'] + valeur['nombre'],
+        }
+
+
+# ============================================================================
+# 🗂️ REGISTRE
+# ============================================================================
+
+def _echapper(valeur):
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _nombre(valeur):
+    if isinstance(valeur, float) and valeur.is_integer():
+        return str(int(valeur))
+    return repr(valeur) if isinstance(valeur, float) else str(valeur)
+
+
+class Metriques:
+    """Registre des métriques du processus, et leurs fichiers dans METRIQUES_DIR."""
+
+    FICHIER_COMMANDES = 'commandes.json'
+
+    # Un web-<pid>.json non réécrit depuis ce nombre d'intervalles, dont le
+    # processus n'existe plus, est reporté dans commandes.json
+    INTERVALLES_ARRET = 4
+
+    def __init__(self):
+        self.verrou = threading.Lock()
+        self.metriques = {}
+        self.derniere_ecriture = 0.0
+
+    def _declarer(self, classe, nom, aide, etiquettes=(), **options):
+        metrique = classe(self, nom, aide, etiquettes, **options)
+        self.metriques[nom] = metrique
+        return metrique
+
+    def compteur(self, nom, aide, etiquettes=()):
+        return self._declarer(Compteur, nom, aide, etiquettes)
+
+    def jauge(self, nom, aide, etiquettes=()):
+        return self._declarer(Jauge, nom, aide, etiquettes)
+
+    def histogramme(self, nom, aide, etiquettes=(), seaux=()):
+        return self._declarer(Histogramme, nom, aide, etiquettes, seaux=seaux)
+
+    # ------------------------------------------------------------------
+    # Instantanés (JSON) et fusion
+    # ------------------------------------------------------------------
+
+    def instantane(self):
+        """{nom: [[étiquettes, valeur], ...]} sérialisable, copie des valeurs actuelles."""
+        with self.verrou:
+            return {
+                nom: [[list(cle), json.loads(json.dumps(valeur))] for cle, valeur in m.series.items()]
+                for nom, m in self.metriques.items() if m.series
+            }
+
+    def fusionner(self, total, instantane):
+        """Ajoute un instantané à total ({nom: {étiquettes: valeur}}) ; noms inconnus ignorés."""
+        for nom, series in instantane.items():
+            metrique = self.metriques.get(nom)
+            if metrique is None:
+                continue
+            cumul = total.setdefault(nom, {})
+            for cle, valeur in series:
+                cle = tuple(cle)
+                if isinstance(metrique, Histogramme) and len(valeur['seaux']) != len(metrique.seaux):
+                    continue  # seaux modifiés depuis l'écriture du fichier
+                cumul[cle] = metrique.fusionner(cumul[cle], valeur) if cle in cumul else valeur
+        return total
+
+    def vider(self):
+        with self.verrou:
+            for metrique in self.metriques.values():
+                metrique.series = {}
+
+    # ------------------------------------------------------------------
+    # Fichiers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def dossier():
+        return str(settings.METRIQUES_DIR)
+
+    def _fichier_processus(self):
+        return os.path.join(self.dossier(), f'web-{os.getpid()}.json')
+
+    def ecrire_si_necessaire(self):
+        """Processus web : réécrit web-<pid>.json au plus toutes les METRIQUES_INTERVALLE secondes."""
+        maintenant = time.monotonic()
+        if maintenant - self.derniere_ecriture < settings.METRIQUES_INTERVALLE:
+            return
+        self.derniere_ecriture = maintenant
+        try:
+            os.makedirs(self.dossier(), exist_ok=True)
+            ecrire_json(self._fichier_processus(), self.instantane())
+        except OSError:
+            pass  # les métriques ne doivent jamais faire échouer une requête
+
+    def _ajouter_aux_commandes(self, instantanes):
+        """Ajoute des instantanés à commandes.json (l'appelant tient verrou_fichier)."""
+        chemin = os.path.join(self.dossier(), self.FICHIER_COMMANDES)
+        total = self.fusionner({}, lire_json(chemin))
+        for instantane in instantanes:
+            self.fusionner(total, instantane)
+        ecrire_json(chemin, {
+            nom: [[list(cle), valeur] for cle, valeur in series.items()]
+            for nom, series in total.items()
+        })
+
+    def pousser(self):
+        """
+        Commande : ajoute les valeurs du processus à commandes.json, puis les
+        remet à zéro (un second appel n'ajoute que ce qui a été mesuré depuis).
+        """
+        if not settings.METRIQUES_ACTIVE:
+            return
+        instantane = self.instantane()
+        if not instantane:
+            return
+        os.makedirs(self.dossier(), exist_ok=True)
+        with verrou_fichier(self.dossier()):
+            self._ajouter_aux_commandes([instantane])
+        self.vider()
+
+    def _processus_arrete(self, chemin):
+        """web-<pid>.json ancien dont le processus n'existe plus (même serveur)."""
+        try:
+            age = time.time() - os.path.getmtime(chemin)
+            pid = int(os.path.basename(chemin)[len('web-'):-len('.json')])
+        except (OSError, ValueError):
+            return False
+        if age < settings.METRIQUES_INTERVALLE * self.INTERVALLES_ARRET:
+            return False
+        if os.name != 'posix':
+            return True  # os.kill(pid, 0) terminerait le processus sous Windows
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass  # processus d'un autre utilisateur : vivant
+        return False
+
+    def recuperer_arretes(self):
+        """
+        Reporte dans commandes.json les valeurs des processus web arrêtés
+        (redémarrage, max_requests de gunicorn...) et supprime leurs
+        fichiers : les totaux restent croissants, le dossier ne grossit pas.
+        """
+        propre = self._fichier_processus()
+        arretes = [chemin for chemin in glob.glob(os.path.join(self.dossier(), 'web-*.json'))
+                   if chemin != propre and self._processus_arrete(chemin)]
+        if not arretes:
+            return
+        with verrou_fichier(self.dossier()):
+            # Un autre processus a pu les reporter entre-temps
+            arretes = [chemin for chemin in arretes if os.path.exists(chemin)]
+            self._ajouter_aux_commandes([lire_json(chemin) for chemin in arretes])
+            for chemin in arretes:
+                os.remove(chemin)
+
+    def agreger(self):
+        """Valeurs de tous les fichiers de METRIQUES_DIR et du processus courant."""
+        try:
+            self.recuperer_arretes()
+        except OSError:
+            pass  # dossier en lecture seule : les valeurs restent lisibles
+        propre = self._fichier_processus()
+        total = {}
+        for chemin in sorted(glob.glob(os.path.join(self.dossier(), '*.json'))):
+            if chemin != propre:
+                self.fusionner(total, lire_json(chemin))
+        return self.fusionner(total, self.instantane())
+
+    # ------------------------------------------------------------------
+    # Format texte Prometheus
+    # ------------------------------------------------------------------
+
+    def _etiquettes(self, metrique, cle, supplementaires=()):
+        paires = list(zip(metrique.etiquettes, cle)) + list(supplementaires)
+        if not paires:
+            return ''
+        return '{' + ','.join(f'{nom}="{_echapper(valeur)}"' for nom, valeur in paires) + '}'
+
+    def exposer(self):
+        """Texte au format d'exposition Prometheus (text/plain; version=0.0.4)."""
+        total = self.agreger()
+        lignes = []
+        for nom, metrique in self.metriques.items():
+            lignes.append(f'# HELP {nom} {metrique.aide}')
+            lignes.append(f'# TYPE {nom} {metrique.type_prometheus}')
+            for cle, valeur in sorted(total.get(nom, {}).items()):
+                if isinstance(metrique, Histogramme):
+                    for limite, nombre in zip(metrique.seaux, valeur['seaux']):
+                        le = self._etiquettes(metrique, cle, [('le', _nombre(float(limite)))])
+                        lignes.append(f'{nom}_bucket{le} {nombre}')
+                    le = self._etiquettes(metrique, cle, [('le', '+Inf')])
+                    lignes.append(f'{nom}_bucket{le} {valeur["nombre"]}')
+                    lignes.append(f'{nom}_sum{self._etiquettes(metrique, cle)} {_nombre(valeur["somme"])}')
+                    lignes.append(f'{nom}_count{self._etiquettes(metrique, cle)} {valeur["nombre"]}')
+                elif isinstance(metrique, Jauge):
+                    lignes.append(f'{nom}{self._etiquettes(metrique, cle)} {_nombre(valeur[0])}')
+                else:
+                    lignes.append(f'{nom}{self._etiquettes(metrique, cle)} {_nombre(valeur)}')
+        return '\n'.join(lignes) + '\n'
+
+
+METRIQUES = Metriques()
+
+
+# ============================================================================
+# 📊 MÉTRIQUES DE L'APPLICATION
+# ============================================================================
+
+SEAUX_DUREE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SEAUX_OCTETS = (1_000, 10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+SEAUX_COMMANDES = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+REQUETES_DUREE = METRIQUES.histogramme(
+    'esa_requete_duree_secondes', 'Durée des requêtes HTTP, par vue', ('vue',), SEAUX_DUREE)
+REQUETES_SQL = METRIQUES.compteur(
+    'esa_requete_sql_total', 'Requêtes SQL exécutées pendant les requêtes HTTP, par vue', ('vue',))
+API_OCTETS = METRIQUES.histogramme(
+    'esa_api_reponse_octets', 'Taille des réponses JSON (API des cartes), par vue', ('vue',), SEAUX_OCTETS)
+
+GEOCODAGE_APPELS = METRIQUES.compteur(
+    'esa_geocodage_appels_total', "Appels à l'API BAN, par résultat (succes, sans_resultat, erreur)",
+    ('resultat',))
+CACHE = METRIQUES.compteur(
+    'esa_cache_total', 'Consultations des caches (listes_admin, matieres, geocodage), hit ou miss',
+    ('cache', 'resultat'))
+
+COMMANDES_EXECUTIONS = METRIQUES.compteur(
+    'esa_commande_executions_total', 'Exécutions des commandes, par résultat (succes, echec)',
+    ('commande', 'resultat'))
+COMMANDES_DUREE = METRIQUES.histogramme(
+    'esa_commande_duree_secondes', 'Durée des commandes', ('commande',), SEAUX_COMMANDES)
+IMPORT_LIGNES = METRIQUES.compteur(
+    'esa_import_lignes_total', 'Lignes lues par les imports', ('commande',))
+IMPORT_DEBIT = METRIQUES.jauge(
+    'esa_import_lignes_par_seconde', 'Débit du dernier import (lignes par seconde)', ('commande',))
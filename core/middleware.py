@@ -1,47 +1,166 @@
-from django.shortcuts import redirect
+"""
+🔐 MIDDLEWARE.PY - Connexion et double authentification obligatoires
+
+Toute page hors URLS_PUBLIQUES et CHEMINS_PUBLICS demande un utilisateur connecté, qui a
+configuré son application d'authentification (TOTP) : sinon, redirection
+vers la connexion ou vers l'activation du 2FA.
+
+Le middleware passe sur chaque requête : il ne fait aucune requête SQL tant
+que l'état 2FA est connu. Cet état est gardé dans la session (CLE_SESSION_MFA)
+au plus MFA_ETAT_DUREE secondes, et effacé par les signaux d'allauth quand
+l'utilisateur ajoute ou supprime un authentificateur (core.signals) ; une
+suppression faite par un administrateur, depuis une autre session, est
+prise en compte à l'expiration. Les traces de débogage passent par le logger
+core.middleware, silencieux par défaut (LOG_LEVEL_MIDDLEWARE=DEBUG pour
+les voir). Mesure du coût : python manage.py check_middleware
+
+PerformanceMiddleware (PERF_ACTIVE, METRIQUES_ACTIVE) mesure le temps passé
+par requête : voir core.performance et core.metriques.
+"""
+
+import json
+import logging
+import time
+
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.shortcuts import redirect
 from allauth.mfa.models import Authenticator
-from urllib3 import request
-from datetime import datetime
+
+from .metriques import API_OCTETS, METRIQUES, REQUETES_DUREE, REQUETES_SQL
+from .performance import MESURE, installer_mesure_gabarits, mesurer_requete
+
+
+logger = logging.getLogger(__name__)
+logger_performance = logging.getLogger('core.performance')
 
 URLS_PUBLIQUES = [
     '/accounts/',
     '/favicon.ico',
     '/static/',
 ]
-from django.shortcuts import redirect
+
+# Préfixes testés en un seul appel : request.path.startswith(PREFIXES_PUBLICS)
+PREFIXES_PUBLICS = tuple(URLS_PUBLIQUES)
+
+# Chemins publics exacts (pas /metricsfoo)
+CHEMINS_PUBLICS = frozenset({
+    '/metrics',  # protégée par la vue elle-même (jeton ou compte staff)
+})
+
+# Session : (id de l'utilisateur, TOTP configuré, lu le (timestamp))
+CLE_SESSION_MFA = 'core_mfa_totp'
+
+
+def totp_configure(request):
+    """L'utilisateur connecté a-t-il un TOTP ? Relu en base toutes les MFA_ETAT_DUREE secondes."""
+    maintenant = time.time()
+    etat = request.session.get(CLE_SESSION_MFA)
+    if (etat is not None and len(etat) == 3 and etat[0] == request.user.pk
+            and maintenant - etat[2] < settings.MFA_ETAT_DUREE):
+        return etat[1]
+    configure = Authenticator.objects.filter(
+        user=request.user,
+        type=Authenticator.Type.TOTP
+    ).exists()
+    request.session[CLE_SESSION_MFA] = (request.user.pk, configure, maintenant)
+    return configure
+
+
+def oublier_etat_mfa(request):
+    """Authentificateur ajouté ou supprimé : l'état sera relu à la prochaine requête."""
+    if request is not None and hasattr(request, 'session'):
+        request.session.pop(CLE_SESSION_MFA, None)
+
 
 class LoginRequiredMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        if '2fa' in request.path:
-                    print(f"DEBUG [{request.method}] session mfa secret: {request.session.get('mfa.totp.secret', 'ABSENT')}")
+        if request.path in CHEMINS_PUBLICS or request.path.startswith(PREFIXES_PUBLICS):
+            return self.get_response(request)
+
         if not request.user.is_authenticated:
-            if not any(request.path.startswith(url) for url in URLS_PUBLIQUES):
-                return redirect('/accounts/login/')
-        elif request.user.is_authenticated:
-            # Vérifier si le 2FA est configuré
-            if not any(request.path.startswith(url) for url in URLS_PUBLIQUES):
-                has_mfa = Authenticator.objects.filter(
-                    user=request.user,
-                    type=Authenticator.Type.TOTP
-                ).exists()
-                if not has_mfa:
-                    return redirect('/accounts/2fa/totp/activate/')
-        print(f"DEBUG path: {request.path}")
-        print(f"DEBUG user: {request.user}")
-        print(f"DEBUG authenticated: {request.user.is_authenticated}")
-        if request.method == 'POST' and '2fa' in request.path:
-            print(f"DEBUG POST data: {request.POST}")
-        print(f"DEBUG heure serveur: {datetime.now()}")
-
-        if request.user.is_authenticated:
-            auths = Authenticator.objects.filter(user=request.user)
-            print(f"DEBUG authenticators: {list(auths.values())}")
-
-        if request.method == 'POST' and '2fa' in request.path:
-            print(f"DEBUG session keys: {list(request.session.keys())}")
-            print(f"DEBUG session data: {dict(request.session)}")
-        return self.get_response(request)
\ No newline at end of file
+            logger.debug('[%s] %s : non connecté, redirection vers la connexion',
+                         request.method, request.path)
+            return redirect('/accounts/login/')
+
+        # Vérifier si le 2FA est configuré
+        if not totp_configure(request):
+            logger.debug('[%s] %s : %s sans 2FA, redirection vers l\'activation',
+                         request.method, request.path, request.user)
+            return redirect('/accounts/2fa/totp/activate/')
+
+        return self.get_response(request)
+
+
+# ============================================================================
+# ⏱️ MESURE DES PERFORMANCES
+# ============================================================================
+
+class PerformanceMiddleware:
+    """
+    Avec PERF_ACTIVE : en-tête Server-Timing (total, vue, SQL, gabarits) sur
+    chaque réponse, et journal des requêtes plus lentes que PERF_SEUIL_LENT_MS.
+    Avec METRIQUES_ACTIVE : durée, requêtes SQL et taille des réponses JSON
+    dans les métriques de /metrics (core.metriques).
+
+    À placer en tête de MIDDLEWARE pour que « total » couvre tous les
+    middlewares.
+    """
+
+    def __init__(self, get_response):
+        self.server_timing = settings.PERF_ACTIVE
+        self.metriques = settings.METRIQUES_ACTIVE
+        if not (self.server_timing or self.metriques):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.seuil_lent = settings.PERF_SEUIL_LENT_MS / 1000
+        if self.server_timing:
+            installer_mesure_gabarits()
+
+    def __call__(self, request):
+        with mesurer_requete() as mesure:
+            response = self.get_response(request)
+            if mesure.debut_vue is not None:
+                mesure.vue = time.perf_counter() - mesure.debut_vue
+
+        if self.server_timing:
+            response['Server-Timing'] = mesure.server_timing()
+            if mesure.total >= self.seuil_lent:
+                self.journaliser(request, response, mesure)
+        if self.metriques:
+            self.enregistrer_metriques(request, response, mesure)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mesure = MESURE.get()
+        if mesure is not None:
+            mesure.debut_vue = time.perf_counter()
+        return None
+
+    def journaliser(self, request, response, mesure):
+        ligne = {
+            'methode': request.method,
+            'chemin': request.path,
+            'statut': response.status_code,
+            'utilisateur': getattr(getattr(request, 'user', None), 'pk', None),
+            'total_ms': round(mesure.total * 1000, 1),
+            'vue_ms': round(mesure.vue * 1000, 1),
+            'sql_ms': round(mesure.sql * 1000, 1),
+            'requetes': mesure.requetes,
+            'gabarits_ms': round(mesure.gabarits * 1000, 1),
+            'sql_repetees': [{'nombre': n, 'sql': sql[:300]} for n, sql in mesure.sql_repetees()],
+        }
+        logger_performance.warning('requete_lente %s', json.dumps(ligne, ensure_ascii=False))
+
+    def enregistrer_metriques(self, request, response, mesure):
+        correspondance = getattr(request, 'resolver_match', None)
+        vue = correspondance.view_name if correspondance else 'non_resolue'
+        REQUETES_DUREE.observer(mesure.total, vue=vue)
+        if mesure.requetes:
+            REQUETES_SQL.incrementer(mesure.requetes, vue=vue)
+        if not response.streaming and response.get('Content-Type', '').startswith('application/json'):
+            API_OCTETS.observer(len(response.content), vue=vue)
+        METRIQUES.ecrire_si_necessaire()
@@ -0,0 +1,112 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:16
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# ============================================================================
+# Copie figée de core.text au moment de la migration : une modification
+# ultérieure de core.text ne doit pas changer ce que fait cette migration.
+# ============================================================================
+
+SEPARATEURS_TELEPHONE = re.compile(r'[/,;]|\s-\s|\s{2,}|\bou\b|\bet\b', re.IGNORECASE)
+
+
+def normaliser_nom(texte):
+    texte = unicodedata.normalize('NFD', texte.lower().strip())
+    return ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
+
+
+def normaliser_telephone(telephone):
+    for numero in SEPARATEURS_TELEPHONE.split(telephone or ''):
+        numero = numero.strip()
+        chiffres = re.sub(r'\D', '', numero)
+        if len(chiffres) < 9:
+            continue
+        if numero.startswith('+'):
+            pass
+        elif chiffres.startswith('00'):
+            chiffres = chiffres[2:]
+        elif len(chiffres) == 10 and chiffres.startswith('0'):
+            chiffres = '33' + chiffres[1:]
+        elif len(chiffres) == 9:
+            chiffres = '33' + chiffres
+        else:
+            continue
+        if chiffres.startswith('330') and len(chiffres) == 12:
+            chiffres = '33' + chiffres[3:]
+        if len(chiffres) > 15:
+            continue
+        return '+' + chiffres
+    return ''
+
+
+def remplir_cles(apps, schema_editor):
+    """Calcule les clés des fiches existantes (même calcul que save())."""
+    for model_name, champ_telephone in [('Eleve', 'telephone_parent'), ('Benevole', 'telephone')]:
+        model = apps.get_model('core', model_name)
+        objets = list(model.objects.all())
+        for obj in objets:
+            obj.nom_cle = normaliser_nom(obj.nom or '')
+            obj.prenom_cle = normaliser_nom(obj.prenom or '')
+            obj.telephone_cle = normaliser_telephone(getattr(obj, champ_telephone) or '')
+        model.objects.bulk_update(objets, ['nom_cle', 'prenom_cle', 'telephone_cle'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_alter_benevole_volet_3_casier_judiciaire'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='benevole',
+            name='nom_cle',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Nom normalisé'),
+        ),
+        migrations.AddField(
+            model_name='benevole',
+            name='prenom_cle',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Prénom normalisé'),
+        ),
+        migrations.AddField(
+            model_name='benevole',
+            name='telephone_cle',
+            field=models.CharField(blank=True, editable=False, help_text='Format E.164 (+33...) du premier numéro de telephone', max_length=20, verbose_name='Téléphone normalisé'),
+        ),
+        migrations.AddField(
+            model_name='eleve',
+            name='nom_cle',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Nom normalisé'),
+        ),
+        migrations.AddField(
+            model_name='eleve',
+            name='prenom_cle',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Prénom normalisé'),
+        ),
+        migrations.AddField(
+            model_name='eleve',
+            name='telephone_cle',
+            field=models.CharField(blank=True, editable=False, help_text='Format E.164 (+33...) du premier numéro de telephone_parent', max_length=20, verbose_name='Téléphone des parents normalisé'),
+        ),
+        migrations.AddIndex(
+            model_name='benevole',
+            index=models.Index(fields=['nom_cle', 'prenom_cle'], name='core_benevo_nom_cle_cce8cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='benevole',
+            index=models.Index(fields=['telephone_cle'], name='core_benevo_telepho_533f46_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eleve',
+            index=models.Index(fields=['nom_cle', 'prenom_cle'], name='core_eleve_nom_cle_4b8302_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eleve',
+            index=models.Index(fields=['telephone_cle'], name='core_eleve_telepho_0d273f_idx'),
+        ),
+        migrations.RunPython(remplir_cles, migrations.RunPython.noop),
+    ]
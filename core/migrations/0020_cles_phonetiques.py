@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:29
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# ============================================================================
+# Copie figée de core.text.phonetique au moment de la migration : une
+# modification ultérieure de l'algorithme ne doit pas changer ce que fait
+# cette migration.
+# ============================================================================
+
+REGLES_PHONETIQUES = [(re.compile(motif), code) for motif, code in [
+    (r'ch(?=[lr])', 'K'),
+    (r't?s?ch|sh', 'X'),
+    (r'gu(?=[eiy])', 'G'),
+    (r'gn', 'N'),
+    (r'dj|dg|g(?=[eiy])|j', 'J'),
+    (r'g', 'G'),
+    (r'ph|f', 'F'),
+    (r'qu|ck|q|k|c(?![eiy])', 'K'),
+    (r'c|s|z', 'S'),
+    (r'x', 'KS'),
+    (r'w|v', 'V'),
+    (r'y', 'i'),
+    (r'h', ''),
+    (r'b', 'B'), (r'd', 'D'), (r'l', 'L'), (r'm', 'M'),
+    (r'n', 'N'), (r'p', 'P'), (r'r', 'R'), (r't', 'T'),
+]]
+
+FINALE_MUETTE = re.compile(r'(?<=..)e*[dstxz]*e*$')
+
+
+def phonetique(texte):
+    if not texte:
+        return ''
+    texte = unicodedata.normalize('NFD', texte.lower())
+    texte = ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
+    texte = re.sub(r'[^a-z]', '', texte)
+    texte = FINALE_MUETTE.sub('', texte)
+    for motif, code in REGLES_PHONETIQUES:
+        texte = motif.sub(code, texte)
+
+    cle = []
+    precedent = ''
+    for i, c in enumerate(texte):
+        if c != precedent:
+            if c not in 'aeiou':
+                cle.append(c)
+            elif i == 0:
+                cle.append('A')
+        precedent = c
+    return ''.join(cle)
+
+
+def remplir_cles_phonetiques(apps, schema_editor):
+    """Calcule les clés phonétiques des fiches existantes (même calcul que save())."""
+    for model_name in ('Eleve', 'Benevole'):
+        model = apps.get_model('core', model_name)
+        objets = list(model.objects.only('id', 'nom', 'prenom'))
+        for obj in objets:
+            obj.nom_phonetique = phonetique(obj.nom or '')
+            obj.prenom_phonetique = phonetique(obj.prenom or '')
+        model.objects.bulk_update(objets, ['nom_phonetique', 'prenom_phonetique'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_cles_normalisees'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='benevole',
+            name='nom_phonetique',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Nom (clé phonétique)'),
+        ),
+        migrations.AddField(
+            model_name='benevole',
+            name='prenom_phonetique',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Prénom (clé phonétique)'),
+        ),
+        migrations.AddField(
+            model_name='eleve',
+            name='nom_phonetique',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Nom (clé phonétique)'),
+        ),
+        migrations.AddField(
+            model_name='eleve',
+            name='prenom_phonetique',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Prénom (clé phonétique)'),
+        ),
+        migrations.AddIndex(
+            model_name='benevole',
+            index=models.Index(fields=['nom_phonetique', 'prenom_phonetique'], name='core_benevo_nom_pho_803bac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eleve',
+            index=models.Index(fields=['nom_phonetique', 'prenom_phonetique'], name='core_eleve_nom_pho_be267f_idx'),
+        ),
+        migrations.RunPython(remplir_cles_phonetiques, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:56
+
+import core.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_cles_phonetiques'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('traitement', models.CharField(help_text='Nom du traitement enregistré dans core.taches', max_length=50, verbose_name='Traitement')),
+                ('description', models.CharField(max_length=200, verbose_name='Description')),
+                ('parametres', models.JSONField(blank=True, default=dict, verbose_name='Paramètres')),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('terminee', 'Terminée'), ('echec', 'Échec')], default='en_attente', max_length=20, verbose_name='Statut')),
+                ('progression', models.PositiveIntegerField(default=0, verbose_name='Éléments traités')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Éléments à traiter')),
+                ('message', models.TextField(blank=True, help_text="Bilan de la tâche, ou l'erreur en cas d'échec", verbose_name='Résultat')),
+                ('fichier', models.FileField(blank=True, storage=core.models.stockage_taches, upload_to='', verbose_name='Fichier produit')),
+                ('date_creation', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('date_debut', models.DateTimeField(blank=True, null=True, verbose_name='Début')),
+                ('date_fin', models.DateTimeField(blank=True, null=True, verbose_name='Fin')),
+                ('utilisateur', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='taches', to=settings.AUTH_USER_MODEL, verbose_name='Lancée par')),
+            ],
+            options={
+                'verbose_name': 'Tâche de fond',
+                'verbose_name_plural': 'Tâches de fond',
+                'ordering': ['-date_creation'],
+                'indexes': [models.Index(fields=['statut', 'date_creation'], name='core_tache_statut_ecfc85_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:01
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Copie figée de core.text.texte_recherche au moment de la migration
+def texte_recherche(texte):
+    texte = unicodedata.normalize('NFD', texte.lower())
+    return ' '.join(''.join(c for c in texte if unicodedata.category(c) != 'Mn').split())
+
+
+# Copie des CHAMPS_RECHERCHE des modèles au moment de la migration
+CHAMPS_RECHERCHE = {
+    'Eleve': ('nom', 'prenom', 'adresse', 'etablissement',
+              'telephone', 'telephone_parent', 'code_postal'),
+    'Benevole': ('nom', 'prenom', 'email', 'telephone', 'adresse',
+                 'ville', 'code_postal', 'profession'),
+}
+
+TABLES = ('core_eleve', 'core_benevole')
+
+
+def remplir_recherche(apps, schema_editor):
+    """Calcule le texte de recherche des fiches existantes (même calcul que save())."""
+    for model_name, champs in CHAMPS_RECHERCHE.items():
+        model = apps.get_model('core', model_name)
+        objets = list(model.objects.only('id', *champs))
+        for obj in objets:
+            obj.recherche = '\n'.join(texte_recherche(str(getattr(obj, champ) or '')) for champ in champs)
+        model.objects.bulk_update(objets, ['recherche'], batch_size=1000)
+
+
+def creer_index_trigrammes(apps, schema_editor):
+    """PostgreSQL : index GIN pg_trgm, pour que recherche LIKE '%...%' n'ait pas à lire toute la table."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in TABLES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_recherche_trgm '
+            f'ON {table} USING gin (recherche gin_trgm_ops)')
+
+
+def supprimer_index_trigrammes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_recherche_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_tache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='benevole',
+            name='recherche',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texte de recherche (sans accents)'),
+        ),
+        migrations.AddField(
+            model_name='eleve',
+            name='recherche',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texte de recherche (sans accents)'),
+        ),
+        migrations.RunPython(remplir_recherche, migrations.RunPython.noop),
+        migrations.RunPython(creer_index_trigrammes, supprimer_index_trigrammes),
+    ]
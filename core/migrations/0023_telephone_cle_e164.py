@@ -0,0 +1,56 @@
+import re
+
+from django.db import migrations
+
+
+# Copie figée de core.text.normaliser_telephone (au plus 15 chiffres, E.164)
+SEPARATEURS_TELEPHONE = re.compile(r'[/,;]|\s-\s|\s{2,}|\bou\b|\bet\b', re.IGNORECASE)
+
+
+def normaliser_telephone(telephone):
+    for numero in SEPARATEURS_TELEPHONE.split(telephone or ''):
+        numero = numero.strip()
+        chiffres = re.sub(r'\D', '', numero)
+        if len(chiffres) < 9:
+            continue
+        if numero.startswith('+'):
+            pass
+        elif chiffres.startswith('00'):
+            chiffres = chiffres[2:]
+        elif len(chiffres) == 10 and chiffres.startswith('0'):
+            chiffres = '33' + chiffres[1:]
+        elif len(chiffres) == 9:
+            chiffres = '33' + chiffres
+        else:
+            continue
+        if chiffres.startswith('330') and len(chiffres) == 12:
+            chiffres = '33' + chiffres[3:]
+        if len(chiffres) > 15:
+            continue
+        return '+' + chiffres
+    return ''
+
+
+def recalculer_cles_trop_longues(apps, schema_editor):
+    """
+    Plusieurs numéros collés dans le même champ donnaient une clé de plus
+    de 16 caractères (acceptée par SQLite seulement) : recalculée.
+    """
+    for model_name, champ_telephone in [('Eleve', 'telephone_parent'), ('Benevole', 'telephone')]:
+        model = apps.get_model('core', model_name)
+        objets = [obj for obj in model.objects.only('id', champ_telephone, 'telephone_cle')
+                  if len(obj.telephone_cle) > 16]
+        for obj in objets:
+            obj.telephone_cle = normaliser_telephone(getattr(obj, champ_telephone))
+        model.objects.bulk_update(objets, ['telephone_cle'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_index_recherche'),
+    ]
+
+    operations = [
+        migrations.RunPython(recalculer_cles_trop_longues, migrations.RunPython.noop),
+    ]
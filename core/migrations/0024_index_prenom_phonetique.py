@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_telephone_cle_e164'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='benevole',
+            index=models.Index(fields=['prenom_phonetique'], name='core_benevo_prenom__99879b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eleve',
+            index=models.Index(fields=['prenom_phonetique'], name='core_eleve_prenom__85fb32_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_index_prenom_phonetique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tache',
+            name='date_activite',
+            field=models.DateTimeField(blank=True, help_text='Mise à jour avec la progression : une tâche sans activité est reprise', null=True, verbose_name='Dernière activité'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:05
+
+import re
+import unicodedata
+
+from django.db import migrations
+
+
+# ============================================================================
+# Copie figée de core.text.phonetique au moment de la migration : une
+# modification ultérieure de l'algorithme ne doit pas changer ce que fait
+# cette migration.
+# ============================================================================
+
+REGLES_PHONETIQUES = [(re.compile(motif), code) for motif, code in [
+    (r'ch(?=[lr])', 'K'),
+    (r't?s?ch|sh', 'X'),
+    (r'gu(?=[eiy])', 'G'),
+    (r'gn', 'N'),
+    (r'dj|dg|g(?=[eiy])|j', 'J'),
+    (r'g', 'G'),
+    (r'ph|f', 'F'),
+    (r'qu|ck|q|k|c(?![eiy])', 'K'),
+    (r'c|s|z', 'S'),
+    (r'x', 'KS'),
+    (r'w|v', 'V'),
+    (r'y', 'i'),
+    (r'h', ''),
+    (r'b', 'B'), (r'd', 'D'), (r'l', 'L'), (r'm', 'M'),
+    (r'n', 'N'), (r'p', 'P'), (r'r', 'R'), (r't', 'T'),
+]]
+
+ADOUCISSEMENTS = [(re.compile(r'c(?=[eiy])'), 's'), (re.compile(r'g(?=[eiy])'), 'j')]
+
+FINALE_MUETTE = re.compile(r'(?<=..)e*[dstxz]*e*$')
+
+
+def phonetique(texte):
+    if not texte:
+        return ''
+    texte = unicodedata.normalize('NFD', texte.lower())
+    texte = ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
+    texte = re.sub(r'[^a-z]', '', texte)
+    for motif, lettre in ADOUCISSEMENTS:
+        texte = motif.sub(lettre, texte)
+    texte = FINALE_MUETTE.sub('', texte)
+    for motif, code in REGLES_PHONETIQUES:
+        texte = motif.sub(code, texte)
+
+    cle = []
+    precedent = ''
+    for i, c in enumerate(texte):
+        if c != precedent:
+            if c not in 'aeiou':
+                cle.append(c)
+            elif i == 0:
+                cle.append('A')
+        precedent = c
+    return ''.join(cle)
+
+
+def recalculer_cles_phonetiques(apps, schema_editor):
+    """Recalcule les clés phonétiques : c et g doux notés avant la finale muette."""
+    for model_name in ('Eleve', 'Benevole'):
+        model = apps.get_model('core', model_name)
+        objets = list(model.objects.only('id', 'nom', 'prenom', 'nom_phonetique', 'prenom_phonetique'))
+        modifies = []
+        for obj in objets:
+            cles = (phonetique(obj.nom or ''), phonetique(obj.prenom or ''))
+            if cles != (obj.nom_phonetique, obj.prenom_phonetique):
+                obj.nom_phonetique, obj.prenom_phonetique = cles
+                modifies.append(obj)
+        model.objects.bulk_update(modifies, ['nom_phonetique', 'prenom_phonetique'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_tache_date_activite'),
+    ]
+
+    operations = [
+        migrations.RunPython(recalculer_cles_phonetiques, migrations.RunPython.noop),
+    ]
@@ -7,10 +7,113 @@ Chaque attribut = une colonne de la table.
 📚 Documentation : https://docs.djangoproject.com/en/stable/topics/db/models/
 """
 
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .text import normaliser_nom, normaliser_telephone, phonetique, texte_recherche
+
+
+# ============================================================================
+# 🔑 CLÉS NORMALISÉES
+# ============================================================================
+
+class ClesNormaliseesMixin:
+    """
+    Maintient les colonnes *_cle (nom/prénom sans accents ni majuscules,
+    téléphone au format E.164) et *_phonetique à chaque save().
+
+    Les imports et le dédoublonnage peuvent ainsi chercher une personne
+    par une simple requête indexée (nom_cle=..., prenom_cle=...) au lieu
+    de charger toute la table pour comparer en Python.
+
+    ⚠️ QuerySet.update() et bulk_create() ne passent pas par save() :
+    appeler mettre_a_jour_cles() avant un bulk_create, ou lancer
+    "python manage.py remplir_cles" après une modification en masse.
+    """
+
+    # colonne clé → (champ source, fonction de normalisation)
+    # Plusieurs champs sources (tuple) : valeurs normalisées une à une,
+    # une par ligne (index de recherche).
+    CLES_NORMALISEES = {}
+
+    def calculer_cles(self):
+        """Retourne {colonne clé: valeur} calculé depuis les champs sources."""
+        cles = {}
+        for cle, (source, normaliser) in self.CLES_NORMALISEES.items():
+            if isinstance(source, tuple):
+                cles[cle] = '\n'.join(normaliser(getattr(self, champ) or '') for champ in source)
+            else:
+                cles[cle] = normaliser(getattr(self, source) or '')
+        return cles
+
+    @classmethod
+    def champs_sources_cles(cls):
+        """Tous les champs dont dépend au moins une colonne clé."""
+        champs = []
+        for source, _ in cls.CLES_NORMALISEES.values():
+            for champ in (source if isinstance(source, tuple) else (source,)):
+                if champ not in champs:
+                    champs.append(champ)
+        return champs
+
+    def mettre_a_jour_cles(self):
+        """Recalcule les colonnes clés ; retourne la liste de celles qui ont changé."""
+        modifiees = []
+        for cle, valeur in self.calculer_cles().items():
+            if getattr(self, cle) != valeur:
+                setattr(self, cle, valeur)
+                modifiees.append(cle)
+        return modifiees
+
+    @classmethod
+    def filtre_nom_prenom_phonetique(cls, nom, prenom):
+        """
+        Critère (Q) : nom et prénom se prononcent comme ceux donnés, y compris
+        inversés. Utilise l'index (nom_phonetique, prenom_phonetique).
+        """
+        cle_nom, cle_prenom = phonetique(nom or ''), phonetique(prenom or '')
+        if not cle_nom or not cle_prenom:
+            return None
+        return (models.Q(nom_phonetique=cle_nom, prenom_phonetique=cle_prenom)
+                | models.Q(nom_phonetique=cle_prenom, prenom_phonetique=cle_nom))
+
+    @classmethod
+    def candidats_phonetiques(cls, nom, prenom):
+        """Fiches dont le nom et le prénom se prononcent comme ceux donnés."""
+        critere = cls.filtre_nom_prenom_phonetique(nom, prenom)
+        if critere is None:
+            return cls.objects.none()
+        return cls.objects.filter(critere)
+
+    @classmethod
+    def filtre_phonetique(cls, mot):
+        """
+        Critère (Q) : le nom ou le prénom se prononce comme ce mot. Chaque
+        branche a son index : (nom_phonetique, prenom_phonetique) pour le nom,
+        prenom_phonetique pour le prénom.
+        """
+        cle = phonetique(mot or '')
+        if len(cle) < 2:
+            # Clé trop courte ("Lo", "A") : elle correspondrait à trop de fiches
+            return None
+        return models.Q(nom_phonetique=cle) | models.Q(prenom_phonetique=cle)
+
+    def save(self, *args, **kwargs):
+        self.mettre_a_jour_cles()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # save(update_fields=['nom']) doit aussi écrire nom_cle
+            update_fields = set(update_fields)
+            update_fields |= {
+                cle for cle, (source, _) in self.CLES_NORMALISEES.items()
+                if update_fields & set(source if isinstance(source, tuple) else (source,))
+            }
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 
 # ============================================================================
 # 📚 MODÈLE MATIÈRE
@@ -51,7 +154,7 @@ class Matiere(models.Model):
 # 👨‍🎓 MODÈLE ÉLÈVE
 # ============================================================================
 
-class Eleve(models.Model):
+class Eleve(ClesNormaliseesMixin, models.Model):
     """
     Représente un élève de l'association ESA
     """
@@ -309,6 +412,69 @@ class Eleve(models.Model):
         verbose_name="Date de dernière visite",
         help_text="Date de la dernière visite effectuée chez la famille"
     )
+
+    # ========================================================================
+    # 🔑 CLÉS DE RECHERCHE (calculées automatiquement à chaque save)
+    # ========================================================================
+
+    nom_cle = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name="Nom normalisé"
+    )
+
+    prenom_cle = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name="Prénom normalisé"
+    )
+
+    telephone_cle = models.CharField(
+        max_length=20,
+        blank=True,
+        editable=False,
+        verbose_name="Téléphone des parents normalisé",
+        help_text="Format E.164 (+33...) du premier numéro de telephone_parent"
+    )
+
+    nom_phonetique = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name="Nom (clé phonétique)"
+    )
+
+    prenom_phonetique = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name="Prénom (clé phonétique)"
+    )
+
+    # Index de recherche de l'admin et des listes (voir core.recherche)
+    recherche = models.TextField(
+        blank=True,
+        editable=False,
+        default='',
+        verbose_name="Texte de recherche (sans accents)"
+    )
+
+    CHAMPS_RECHERCHE = (
+        'nom', 'prenom', 'adresse', 'etablissement',
+        'telephone', 'telephone_parent', 'code_postal',
+    )
+
+    CLES_NORMALISEES = {
+        'nom_cle': ('nom', normaliser_nom),
+        'prenom_cle': ('prenom', normaliser_nom),
+        'telephone_cle': ('telephone_parent', normaliser_telephone),
+        'nom_phonetique': ('nom', phonetique),
+        'prenom_phonetique': ('prenom', phonetique),
+        'recherche': (CHAMPS_RECHERCHE, texte_recherche),
+    }
+
     # ========================================================================
     # 🎨 MÉTADONNÉES DU MODÈLE
     # ========================================================================
@@ -317,6 +483,14 @@ class Eleve(models.Model):
         verbose_name = "Élève"
         verbose_name_plural = "Élèves"
         ordering = ['nom', 'prenom']
+
+        indexes = [
+            models.Index(fields=['nom_cle', 'prenom_cle']),
+            models.Index(fields=['telephone_cle']),
+            models.Index(fields=['nom_phonetique', 'prenom_phonetique']),
+            # filtre_phonetique : prenom_phonetique seul (recherche de l'admin)
+            models.Index(fields=['prenom_phonetique']),
+        ]
     
     def __str__(self):
         return f"{self.prenom} {self.nom}"
@@ -325,6 +499,24 @@ class Eleve(models.Model):
         """Retourne le nom complet de l'élève"""
         return f"{self.prenom} {self.nom}"
     
+    @classmethod
+    def filtre_identite(cls, nom, prenom, telephone_parent):
+        """
+        Critères (pour filter/get) retrouvant un élève par son identité :
+        nom + prénom + téléphone des parents, sur les colonnes clés indexées.
+        """
+        filtre = {
+            'nom_cle': normaliser_nom(nom),
+            'prenom_cle': normaliser_nom(prenom),
+        }
+        telephone_cle = normaliser_telephone(telephone_parent)
+        if telephone_cle:
+            filtre['telephone_cle'] = telephone_cle
+        else:
+            # Pas un numéro reconnaissable : comparaison exacte
+            filtre['telephone_parent'] = telephone_parent
+        return filtre
+    
     def get_nom_parent_complet(self):
         """Retourne le nom complet du parent"""
         if self.prenom_parent and self.nom_parent:
@@ -354,7 +546,7 @@ class Eleve(models.Model):
 # 🎓 MODÈLE BÉNÉVOLE - VERSION COMPLÈTE
 # ============================================================================
 
-class Benevole(models.Model):
+class Benevole(ClesNormaliseesMixin, models.Model):
     """
     Représente un bénévole de l'association ESA.
     
@@ -652,6 +844,68 @@ class Benevole(models.Model):
         help_text="Dernière mise à jour de la fiche"
     )
     
+    # ================================================================
+    # 🔑 CLÉS DE RECHERCHE (calculées automatiquement à chaque save)
+    # ================================================================
+    
+    nom_cle = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name="Nom normalisé"
+    )
+    
+    prenom_cle = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name="Prénom normalisé"
+    )
+    
+    telephone_cle = models.CharField(
+        max_length=20,
+        blank=True,
+        editable=False,
+        verbose_name="Téléphone normalisé",
+        help_text="Format E.164 (+33...) du premier numéro de telephone"
+    )
+    
+    nom_phonetique = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name="Nom (clé phonétique)"
+    )
+    
+    prenom_phonetique = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name="Prénom (clé phonétique)"
+    )
+    
+    # Index de recherche de l'admin et des listes (voir core.recherche)
+    recherche = models.TextField(
+        blank=True,
+        editable=False,
+        default='',
+        verbose_name="Texte de recherche (sans accents)"
+    )
+    
+    CHAMPS_RECHERCHE = (
+        'nom', 'prenom', 'email', 'telephone', 'adresse',
+        'ville', 'code_postal', 'profession',
+    )
+    
+    CLES_NORMALISEES = {
+        'nom_cle': ('nom', normaliser_nom),
+        'prenom_cle': ('prenom', normaliser_nom),
+        'telephone_cle': ('telephone', normaliser_telephone),
+        'nom_phonetique': ('nom', phonetique),
+        'prenom_phonetique': ('prenom', phonetique),
+        'recherche': (CHAMPS_RECHERCHE, texte_recherche),
+    }
+    
     # ================================================================
     # 🎨 MÉTADONNÉES DU MODÈLE
     # ================================================================
@@ -665,6 +919,11 @@ class Benevole(models.Model):
             models.Index(fields=['nom', 'prenom']),
             models.Index(fields=['statut']),
             models.Index(fields=['code_postal']),
+            models.Index(fields=['nom_cle', 'prenom_cle']),
+            models.Index(fields=['telephone_cle']),
+            models.Index(fields=['nom_phonetique', 'prenom_phonetique']),
+            # filtre_phonetique : prenom_phonetique seul (recherche de l'admin)
+            models.Index(fields=['prenom_phonetique']),
         ]
     
     # ================================================================
@@ -884,3 +1143,129 @@ class ProfilUtilisateur(models.Model):
     def __str__(self):
         return f"{self.user.username} → {self.benevole.get_nom_complet()}"
 
+
+
+# ============================================================================
+# ⏳ MODÈLE TÂCHE DE FOND
+# ============================================================================
+
+def stockage_taches():
+    """Fichiers produits par les tâches (exports) : hors de MEDIA_ROOT, servis par l'admin."""
+    return FileSystemStorage(location=settings.TACHES_ROOT)
+
+
+class Tache(models.Model):
+    """
+    Action longue de l'admin (export, mise à jour de milliers de fiches...)
+    exécutée hors de la requête HTTP par la commande run_jobs.
+    Voir core.taches.
+    """
+
+    STATUT_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('terminee', 'Terminée'),
+        ('echec', 'Échec'),
+    ]
+
+    traitement = models.CharField(
+        max_length=50,
+        verbose_name="Traitement",
+        help_text="Nom du traitement enregistré dans core.taches"
+    )
+
+    description = models.CharField(
+        max_length=200,
+        verbose_name="Description"
+    )
+
+    parametres = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Paramètres"
+    )
+
+    statut = models.CharField(
+        max_length=20,
+        choices=STATUT_CHOICES,
+        default='en_attente',
+        verbose_name="Statut"
+    )
+
+    progression = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Éléments traités"
+    )
+
+    total = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Éléments à traiter"
+    )
+
+    message = models.TextField(
+        blank=True,
+        verbose_name="Résultat",
+        help_text="Bilan de la tâche, ou l'erreur en cas d'échec"
+    )
+
+    fichier = models.FileField(
+        storage=stockage_taches,
+        blank=True,
+        verbose_name="Fichier produit"
+    )
+
+    utilisateur = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='taches',
+        verbose_name="Lancée par"
+    )
+
+    date_creation = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+
+    date_debut = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Début"
+    )
+
+    date_activite = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Dernière activité",
+        help_text="Mise à jour avec la progression : une tâche sans activité est reprise"
+    )
+
+    date_fin = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Fin"
+    )
+
+    class Meta:
+        verbose_name = "Tâche de fond"
+        verbose_name_plural = "Tâches de fond"
+        ordering = ['-date_creation']
+        indexes = [
+            # run_jobs : prochaine tâche en attente
+            models.Index(fields=['statut', 'date_creation']),
+        ]
+
+    def __str__(self):
+        return f"{self.description} ({self.get_statut_display()})"
+
+    def est_finie(self):
+        return self.statut in ('terminee', 'echec')
+
+    def pourcentage(self):
+        """Avancement en pourcentage (100 une fois terminée)."""
+        if self.statut == 'terminee':
+            return 100
+        if not self.total:
+            return 0
+        return min(100, int(self.progression * 100 / self.total))
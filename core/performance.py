@@ -0,0 +1,162 @@
+"""
+⏱️ PERFORMANCE.PY - Mesure du temps passé par requête (SQL, vue, gabarits)
+
+PerformanceMiddleware (core.middleware) ouvre une Mesure pour chaque
+requête HTTP :
+
+    - SQL      : nombre et durée des requêtes, via connection.execute_wrapper
+                 sur chaque connexion (aucun changement dans le code appelant)
+    - vue      : de l'appel de la vue à la réponse (SQL et gabarits compris)
+    - gabarits : rendu des templates Django, render() comme TemplateResponse
+    - total    : toute la requête, middlewares compris
+
+Le résultat part dans l'en-tête Server-Timing (onglet Réseau du navigateur,
+« Timing ») et, au-delà de PERF_SEUIL_LENT_MS, dans une ligne JSON du
+logger core.performance, avec les requêtes SQL les plus répétées :
+
+    requete_lente {"methode": "GET", "chemin": "/eleves/", "total_ms": 812.4,
+                   "requetes": 153, "sql_repetees": [{"nombre": 150, "sql": "SELECT ..."}]}
+
+Désactivé (PERF_ACTIVE=False, par défaut), le middleware se retire de la
+chaîne au démarrage (MiddlewareNotUsed) : aucun coût. Activé, chaque
+requête SQL ne coûte qu'un chronomètre et un compteur ; les empreintes ne
+sont calculées que pour les requêtes lentes.
+"""
+
+import contextvars
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+# Requêtes SQL les plus répétées citées dans le journal d'une requête lente
+NOMBRE_SQL_REPETEES = 3
+
+# Mesure de la requête HTTP en cours (par thread / tâche asynchrone)
+MESURE = contextvars.ContextVar('mesure_performance', default=None)
+
+
+# ============================================================================
+# 🔏 EMPREINTES SQL
+# ============================================================================
+
+_CHAINES = re.compile(r"'(?:[^']|'')*'")
+_NOMBRES = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LISTES = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_ESPACES = re.compile(r'\s+')
+# Points de sauvegarde de transaction.atomic() : "s<thread>_x<n>"
+_POINTS_SAUVEGARDE = re.compile(r'"s\d+_x\d+"')
+
+
+def empreinte_sql(sql):
+    """
+    Forme d'une requête SQL, sans ses valeurs : deux requêtes qui ne
+    diffèrent que par leurs paramètres (ids, listes IN, LIMIT...) ont la
+    même empreinte.
+
+        empreinte_sql('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21')
+        # 'SELECT * FROM t WHERE id IN (…) LIMIT ?'
+    """
+    sql = _CHAINES.sub('?', sql)
+    sql = _POINTS_SAUVEGARDE.sub('"s?_x?"', sql)
+    sql = _NOMBRES.sub('?', sql)
+    sql = _LISTES.sub('(…)', sql)
+    return _ESPACES.sub(' ', sql).strip()
+
+
+# ============================================================================
+# ⏱️ MESURE D'UNE REQUÊTE HTTP
+# ============================================================================
+
+class Mesure:
+    """Temps et requêtes SQL d'une requête HTTP (secondes)."""
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.total = 0.0
+        self.debut_vue = None
+        self.vue = 0.0
+        self.sql = 0.0
+        self.requetes = 0
+        self.sql_executees = Counter()  # texte SQL → nombre, sans empreinte (coût)
+        self.gabarits = 0.0
+        self.profondeur_gabarits = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper : chronomètre chaque requête SQL."""
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - debut
+            self.requetes += 1
+            self.sql_executees[sql] += 1
+
+    def sql_repetees(self, nombre=NOMBRE_SQL_REPETEES):
+        """[(nombre d'exécutions, empreinte)] des requêtes exécutées plus d'une fois."""
+        par_empreinte = Counter()
+        for sql, executions in self.sql_executees.items():
+            par_empreinte[empreinte_sql(sql)] += executions
+        return [(n, sql) for sql, n in par_empreinte.most_common(nombre) if n > 1]
+
+    def server_timing(self):
+        """Valeur de l'en-tête Server-Timing (durées en millisecondes)."""
+        return ', '.join([
+            f'total;dur={self.total * 1000:.1f}',
+            f'vue;dur={self.vue * 1000:.1f}',
+            f'db;dur={self.sql * 1000:.1f};desc="{self.requetes} requête(s) SQL"',
+            f'gabarits;dur={self.gabarits * 1000:.1f}',
+        ])
+
+
+@contextmanager
+def mesurer_requete():
+    """Mesure ouverte sur toutes les connexions le temps du bloc."""
+    mesure = Mesure()
+    jeton = MESURE.set(mesure)
+    try:
+        with ExitStack() as pile:
+            for connexion in connections.all():
+                pile.enter_context(connexion.execute_wrapper(mesure))
+            yield mesure
+    finally:
+        mesure.total = time.perf_counter() - mesure.debut
+        MESURE.reset(jeton)
+
+
+# ============================================================================
+# 🎨 TEMPS DE RENDU DES GABARITS
+# ============================================================================
+
+def installer_mesure_gabarits():
+    """
+    Chronomètre le rendu des templates Django (backend Template.render, par
+    où passent render(), render_to_string() et TemplateResponse). Installé
+    une seule fois, seulement si le middleware est actif ; hors requête
+    mesurée, le rendu est appelé tel quel.
+    """
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'mesure_gabarits', False):
+        return
+    rendu_origine = Template.render
+
+    def render(self, context=None, request=None):
+        mesure = MESURE.get()
+        if mesure is None:
+            return rendu_origine(self, context, request)
+        mesure.profondeur_gabarits += 1
+        debut = time.perf_counter()
+        try:
+            return rendu_origine(self, context, request)
+        finally:
+            mesure.profondeur_gabarits -= 1
+            # render_to_string() dans un gabarit : déjà compté par le rendu englobant
+            if not mesure.profondeur_gabarits:
+                mesure.gabarits += time.perf_counter() - debut
+
+    render.mesure_gabarits = True
+    Template.render = render
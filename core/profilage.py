@@ -0,0 +1,337 @@
+"""
+⏱️ PROFILAGE.PY - Mesure des imports par phase (option --profile)
+
+Toutes les commandes d'import acceptent :
+
+    python manage.py import_eleves eleves.csv --profile                # profil_import_eleves_<date>.json
+    python manage.py import_eleves eleves.csv --profile mesures.json
+    python manage.py import_eleves eleves.csv --profile --cprofile import.prof
+
+Le temps est réparti en phases exclusives (une seconde n'est comptée
+qu'une fois) :
+    - verifications : vérifications système de Django avant la commande
+    - lecture       : analyse du fichier (CSV, XLSX, ODS)
+    - traitement    : code Python de la boucle (normalisation, construction
+                      des requêtes par l'ORM...)
+    - recherche     : requêtes SELECT lancées pendant la boucle
+    - ecriture      : INSERT / UPDATE / DELETE pendant la boucle
+    - autres phases nommées par la commande (geocodage, instantane...)
+
+En fin de commande, un tableau (temps, requêtes, lignes/s par phase) est
+affiché et un fichier JSON est écrit, à comparer d'un déploiement à l'autre.
+
+Les requêtes sont chronométrées par connection.execute_wrapper seulement :
+la lecture des lignes d'un curseur (fetchone / fetchall...) et les COMMIT
+n'y passent pas et restent dans la phase englobante (traitement). Sur
+SQLite, qui évalue une requête au fil de la lecture des lignes, recherche
+sous-estime donc le coût des SELECT.
+
+Sans --profile, le profileur est inactif et ne coûte rien.
+"""
+
+import cProfile
+import io
+import json
+import platform
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import django
+from django.conf import settings
+from django.db import connection
+
+from .metriques import (COMMANDES_DUREE, COMMANDES_EXECUTIONS, IMPORT_DEBIT,
+                        IMPORT_LIGNES, METRIQUES)
+
+
+# Phase de départ : tout ce qui n'est pas dans une phase nommée
+AUTRE = 'autre'
+LECTURE = 'lecture'
+TRAITEMENT = 'traitement'
+RECHERCHE = 'recherche'
+ECRITURE = 'ecriture'
+
+RIEN = nullcontext()
+
+
+class Phase:
+    """Cumul d'une phase : temps exclusif, nombre d'entrées et de requêtes."""
+
+    __slots__ = ('secondes', 'appels', 'requetes')
+
+    def __init__(self):
+        self.secondes = 0.0
+        self.appels = 0
+        self.requetes = 0
+
+
+class Profileur:
+    """
+    Chronomètre à pile : entrer dans une phase met en pause la phase
+    englobante, qui reprend à la sortie.
+
+    Les requêtes SQL sont comptées dans la phase en cours ; pendant la
+    boucle de lignes (lignes()), elles forment leurs propres phases
+    recherche / ecriture.
+    """
+
+    def __init__(self, commande, actif=False):
+        self.commande = commande
+        self.actif = actif
+        self.phases = {}
+        self.pile = []
+        self.depuis = None
+        self.nb_lignes = 0
+        self.debut = None
+        self.duree = 0.0
+
+    # ------------------------------------------------------------------
+    # Chronométrage
+    # ------------------------------------------------------------------
+
+    def _entrer(self, nom):
+        maintenant = time.perf_counter()
+        if self.pile:
+            self.phases[self.pile[-1]].secondes += maintenant - self.depuis
+        phase = self.phases.get(nom)
+        if phase is None:
+            phase = self.phases[nom] = Phase()
+        phase.appels += 1
+        self.pile.append(nom)
+        self.depuis = maintenant
+        return phase
+
+    def _sortir(self):
+        maintenant = time.perf_counter()
+        self.phases[self.pile.pop()].secondes += maintenant - self.depuis
+        self.depuis = maintenant
+
+    @contextmanager
+    def _phase(self, nom):
+        self._entrer(nom)
+        try:
+            yield
+        finally:
+            self._sortir()
+
+    def phase(self, nom):
+        """Bloc chronométré sous le nom donné (sans effet si inactif)."""
+        return self._phase(nom) if self.actif else RIEN
+
+    def lignes(self, reader):
+        """
+        Itère sur un lecteur de lignes en séparant la lecture du fichier
+        (phase lecture) du corps de la boucle (phase traitement).
+        """
+        if not self.actif:
+            # Lignes comptées quand même : débit publié dans les métriques
+            for row in reader:
+                self.nb_lignes += 1
+                yield row
+            return
+
+        iterateur = iter(reader)
+        while True:
+            self._entrer(LECTURE)
+            try:
+                row = next(iterateur)
+            except StopIteration:
+                return
+            finally:
+                self._sortir()
+
+            self.nb_lignes += 1
+            self._entrer(TRAITEMENT)
+            try:
+                yield row
+            finally:
+                self._sortir()
+
+    def _requete(self, execute, sql, params, many, context):
+        """execute_wrapper : compte la requête, et la chronomètre à part dans la boucle."""
+        if self.pile and self.pile[-1] == TRAITEMENT:
+            est_lecture = sql.lstrip()[:6].upper() == 'SELECT'
+            phase = self._entrer(RECHERCHE if est_lecture else ECRITURE)
+            try:
+                phase.requetes += 1
+                return execute(sql, params, many, context)
+            finally:
+                self._sortir()
+
+        if self.pile:
+            self.phases[self.pile[-1]].requetes += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def mesurer(self):
+        """Active le chronométrage et le comptage des requêtes pour la durée du bloc."""
+        if not self.actif:
+            yield
+            return
+
+        self.debut = time.perf_counter()
+        self._entrer(AUTRE)
+        try:
+            with connection.execute_wrapper(self._requete):
+                yield
+        finally:
+            # Une boucle interrompue par une exception peut laisser des phases ouvertes
+            while self.pile:
+                self._sortir()
+            self.duree = time.perf_counter() - self.debut
+
+    # ------------------------------------------------------------------
+    # Rapport
+    # ------------------------------------------------------------------
+
+    def resultats(self):
+        """Dict sérialisable : une entrée par phase, triées par temps décroissant."""
+        phases = {}
+        for nom, phase in sorted(self.phases.items(), key=lambda p: -p[1].secondes):
+            phases[nom] = {
+                'secondes': round(phase.secondes, 6),
+                'pourcentage': round(100 * phase.secondes / self.duree, 1) if self.duree else 0,
+                'appels': phase.appels,
+                'requetes': phase.requetes,
+                'lignes_par_seconde': (round(self.nb_lignes / phase.secondes, 1)
+                                       if phase.secondes and self.nb_lignes else None),
+            }
+        return {
+            'commande': self.commande,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'duree_secondes': round(self.duree, 6),
+            'lignes': self.nb_lignes,
+            'requetes': sum(phase.requetes for phase in self.phases.values()),
+            'lignes_par_seconde': round(self.nb_lignes / self.duree, 1) if self.duree else None,
+            'phases': phases,
+        }
+
+    def tableau(self):
+        """Lignes de texte du tableau récapitulatif."""
+        resultats = self.resultats()
+        lignes = [
+            f'{"Phase":<18}{"Temps (s)":>11}{"%":>7}{"Appels":>9}{"Requêtes":>10}{"Lignes/s":>11}',
+            '-' * 66,
+        ]
+        for nom, p in resultats['phases'].items():
+            debit = f'{p["lignes_par_seconde"]:.0f}' if p['lignes_par_seconde'] else '-'
+            lignes.append(f'{nom:<18}{p["secondes"]:>11.3f}{p["pourcentage"]:>7.1f}'
+                          f'{p["appels"]:>9}{p["requetes"]:>10}{debit:>11}')
+        lignes.append('-' * 66)
+        debit = f'{resultats["lignes_par_seconde"]:.0f}' if resultats['lignes_par_seconde'] else '-'
+        lignes.append(f'{"TOTAL":<18}{resultats["duree_secondes"]:>11.3f}{100:>7.1f}'
+                      f'{"":>9}{resultats["requetes"]:>10}{debit:>11}')
+        lignes.append(f'{resultats["lignes"]} ligne(s) lue(s)')
+        return lignes
+
+    def ecrire(self, chemin):
+        with open(chemin, 'w', encoding='utf-8') as f:
+            json.dump(self.resultats(), f, ensure_ascii=False, indent=2)
+
+
+# ============================================================================
+# 🧩 MIXIN POUR LES COMMANDES D'IMPORT
+# ============================================================================
+
+class ProfilageMixin:
+    """
+    Ajoute --profile et --cprofile à une commande, et met à sa disposition
+    self.profileur :
+
+        class Command(ProfilageMixin, BaseCommand):
+            def handle(self, *args, **options):
+                for row in self.profileur.lignes(reader):
+                    ...
+                with self.profileur.phase('geocodage'):
+                    ...
+    """
+
+    # Nombre de fonctions affichées depuis le profil cProfile
+    TOP_CPROFILE = 15
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            '--profile',
+            nargs='?',
+            const='',
+            metavar='JSON',
+            help='Mesure le temps, les lignes et les requêtes par phase ; écrit un rapport JSON '
+                 '(défaut : profil_<commande>_<date>.json)'
+        )
+        parser.add_argument(
+            '--cprofile',
+            metavar='FICHIER',
+            help='Avec --profile : enregistre aussi un profil cProfile (lisible avec pstats / snakeviz)'
+        )
+        return parser
+
+    def execute(self, *args, **options):
+        commande = self.__module__.rsplit('.', 1)[-1]
+        debut = time.perf_counter()
+        resultat = 'echec'
+        try:
+            sortie = self._executer(commande, *args, **options)
+            resultat = 'succes'
+            return sortie
+        finally:
+            if settings.METRIQUES_ACTIVE:
+                self.publier_metriques(commande, time.perf_counter() - debut, resultat)
+
+    def _executer(self, commande, *args, **options):
+        profil_json = options.get('profile')
+        self.profileur = Profileur(commande, actif=profil_json is not None)
+        if not self.profileur.actif:
+            return super().execute(*args, **options)
+
+        profil_c = cProfile.Profile() if options.get('cprofile') else None
+        try:
+            with self.profileur.mesurer():
+                if profil_c:
+                    profil_c.enable()
+                try:
+                    return super().execute(*args, **options)
+                finally:
+                    if profil_c:
+                        profil_c.disable()
+        finally:
+            chemin = profil_json or f'profil_{commande}_{datetime.now():%Y%m%d_%H%M%S}.json'
+            self.rapport_profilage(chemin, profil_c, options.get('cprofile'))
+
+    def publier_metriques(self, commande, duree, resultat):
+        """Exécution, durée et débit de l'import dans les métriques de /metrics (core.metriques)."""
+        try:
+            COMMANDES_EXECUTIONS.incrementer(commande=commande, resultat=resultat)
+            COMMANDES_DUREE.observer(duree, commande=commande)
+            lignes = self.profileur.nb_lignes
+            if lignes:
+                IMPORT_LIGNES.incrementer(lignes, commande=commande)
+                if duree:
+                    IMPORT_DEBIT.fixer(lignes / duree, commande=commande)
+            METRIQUES.pousser()
+        except Exception as e:
+            # Dossier des métriques inaccessible... : l'import, lui, a abouti
+            self.stderr.write(f'⚠️  Métriques non enregistrées : {e}')
+
+    def check(self, *args, **kwargs):
+        with self.profileur.phase('verifications'):
+            return super().check(*args, **kwargs)
+
+    def rapport_profilage(self, chemin, profil_c, chemin_c):
+        self.stdout.write(self.style.SUCCESS('\n⏱️  Profil de l\'import'))
+        for ligne in self.profileur.tableau():
+            self.stdout.write(f'  {ligne}')
+
+        self.profileur.ecrire(chemin)
+        self.stdout.write(f'  📝 Mesures écrites dans {chemin}')
+
+        if profil_c:
+            profil_c.dump_stats(chemin_c)
+            sortie = io.StringIO()
+            pstats.Stats(profil_c, stream=sortie).sort_stats('cumulative').print_stats(self.TOP_CPROFILE)
+            self.stdout.write(sortie.getvalue())
+            self.stdout.write(f'  📝 Profil cProfile écrit dans {chemin_c}')
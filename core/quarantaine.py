@@ -0,0 +1,198 @@
+"""
+🚧 QUARANTAINE.PY - Lignes rejetées par les imports (option --only-rejects)
+
+Une ligne qui échoue (erreur, fiche introuvable...) n'est plus seulement
+affichée : elle est recopiée telle quelle, au fil de l'import, dans un
+fichier de rejets à côté du fichier importé, avec son numéro de ligne
+d'origine et le motif du rejet :
+
+    eleves.csv               → eleves.rejets.csv
+    suivi.xlsx:Binômes David → suivi_Binômes David.rejets.csv
+
+    Nom famille enfant,Prénom enfant,...,ligne_origine,motif_rejet
+    DUPONT,Jean,...,42,value too long for type character varying(20)
+
+Après correction des lignes dans ce fichier (ou dans la source), seules
+les lignes rejetées sont reprises :
+
+    python manage.py import_eleves eleves.csv --only-rejects
+
+Le fichier de rejets est alors réécrit avec les lignes encore en échec,
+ou supprimé si toutes sont passées. En --dry-run, les rejets sont
+seulement comptés : aucun fichier n'est écrit.
+"""
+
+import csv
+import os
+from contextlib import contextmanager
+
+from .colonnes import LecteurColonnes
+from .lecture import separer_feuille
+
+
+# Colonnes ajoutées en fin de ligne dans le fichier de rejets
+COLONNE_LIGNE = 'ligne_origine'
+COLONNE_MOTIF = 'motif_rejet'
+
+
+def chemin_rejets(chemin):
+    """Fichier de rejets d'un fichier d'import (toujours en CSV)."""
+    fichier, feuille = separer_feuille(chemin)
+    base = os.path.splitext(fichier)[0]
+    if base.endswith('.rejets'):
+        base = base[:-len('.rejets')]
+    if feuille:
+        base = f'{base}_{feuille}'
+    return f'{base}.rejets.csv'
+
+
+class Quarantaine:
+    """
+    Fichier de rejets d'un fichier d'import.
+
+    En relecture (--only-rejects), c'est le fichier de rejets qui est lu ;
+    les nouveaux rejets vont dans un fichier temporaire qui le remplace à la
+    fin, pour ne rien perdre si l'import est interrompu.
+    """
+
+    def __init__(self, chemin_import, relecture=False, ecrire=True):
+        self.chemin = chemin_rejets(chemin_import)
+        self.relecture = relecture
+        self.source = self.chemin if relecture else chemin_import
+        self.ecrire = ecrire
+        self.destination = f'{self.chemin}.tmp' if relecture else self.chemin
+        self.entetes = []
+        self.largeur = 0
+        self.fichier = None
+        self.writer = None
+        self.nombre = 0
+        self.absente = False
+
+    @contextmanager
+    def lire(self, schema, minuscules=False):
+        """Ouvre la source avec le schéma ; lecteur.rejeter(motif) met la ligne en quarantaine."""
+        if self.relecture and not os.path.exists(self.source):
+            self.absente = True
+            yield LecteurColonnes([], iter(()), None)
+            return
+
+        with schema.ouvrir(self.source, minuscules) as lecteur:
+            self.entetes = lecteur.fieldnames
+            # Fichier de rejets relu : ses deux dernières colonnes sont les nôtres
+            if COLONNE_LIGNE in self.entetes:
+                self.largeur = self.entetes.index(COLONNE_LIGNE)
+            else:
+                self.largeur = len(self.entetes)
+            lecteur.rejets = self
+            yield lecteur
+
+    def rejeter(self, numero, brute, motif):
+        """Recopie une ligne brute (liste de textes) dans le fichier de rejets."""
+        if not any(brute):
+            return  # une ligne vide n'a rien à corriger
+        self.nombre += 1
+        if not self.ecrire:
+            return
+
+        if self.largeur < len(self.entetes) and self.largeur < len(brute):
+            numero = brute[self.largeur]  # numéro d'origine, pas celui du fichier de rejets
+        cellules = list(brute[:self.largeur])
+        cellules += [''] * (self.largeur - len(cellules))
+
+        if self.writer is None:
+            self.fichier = open(self.destination, 'w', encoding='utf-8', newline='')
+            self.writer = csv.writer(self.fichier)
+            self.writer.writerow(self.entetes[:self.largeur] + [COLONNE_LIGNE, COLONNE_MOTIF])
+        self.writer.writerow(cellules + [numero, motif])
+        # Écrit au fil de l'eau : visible même si l'import est interrompu
+        self.fichier.flush()
+
+    def terminer(self):
+        """Fin normale : remplace ou supprime le fichier de rejets selon le résultat."""
+        self._fermer()
+        if not self.ecrire or self.absente:
+            return
+        if self.nombre:
+            if self.relecture:
+                os.replace(self.destination, self.chemin)
+        elif os.path.exists(self.chemin):
+            os.remove(self.chemin)
+
+    def abandonner(self):
+        """Import interrompu : en relecture, le fichier de rejets d'origine est conservé."""
+        self._fermer()
+        if self.relecture and os.path.exists(self.destination):
+            os.remove(self.destination)
+
+    def _fermer(self):
+        if self.fichier is not None:
+            self.fichier.close()
+            self.fichier = None
+
+
+# ============================================================================
+# 🧩 MIXIN POUR LES COMMANDES D'IMPORT
+# ============================================================================
+
+class QuarantaineMixin:
+    """
+    Ajoute --only-rejects à une commande d'import, et met à sa disposition :
+
+        with self.ouvrir_import(ColonnesEleves, csv_file) as lecteur:
+            for ligne in self.profileur.lignes(lecteur):
+                try:
+                    ...
+                except Exception as e:
+                    lecteur.rejeter(str(e))
+
+    self.seulement_rejets indique une reprise des rejets (fichier partiel).
+    """
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            '--only-rejects',
+            action='store_true',
+            help='Reprend uniquement les lignes rejetées par le dernier import '
+                 '(fichier <nom>.rejets.csv à côté de chaque fichier)'
+        )
+        return parser
+
+    def execute(self, *args, **options):
+        self.seulement_rejets = options.get('only_rejects', False)
+        self.ecrire_rejets = not options.get('dry_run', False)
+        return super().execute(*args, **options)
+
+    @contextmanager
+    def quarantaine(self, chemin):
+        """Quarantaine d'un fichier d'import, avec bilan affiché à la fin."""
+        rejets = Quarantaine(chemin, self.seulement_rejets, self.ecrire_rejets)
+        if self.seulement_rejets:
+            self.stdout.write(f'   🚧 Reprise des rejets : {rejets.chemin}')
+        try:
+            yield rejets
+        except BaseException:
+            rejets.abandonner()
+            raise
+        rejets.terminer()
+        self.bilan_rejets(rejets)
+
+    @contextmanager
+    def ouvrir_import(self, schema, chemin, minuscules=False):
+        with self.quarantaine(chemin) as rejets, rejets.lire(schema, minuscules) as lecteur:
+            yield lecteur
+
+    def bilan_rejets(self, rejets):
+        if rejets.absente:
+            self.stdout.write(f'   ✅ Aucun rejet à reprendre ({rejets.chemin} absent)')
+        elif not rejets.nombre:
+            if rejets.relecture and rejets.ecrire:
+                self.stdout.write(self.style.SUCCESS(
+                    f'   ✅ Tous les rejets ont été repris ({rejets.chemin} supprimé)'))
+        elif not rejets.ecrire:
+            self.stdout.write(self.style.WARNING(
+                f'   🚧 {rejets.nombre} ligne(s) seraient rejetées'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'   🚧 {rejets.nombre} ligne(s) rejetée(s) → {rejets.chemin} '
+                f'(à corriger, puis relancer avec --only-rejects)'))
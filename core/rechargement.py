@@ -0,0 +1,319 @@
+"""
+🔁 RECHARGEMENT.PY - Rechargement complet via une base de préparation
+
+Un rechargement complet ne vide plus la base de production pendant
+l'import. Les données sont chargées dans une base SQLite de préparation
+(« staging »), validées, puis basculées en une seule transaction courte :
+
+    1. preparer()     : base de préparation vierge (schéma migré), avec une
+                        copie des utilisateurs et des matières de production
+    2. importer()     : commandes d'import lancées sur la base de préparation
+    3. completer()    : profils co-responsables et coordonnées GPS reportés
+    4. valider()      : volumes, clés étrangères, un binôme actif par élève
+    5. basculer()     : remplacement des tables en UNE transaction
+
+Tant que la bascule n'a pas eu lieu, la production n'est pas touchée : un
+import qui échoue à mi-parcours laisse le site tel qu'il était. Les lecteurs
+(carte, API) voient soit l'ancien jeu de données, soit le nouveau, jamais
+un état partiel.
+
+La base de préparation est toujours un fichier SQLite, même quand la
+production tourne sur PostgreSQL. Elle contient une copie de la table des
+utilisateurs (hachages de mots de passe compris) : base_preparation() la
+crée en 0600 dans un dossier temporaire privé et la supprime à la sortie,
+que le rechargement ait réussi ou échoué.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import dj_database_url
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.db.models import Count
+
+from .matieres import REGISTRE
+from .models import Benevole, Binome, Eleve, Matiere, ProfilUtilisateur
+
+
+# Alias de connexion de la base de préparation
+ALIAS = 'staging'
+
+# Baisse maximale tolérée du nombre de fiches par rapport à la production
+BAISSE_MAX = 0.5
+
+TAILLE_LOT = 500
+
+
+def modeles_remplaces():
+    """Tables remplacées par la bascule, dans l'ordre d'insertion (parents d'abord)."""
+    return [
+        Eleve,
+        Benevole,
+        Eleve.matieres_souhaitees.through,
+        Benevole.matieres.through,
+        Binome,
+        ProfilUtilisateur,
+    ]
+
+
+# ============================================================================
+# 🏗️ PRÉPARATION
+# ============================================================================
+
+def url_preparation(chemin):
+    return f'sqlite:///{os.path.abspath(chemin)}'
+
+
+def ouvrir(chemin):
+    """Déclare la connexion 'staging' vers le fichier SQLite donné."""
+    connections.settings[ALIAS] = {
+        **connections.settings[DEFAULT_DB_ALIAS],
+        **dj_database_url.parse(url_preparation(chemin)),
+    }
+
+
+@contextmanager
+def base_preparation(chemin=None):
+    """
+    Fournit le chemin du fichier de préparation et le supprime à la sortie,
+    succès ou échec. Sans chemin, le fichier est placé dans un dossier
+    temporaire privé (0700), supprimé lui aussi.
+    """
+    dossier = None
+    if chemin is None:
+        dossier = tempfile.mkdtemp(prefix='esa_staging_')
+        chemin = os.path.join(dossier, 'staging.sqlite3')
+    try:
+        yield chemin
+    finally:
+        if ALIAS in connections.settings:
+            connections[ALIAS].close()
+        if dossier:
+            shutil.rmtree(dossier, ignore_errors=True)
+        else:
+            for fichier in (chemin, f'{chemin}-journal', f'{chemin}-wal', f'{chemin}-shm'):
+                if os.path.exists(fichier):
+                    os.remove(fichier)
+
+
+def copier(modele, destination, source=DEFAULT_DB_ALIAS):
+    """Copie toutes les lignes d'une table, identifiants compris."""
+    objets = list(modele.objects.using(source).all())
+    modele.objects.using(destination).bulk_create(objets, batch_size=TAILLE_LOT)
+    return len(objets)
+
+
+def preparer(chemin):
+    """
+    Crée une base de préparation vierge : schéma migré, plus une copie des
+    utilisateurs (co-responsables, comptes) et des matières de production,
+    pour que les imports retrouvent les mêmes identifiants.
+
+    Le fichier est créé en 0600 avant la migration : SQLite garde ces
+    droits, ainsi que pour son journal.
+    """
+    if os.path.exists(chemin):
+        os.remove(chemin)
+    os.close(os.open(chemin, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+    ouvrir(chemin)
+    call_command('migrate', database=ALIAS, verbosity=0)
+    return {
+        'utilisateurs': copier(User, ALIAS),
+        'matieres': copier(Matiere, ALIAS),
+    }
+
+
+# ============================================================================
+# 📥 IMPORTS
+# ============================================================================
+
+def importer(chemin, commande, *arguments):
+    """
+    Lance une commande d'import sur la base de préparation, dans un
+    processus séparé : le code d'import est exécuté tel quel, sa connexion
+    par défaut pointant vers le fichier de préparation.
+
+    Lève subprocess.CalledProcessError si la commande échoue.
+    """
+    env = {**os.environ, 'DATABASE_URL': url_preparation(chemin)}
+    sys.stdout.flush()
+    subprocess.run(
+        [sys.executable, str(settings.BASE_DIR / 'manage.py'), commande, *arguments],
+        env=env, check=True,
+    )
+
+
+# ============================================================================
+# 🔗 COMPLÉMENTS
+# ============================================================================
+
+def reporter_profils():
+    """
+    Rattache chaque profil co-responsable de production au bénévole de même
+    email dans la base de préparation (les identifiants ont changé).
+
+    Retourne la liste des profils sans bénévole correspondant, qui ne
+    seront pas repris.
+    """
+    par_email = {
+        email.lower(): benevole_id
+        for benevole_id, email in Benevole.objects.using(ALIAS).values_list('id', 'email')
+        if email
+    }
+
+    profils = []
+    perdus = []
+    deja_pris = set()
+    for profil in ProfilUtilisateur.objects.select_related('user', 'benevole'):
+        benevole_id = None
+        for email in (profil.benevole.email, profil.user.email):
+            if email and email.lower() in par_email:
+                benevole_id = par_email[email.lower()]
+                break
+        if benevole_id is None or benevole_id in deja_pris:
+            perdus.append(profil)
+            continue
+        deja_pris.add(benevole_id)
+        profils.append(ProfilUtilisateur(id=profil.id, user_id=profil.user_id,
+                                         benevole_id=benevole_id))
+
+    ProfilUtilisateur.objects.using(ALIAS).bulk_create(profils, batch_size=TAILLE_LOT)
+    return perdus
+
+
+def _cle_adresse(nom_cle, prenom_cle, adresse):
+    return (nom_cle, prenom_cle, ' '.join((adresse or '').lower().split()))
+
+
+def reporter_coordonnees(modele):
+    """
+    Reprend latitude / longitude de production pour les fiches dont le nom
+    et l'adresse n'ont pas changé : seules les nouvelles adresses restent
+    à géolocaliser. Retourne le nombre de fiches complétées.
+    """
+    coordonnees = {
+        _cle_adresse(nom_cle, prenom_cle, adresse): (latitude, longitude)
+        for nom_cle, prenom_cle, adresse, latitude, longitude in modele.objects.filter(
+            latitude__isnull=False, longitude__isnull=False,
+        ).values_list('nom_cle', 'prenom_cle', 'adresse', 'latitude', 'longitude')
+    }
+
+    a_completer = []
+    for fiche in modele.objects.using(ALIAS).filter(latitude__isnull=True).only(
+            'id', 'nom_cle', 'prenom_cle', 'adresse'):
+        position = coordonnees.get(_cle_adresse(fiche.nom_cle, fiche.prenom_cle, fiche.adresse))
+        if position:
+            fiche.latitude, fiche.longitude = position
+            a_completer.append(fiche)
+
+    modele.objects.using(ALIAS).bulk_update(
+        a_completer, ['latitude', 'longitude'], batch_size=TAILLE_LOT)
+    return len(a_completer)
+
+
+# ============================================================================
+# ✅ VALIDATION
+# ============================================================================
+
+def valider(baisse_max=BAISSE_MAX):
+    """
+    Vérifie la base de préparation avant bascule.
+
+    Retourne (volumes, erreurs) : volumes = {modèle: (production, préparation)},
+    erreurs = liste de messages (vide si la bascule peut avoir lieu).
+    """
+    erreurs = []
+    volumes = {}
+
+    # Volumes : pas de table vide, pas d'effondrement par rapport à la production
+    for modele in (Eleve, Benevole, Binome):
+        avant = modele.objects.count()
+        apres = modele.objects.using(ALIAS).count()
+        volumes[modele._meta.verbose_name_plural] = (avant, apres)
+        if modele is not Binome and apres == 0:
+            erreurs.append(f'Aucun(e) {modele._meta.verbose_name} importé(e)')
+        elif avant and apres < avant * (1 - baisse_max):
+            erreurs.append(
+                f'{modele._meta.verbose_name_plural} : {apres} fiches contre {avant} '
+                f'en production (baisse de plus de {baisse_max:.0%})')
+
+    # Intégrité des clés étrangères (binômes, matières, co-responsables, profils)
+    tables = [modele._meta.db_table for modele in modeles_remplaces()]
+    try:
+        connections[ALIAS].check_constraints(table_names=tables)
+    except IntegrityError as e:
+        erreurs.append(f'Clé étrangère invalide : {e}')
+
+    # Un seul binôme actif par élève
+    doublons = (Binome.objects.using(ALIAS).filter(actif=True)
+                .values('eleve_id').annotate(nb=Count('id')).filter(nb__gt=1))
+    for ligne in doublons:
+        erreurs.append(f'Élève id={ligne["eleve_id"]} : {ligne["nb"]} binômes actifs')
+
+    # Utilisateurs et matières créés pendant l'import : pas de collision d'identifiant
+    for modele, champ in ((User, 'username'), (Matiere, 'nom')):
+        production = dict(modele.objects.values_list('id', champ))
+        for id, valeur in modele.objects.using(ALIAS).values_list('id', champ):
+            if id in production and production[id] != valeur:
+                erreurs.append(f'{modele.__name__} id={id} : « {valeur} » en préparation, '
+                               f'« {production[id]} » en production')
+
+    return volumes, erreurs
+
+
+# ============================================================================
+# 🔀 BASCULE
+# ============================================================================
+
+def nouveaux(modele):
+    """Lignes créées en préparation qui n'existent pas encore en production."""
+    existants = set(modele.objects.values_list('id', flat=True))
+    return [objet for objet in modele.objects.using(ALIAS).all() if objet.id not in existants]
+
+
+def basculer():
+    """
+    Remplace les tables de production par celles de la base de préparation.
+
+    Tout est lu en mémoire AVANT d'ouvrir la transaction : celle-ci ne
+    contient que les DELETE et les INSERT groupés, et dure quelques
+    millisecondes. En cas d'erreur, rien n'est modifié.
+
+    Retourne ({modèle: lignes insérées}, durée de la transaction en secondes).
+    """
+    ajouts = [(User, nouveaux(User)), (Matiere, nouveaux(Matiere))]
+    lots = [(modele, list(modele.objects.using(ALIAS).all())) for modele in modeles_remplaces()]
+
+    connexion = connections[DEFAULT_DB_ALIAS]
+    debut = time.perf_counter()
+    with transaction.atomic():
+        with connexion.cursor() as cursor:
+            # Enfants d'abord : les contraintes restent satisfaites à chaque étape
+            for modele, _ in reversed(lots):
+                cursor.execute(f'DELETE FROM {connexion.ops.quote_name(modele._meta.db_table)}')
+
+            for modele, objets in ajouts + lots:
+                modele.objects.bulk_create(objets, batch_size=TAILLE_LOT)
+
+            # PostgreSQL : les séquences repartent après les identifiants insérés
+            modeles = [modele for modele, _ in ajouts + lots]
+            for sql in connexion.ops.sequence_reset_sql(no_style(), modeles):
+                cursor.execute(sql)
+    duree = time.perf_counter() - debut
+    # Matières ajoutées par bulk_create : pas de signal post_save
+    REGISTRE.invalider()
+
+    inseres = defaultdict(int)
+    for modele, objets in ajouts + lots:
+        inseres[modele._meta.verbose_name_plural] += len(objets)
+    return dict(inseres), duree
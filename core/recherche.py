@@ -0,0 +1,93 @@
+"""
+🔎 RECHERCHE.PY - Recherche plein texte, sans accents, sur l'index « recherche »
+
+La recherche de l'admin faisait un `icontains` par champ de search_fields,
+réunis par OR, plus des jointures (matières, co-responsable) qui dupliquaient
+les lignes et imposaient un DISTINCT : toute la table était relue à chaque
+frappe, et "helene" ne trouvait pas "Hélène".
+
+Chaque fiche élève / bénévole tient désormais une colonne `recherche` :
+ses champs recherchables en minuscules et sans accents (texte_recherche),
+recalculée par save() comme les autres clés normalisées. Une recherche est
+découpée en mots, et chaque mot doit apparaître dans cette seule colonne :
+
+    critere_recherche('Hélène  "rue de la"')
+    # Q(recherche__contains='helene') & Q(recherche__contains='rue de la')
+
+Sur PostgreSQL, la colonne a un index GIN trigrammes (pg_trgm, migration
+0022) que LIKE '%...%' utilise directement ; sur SQLite, le parcours ne lit
+qu'une colonne courte, sans jointure ni DISTINCT.
+
+Les matières et le co-responsable ne sont pas recopiés dans l'index (ils
+changent sans que la fiche soit enregistrée) : ils sont cherchés à part,
+par sous-requête sur la table de liaison et sur les clés des bénévoles.
+"""
+
+from django.db.models import Q
+from django.utils.text import smart_split, unescape_string_literal
+
+from .matieres import REGISTRE
+from .models import ProfilUtilisateur
+from .text import texte_recherche
+
+
+def mots_recherche(terme):
+    """Mots normalisés d'une recherche ; "entre guillemets" reste un seul mot."""
+    mots = []
+    for mot in smart_split(terme):
+        if mot[:1] in ('"', "'") and mot[-1:] == mot[:1] and len(mot) > 1:
+            mot = unescape_string_literal(mot)
+        mot = texte_recherche(mot)
+        if mot:
+            mots.append(mot)
+    return mots
+
+
+def critere_matieres(champ, mot):
+    """
+    Q des fiches ayant une matière dont le nom contient le mot, ou None :
+    noms résolus par le registre, puis une sous-requête sur la table de
+    liaison (pas de jointure, donc pas de doublons).
+    """
+    matiere_ids = [m.id for m in REGISTRE.toutes() if mot in texte_recherche(m.nom)]
+    if not matiere_ids:
+        return None
+    source = champ.field.m2m_field_name()
+    cible = champ.field.m2m_reverse_field_name()
+    fiches = champ.through.objects.filter(
+        **{f'{cible}_id__in': matiere_ids}).values(f'{source}_id')
+    return Q(pk__in=fiches)
+
+
+def critere_co_responsable(mot):
+    """Q des fiches dont le co-responsable (bénévole) a un nom ou prénom contenant le mot."""
+    utilisateurs = ProfilUtilisateur.objects.filter(
+        Q(benevole__nom_cle__contains=mot) | Q(benevole__prenom_cle__contains=mot)
+    ).values('user_id')
+    return Q(co_responsable__in=utilisateurs)
+
+
+def critere_recherche(terme, champs=('recherche',), matieres=None, co_responsable=False):
+    """
+    Q des fiches contenant chaque mot de la recherche, ou None si elle est vide.
+
+    champs : colonnes d'index à consulter ('recherche', 'eleve__recherche'...),
+    matieres : relation ManyToMany des matières (Benevole.matieres) ou None,
+    co_responsable : chercher aussi dans le nom du co-responsable.
+    """
+    mots = mots_recherche(terme)
+    if not mots:
+        return None
+    resultat = Q()
+    for mot in mots:
+        critere = Q()
+        for champ in champs:
+            critere |= Q(**{f'{champ}__contains': mot})
+        if matieres is not None:
+            par_matiere = critere_matieres(matieres, mot)
+            if par_matiere is not None:
+                critere |= par_matiere
+        if co_responsable:
+            critere |= critere_co_responsable(mot)
+        resultat &= critere
+    return resultat
@@ -0,0 +1,57 @@
+"""
+📡 SIGNALS.PY - Signaux de l'application core
+
+Chargé par CoreConfig.ready() (apps.py).
+"""
+
+from allauth.mfa.signals import authenticator_added, authenticator_removed, authenticator_reset
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .comptages import CACHE_LISTES
+from .matieres import REGISTRE
+from .middleware import oublier_etat_mfa
+from .models import Benevole, Binome, Eleve, Matiere, ProfilUtilisateur
+
+
+# ============================================================================
+# 📚 REGISTRE DES MATIÈRES
+# ============================================================================
+
+@receiver(post_save, sender=Matiere)
+@receiver(post_delete, sender=Matiere)
+def invalider_registre_matieres(sender, **kwargs):
+    """Une matière créée, modifiée ou supprimée : le registre sera rechargé."""
+    REGISTRE.invalider()
+
+
+# ============================================================================
+# 🧮 TOTAUX ET FILTRES DES LISTES DE L'ADMIN
+# ============================================================================
+
+@receiver(post_save, sender=Eleve)
+@receiver(post_delete, sender=Eleve)
+@receiver(post_save, sender=Benevole)
+@receiver(post_delete, sender=Benevole)
+@receiver(post_save, sender=Binome)
+@receiver(post_delete, sender=Binome)
+@receiver(post_save, sender=ProfilUtilisateur)
+@receiver(post_delete, sender=ProfilUtilisateur)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalider_cache_listes(sender, **kwargs):
+    """Une fiche créée, modifiée ou supprimée : totaux et filtres de son modèle recalculés."""
+    CACHE_LISTES.invalider(sender)
+
+
+# ============================================================================
+# 🔐 DOUBLE AUTHENTIFICATION (état gardé en session par core.middleware)
+# ============================================================================
+
+@receiver(authenticator_added)
+@receiver(authenticator_removed)
+@receiver(authenticator_reset)
+def invalider_etat_mfa(sender, request=None, **kwargs):
+    """2FA activé ou désactivé : le middleware relira l'état en base."""
+    oublier_etat_mfa(request)
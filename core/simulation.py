@@ -0,0 +1,286 @@
+"""
+🔍 SIMULATION.PY - Mode --dry-run des imports, sans requête par ligne
+
+En mode test, les commandes d'import chargent UNE FOIS un instantané en
+lecture seule des clés utiles (identité, statut, binôme actif...), puis
+simulent créations, mises à jour et archivages en mémoire.
+
+Un import de 10 000 lignes se prévisualise ainsi en quelques secondes,
+avec une poignée de requêtes de lecture : aucun verrou n'est gardé sur
+la base SQLite de production.
+
+Chaque changement simulé est noté dans un JournalSimulation, qui peut
+être écrit en JSON ou en CSV (option --diff des commandes d'import).
+"""
+
+import csv
+import json
+from collections import defaultdict
+
+from .matieres import REGISTRE
+from .models import Benevole, Binome, Eleve
+from .text import normaliser_nom, normaliser_telephone, phonetique
+
+
+# ============================================================================
+# 📝 JOURNAL DES CHANGEMENTS SIMULÉS
+# ============================================================================
+
+class JournalSimulation:
+    """
+    Liste structurée des changements qu'un import effectuerait.
+
+    Une entrée par objet touché :
+        {"action": "creation" | "mise_a_jour" | "archivage",
+         "modele": "Eleve", "id": 12 (None si créé), "libelle": "Jean Dupont",
+         "champs": {"statut": ["en_attente", "accompagne"], ...}}
+    """
+
+    def __init__(self):
+        self.entrees = []
+
+    def noter(self, action, modele, id, libelle, champs=None):
+        """Ajoute une entrée ; champs = {champ: (avant, après)}."""
+        self.entrees.append({
+            'action': action,
+            'modele': modele,
+            'id': id,
+            'libelle': libelle,
+            'champs': {champ: list(valeurs) for champ, valeurs in (champs or {}).items()},
+        })
+
+    def resume(self):
+        """Nombre d'entrées par (modèle, action)."""
+        compteur = defaultdict(int)
+        for entree in self.entrees:
+            compteur[(entree['modele'], entree['action'])] += 1
+        return dict(compteur)
+
+    def ecrire(self, chemin):
+        """Écrit le journal en JSON, ou en CSV (une ligne par champ) si chemin finit par .csv."""
+        if chemin.lower().endswith('.csv'):
+            with open(chemin, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['action', 'modele', 'id', 'libelle', 'champ', 'avant', 'apres'])
+                for entree in self.entrees:
+                    champs = entree['champs'] or {'': ['', '']}
+                    for champ, (avant, apres) in champs.items():
+                        writer.writerow([
+                            entree['action'], entree['modele'], entree['id'] or '',
+                            entree['libelle'], champ, _texte(avant), _texte(apres),
+                        ])
+        else:
+            with open(chemin, 'w', encoding='utf-8') as f:
+                json.dump(self.entrees, f, ensure_ascii=False, indent=2, default=str)
+
+
+def _texte(valeur):
+    return '' if valeur is None else str(valeur)
+
+
+# ============================================================================
+# 📸 INSTANTANÉS EN LECTURE SEULE
+# ============================================================================
+
+class Fiche(dict):
+    """Copie en mémoire d'une ligne de la base (ou d'une création simulée)."""
+
+    @property
+    def libelle(self):
+        return f"{self['prenom']} {self['nom']}"
+
+
+def cle_identite_eleve(nom_cle, prenom_cle, telephone_cle, telephone_parent):
+    """Même critère que Eleve.filtre_identite(), sous forme de clé de dictionnaire."""
+    return (nom_cle, prenom_cle, telephone_cle, '' if telephone_cle else telephone_parent)
+
+
+def indexer_phonetique(index, fiche):
+    """Range la fiche sous sa clé (nom_phonetique, prenom_phonetique)."""
+    index[(fiche['nom_phonetique'], fiche['prenom_phonetique'])].append(fiche)
+
+
+# Noms approchants cités quand une fiche n'est pas trouvée
+NB_SUGGESTIONS = 3
+
+
+def candidats_phonetiques(index, nom, prenom):
+    """Comme Modele.candidats_phonetiques(), dans un index en mémoire (sans doublon)."""
+    cle_nom, cle_prenom = phonetique(nom or ''), phonetique(prenom or '')
+    if not cle_nom or not cle_prenom:
+        return []
+    fiches = list(index.get((cle_nom, cle_prenom), []))
+    if cle_nom != cle_prenom:
+        fiches += index.get((cle_prenom, cle_nom), [])
+    return fiches
+
+
+def suggestions_phonetiques(index, nom, prenom):
+    """Comme import_binomes.suggestions : noms approchants, jamais rattachés d'office."""
+    return [f"{f['prenom']} {f['nom']}" for f in candidats_phonetiques(index, nom, prenom)[:NB_SUGGESTIONS]]
+
+
+class InstantaneEleves:
+    """
+    Identité, statut et co-responsable de tous les élèves (1 requête),
+    plus leurs matières souhaitées si matieres=True (1 requête de plus).
+    """
+
+    def __init__(self, matieres=False):
+        self.par_identite = defaultdict(list)
+        self.par_nom = defaultdict(list)
+        self.par_phonetique = defaultdict(list)
+        self.par_id = {}
+        champs = ['id', 'nom', 'prenom', 'nom_cle', 'prenom_cle', 'telephone_cle',
+                  'telephone_parent', 'nom_phonetique', 'prenom_phonetique',
+                  'statut', 'co_responsable_id']
+        for valeurs in Eleve.objects.values_list(*champs):
+            fiche = Fiche(zip(champs, valeurs))
+            fiche['matieres'] = set()
+            self._ajouter(fiche)
+
+        if matieres:
+            # Noms lus dans le registre : pas de jointure sur Matiere
+            liens = Eleve.matieres_souhaitees.through.objects.values_list('eleve_id', 'matiere_id')
+            for eleve_id, matiere_id in liens:
+                self.par_id[eleve_id]['matieres'].add(REGISTRE.get(matiere_id).nom.lower())
+
+    def _ajouter(self, fiche):
+        self.par_identite[cle_identite_eleve(
+            fiche['nom_cle'], fiche['prenom_cle'],
+            fiche['telephone_cle'], fiche['telephone_parent'])].append(fiche)
+        self.par_nom[(fiche['nom_cle'], fiche['prenom_cle'])].append(fiche)
+        indexer_phonetique(self.par_phonetique, fiche)
+        if fiche['id'] is not None:
+            self.par_id[fiche['id']] = fiche
+
+    def get(self, nom, prenom, telephone_parent):
+        """Comme Eleve.objects.get(**Eleve.filtre_identite(...))."""
+        telephone_cle = normaliser_telephone(telephone_parent)
+        fiches = self.par_identite.get(cle_identite_eleve(
+            normaliser_nom(nom), normaliser_nom(prenom), telephone_cle, telephone_parent), [])
+        if not fiches:
+            raise Eleve.DoesNotExist
+        if len(fiches) > 1:
+            raise Eleve.MultipleObjectsReturned(
+                f'{len(fiches)} élèves correspondent à {prenom} {nom}')
+        return fiches[0]
+
+    def trouver(self, nom, prenom, telephone_parent):
+        """Comme import_binomes.trouver_eleve : avec téléphone, puis par nom s'il est unique."""
+        if telephone_parent:
+            try:
+                return self.get(nom, prenom, telephone_parent)
+            except Eleve.DoesNotExist:
+                pass
+            except Eleve.MultipleObjectsReturned:
+                telephone_cle = normaliser_telephone(telephone_parent)
+                return self.par_identite[cle_identite_eleve(
+                    normaliser_nom(nom), normaliser_nom(prenom), telephone_cle, telephone_parent)][0]
+
+        fiches = self.par_nom.get((normaliser_nom(nom), normaliser_nom(prenom)), [])
+        return fiches[0] if len(fiches) == 1 else None
+
+    def suggestions(self, nom, prenom):
+        return suggestions_phonetiques(self.par_phonetique, nom, prenom)
+
+    @staticmethod
+    def ajouter_matieres(fiche, matieres_list):
+        """Simule eleve.matieres_souhaitees.add() ; retourne les matières réellement ajoutées."""
+        nouvelles = sorted(m for m in matieres_list if m.lower() not in fiche['matieres'])
+        fiche['matieres'].update(m.lower() for m in nouvelles)
+        return nouvelles
+
+    def creer(self, nom, prenom, telephone_parent, statut):
+        """Enregistre une création simulée (id None) et la retourne."""
+        fiche = Fiche(
+            id=None, nom=nom, prenom=prenom,
+            nom_cle=normaliser_nom(nom), prenom_cle=normaliser_nom(prenom),
+            telephone_cle=normaliser_telephone(telephone_parent),
+            nom_phonetique=phonetique(nom), prenom_phonetique=phonetique(prenom),
+            telephone_parent=telephone_parent, statut=statut, co_responsable_id=None,
+            matieres=set(),
+        )
+        self._ajouter(fiche)
+        return fiche
+
+    def simuler_import(self, journal, nom, prenom, telephone_parent, statut,
+                       matieres_list=(), **valeurs):
+        """
+        Simule la logique commune des imports d'élèves :
+        l'élève existe → seul son statut change, sinon il est créé.
+        Les matières reconnues sont ajoutées dans les deux cas.
+
+        Retourne (fiche, cree: bool) et note le changement dans le journal.
+        """
+        try:
+            fiche = self.get(nom, prenom, telephone_parent)
+            cree = False
+            changements = {}
+            if fiche['statut'] != statut:
+                changements['statut'] = (fiche['statut'], statut)
+                fiche['statut'] = statut
+        except Eleve.DoesNotExist:
+            fiche = self.creer(nom, prenom, telephone_parent, statut)
+            cree = True
+            changements = {'statut': (None, statut)}
+            changements.update({champ: (None, valeur) for champ, valeur in valeurs.items()})
+
+        nouvelles = self.ajouter_matieres(fiche, matieres_list)
+        if nouvelles:
+            changements['matieres'] = (None, ', '.join(nouvelles))
+
+        if cree:
+            journal.noter('creation', 'Eleve', None, fiche.libelle, changements)
+        elif changements:
+            journal.noter('mise_a_jour', 'Eleve', fiche['id'], fiche.libelle, changements)
+        return fiche, cree
+
+
+class InstantaneBenevoles:
+    """Email, nom et statut de tous les bénévoles (1 requête)."""
+
+    def __init__(self):
+        self.par_email = {}
+        self.par_nom = defaultdict(list)
+        self.par_phonetique = defaultdict(list)
+        champs = ['id', 'nom', 'prenom', 'email', 'nom_cle', 'prenom_cle',
+                  'nom_phonetique', 'prenom_phonetique', 'statut']
+        for valeurs in Benevole.objects.values_list(*champs):
+            fiche = Fiche(zip(champs, valeurs))
+            if fiche['email']:
+                self.par_email.setdefault(fiche['email'].lower(), fiche)
+            self.par_nom[(fiche['nom_cle'], fiche['prenom_cle'])].append(fiche)
+            indexer_phonetique(self.par_phonetique, fiche)
+
+    def trouver(self, nom, prenom, email):
+        """Comme import_binomes.trouver_benevole : par email, puis nom + prénom."""
+        if email and '@' in email:
+            fiche = self.par_email.get(email.lower())
+            if fiche:
+                return fiche
+        fiches = self.par_nom.get((normaliser_nom(nom), normaliser_nom(prenom)), [])
+        return fiches[0] if fiches else None
+
+    def suggestions(self, nom, prenom):
+        return suggestions_phonetiques(self.par_phonetique, nom, prenom)
+
+
+class InstantaneBinomes:
+    """Binôme (actif ou non) de chaque élève (1 requête)."""
+
+    def __init__(self):
+        self.par_eleve = {}
+        champs = ['id', 'eleve_id', 'benevole_id', 'actif']
+        for valeurs in Binome.objects.values_list(*champs):
+            fiche = Fiche(zip(champs, valeurs))
+            self.par_eleve[fiche['eleve_id']] = fiche
+
+    def actifs(self):
+        return [fiche for fiche in self.par_eleve.values() if fiche['actif']]
+
+    def creer(self, eleve_id, benevole_id):
+        """Enregistre une création simulée (id None) et la retourne."""
+        fiche = Fiche(id=None, eleve_id=eleve_id, benevole_id=benevole_id, actif=True)
+        self.par_eleve[eleve_id] = fiche
+        return fiche
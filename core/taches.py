@@ -0,0 +1,299 @@
+"""
+⏳ TACHES.PY - Tâches de fond pour les actions longues de l'admin
+
+Une action de l'admin sur des milliers de fiches (export, changement de
+statut...) ne s'exécute plus dans la requête HTTP, où elle finit coupée
+par le proxy : elle est enregistrée comme Tache, et la commande run_jobs
+l'exécute à part. La file est la table core_tache elle-même, sans broker
+externe.
+
+    # Dans l'admin
+    tache = planifier('export', '📥 Export de 12 000 élèves', request.user,
+                      modele='core.eleve', ids=ids, format_export='xlsx')
+
+    # Sur le serveur (service systemd, ou cron avec --once)
+    python manage.py run_jobs
+
+La page de la tâche dans l'admin suit la progression (…/progression/,
+interrogé toutes les deux secondes) et propose le fichier produit au
+téléchargement une fois la tâche terminée.
+
+Un traitement est une fonction enregistrée par @traitement('nom'), appelée
+avec un Suivi et les paramètres de la tâche (JSON), qui retourne le bilan :
+
+    @traitement('mise_a_jour')
+    def mettre_a_jour(suivi, modele, ids, valeurs):
+        suivi.commencer(len(ids))
+        ...
+        suivi.avancer(len(lot))
+        return f'{n} fiche(s) mise(s) à jour'
+"""
+
+import logging
+import os
+import tempfile
+import time
+import traceback
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+from .comptages import CACHE_LISTES
+from .models import Tache
+
+
+logger = logging.getLogger(__name__)
+
+# Au-delà de ce nombre de fiches, une action de l'admin passe en tâche de fond
+SEUIL_TACHE = 2000
+
+# Fiches traitées par requête dans les traitements
+TAILLE_LOT = 500
+
+# Progression écrite en base au plus une fois par intervalle (secondes)
+INTERVALLE_PROGRESSION = 1.0
+
+TRAITEMENTS = {}
+
+
+class TacheReprise(Exception):
+    """La tâche a été remise en file pendant son exécution : ce worker s'arrête."""
+
+
+def traitement(nom):
+    """Enregistre une fonction comme traitement de tâche de fond."""
+    def enregistrer(fonction):
+        TRAITEMENTS[nom] = fonction
+        return fonction
+    return enregistrer
+
+
+def planifier(nom, description, utilisateur=None, **parametres):
+    """Met une tâche en file ; les paramètres doivent être sérialisables en JSON."""
+    if nom not in TRAITEMENTS:
+        raise ValueError(f'Traitement inconnu : {nom}')
+    return Tache.objects.create(
+        traitement=nom,
+        description=description[:200],
+        utilisateur=utilisateur if utilisateur and utilisateur.pk else None,
+        parametres=parametres,
+    )
+
+
+# ============================================================================
+# ⚙️ EXÉCUTION
+# ============================================================================
+
+def _reservation(tache):
+    """Lignes de la tâche telle que ce worker l'a réservée (ni reprise, ni réservée à nouveau)."""
+    return Tache.objects.filter(pk=tache.pk, statut='en_cours', date_debut=tache.date_debut)
+
+
+class Suivi:
+    """
+    Progression d'une tâche, écrite en base sans ralentir le traitement.
+    Chaque écriture met aussi à jour date_activite : tant que la tâche
+    avance, elle n'est pas considérée abandonnée.
+    """
+
+    def __init__(self, tache):
+        self.tache = tache
+        self.derniere_ecriture = 0.0
+
+    def commencer(self, total):
+        self.tache.total = total
+        self.tache.progression = 0
+        self._ecrire()
+
+    def avancer(self, nombre=1):
+        self.tache.progression += nombre
+        if time.monotonic() - self.derniere_ecriture >= INTERVALLE_PROGRESSION:
+            self._ecrire()
+
+    def _ecrire(self):
+        self.derniere_ecriture = time.monotonic()
+        ecrites = _reservation(self.tache).update(
+            progression=self.tache.progression, total=self.tache.total,
+            date_activite=timezone.now())
+        if not ecrites:
+            raise TacheReprise(f'Tâche {self.tache.pk} remise en file pendant son exécution')
+
+
+def reprendre_abandonnees():
+    """
+    Remet en file les tâches « en cours » sans activité depuis plus de
+    TACHES_DELAI_MAX secondes : leur worker a disparu sans pouvoir les
+    rendre (kill -9, redémarrage du serveur). Retourne le nombre de tâches
+    reprises.
+    """
+    limite = timezone.now() - timedelta(seconds=settings.TACHES_DELAI_MAX)
+    reprises = Tache.objects.filter(
+        Q(date_activite__lt=limite) | Q(date_activite__isnull=True, date_debut__lt=limite),
+        statut='en_cours',
+    ).update(statut='en_attente', progression=0, date_debut=None, date_activite=None)
+    if reprises:
+        logger.warning('%s tâche(s) abandonnée(s) remise(s) en attente', reprises)
+    return reprises
+
+
+def prendre_suivante():
+    """
+    Réserve la plus ancienne tâche en attente, ou None.
+
+    La réservation est un UPDATE conditionnel (statut encore « en attente ») :
+    deux workers ne peuvent pas prendre la même tâche, sur SQLite comme
+    sur PostgreSQL. Les tâches abandonnées sont d'abord remises en file.
+    """
+    reprendre_abandonnees()
+    while True:
+        tache = Tache.objects.filter(statut='en_attente').order_by('date_creation', 'pk').first()
+        if tache is None:
+            return None
+        maintenant = timezone.now()
+        reservee = Tache.objects.filter(pk=tache.pk, statut='en_attente').update(
+            statut='en_cours', date_debut=maintenant, date_activite=maintenant)
+        if reservee:
+            tache.refresh_from_db()
+            return tache
+
+
+def executer(tache):
+    """
+    Exécute une tâche réservée et enregistre son bilan (ou son erreur).
+
+    Le bilan n'est écrit que si la tâche est toujours celle que ce worker a
+    réservée : une tâche reprise entre-temps par un autre worker n'est pas
+    écrasée (elle reste alors « en cours » dans l'objet retourné).
+    """
+    fonction = TRAITEMENTS.get(tache.traitement)
+    try:
+        if fonction is None:
+            raise ValueError(f'Traitement inconnu : {tache.traitement}')
+        bilan = fonction(Suivi(tache), **tache.parametres)
+    except TacheReprise:
+        logger.warning('Tâche %s (%s) reprise par un autre worker', tache.pk, tache.traitement)
+        return tache
+    except Exception:
+        logger.exception('Tâche %s (%s) en échec', tache.pk, tache.traitement)
+        tache.statut = 'echec'
+        tache.message = traceback.format_exc(limit=5)
+    else:
+        tache.statut = 'terminee'
+        tache.message = bilan or ''
+        tache.progression = tache.total
+    tache.date_fin = timezone.now()
+    ecrites = _reservation(tache).update(
+        statut=tache.statut, message=tache.message, progression=tache.progression,
+        total=tache.total, fichier=tache.fichier.name or '', date_fin=tache.date_fin)
+    if not ecrites:
+        logger.warning('Tâche %s (%s) reprise par un autre worker : bilan ignoré',
+                       tache.pk, tache.traitement)
+        if tache.fichier:
+            tache.fichier.delete(save=False)
+        tache.statut = 'en_cours'
+    return tache
+
+
+def remettre_en_attente(tache):
+    """Tâche interrompue (arrêt du worker) : elle sera reprise depuis le début."""
+    _reservation(tache).update(
+        statut='en_attente', progression=0, date_debut=None, date_activite=None)
+
+
+def purger(jours):
+    """Supprime les tâches finies depuis plus de `jours` jours, et leurs fichiers."""
+    limite = timezone.now() - timedelta(days=jours)
+    anciennes = Tache.objects.filter(statut__in=('terminee', 'echec'), date_fin__lt=limite)
+    nombre = 0
+    for tache in anciennes:
+        if tache.fichier:
+            tache.fichier.delete(save=False)
+        tache.delete()
+        nombre += 1
+    return nombre
+
+
+# ============================================================================
+# 🧰 TRAITEMENTS
+# ============================================================================
+
+def _lots(ids):
+    for debut in range(0, len(ids), TAILLE_LOT):
+        yield ids[debut:debut + TAILLE_LOT]
+
+
+@traitement('mise_a_jour')
+def mettre_a_jour(suivi, modele, ids, valeurs):
+    """queryset.update(**valeurs) sur les fiches, par lots de TAILLE_LOT."""
+    model = apps.get_model(modele)
+    suivi.commencer(len(ids))
+    modifiees = 0
+    for lot in _lots(ids):
+        modifiees += model._default_manager.filter(pk__in=lot).update(**valeurs)
+        suivi.avancer(len(lot))
+    # update() n'envoie pas de signal (cache du processus seulement : les
+    # workers web recalculent après CacheListes.DUREE_MAX)
+    CACHE_LISTES.invalider(model)
+    return f'{modifiees} fiche(s) mise(s) à jour'
+
+
+@traitement('export')
+def exporter(suivi, modele, ids, format_export):
+    """Export (core.export) des fiches avec les colonnes de leur admin, dans un fichier."""
+    from django.contrib import admin
+
+    from .export import FORMATS, lignes_export
+
+    model = apps.get_model(modele)
+    model_admin = admin.site._registry[model]
+    queryset = model_admin.queryset_export(model._default_manager.filter(pk__in=ids))
+    _, flux = FORMATS[format_export]
+    titres = [titre for titre, _ in model_admin.colonnes_export]
+
+    def suivies(lignes):
+        for ligne in lignes:
+            yield ligne
+            suivi.avancer()
+
+    suivi.commencer(len(ids))
+    with tempfile.NamedTemporaryFile(suffix=f'.{format_export}', delete=False) as temporaire:
+        try:
+            for morceau in flux(titres, suivies(lignes_export(queryset, model_admin.colonnes_export))):
+                temporaire.write(morceau.encode() if isinstance(morceau, str) else morceau)
+            temporaire.close()
+            horodatage = timezone.localtime().strftime('%Y%m%d_%H%M%S')
+            with open(temporaire.name, 'rb') as contenu:
+                suivi.tache.fichier.save(
+                    f'{model_admin.nom_export}_{horodatage}.{format_export}', File(contenu), save=False)
+        finally:
+            os.remove(temporaire.name)
+    return f'{suivi.tache.progression} fiche(s) exportée(s)'
+
+
+@traitement('geocodage')
+def geolocaliser(suivi, modele, ids):
+    """Géolocalisation groupée (core.geocodage) des fiches sans coordonnées."""
+    from .geocodage import geocoder_fiches
+
+    model = apps.get_model(modele)
+    suivi.commencer(len(ids))
+    bilan = geocoder_fiches(model._default_manager.filter(pk__in=ids), avancement=suivi.avancer)
+    return bilan_geocodage(bilan)
+
+
+def bilan_geocodage(bilan):
+    """Bilan lisible de geocoder_fiches, pour l'admin et les tâches."""
+    morceaux = [f"{bilan['succes']} fiche(s) géolocalisée(s)"]
+    if bilan['reprises']:
+        morceaux.append(f"dont {bilan['reprises']} d'après une adresse déjà connue")
+    if bilan['echecs']:
+        morceaux.append(f"{bilan['echecs']} échec(s)")
+    if bilan['sans_adresse']:
+        morceaux.append(f"{bilan['sans_adresse']} sans adresse")
+    if bilan['deja']:
+        morceaux.append(f"{bilan['deja']} déjà géolocalisée(s)")
+    return ', '.join(morceaux)
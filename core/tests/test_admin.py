@@ -0,0 +1,77 @@
+"""
+Tests des listes de l'admin : le nombre de requêtes SQL ne dépend pas du
+nombre de lignes affichées (pas de requête par ligne).
+
+    python manage.py test core.tests.test_admin
+"""
+
+from datetime import date
+
+from allauth.mfa.models import Authenticator
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.comptages import CACHE_LISTES
+from core.models import Benevole, Binome, Eleve, Matiere, ProfilUtilisateur
+
+
+# Lignes de la petite liste ; la grande en a deux fois plus (une seule page)
+N = 5
+
+
+class RequetesListesAdminTests(TestCase):
+    """Élèves, bénévoles et binômes : même nombre de requêtes pour N et 2N lignes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin_listes', 'admin@example.org', 'x')
+        Authenticator.objects.create(user=cls.admin, type=Authenticator.Type.TOTP, data={})
+        cls.matieres = [Matiere.objects.create(nom=nom) for nom in ('Maths', 'Français')]
+        # Co-responsable : vignette affichée dans les listes élèves / bénévoles
+        cls.responsable = User.objects.create_user('responsable', 'resp@example.org', 'x')
+        ProfilUtilisateur.objects.create(user=cls.responsable, benevole=Benevole.objects.create(
+            nom='Martin', prenom='Claire', email='resp@example.org', est_responsable=True))
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.numero = 0
+
+    def ajouter_binomes(self, nombre):
+        """Ajoute `nombre` élèves et bénévoles, liés deux à deux en binômes."""
+        for _ in range(nombre):
+            self.numero += 1
+            eleve = Eleve.objects.create(nom=f'Eleve{self.numero}', prenom='Lina',
+                                         co_responsable=self.responsable)
+            eleve.matieres_souhaitees.set(self.matieres)
+            benevole = Benevole.objects.create(nom=f'Benevole{self.numero}', prenom='Paul',
+                                               email=f'b{self.numero}@example.org',
+                                               co_responsable=self.responsable)
+            benevole.matieres.set(self.matieres)
+            Binome.objects.create(eleve=eleve, benevole=benevole, date_debut=date(2024, 9, 1))
+
+    def afficher(self, modele):
+        """Affiche la liste ; un premier affichage charge les caches du processus."""
+        url = reverse(f'admin:core_{modele._meta.model_name}_changelist')
+        CACHE_LISTES.invalider(modele)
+        self.client.get(url)
+        return lambda: self.client.get(url)
+
+    def test_nombre_de_requetes_constant(self):
+        modeles = (Eleve, Benevole, Binome)
+        self.ajouter_binomes(N)
+        petites = {}
+        for modele in modeles:
+            afficher = self.afficher(modele)
+            with CaptureQueriesContext(connection) as requetes:
+                self.assertEqual(afficher().context['cl'].result_count, modele.objects.count())
+            petites[modele] = len(requetes)
+
+        self.ajouter_binomes(N)
+        for modele in modeles:
+            afficher = self.afficher(modele)
+            with self.subTest(liste=modele._meta.verbose_name_plural):
+                with self.assertNumQueries(petites[modele]):
+                    self.assertEqual(afficher().context['cl'].result_count, modele.objects.count())
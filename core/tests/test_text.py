@@ -0,0 +1,160 @@
+"""
+Tests de core.text : les normalisations rapides (table de traduction,
+caches) donnent exactement les résultats des anciennes implémentations.
+
+    python manage.py test core.tests.test_text
+"""
+
+import random
+import re
+import unicodedata
+
+from django.test import SimpleTestCase
+
+from core import text
+from core.models import Eleve
+
+
+# ============================================================================
+# 📜 ANCIENNES IMPLÉMENTATIONS (référence)
+# ============================================================================
+
+def normaliser_reference(texte):
+    """Ancienne implémentation de normaliser / normaliser_nom des imports."""
+    texte = texte.lower().strip()
+    texte = unicodedata.normalize('NFD', texte)
+    return ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
+
+
+def normalize_name_reference(name):
+    """Ancienne implémentation de clean_duplicates.normalize_name."""
+    if not name:
+        return ""
+    normalized = unicodedata.normalize('NFD', name)
+    normalized = ''.join(char for char in normalized if unicodedata.category(char) != 'Mn')
+    normalized = normalized.lower()
+    return re.sub(r'[*\s]+', '', normalized)
+
+
+def normaliser_classe_reference(classe_str):
+    """Ancienne implémentation de normaliser_classe des imports d'élèves."""
+    if not classe_str:
+        return ''
+    classe_str = classe_str.strip()
+    if classe_str in {c for c, _ in Eleve.CLASSE_CHOICES}:
+        return classe_str
+    return text.CLASSE_MAPPING.get(classe_str.upper(), '')
+
+
+COMPARAISONS = [
+    ('normaliser', normaliser_reference, text.normaliser),
+    ('normaliser_nom', normaliser_reference, text.normaliser_nom),
+    ('normaliser_compact', normalize_name_reference, text.normaliser_compact),
+    ('normaliser_classe', normaliser_classe_reference, text.normaliser_classe),
+]
+
+
+# ============================================================================
+# 🧪 CORPUS
+# ============================================================================
+
+# Formes décomposées, ligatures, majuscules spéciales, écritures non latines...
+CAS_PARTICULIERS = [
+    '', ' ', '  Hélène  ', 'MARIE-HÉLÈNE', 'Marie-Hélène', 'Œdipe', 'Straße',
+    'İstanbul', 'ıi', 'Ångström', 'Ñandú', 'Łódź', 'Dvořák', 'Nguyễn Thị Ánh',
+    'Ἀθῆναι', 'Ωμέγα', 'Юлия Ёлкина', 'Йошкар-Ола', 'محمد', 'أمينة', 'עִבְרִית',
+    '李小龍', 'ｆｕｌｌｗｉｄｔｈ', 'ǅemal', 'ﬁlou', 'Ⅻ', '①', 'Le Gall*', 'N\'Diaye',
+    'Tchorbadjian', '6ème', '6°', '1ÈRE', 'Terminale', 'cap 1', ' 2de ',
+    '12, Rue  d\'Italie', ' Bd Baille ', '😀 émoji', 'ä́',
+]
+
+
+def corpus_aleatoire(nombre, graine=0):
+    """Mots mêlant ASCII, Latin-1, Latin étendu et autres écritures."""
+    rng = random.Random(graine)
+    alphabet = (
+        'abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ -\'*'
+        + ''.join(chr(c) for c in range(0xC0, 0x250))        # Latin-1, Latin étendu A/B
+        + ''.join(chr(c) for c in range(0x300, 0x370))       # diacritiques combinants
+        + ''.join(chr(c) for c in range(0x370, 0x530))       # grec, cyrillique
+        + ''.join(chr(c) for c in range(0x1E00, 0x1F00))     # Latin étendu additionnel
+        + 'ابتثجحخدذرزسشصضطظعغفقكلمنهوي' + '中文字' + 'ﬀﬁﬂ'
+    )
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 16)))
+            for _ in range(nombre)]
+
+
+class NormalisationIdentiqueTests(SimpleTestCase):
+    """Chaque fonction de core.text rend la même valeur que l'ancienne implémentation."""
+
+    def verifier(self, valeurs):
+        for nom, reference, nouvelle in COMPARAISONS:
+            for valeur in valeurs:
+                with self.subTest(fonction=nom, valeur=valeur):
+                    self.assertEqual(nouvelle(valeur), reference(valeur))
+
+    def test_cas_particuliers(self):
+        self.verifier(CAS_PARTICULIERS)
+
+    def test_classes(self):
+        self.verifier(list(text.CLASSE_MAPPING) + [c for c, _ in Eleve.CLASSE_CHOICES])
+
+    def test_chaque_caractere_du_plan_multilingue(self):
+        # Chaque caractère seul et entouré de texte : chemin rapide et chemin lent
+        valeurs = []
+        for code in range(0x20, 0x3000):
+            if 0xD800 <= code <= 0xDFFF:
+                continue
+            caractere = chr(code)
+            valeurs += [caractere, f'Élé{caractere}ne', f'{caractere}abc']
+        for nom, reference, nouvelle in COMPARAISONS[:3]:
+            differences = [v for v in valeurs if nouvelle(v) != reference(v)]
+            self.assertEqual(differences, [], nom)
+
+    def test_corpus_aleatoire(self):
+        self.verifier(corpus_aleatoire(3000))
+
+
+class TelephoneTests(SimpleTestCase):
+    """normaliser_telephone rend un numéro E.164 (16 caractères au plus) ou ''."""
+
+    def test_formats_francais(self):
+        for telephone in ['06 12 34 56 78', '0033 6 12 34 56 78', '6.12.34.56.78',
+                          '+33 (0)6 12 34 56 78', '06-12-34-56-78']:
+            with self.subTest(telephone=telephone):
+                self.assertEqual(text.normaliser_telephone(telephone), '+33612345678')
+
+    def test_plusieurs_numeros(self):
+        for telephone in ['+33 6 12 34 56 78 - 04 91 00 00 00', '06 12 34 56 78 / 04 91 00 00 00',
+                          '06 12 34 56 78   04 91 00 00 00', '06 12 34 56 78 ou 04 91 00 00 00']:
+            with self.subTest(telephone=telephone):
+                self.assertEqual(text.normaliser_telephone(telephone), '+33612345678')
+
+    def test_jamais_plus_de_15_chiffres(self):
+        for telephone in ['+33612345678 0491000000', '061234567804910000', '+1234567890123456']:
+            with self.subTest(telephone=telephone):
+                self.assertLessEqual(len(text.normaliser_telephone(telephone)), 16)
+
+
+class PhonetiqueTests(SimpleTestCase):
+    """Deux noms qui se prononcent pareil ont la même clé phonétique."""
+
+    def test_memes_cles(self):
+        for noms in [('Tchorbadjian', 'Tchorbadjan'), ('Marie-Hélène', 'Marie Helene'),
+                     ('Dupont', 'Dupond'), ('Mohamed', 'Mohammed', 'Muhammad'),
+                     ('Alice', 'Alisse'), ('Patrice', 'Patrisse'), ('Serge', 'Serje'),
+                     ('Georges', 'Jorj'), ('Gilles', 'Jill'), ('Cécile', 'Sécile')]:
+            with self.subTest(noms=noms):
+                self.assertEqual(len({text.phonetique(nom) for nom in noms}), 1)
+
+    def test_c_et_g_doux_avant_la_finale_muette(self):
+        # Le e final qui adoucit le c ou le g est muet, pas le c ou le g
+        for nom, cle in [('Alice', 'AL'), ('Patrice', 'PTR'), ('Serge', 'SRJ'),
+                         ('Georges', 'JRJ'), ('Gilles', 'JL'), ('Ange', 'ANJ')]:
+            with self.subTest(nom=nom):
+                self.assertEqual(text.phonetique(nom), cle)
+
+    def test_c_et_g_durs(self):
+        for nom, cle in [('Nicolas', 'NKL'), ('Jacques', 'JK'), ('Guillaume', 'GLM')]:
+            with self.subTest(nom=nom):
+                self.assertEqual(text.phonetique(nom), cle)
@@ -0,0 +1,284 @@
+"""
+🔤 TEXT.PY - Normalisation des textes (noms, classes, adresses)
+
+Toutes les comparaisons "souples" de l'application (imports, dédoublonnage,
+recherche) passent par ces fonctions : minuscules + suppression des accents,
+et clé phonétique pour les noms qui s'écrivent différemment.
+
+Les mêmes valeurs sont normalisées des milliers de fois pendant un import
+(un nom de famille par ligne, par fichier, par comparaison...). Chaque
+fonction garde donc en cache (LRU borné) ses derniers résultats, et les
+accents courants sont retirés avec str.translate() : le passage coûteux
+par unicodedata n'est fait que pour les caractères plus rares.
+
+Utilisation :
+    from core.text import normaliser_nom
+    normaliser_nom('  Hélène ')  # 'helene'
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+
+# Taille maximale des caches (une entrée par valeur distincte)
+TAILLE_CACHE = 65536
+
+
+# ============================================================================
+# ⚡ TABLE DE TRADUCTION DES ACCENTS COURANTS
+# ============================================================================
+
+def _sans_accents_unicodedata(texte):
+    """Suppression des accents par décomposition NFD (chemin lent)."""
+    texte = unicodedata.normalize('NFD', texte)
+    return ''.join(c for c in texte if unicodedata.category(c) != 'Mn')
+
+
+# Latin-1 + Latin étendu A/B : é → e, ç → c, Ŝ → S, ...
+# La table est calculée avec unicodedata, le résultat est donc identique
+# au chemin lent pour tous ces caractères.
+TABLE_ACCENTS = {}
+for _code in range(0xC0, 0x250):
+    _sans_accent = _sans_accents_unicodedata(chr(_code))
+    if _sans_accent != chr(_code):
+        TABLE_ACCENTS[_code] = _sans_accent
+
+
+def sans_accents(texte):
+    """Supprime les accents (diacritiques) d'un texte."""
+    texte = texte.translate(TABLE_ACCENTS)
+    if texte.isascii():
+        return texte
+    return _sans_accents_unicodedata(texte)
+
+
+# ============================================================================
+# 👤 NOMS
+# ============================================================================
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def normaliser(texte):
+    """Minuscules + suppression accents pour comparaison."""
+    return sans_accents(texte.lower().strip())
+
+
+# Même normalisation, nom historique des imports bénévoles / binômes
+normaliser_nom = normaliser
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def normaliser_compact(texte):
+    """
+    Normalise un nom pour comparaison stricte : sans accents, en minuscules,
+    sans espaces ni astérisques ("Le Gall*" → "legall").
+    """
+    if not texte:
+        return ""
+    return re.sub(r'[*\s]+', '', sans_accents(texte).lower())
+
+
+def texte_recherche(texte):
+    """
+    Texte pour l'index de recherche (colonne recherche, core.recherche) :
+    minuscules, sans accents, espaces réduits. Pas de cache : les valeurs
+    (adresses, e-mails...) sont presque toutes distinctes.
+    """
+    return ' '.join(sans_accents(texte.lower()).split())
+
+
+# ============================================================================
+# 🗣️ CLÉ PHONÉTIQUE
+# ============================================================================
+
+# Règles appliquées dans l'ordre sur un nom sans accents, en minuscules.
+# Les sons sont codés en MAJUSCULES pour ne plus être réécrits ensuite :
+# X = ch, J = j / ge / dj, K = k / c dur / qu, S = s / c doux / z, F = f / ph...
+REGLES_PHONETIQUES = [(re.compile(motif), code) for motif, code in [
+    (r'ch(?=[lr])', 'K'),                   # Christophe, Chloé
+    (r't?s?ch|sh', 'X'),                    # Tchorbadjian, Schmitt, Shirley
+    (r'gu(?=[eiy])', 'G'),                  # Guillaume
+    (r'gn', 'N'),                           # Agnès
+    (r'dj|dg|g(?=[eiy])|j', 'J'),           # Djamel, Georges, Jean
+    (r'g', 'G'),
+    (r'ph|f', 'F'),                         # Philippe, Stéphane
+    (r'qu|ck|q|k|c(?![eiy])', 'K'),         # Quentin, Nicolas
+    (r'c|s|z', 'S'),                        # Cécile, Zoé
+    (r'x', 'KS'),
+    (r'w|v', 'V'),
+    (r'y', 'i'),
+    (r'h', ''),                             # h muet
+    (r'b', 'B'), (r'd', 'D'), (r'l', 'L'), (r'm', 'M'),
+    (r'n', 'N'), (r'p', 'P'), (r'r', 'R'), (r't', 'T'),
+]]
+
+# c et g doux, notés avant de retirer la finale muette, qui emporterait le
+# e qui les adoucit : Alice / Alisse, Patrice, Serge, Georges
+ADOUCISSEMENTS = [(re.compile(r'c(?=[eiy])'), 's'), (re.compile(r'g(?=[eiy])'), 'j')]
+
+# Lettres finales muettes : Dupont / Dupond, Benoît / Benoist, Laurent...
+FINALE_MUETTE = re.compile(r'(?<=..)e*[dstxz]*e*$')
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def phonetique(texte):
+    """
+    Clé phonétique française d'un nom : deux noms qui se prononcent
+    (à peu près) pareil ont la même clé.
+
+        "Tchorbadjian", "Tchorbadjan"      → "XRBJN"
+        "Marie-Hélène", "Marie Helene"     → "MRLN"
+        "Dupont", "Dupond"                 → "DPN"
+        "Mohamed", "Mohammed", "Muhammad"  → "MM"
+        "Alice", "Alisse"                  → "AL"
+
+    Principe : c et g doux notés (ADOUCISSEMENTS), finales muettes
+    retirées, lettres regroupées par son (REGLES_PHONETIQUES), lettres
+    doublées réduites, voyelles supprimées sauf l'initiale (codée "A").
+
+    ⚠️ Clé volontairement grossière : Mahmoud donne aussi "MM", Amine et
+    Amina "AMN". Elle sert à proposer des candidats (recherche, noms
+    approchants d'un import), jamais à rattacher une fiche d'office.
+    """
+    if not texte:
+        return ''
+    texte = re.sub(r'[^a-z]', '', sans_accents(texte.lower()))
+    for motif, lettre in ADOUCISSEMENTS:
+        texte = motif.sub(lettre, texte)
+    texte = FINALE_MUETTE.sub('', texte)
+    for motif, code in REGLES_PHONETIQUES:
+        texte = motif.sub(code, texte)
+
+    cle = []
+    precedent = ''
+    for i, c in enumerate(texte):
+        if c != precedent:
+            if c not in 'aeiou':
+                cle.append(c)
+            elif i == 0:
+                cle.append('A')
+        precedent = c
+    return ''.join(cle)
+
+
+# ============================================================================
+# 🏫 CLASSES
+# ============================================================================
+
+# Mapping pour normaliser les classes du CSV vers les choix du modèle.
+# Toutes les clés sont en MAJUSCULES — la fonction fait un .upper() avant lookup.
+CLASSE_MAPPING = {
+    # Collège — variantes orthographiques
+    '6°': '6e',  '6ÈME': '6e', '6EME': '6e',
+    '5°': '5e',  '5ÈME': '5e', '5EME': '5e',
+    '4°': '4e',  '4ÈME': '4e', '4EME': '4e',
+    '3°': '3e',  '3ÈME': '3e', '3EME': '3e',
+    # Collège — sections (6A … 6E, etc.)
+    '6A': '6e', '6B': '6e', '6C': '6e', '6D': '6e', '6E': '6e',
+    '5A': '5e', '5B': '5e', '5C': '5e', '5D': '5e', '5E': '5e',
+    '4A': '4e', '4B': '4e', '4C': '4e', '4D': '4e', '4E': '4e',
+    '3A': '3e', '3B': '3e', '3C': '3e', '3D': '3e', '3E': '3e',
+    # Lycée général
+    '2NDE': '2de', '2DE': '2de', '2°': '2de', 'SECONDE': '2de',
+    '1ÈRE': '1re', '1ERE': '1re', '1RE': '1re', '1°': '1re', 'PREMIERE': '1re',
+    # Terminale
+    'T': 'Terminale', 'TLE': 'Terminale', 'TERM': 'Terminale', 'TERMINALE': 'Terminale',
+    'TS': 'Terminale', 'TES': 'Terminale', 'TL': 'Terminale',
+    # CAP
+    'CAP 1': 'CAP 1e', 'CAP1': 'CAP 1e',
+    'CAP 2': 'CAP 2e', 'CAP2': 'CAP 2e',
+    # Bac Pro
+    '2DE BAC PRO': 'Bac Pro 2e', '2NDE BAC PRO': 'Bac Pro 2e',
+    'SECONDE BAC PRO': 'Bac Pro 2e', '2DE BACPRO': 'Bac Pro 2e',
+    'BAC PRO 2E': 'Bac Pro 2e', 'BAC PRO 2': 'Bac Pro 2e',
+}
+
+
+@lru_cache(maxsize=1)
+def classes_valides():
+    """Valeurs de classe acceptées par le modèle Eleve."""
+    # Import local : évite une dépendance circulaire avec core.models
+    from core.models import Eleve
+    return frozenset(c for c, _ in Eleve.CLASSE_CHOICES)
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def normaliser_classe(classe_str):
+    """Normalise la valeur de classe CSV vers un choix du modèle, ou '' si inconnu."""
+    if not classe_str:
+        return ''
+    classe_str = classe_str.strip()
+    if classe_str in classes_valides():
+        return classe_str
+    return CLASSE_MAPPING.get(classe_str.upper(), '')
+
+
+# ============================================================================
+# 📍 ADRESSES
+# ============================================================================
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def normaliser_adresse(adresse):
+    """
+    Clé de comparaison d'une adresse : sans accents, en minuscules,
+    ponctuation et espaces multiples réduits ("12, Rue  d'Italie" →
+    "12 rue d italie").
+    """
+    if not adresse:
+        return ''
+    adresse = normaliser(adresse)
+    return ' '.join(re.sub(r"[,;.'’\-]+", ' ', adresse).split())
+
+
+# ============================================================================
+# 📞 TÉLÉPHONES
+# ============================================================================
+
+# Plusieurs numéros dans le même champ : "06 12 34 56 78 / 04 91 00 00 00",
+# "06 12 34 56 78 - 04 91 00 00 00", "06 12 34 56 78   04 91 00 00 00"
+SEPARATEURS_TELEPHONE = re.compile(r'[/,;]|\s-\s|\s{2,}|\bou\b|\bet\b', re.IGNORECASE)
+
+# E.164 : au plus 15 chiffres, indicatif compris (clé de 16 caractères)
+CHIFFRES_MAX_TELEPHONE = 15
+
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def normaliser_telephone(telephone):
+    """
+    Format E.164 du premier numéro trouvé, ou '' si aucun.
+
+    Les numéros français sont ramenés à +33 :
+        "06 12 34 56 78"     → "+33612345678"
+        "0033 6 12 34 56 78" → "+33612345678"
+        "6.12.34.56.78"      → "+33612345678"  (zéro perdu par le tableur)
+    Les autres numéros internationaux ("+44 ...") gardent leur indicatif.
+    """
+    if not telephone:
+        return ''
+
+    for numero in SEPARATEURS_TELEPHONE.split(telephone):
+        numero = numero.strip()
+        chiffres = re.sub(r'\D', '', numero)
+        if len(chiffres) < 9:
+            continue
+
+        if numero.startswith('+'):
+            pass
+        elif chiffres.startswith('00'):
+            chiffres = chiffres[2:]
+        elif len(chiffres) == 10 and chiffres.startswith('0'):
+            chiffres = '33' + chiffres[1:]
+        elif len(chiffres) == 9:
+            chiffres = '33' + chiffres
+        else:
+            continue
+
+        # "+33 (0)6 ..." : le zéro entre parenthèses est en trop
+        if chiffres.startswith('330') and len(chiffres) == 12:
+            chiffres = '33' + chiffres[3:]
+        # Plusieurs numéros collés : pas un numéro valide
+        if len(chiffres) > CHIFFRES_MAX_TELEPHONE:
+            continue
+        return '+' + chiffres
+
+    return ''
@@ -82,6 +82,12 @@ urlpatterns = [
     path('autosave/eleve/', views.autosave_eleve, name='autosave_eleve'),
     path('validate/eleve/', views.validate_eleve, name='validate_eleve'),
     path('profil/', views.profil, name='profil'),
+    
+    # ----------------------------------------------------------------
+    # 📈 MÉTRIQUES (Prometheus, protégées par jeton)
+    # ----------------------------------------------------------------
+    # URL : /metrics (chemin attendu par défaut par Prometheus)
+    path('metrics', views.metriques, name='metriques'),
 ]
 
 
@@ -2,17 +2,33 @@
 🎓 VIEWS.PY - Vues de l'application CORE
 """
 
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST
 from django.contrib.admin.views.decorators import staff_member_required
+from .matieres import noms_matieres_par_fiche
+from .metriques import METRIQUES
+from .middleware import totp_configure
 from .models import Eleve, Benevole, Binome
+from .recherche import critere_recherche
 from allauth.mfa.models import Authenticator
 from allauth.socialaccount.models import SocialAccount
 from django.contrib.auth.decorators import login_not_required
+import hmac
 import json
 
 
+# ============================================================================
+# 🔎 RECHERCHE
+# ============================================================================
+
+def filtrer_recherche(request, queryset, **options):
+    """Applique la recherche ?q= (index sans accents, core.recherche) au queryset."""
+    critere = critere_recherche(request.GET.get('q', ''), **options)
+    return queryset if critere is None else queryset.filter(critere)
+
+
 # ============================================================================
 # 🏠 PAGE D'ACCUEIL
 # ============================================================================
@@ -171,6 +187,9 @@ def api_eleves_json(request):
         longitude__isnull=False,
         statut='en_attente'  # Filtrer uniquement les élèves en attente d'accompagnement
     )
+    eleves = list(filtrer_recherche(request, eleves))
+    # Matières de tous les élèves en une requête, noms lus dans le registre
+    matieres = noms_matieres_par_fiche(Eleve.matieres_souhaitees, [e.id for e in eleves])
     
     data = []
     for eleve in eleves:
@@ -185,7 +204,7 @@ def api_eleves_json(request):
             'code_postal': eleve.code_postal,
             'ville': eleve.ville,
             'telephone': eleve.telephone,
-            'matieres_souhaitees': list(eleve.matieres_souhaitees.values_list('nom', flat=True)),
+            'matieres_souhaitees': matieres[eleve.id],
             'arrondissement': eleve.arrondissement,
             'statut': eleve.statut,
         })
@@ -200,6 +219,8 @@ def api_benevoles_json(request):
         longitude__isnull=False,
         statut='Candidat'  # Filtrer uniquement les bénévoles candidats
     )
+    benevoles = list(filtrer_recherche(request, benevoles, matieres=Benevole.matieres))
+    matieres = noms_matieres_par_fiche(Benevole.matieres, [b.id for b in benevoles])
     
     data = []
     for benevole in benevoles:
@@ -213,7 +234,7 @@ def api_benevoles_json(request):
             'code_postal': benevole.code_postal,
             'ville': benevole.ville,
             'telephone': benevole.telephone,
-            'matieres': list(benevole.matieres.values_list('nom', flat=True)),
+            'matieres': matieres[benevole.id],
             'arrondissement': benevole.arrondissement,
         })
     
@@ -226,18 +247,22 @@ def api_benevoles_json(request):
 
 def liste_eleves(request):
     """Liste de tous les élèves"""
-    eleves = Eleve.objects.all().order_by('nom', 'prenom')
+    eleves = filtrer_recherche(request, Eleve.objects.all()).order_by('nom', 'prenom')
     context = {
         'eleves': eleves,
+        'recherche': request.GET.get('q', ''),
     }
     return render(request, 'core/liste_eleves.html', context)
 
 
 def liste_benevoles(request):
     """Liste de tous les bénévoles"""
-    benevoles = Benevole.objects.all().order_by('nom', 'prenom')
+    benevoles = filtrer_recherche(
+        request, Benevole.objects.all(), matieres=Benevole.matieres
+    ).order_by('nom', 'prenom')
     context = {
         'benevoles': benevoles,
+        'recherche': request.GET.get('q', ''),
     }
     return render(request, 'core/liste_benevoles.html', context)
 
@@ -391,3 +416,26 @@ def profil(request):
         'has_mfa': has_mfa,
         'google_data': social_account.extra_data if social_account else {},
     })
+
+
+# ============================================================================
+# 📈 MÉTRIQUES (Prometheus)
+# ============================================================================
+
+@login_not_required
+def metriques(request):
+    """
+    Métriques de l'application au format Prometheus (core.metriques).
+
+    Accès pour le collecteur avec l'en-tête « Authorization: Bearer
+    <METRIQUES_JETON> », ou pour un membre du staff connecté avec son 2FA.
+    """
+    jeton = settings.METRIQUES_JETON
+    autorisation = request.headers.get('Authorization', '')
+    # En octets : compare_digest refuse les str non ASCII (en-tête quelconque)
+    par_jeton = bool(jeton) and hmac.compare_digest(autorisation.encode(), f'Bearer {jeton}'.encode())
+    par_compte = (request.user.is_authenticated and request.user.is_staff
+                  and totp_configure(request))
+    if not (par_jeton or par_compte):
+        return HttpResponse('Accès refusé\n', status=403, content_type='text/plain; charset=utf-8')
+    return HttpResponse(METRIQUES.exposer(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -71,6 +71,7 @@ INSTALLED_APPS = [
 # Ils traitent les requêtes/réponses dans l'ordre de la liste
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',              # Mesures et métriques
     'django.middleware.security.SecurityMiddleware',       # Sécurité
     'django.contrib.sessions.middleware.SessionMiddleware', # Sessions utilisateur
     'django.middleware.common.CommonMiddleware',           # Fonctionnalités communes
@@ -217,6 +218,15 @@ MEDIA_URL = '/media/'
 # Dossier où stocker les uploads
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Fichiers produits par les tâches de fond (exports) : hors de MEDIA_ROOT,
+# téléchargés uniquement depuis l'admin (voir core.taches)
+TACHES_ROOT = config('TACHES_ROOT', default=str(BASE_DIR / 'taches'))
+
+# Une tâche « en cours » sans activité (progression écrite) depuis plus
+# longtemps (secondes) est considérée abandonnée (worker tué, serveur
+# redémarré) et remise en file
+TACHES_DELAI_MAX = config('TACHES_DELAI_MAX', default=600, cast=int)
+
 
 # ============================================================================
 # 🔐 AUTHENTIFICATION
@@ -273,7 +283,33 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'INFO',
     },
+    'loggers': {
+        # Traces de LoginRequiredMiddleware : LOG_LEVEL_MIDDLEWARE=DEBUG pour les voir
+        'core.middleware': {
+            'level': config('LOG_LEVEL_MIDDLEWARE', default='WARNING'),
+        },
+    },
 }
+
+# ⏱️ Mesure des performances (core.performance) : en-tête Server-Timing et
+# journal des requêtes plus lentes que le seuil. Désactivée : aucun coût.
+PERF_ACTIVE = config('PERF_ACTIVE', default=False, cast=bool)
+PERF_SEUIL_LENT_MS = config('PERF_SEUIL_LENT_MS', default=500, cast=int)
+
+# 📈 Métriques Prometheus (core.metriques) exposées sur /metrics. Accès avec
+# l'en-tête « Authorization: Bearer <METRIQUES_JETON> », ou en staff connecté.
+# Désactivées par défaut : ni mesure par requête, ni fichier écrit.
+METRIQUES_ACTIVE = config('METRIQUES_ACTIVE', default=False, cast=bool)
+METRIQUES_JETON = config('METRIQUES_JETON', default='')
+METRIQUES_DIR = config('METRIQUES_DIR', default=str(BASE_DIR / 'metriques'))
+METRIQUES_INTERVALLE = config('METRIQUES_INTERVALLE', default=15, cast=int)
+
+# 🗄️ Statistiques des requêtes SQL par empreinte (core.dbstats), lues avec
+# python manage.py top_queries. Désactivées : aucun coût.
+DBSTATS_ACTIVE = config('DBSTATS_ACTIVE', default=False, cast=bool)
+DBSTATS_FICHIER = config('DBSTATS_FICHIER', default=str(Path(METRIQUES_DIR) / 'sql' / 'requetes.json'))
+DBSTATS_INTERVALLE = config('DBSTATS_INTERVALLE', default=60, cast=int)
+
 # ============================================================================
 # 🔐 ALLAUTH - Authentification Google + 2FA
 # ============================================================================
@@ -299,6 +335,10 @@ LOGIN_URL = '/accounts/login/'
 ACCOUNT_LOGOUT_REDIRECT_URL = '/accounts/login/'
 MFA_TOTP_REGENERATE_SECRET_ON_FAILURE = False
 MFA_TOTP_TOLERANCE = 2
+# État 2FA gardé en session par core.middleware, relu en base après ce délai
+# (secondes) : un authentificateur supprimé par un administrateur est pris
+# en compte au plus tard après cette durée
+MFA_ETAT_DUREE = config('MFA_ETAT_DUREE', default=60, cast=int)
 ACCOUNT_IP_ADDRESS_HEADER = 'HTTP_X_FORWARDED_FOR'
 USE_X_FORWARDED_HOST = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -5,6 +5,7 @@
 # ============================================================
 
 set -e  # Arrêter en cas d'erreur
+set -o pipefail  # ... y compris dans "commande | tee"
 
 PROJECT_DIR="/home/ubuntu/esa_manager"
 VENV="$PROJECT_DIR/venv/bin/activate"
@@ -62,55 +63,22 @@ if [ "$SKIP_IMPORT" = false ]; then
     log ""
     log ">>> Étape 4 : Import des données CSV"
 
-    log "  Vidage de la base..."
-    python manage.py dbshell << 'SQL'
-DELETE FROM core_profilutilisateur;
-DELETE FROM core_binome;
-DELETE FROM core_eleve_matieres_souhaitees;
-DELETE FROM core_benevole_matieres;
-DELETE FROM core_eleve;
-DELETE FROM core_benevole;
-SQL
-    log "  Base vidée."
-
-    log "  Import bénévoles..."
-    python manage.py import_benevoles \
-        "$CSV_DIR/benevoles.csv" \
-        "$CSV_DIR/candidats.csv" \
+    # Imports joués dans une base de préparation, validés, puis basculés
+    # en une transaction : le site n'est jamais vide ni à moitié rempli.
+    # En cas d'échec, la production reste intacte.
+    GEO_ARGS=(--report "$PROJECT_DIR/echecs_geo_$(date +%Y%m%d).csv")
+    if [ "$SKIP_GEO" = true ]; then
+        GEO_ARGS=(--sans-geo)
+    fi
+
+    python manage.py recharger_donnees \
+        --benevoles "$CSV_DIR/benevoles.csv" "$CSV_DIR/candidats.csv" \
+        --eleves "$CSV_DIR/eleves.csv" \
+        --eleves-attente "$CSV_DIR/eleves_en_attente.csv" \
+        --binomes "$CSV_DIR"/binomes_*.csv \
+        "${GEO_ARGS[@]}" \
         | tee -a "$LOG_FILE"
-
-    log "  Import élèves accompagnés..."
-    python manage.py import_eleves \
-        "$CSV_DIR/eleves.csv" \
-        | tee -a "$LOG_FILE"
-
-    log "  Import élèves en attente..."
-    python manage.py import_eleves_attente \
-        "$CSV_DIR/eleves_en_attente.csv" \
-        | tee -a "$LOG_FILE"
-
-    log "  Import binômes..."
-    python manage.py import_binomes \
-        "$CSV_DIR"/binomes_*.csv \
-        | tee -a "$LOG_FILE"
-
-    log "  Reconstruction des profils co-responsables..."
-    python manage.py shell -c "
-from core.models import Benevole
-from django.contrib.auth.models import User
-from core.models import ProfilUtilisateur
-
-for profil in ProfilUtilisateur.objects.all():
-    user = profil.user
-    try:
-        benevole = Benevole.objects.get(email=user.email)
-        profil.benevole = benevole
-        profil.save()
-        print(f'OK: {user.username} -> {benevole.nom}')
-    except Benevole.DoesNotExist:
-        print(f'Non trouvé: {user.username} ({user.email})')
-"
-    log "  Profils co-responsables reconstruits."
+    log "  Données rechargées."
 
 else
     log ""
@@ -120,17 +88,7 @@ fi
 # ------------------------------------------------------------
 # 5. GÉOLOCALISATION
 # ------------------------------------------------------------
-if [ "$SKIP_GEO" = false ] && [ "$SKIP_IMPORT" = false ]; then
-    log ""
-    log ">>> Étape 5 : Géolocalisation"
-    python manage.py geolocalize_all \
-        --report "$PROJECT_DIR/echecs_geo_$(date +%Y%m%d).csv" \
-        | tee -a "$LOG_FILE"
-    log "Géolocalisation terminée."
-else
-    log ""
-    log ">>> Étape 5 : Géolocalisation ignorée"
-fi
+# Faite par recharger_donnees avant la bascule (nouvelles adresses seulement)
 
 # ------------------------------------------------------------
 # 6. REDÉMARRAGE DU SERVICE